@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Reaction times of the real daemon against the fake MPD, and a check that its behaviour holds.
+
+The daemon runs unchanged in a subprocess with a temporary HOME and one
+station scheduled all day. The run checks that:
+
+- the scheduled station starts;
+- manual mode is respected (another station keeps playing);
+- "return to schedule" (removing the lock file) brings the scheduled
+  station back;
+- a stream stopped behind the daemon's back is restarted.
+
+It reports how long each reaction took, the control socket round trip and
+the daemon's own task timings. ``--root`` runs the daemon from another
+checkout, e.g. to compare with an older version (which has no control
+socket).
+
+Usage: python benchmarks/bench_daemon_loop.py [--root PATH] [--pings 200]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+import daemon_loop  # noqa: E402
+from fake_mpd import FakeMPD  # noqa: E402
+from fake_stream_server import start_servers, stop_servers  # noqa: E402
+
+
+def _write_config(home: Path, base_url: str, port: int) -> Path:
+    config_dir = home / ".config/radio-scheduler"
+    config_dir.mkdir(parents=True)
+    config = {
+        "stations": [
+            {"name": "Scheduled", "url": f"{base_url}/ok/1", "genre": "test"},
+            {"name": "Manual", "url": f"{base_url}/ok/2", "genre": "test"},
+        ],
+        "schedule": {"default": "Scheduled", "weekly": [], "news_breaks": {"enabled": False}},
+        "mpd": {"host": "127.0.0.1", "port": port},
+    }
+    (config_dir / "config.yaml").write_text(yaml.safe_dump(config), encoding="utf-8")
+    return config_dir
+
+
+def _wait_for(predicate, timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def _playing(player, url: str, since: float = 0.0) -> bool:
+    return (player.state == "play" and player.playlist[:1] == [url]
+            and player.played_at is not None and player.played_at >= since)
+
+
+def run(root=ROOT, pings=200):
+    """Returns a flat dict of results (seconds, counts, flags)."""
+    streams = start_servers(1, stream_seconds=3600)
+    server = FakeMPD().start()
+    player = server.player
+    base_url = streams[0][0].base_url
+    scheduled, manual = f"{base_url}/ok/1", f"{base_url}/ok/2"
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        config_dir = _write_config(home, base_url, server.port)
+        control = config_dir / "daemon.sock"
+        env = dict(os.environ, HOME=str(home), PATH=f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}")
+        start = time.time()
+        daemon = subprocess.Popen([sys.executable, str(Path(root) / "radio-scheduler.py")], env=env)
+        try:
+            results["starts_scheduled"] = _wait_for(lambda: _playing(player, scheduled), 30)
+            results["startup_s"] = player.played_at - start if results["starts_scheduled"] else None
+
+            # Tryb ręczny: GUI zakłada blokadę i samo włącza inną stację
+            (config_dir / "manual_override.lock").touch()
+            time.sleep(1)
+            player.clear()
+            player.add(manual)
+            player.play()
+            time.sleep(12) # Dłużej niż najdłuższa przerwa między obiegami
+            results["manual_respected"] = _playing(player, manual)
+
+            since = time.time()
+            (config_dir / "manual_override.lock").unlink()
+            resumed = _wait_for(lambda: _playing(player, scheduled, since), 20)
+            results["return_to_schedule_s"] = player.played_at - since if resumed else None
+
+            time.sleep(5) # Monitor musi uznać strumień za zdrowy
+            since = time.time()
+            player.stop()
+            restarted = _wait_for(lambda: _playing(player, scheduled, since), 30)
+            results["restart_after_stop_s"] = player.played_at - since if restarted else None
+
+            times = []
+            for _ in range(pings):
+                t = time.perf_counter()
+                reply = daemon_loop.request("ping", control)
+                if reply is None:
+                    break
+                times.append(time.perf_counter() - t)
+            results["control_ping_s"] = statistics.median(times) if times else None
+            reply = daemon_loop.request("metrics", control)
+            if reply and reply.get("ok"):
+                commands = reply["result"]["tasks"]["commands"]
+                for name in ("schedule_pass", "zone_pass", "idle_check"):
+                    if name in commands:
+                        results[f"{name}_p50_s"] = commands[name]["p50"]
+                        results[f"{name}_count"] = commands[name]["count"]
+                if "loop_lag" in commands:
+                    results["loop_lag_max_s"] = commands["loop_lag"]["max"]
+            results["daemon_alive"] = daemon.poll() is None
+        finally:
+            daemon.terminate()
+            daemon.wait()
+            server.close()
+            stop_servers(streams)
+        log = (config_dir / "radio-scheduler.log").read_text(encoding="utf-8", errors="replace")
+        results["errors_logged"] = log.count(" - ERROR - ") + log.count(" - CRITICAL - ")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--root", default=str(ROOT), help="Checkout whose radio-scheduler.py to run")
+    parser.add_argument("--pings", type=int, default=200)
+    args = parser.parse_args()
+    for key, value in run(args.root, args.pings).items():
+        if key.endswith("_s") and value is not None:
+            print(f"{key:24} {value * 1e3:12.2f} ms")
+        else:
+            print(f"{key:24} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""DNS cost of a station switch with and without pre-resolution, and the cost of the lookahead.
+
+The resolver is simulated with a fixed delay (a slow or flaky upstream), so
+the numbers do not depend on the network the benchmark runs on.
+
+Usage: python benchmarks/bench_dns_prefetch.py [--resolver-delay 0.15] [--switches 20]
+"""
+import argparse
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import dns_cache  # noqa: E402
+import schedule_engine  # noqa: E402
+
+SCHEDULE = {
+    "default": "Default",
+    "weekly": [{"days": ["mon", "tue", "wed", "thu", "fri"], "from": f"{h:02d}:00", "to": f"{h + 1:02d}:00",
+                "station": f"Station {h}"} for h in range(6, 22)],
+    "news_breaks": {"enabled": True, "simple": {"station": "News", "from": "06:00", "to": "22:00",
+                                                "interval_minutes": 60, "duration_minutes": 5}},
+}
+
+
+def run(resolver_delay=0.15, switches=20, lead=90):
+    """Returns a flat dict of results (seconds)."""
+    def slow_resolve(host, port):
+        time.sleep(resolver_delay)
+        return ["192.0.2.1"]
+
+    hosts = [f"stream{i}.example.net" for i in range(switches)]
+
+    cold_cache = dns_cache.DNSCache(resolve_fn=slow_resolve, ttl_fn=None)
+    cold = []
+    for host in hosts:
+        start = time.perf_counter()
+        cold_cache.lookup(host)
+        cold.append(time.perf_counter() - start)
+
+    warm_cache = dns_cache.DNSCache(resolve_fn=slow_resolve, ttl_fn=None)
+    for host in hosts:
+        warm_cache.prefetch_async([host]).join() # W demonie dzieje się to ~90 s przed zmianą
+    warm = []
+    for host in hosts:
+        start = time.perf_counter()
+        warm_cache.lookup(host)
+        warm.append(time.perf_counter() - start)
+
+    weekly_for = lambda day: SCHEDULE["weekly"]
+    now = datetime(2026, 1, 5, 8, 30)
+    ticks = 1000
+    start = time.perf_counter()
+    for i in range(ticks):
+        schedule_engine.upcoming_transitions(SCHEDULE, weekly_for, now + timedelta(seconds=10 * i),
+                                             timedelta(seconds=lead))
+    lookahead = (time.perf_counter() - start) / ticks
+
+    return {
+        "switches": switches,
+        "switch_dns_cold_p50_s": statistics.median(cold),
+        "switch_dns_prefetched_p50_s": statistics.median(warm),
+        "lookahead_per_tick_s": lookahead,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--resolver-delay", type=float, default=0.15, help="Simulated upstream resolver latency")
+    parser.add_argument("--switches", type=int, default=20)
+    parser.add_argument("--lead", type=int, default=90, help="Lookahead in seconds")
+    args = parser.parse_args()
+    results = run(args.resolver_delay, args.switches, args.lead)
+    for key, value in results.items():
+        if key.endswith("_s"):
+            print(f"{key:30} {value * 1e3:12.3f} ms")
+        else:
+            print(f"{key:30} {value:12}")
+
+
+if __name__ == "__main__":
+    main()
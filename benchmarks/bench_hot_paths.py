@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Hot paths: the daemon's per-tick decision, config load/save, MPD calls and the GUI's station tree.
+
+Tick: with ``--rules`` weekly rules (spread over the week), the station for
+random moments is computed in two ways. The first evaluates
+``target_station`` directly. The second reads the compiled timeline from
+``TimelineCache`` like the daemon does on every tick. The schedule's
+fingerprint is computed once, as the daemon does once per config load.
+``tick_compiled_unkeyed`` omits it, so every tick serializes the day's
+rules. Both ways must agree, also in the middle of a minute and in the last
+minute of a news window. The run also reports the time to compile one day.
+
+Config: ``save_config`` and ``load_config`` are timed with ``--stations``
+stations, for YAML and for SQLite storage.
+
+MPD: the same calls go to the fake MPD through two ``MPCController``
+instances. ``commands: mpc`` (the default) starts an ``mpc`` process per
+command (the stand-in from ``benchmarks/bin``). ``commands: socket`` speaks
+the MPD protocol directly.
+
+GUI: ``find_next_news``, ``refresh_tree`` and ``filter_stations_tree`` from
+radio-scheduler-gui.py run on an offscreen Qt platform in a child process
+with its own HOME. Without PySide6 this part is skipped
+(``gui_available`` False).
+
+Usage: python benchmarks/bench_hot_paths.py [--rules 10,100,1000] [--stations 100,1000,10000] [--calls 50]
+"""
+import argparse
+import importlib.util
+import json
+import os
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+from types import SimpleNamespace
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+import config_store  # noqa: E402
+import schedule_engine  # noqa: E402
+from fake_mpd import FakeMPD  # noqa: E402
+from mpc_controller import MPCController  # noqa: E402
+
+GENRES = ["pop", "rock", "news", "classic", "jazz", "chillout", "talk", "dance", "folk", None]
+NEWS = {"enabled": True, "start_minute_offset": 0, "use_advanced": True,
+        "advanced": [{"days": list(schedule_engine.WEEKDAYS), "from": "06:00", "to": "23:00",
+                      "interval_minutes": 15, "duration_minutes": 3, "station": "News"}]}
+
+
+def make_stations(n: int):
+    rng = random.Random(n)
+    return [{"name": f"Station {i}", "url": f"http://stream{i % 97}.example.org:8000/s{i}",
+             "genre": rng.choice(GENRES), "favorite": i % 50 == 0} for i in range(n)]
+
+
+def make_schedule(rules: int):
+    """``rules`` back-to-back weekly rules, about rules/7 of them on each day."""
+    per_day = -(-rules // 7)
+    width = max(1, 1440 // per_day)
+    weekly = []
+    for i in range(rules):
+        start = (i // 7) * width
+        end = min(start + width, 1439)
+        weekly.append({"days": [schedule_engine.WEEKDAYS[i % 7]], "station": f"Station {i}",
+                       "from": f"{start // 60:02d}:{start % 60:02d}", "to": f"{end // 60:02d}:{end % 60:02d}"})
+    return {"default": "Station 0", "weekly": weekly, "news_breaks": NEWS}
+
+
+def _mean(fn, args_list) -> float:
+    t = time.perf_counter()
+    for args in args_list:
+        fn(*args)
+    return (time.perf_counter() - t) / len(args_list)
+
+
+def _p50(fn, calls: int) -> float:
+    times = []
+    for _ in range(calls):
+        t = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t)
+    return statistics.median(times)
+
+
+def tick(rule_counts, ticks: int = 2000) -> dict:
+    results = {}
+    rng = random.Random(1)
+    start = datetime(2026, 1, 5)
+    moments = [start + timedelta(minutes=rng.randrange(7 * 1440)) for _ in range(ticks)]
+    for rules in rule_counts:
+        sched = make_schedule(rules)
+        weekly_for = lambda day, weekly=sched["weekly"]: weekly # Jak demon przy przechowywaniu w YAML
+
+        results[f"tick_direct_{rules}_s"] = _mean(
+            lambda now: schedule_engine.target_station(sched, weekly_for, now), [(m,) for m in moments])
+        cache = schedule_engine.TimelineCache()
+        fingerprint = schedule_engine.schedule_fingerprint(sched, weekly_for)
+        for day in range(7):
+            cache.get(sched, weekly_for, (start + timedelta(days=day)).date(), fingerprint=fingerprint)
+        results[f"tick_compiled_{rules}_s"] = _mean(
+            lambda now: cache.get(sched, weekly_for, now.date(), fingerprint=fingerprint).at(now),
+            [(m,) for m in moments])
+        results[f"tick_compiled_unkeyed_{rules}_s"] = _mean(
+            lambda now: cache.get(sched, weekly_for, now.date()).at(now), [(m,) for m in moments])
+        t = time.perf_counter()
+        schedule_engine.compile_timeline(sched, sched["weekly"], start.date())
+        results[f"compile_day_{rules}_s"] = time.perf_counter() - t
+        # Także w środku minuty - skompilowany dzień ma się zgadzać co do sekundy
+        checks = [m + timedelta(seconds=rng.choice((0, 1, 30, 59))) for m in moments[:200]]
+        checks += [start + timedelta(days=day, hours=23, seconds=30) for day in range(7)] # Koniec okna newsów
+        results[f"tick_agrees_{rules}"] = all(
+            schedule_engine.target_station(sched, weekly_for, m)
+            == cache.get(sched, weekly_for, m.date(), fingerprint=fingerprint).at(m)
+            for m in checks)
+    return results
+
+
+def config(station_counts) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for count in station_counts:
+            stations = make_stations(count)
+            for storage in (config_store.STORAGE_YAML, config_store.STORAGE_SQLITE):
+                path = Path(tmp) / f"{storage}-{count}.yaml"
+                data = {"language": "en", "stations": stations, "schedule": make_schedule(50)}
+                if storage == config_store.STORAGE_SQLITE:
+                    data.update(storage=storage, storage_path=str(path.with_suffix(".db")))
+                t = time.perf_counter()
+                config_store.save_config(data, path)
+                results[f"config_save_{storage}_{count}_s"] = time.perf_counter() - t
+                t = time.perf_counter()
+                loaded = config_store.load_config(path)
+                results[f"config_load_{storage}_{count}_s"] = time.perf_counter() - t
+                if len(loaded["stations"]) != count:
+                    results[f"config_roundtrip_{storage}_{count}"] = False
+    results["config_roundtrip"] = not any(key.startswith("config_roundtrip_") for key in results)
+    return results
+
+
+def mpd(calls: int) -> dict:
+    results = {}
+    os.environ["PATH"] = f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}"
+    server = FakeMPD().start()
+    try:
+        url = "http://example.net/stream"
+        controllers = {commands: MPCController("127.0.0.1", server.port, commands=commands)
+                       for commands in ("mpc", "socket")}
+        for commands, mpc in controllers.items():
+            results[f"{commands}_current_url_s"] = _p50(mpc.get_current_url, calls)
+            results[f"{commands}_volume_s"] = _p50(mpc.get_volume, calls)
+            results[f"{commands}_play_url_s"] = _p50(lambda: mpc.play_url(url), calls)
+        results["mpc_socket_agree"] = (controllers["mpc"].get_current_url() == controllers["socket"].get_current_url() == url
+                                       and controllers["mpc"].get_volume() == controllers["socket"].get_volume())
+        results["socket_speedup"] = f"{results['mpc_current_url_s'] / results['socket_current_url_s']:.0f}x"
+    finally:
+        server.close()
+    return results
+
+
+def _gui_worker(station_counts) -> dict:
+    """Runs inside the child process (HOME is a temporary directory)."""
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    spec = importlib.util.spec_from_file_location("radio_scheduler_gui", ROOT / "radio-scheduler-gui.py")
+    gui = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(gui)
+    from PySide6.QtWidgets import QApplication, QLineEdit, QPushButton, QTreeWidget
+    app = QApplication.instance() or QApplication([]) # noqa: F841 - musi żyć do końca pomiarów
+
+    results = {}
+    sched = make_schedule(100)
+    info = SimpleNamespace(mw=SimpleNamespace(schedule=sched))
+    moments = [datetime(2026, 1, 5) + timedelta(minutes=m) for m in range(0, 7 * 1440, 7)]
+    results["find_next_news_s"] = _mean(lambda now: gui.ScheduleInfoWidget.find_next_news(info, now),
+                                        [(m,) for m in moments])
+    for count in station_counts:
+        registry = gui.StationRegistry.from_dicts(make_stations(count))
+        # Tylko to, czego używają mierzone metody okna - bez całego MainWindow (demon, timery, konfiguracja)
+        view = SimpleNamespace(tree=QTreeWidget(), station_items={}, playing_item=None, stations=registry,
+                               last_known_song=registry[count // 2].url, schedule=sched,
+                               translator=gui.Translator("en"), health_cache=SimpleNamespace(latest=lambda url: None),
+                               apply_stations_btn=QPushButton(), station_filter_input=QLineEdit())
+        view.tree.setColumnCount(2)
+        view.apply_health_badge = lambda item, station: gui.MainWindow.apply_health_badge(view, item, station)
+        t = time.perf_counter()
+        gui.MainWindow.refresh_tree(view)
+        results[f"refresh_tree_{count}_s"] = time.perf_counter() - t
+        queries = ("rock", "station 1", "zzz", "")
+        t = time.perf_counter()
+        for query in queries:
+            view.station_filter_input.setText(query)
+            gui.MainWindow.filter_stations_tree(view)
+        results[f"filter_tree_{count}_s"] = (time.perf_counter() - t) / len(queries)
+    return results
+
+
+def gui(station_counts) -> dict:
+    if importlib.util.find_spec("PySide6") is None:
+        return {"gui_available": False}
+    with tempfile.TemporaryDirectory() as tmp:
+        proc = subprocess.run([sys.executable, __file__, "--gui-worker",
+                               "--stations", ",".join(str(c) for c in station_counts)],
+                              env=dict(os.environ, HOME=tmp, QT_QPA_PLATFORM="offscreen"),
+                              capture_output=True, text=True, timeout=600)
+    if proc.returncode != 0:
+        return {"gui_available": True, "gui_error": proc.stderr.strip().splitlines()[-1:]}
+    results = {"gui_available": True}
+    results.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return results
+
+
+def run(rules=(10, 100, 1000), stations=(100, 1000, 10000), calls=50):
+    """Returns a flat dict of results (seconds, counts, flags)."""
+    results = tick(rules)
+    results.update(config(stations))
+    results.update(mpd(calls))
+    results.update(gui(stations))
+    return results
+
+
+def _counts(text: str):
+    return tuple(int(part) for part in text.split(",") if part)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", type=_counts, default=(10, 100, 1000))
+    parser.add_argument("--stations", type=_counts, default=(100, 1000, 10000))
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--gui-worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.gui_worker:
+        print(json.dumps(_gui_worker(args.stations)))
+        return
+    for key, value in run(args.rules, args.stations, args.calls).items():
+        if key.endswith("_s") and value is not None:
+            print(f"{key:28} {value * 1e3:12.3f} ms")
+        else:
+            print(f"{key:28} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Logging pipeline: time a log call takes on the caller's thread, and bounded disk and memory use.
+
+``--records`` log calls are timed from the caller's side in two setups:
+the former synchronous ``FileHandler`` and the queue pipeline. Both write
+to a disk whose writes take ``--disk-ms`` (a slowed stream stands in for a
+busy SD card). The report gives the mean and p99 per call.
+
+Then ``--megabytes`` of log lines go through the pipeline with small size
+limits. The run reports the files kept, their total size, and the
+compression ratio of the rotated files. Finally a day of heartbeats goes
+to the ring buffer, which must hold only the capacity.
+
+Usage: python benchmarks/bench_log_pipeline.py [--records 2000] [--disk-ms 1] [--megabytes 20]
+"""
+import argparse
+import gzip
+import logging
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+import log_pipeline  # noqa: E402
+
+
+class _SlowFile:
+    """File stream whose every flush waits, like a slow card."""
+
+    def __init__(self, stream, delay: float):
+        self._stream = stream
+        self._delay = delay
+
+    def flush(self):
+        self._stream.flush()
+        time.sleep(self._delay)
+
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+
+def _time_calls(records: int) -> list:
+    logger = logging.getLogger("bench")
+    times = []
+    for i in range(records):
+        t = time.perf_counter()
+        logger.info(f"Changing station to: Station {i % 7} (URL: http://example.net/{i})")
+        times.append(time.perf_counter() - t)
+    return times
+
+
+def caller_latency(records: int, disk_ms: float) -> dict:
+    results = {}
+    root = logging.getLogger()
+    root.setLevel(logging.INFO)
+    with tempfile.TemporaryDirectory() as tmp:
+        handler = logging.FileHandler(Path(tmp) / "sync.log", encoding="utf-8")
+        handler.setFormatter(logging.Formatter(log_pipeline.FORMAT))
+        handler.stream = _SlowFile(handler.stream, disk_ms / 1000)
+        root.addHandler(handler)
+        try:
+            times = _time_calls(records)
+        finally:
+            root.removeHandler(handler)
+            handler.close()
+        results["sync_call_s"] = statistics.mean(times)
+        results["sync_call_p99_s"] = sorted(times)[int(len(times) * 0.99)]
+
+        pipeline = log_pipeline.LogPipeline(Path(tmp) / "queued.log")
+        pipeline.file_handler.stream = _SlowFile(pipeline.file_handler.stream, disk_ms / 1000)
+        pipeline.start()
+        try:
+            times = _time_calls(records)
+            t = time.perf_counter()
+        finally:
+            pipeline.stop()
+        results["queued_call_s"] = statistics.mean(times)
+        results["queued_call_p99_s"] = sorted(times)[int(len(times) * 0.99)]
+        results["queued_drain_s"] = time.perf_counter() - t
+        results["queued_lines_written"] = len((Path(tmp) / "queued.log").read_text(encoding="utf-8").splitlines())
+    return results
+
+
+def rotation(megabytes: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "radio-scheduler.log"
+        pipeline = log_pipeline.LogPipeline(path, max_bytes=1024 * 1024, backup_count=5).start()
+        line = "Changing station to: Station 3 (URL: http://example.net/stream) " + "x" * 40
+        written = 0
+        t = time.perf_counter()
+        i = 0
+        while written < megabytes * 1024 * 1024:
+            logging.info(f"{line} {i}")
+            written += len(line) + 40
+            i += 1
+        pipeline.stop()
+        results["rotation_run_s"] = time.perf_counter() - t
+        files = sorted(Path(tmp).iterdir())
+        results["files_kept"] = len(files)
+        results["bytes_kept"] = sum(f.stat().st_size for f in files)
+        backup = path.with_name(path.name + ".1.gz")
+        if backup.exists():
+            results["gzip_ratio"] = round(len(gzip.decompress(backup.read_bytes())) / backup.stat().st_size, 1)
+
+        buffer = log_pipeline.RingBufferHandler()
+        buffer.setFormatter(logging.Formatter(log_pipeline.FORMAT))
+        heartbeat = logging.getLogger(log_pipeline.HEARTBEAT_LOGGER)
+        heartbeat.addHandler(buffer)
+        for minute in range(3 * 1440):
+            heartbeat.info(f"Heartbeat: Day=mon, Time={minute // 60 % 24:02d}:{minute % 60:02d}")
+        heartbeat.removeHandler(buffer)
+        results["heartbeats_kept"] = len(buffer.tail())
+        results["heartbeat_bytes"] = sum(len(line) for line in buffer.tail())
+        results["heartbeats_in_log"] = path.read_text(encoding="utf-8").count("Heartbeat")
+    return results
+
+
+def run(records=2000, disk_ms=1.0, megabytes=20):
+    """Returns a flat dict of results (seconds, counts, sizes, flags)."""
+    results = caller_latency(records, disk_ms)
+    results.update(rotation(megabytes))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--disk-ms", type=float, default=1.0)
+    parser.add_argument("--megabytes", type=int, default=20)
+    args = parser.parse_args()
+    for key, value in run(args.records, args.disk_ms, args.megabytes).items():
+        if key.endswith("_s") and value is not None:
+            print(f"{key:24} {value * 1e3:12.3f} ms")
+        else:
+            print(f"{key:24} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
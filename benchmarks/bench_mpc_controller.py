@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Cost of MPCController calls against the fake MPD and the ``mpc`` shim, with and without faults.
+
+The clean run times every controller method. The faulty run injects errors
+and dropped connections and checks that the controller reports them as
+failed calls (False/None) instead of raising.
+
+Usage: python benchmarks/bench_mpc_controller.py [--calls 50] [--error-rate 0.2] [--drop-rate 0.1]
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+from fake_mpd import FakeMPD  # noqa: E402
+
+OPERATIONS = {
+    "play_url": lambda mpc: mpc.play_url("http://example.net/stream"),
+    "get_current_url": lambda mpc: mpc.get_current_url(),
+    "get_current": lambda mpc: mpc.get_current(),
+    "get_volume": lambda mpc: mpc.get_volume(),
+    "set_volume": lambda mpc: mpc.set_volume(40),
+    "get_status_dict": lambda mpc: mpc.get_status_dict(),
+}
+
+
+def _use_fake(server):
+    os.environ["MPD_HOST"] = "127.0.0.1"
+    os.environ["MPD_PORT"] = str(server.port)
+    os.environ["PATH"] = f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}"
+
+
+def run(calls=50, error_rate=0.2, drop_rate=0.1):
+    """Returns a flat dict of results (seconds, counts)."""
+    from mpc_controller import MPCController
+    results = {"calls": calls}
+
+    server = FakeMPD().start()
+    try:
+        _use_fake(server)
+        mpc = MPCController()
+        for name, operation in OPERATIONS.items():
+            times = []
+            for _ in range(calls):
+                start = time.perf_counter()
+                operation(mpc)
+                times.append(time.perf_counter() - start)
+            results[f"{name}_p50_s"] = statistics.median(times)
+        results["clean_commands"] = server.commands
+    finally:
+        server.close()
+
+    server = FakeMPD(error_rate=error_rate, drop_rate=drop_rate, seed=3).start()
+    failed = raised = 0
+    try:
+        _use_fake(server)
+        mpc = MPCController()
+        for _ in range(calls):
+            for operation in OPERATIONS.values():
+                try:
+                    if operation(mpc) in (False, None, {}, "–"):
+                        failed += 1
+                except Exception:
+                    raised += 1
+        results["faulty_injected"] = sum(server.injected.values())
+        results["faulty_failed_calls"] = failed
+        results["faulty_raised"] = raised
+    finally:
+        server.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=50)
+    parser.add_argument("--error-rate", type=float, default=0.2)
+    parser.add_argument("--drop-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    for key, value in run(args.calls, args.error_rate, args.drop_rate).items():
+        if key.endswith("_s"):
+            print(f"{key:28} {value * 1e3:12.2f} ms")
+        else:
+            print(f"{key:28} {value:12}")
+
+
+if __name__ == "__main__":
+    main()
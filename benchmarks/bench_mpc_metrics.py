@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Overhead of recording MPD call metrics.
+
+Measures what instrumentation adds to every MPCController call: the two
+clock reads plus ``CommandMetrics.record``, single-threaded and with four
+threads recording at once (the daemon's loop and playback monitor both
+call MPD). Also times a snapshot, which the daemon takes once a minute.
+
+Usage: python benchmarks/bench_mpc_metrics.py [--calls 200000]
+"""
+import argparse
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from mpc_metrics import CommandMetrics, format_table  # noqa: E402
+
+COMMANDS = ("status", "current", "volume", "clear", "add", "play")
+
+
+def _record_loop(metrics, latencies, calls):
+    perf_counter = time.perf_counter
+    for i in range(calls):
+        start = perf_counter()
+        metrics.record(COMMANDS[i % 6], perf_counter() - start + latencies[i % len(latencies)], True)
+
+
+def run(calls=200_000, threads=4):
+    """Returns a flat dict of results (seconds, counts)."""
+    rng = random.Random(5)
+    latencies = [rng.lognormvariate(-6, 1.5) for _ in range(1000)]
+
+    # Pusta pętla z tymi samymi odczytami zegara - odejmujemy jej koszt
+    start = time.perf_counter()
+    for i in range(calls):
+        t = time.perf_counter()
+        time.perf_counter() - t + latencies[i % 1000]
+    baseline = (time.perf_counter() - start) / calls
+
+    metrics = CommandMetrics()
+    start = time.perf_counter()
+    _record_loop(metrics, latencies, calls)
+    single = (time.perf_counter() - start) / calls
+
+    contended = CommandMetrics()
+    per_thread = calls // threads
+    workers = [threading.Thread(target=_record_loop, args=(contended, latencies, per_thread)) for _ in range(threads)]
+    start = time.perf_counter()
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    parallel = (time.perf_counter() - start) / (per_thread * threads)
+
+    start = time.perf_counter()
+    for _ in range(100):
+        snapshot = metrics.snapshot()
+    snapshot_cost = (time.perf_counter() - start) / 100
+
+    status = snapshot["commands"]["status"]
+    return {
+        "calls": calls,
+        "record_overhead_s": single - baseline,
+        "record_contended_s": parallel - baseline,
+        "snapshot_s": snapshot_cost,
+        "status_p50_s": status["p50"],
+        "status_p99_s": status["p99"],
+        "status_count": status["count"],
+        "lost_updates": threads * per_thread - sum(c["count"] for c in contended.snapshot()["commands"].values()),
+        "table": "\n" + "\n".join(format_table(snapshot)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+    for key, value in run(args.calls, args.threads).items():
+        if key.endswith("_s"):
+            print(f"{key:24} {value * 1e6:12.2f} µs")
+        else:
+            print(f"{key:24} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
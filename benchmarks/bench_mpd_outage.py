@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Cost of polling MPD while it is down or wedged, with and without the circuit breaker.
+
+One poll is what the GUI timer does every tick: status over the socket plus
+``mpc current`` and ``mpc volume`` through the ``mpc`` shim. "Down" means
+nothing listens on the port; "wedged" means connections are accepted but
+MPD never answers. Without the breaker every poll pays the full timeout.
+
+Usage: python benchmarks/bench_mpd_outage.py [--polls 10]
+"""
+import argparse
+import os
+import socket
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+import mpc_controller  # noqa: E402
+from mpc_controller import MPCController  # noqa: E402
+
+
+def _poll(mpc):
+    mpc.get_status_dict()
+    mpc.get_current()
+    mpc.get_volume()
+
+
+def _measure(port, polls, breaker):
+    os.environ["MPD_PORT"] = str(port)
+    mpc = MPCController("127.0.0.1", port)
+    if not breaker:
+        mpc.breaker.threshold = float("inf")
+    times = []
+    for _ in range(polls):
+        start = time.perf_counter()
+        _poll(mpc)
+        times.append(time.perf_counter() - start)
+    return sum(times) / polls, mpc.breaker.rejected
+
+
+def run(polls=10):
+    """Returns a flat dict of results (seconds, counts)."""
+    os.environ["MPD_HOST"] = "127.0.0.1"
+    os.environ["PATH"] = f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}"
+    results = {"polls": polls, "command_timeout_s": mpc_controller.COMMAND_TIMEOUT}
+
+    with socket.socket() as free:
+        free.bind(("127.0.0.1", 0))
+        down_port = free.getsockname()[1]
+    results["down_poll_s"], _ = _measure(down_port, polls, breaker=False)
+    results["down_poll_breaker_s"], results["down_rejected"] = _measure(down_port, polls, breaker=True)
+
+    # Nasłuchuje, ale nigdy nie odbiera połączeń - klient czeka na powitanie do limitu czasu
+    with socket.socket() as wedged:
+        wedged.bind(("127.0.0.1", 0))
+        wedged.listen(64)
+        port = wedged.getsockname()[1]
+        results["wedged_poll_s"], _ = _measure(port, max(2, polls // 5), breaker=False)
+        results["wedged_poll_breaker_s"], results["wedged_rejected"] = _measure(port, polls, breaker=True)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--polls", type=int, default=10)
+    args = parser.parse_args()
+    for key, value in run(args.polls).items():
+        if key.endswith("_s"):
+            print(f"{key:24} {value * 1e3:12.1f} ms")
+        else:
+            print(f"{key:24} {value:12}")
+
+
+if __name__ == "__main__":
+    main()
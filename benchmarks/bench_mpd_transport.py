@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""MPD call latency over a local Unix socket versus TCP, with and without a password.
+
+The same fake MPD serves both transports. ``status`` is the direct socket
+query the playback monitor makes every second; ``volume`` goes through the
+``mpc`` shim like all other controller calls, so process start-up dominates.
+
+Usage: python benchmarks/bench_mpd_transport.py [--calls 300]
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+from fake_mpd import FakeMPD  # noqa: E402
+from mpc_controller import MPCController  # noqa: E402
+
+
+def _p50(fn, calls):
+    times = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def run(calls=300, password="secret"):
+    """Returns a flat dict of results (seconds)."""
+    os.environ["PATH"] = f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}"
+    results = {"calls": calls}
+    with tempfile.TemporaryDirectory() as tmp:
+        for secured in (False, True):
+            pw = password if secured else None
+            tcp = FakeMPD(password=pw).start()
+            unix = FakeMPD(os.path.join(tmp, "mpd.sock"), password=pw).start()
+            try:
+                suffix = "_password" if secured else ""
+                for name, mpc in (("tcp", MPCController("127.0.0.1", tcp.port, password=pw)),
+                                  ("unix", MPCController(socket_path=unix.server_address, password=pw))):
+                    assert mpc.get_status_dict(), f"no status over {name}"
+                    results[f"{name}_status{suffix}_s"] = _p50(mpc.get_status_dict, calls)
+                    if not secured:
+                        results[f"{name}_mpc_volume_s"] = _p50(mpc.get_volume, max(10, calls // 10))
+            finally:
+                tcp.close()
+                unix.close()
+    results["unix_status_speedup"] = results["tcp_status_s"] / results["unix_status_s"]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--calls", type=int, default=300)
+    args = parser.parse_args()
+    for key, value in run(args.calls).items():
+        if key.endswith("_s"):
+            print(f"{key:28} {value * 1e3:10.3f} ms")
+        elif isinstance(value, float):
+            print(f"{key:28} {value:10.2f}x")
+        else:
+            print(f"{key:28} {value:10}")
+
+
+if __name__ == "__main__":
+    main()
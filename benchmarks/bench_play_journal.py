@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Cost of the play journal: appending, daily rollups and loading a year of statistics.
+
+The journal is filled with a year of station changes from the schedule
+simulator (see bench_simulation). The report covers:
+
+- the time per appended record;
+- the first rollup of the whole year and the incremental rollup of one
+  more day;
+- loading the statistics of the year from the rollups, against summing
+  the raw journal.
+
+It also checks that both give the same hours per station.
+
+Usage: python benchmarks/bench_play_journal.py [--days 365]
+"""
+import argparse
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+sys.path.insert(0, str(BENCH_DIR))
+import play_journal  # noqa: E402
+import schedule_simulator  # noqa: E402
+from bench_simulation import CONFIG  # noqa: E402
+
+REASONS = {schedule_simulator.REASON_NEWS: play_journal.REASON_NEWS,
+           schedule_simulator.REASON_MANUAL: play_journal.REASON_MANUAL}
+
+
+def run(days=365):
+    """Returns a flat dict of results (seconds, counts, sizes, flags)."""
+    start = datetime(2026, 1, 5)
+    end = start + timedelta(days=days + 1)
+    changes = schedule_simulator.simulate(CONFIG, start, end)
+    results = {"days": days, "records": len(changes)}
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        paths = {"journal_path": tmp / "play_journal.bin", "rollup_path": tmp / "play_rollup.bin"}
+        journal = play_journal.PlayJournal(paths["journal_path"], tmp / "play_journal.names")
+
+        t = time.perf_counter()
+        for change in changes:
+            journal.append(change.station, REASONS.get(change.reason, play_journal.REASON_SCHEDULE),
+                           at=change.at.timestamp())
+        results["append_s"] = (time.perf_counter() - t) / len(changes)
+        results["journal_bytes"] = paths["journal_path"].stat().st_size
+
+        last_day = (start + timedelta(days=days)).date()
+        t = time.perf_counter()
+        results["rollup_rows"] = play_journal.roll_up(last_day - timedelta(days=1), **paths)
+        results["rollup_first_s"] = time.perf_counter() - t
+        t = time.perf_counter()
+        play_journal.roll_up(last_day, **paths)
+        results["rollup_next_day_s"] = time.perf_counter() - t
+        results["rollup_bytes"] = paths["rollup_path"].stat().st_size
+
+        now = play_journal.day_start(last_day.toordinal()) + 12 * 3600
+        t = time.perf_counter()
+        stats = play_journal.load_stats(start.date(), now=now, names_path=tmp / "play_journal.names", **paths)
+        results["load_year_s"] = time.perf_counter() - t
+        results["numpy"] = play_journal.np is not None
+
+        t = time.perf_counter()
+        records = play_journal.records_between(start.timestamp(), now, paths["journal_path"])
+        raw = play_journal.hourly_totals(records, start.timestamp(), now)
+        results["sum_raw_journal_s"] = time.perf_counter() - t
+
+        names = play_journal.load_names(tmp / "play_journal.names")
+        expected = {}
+        for (_day, _zone, station), hours in raw.items():
+            expected[names[station]] = expected.get(names[station], 0.0) + sum(hours)
+        results["hours_total"] = round(sum(stats.per_station.values()) / 3600, 1)
+        results["matches_raw_journal"] = (stats.per_station.keys() == expected.keys() and all(
+            abs(stats.per_station[name] - seconds) < 1.0 for name, seconds in expected.items()))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+    for key, value in run(args.days).items():
+        if key.endswith("_s"):
+            print(f"{key:24} {value * 1e3:12.3f} ms")
+        else:
+            print(f"{key:24} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
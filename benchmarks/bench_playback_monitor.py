@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Detection latency of dead and stalled streams, measured against a fake MPD.
+
+Each trial starts playback on the fake server, lets it run for a moment and
+then kills the stream (MPD stops with an error) or freezes it (MPD keeps
+"playing" but ``elapsed`` stops). The latency is the time from the fault to
+the monitor's event, polling status over a real socket as the daemon does.
+
+Usage: python benchmarks/bench_playback_monitor.py [--trials 5] [--interval 1.0]
+"""
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import playback_monitor  # noqa: E402
+from fake_mpd import FakeMPD  # noqa: E402
+from mpc_controller import MPCController  # noqa: E402
+
+
+def _trial(server, monitor, fault):
+    player = server.player
+    player.clear()
+    player.add("http://example.net/stream")
+    player.play()
+    monitor.expect("http://example.net/stream")
+    monitor.drain()
+    time.sleep(random.uniform(1.5, 2.5))
+    start = time.monotonic()
+    fault(player)
+    while True:
+        events = [e for e in monitor.drain() if e.kind == playback_monitor.EVENT_FAILED]
+        if events:
+            return time.monotonic() - start
+        monitor.wait(0.05)
+
+
+def run(trials=5, interval=1.0, dead_after=5.0):
+    """Returns a flat dict of results (seconds)."""
+    random.seed(7)
+    server = FakeMPD().start()
+    mpc = MPCController("127.0.0.1", server.port)
+    monitor = playback_monitor.PlaybackMonitor(mpc.get_status_dict, interval=interval, dead_after=dead_after)
+    monitor.start()
+    try:
+        errors = [_trial(server, monitor, lambda p: p.fail()) for _ in range(trials)]
+        stops = [_trial(server, monitor, lambda p: p.fail(None)) for _ in range(trials)]
+        stalls = [_trial(server, monitor, lambda p: p.stall()) for _ in range(trials)]
+        start = time.perf_counter()
+        for _ in range(50):
+            mpc.get_status_dict()
+        poll_cost = (time.perf_counter() - start) / 50
+    finally:
+        monitor.stop()
+        server.close()
+    return {
+        "trials": trials,
+        "error_detect_p50_s": statistics.median(errors),
+        "error_detect_max_s": max(errors),
+        "stop_detect_p50_s": statistics.median(stops),
+        "stall_detect_p50_s": statistics.median(stalls),
+        "stall_detect_max_s": max(stalls),
+        "status_poll_cost_s": poll_cost,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--interval", type=float, default=1.0, help="Status poll interval")
+    parser.add_argument("--dead-after", type=float, default=5.0, help="Seconds without progress before a stream is dead")
+    args = parser.parse_args()
+    for key, value in run(args.trials, args.interval, args.dead_after).items():
+        if key.endswith("_s"):
+            print(f"{key:24} {value * 1e3:12.1f} ms")
+        else:
+            print(f"{key:24} {value:12}")
+
+
+if __name__ == "__main__":
+    main()
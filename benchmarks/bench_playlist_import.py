@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Throughput benchmark: sequential vs. process-pool playlist folder import.
+
+Usage: python benchmarks/bench_playlist_import.py [--files 200] [--entries 2000] [--workers N]
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import playlist_import  # noqa: E402
+
+GENRES = ["pop", "rock", "news", "classic", "jazz", "chillout", "asian", "talk", "dance", "folk"]
+
+
+def make_tree(root: Path, files: int, entries: int, duplicate_ratio=0.1):
+    """Writes ``files`` M3U/PLS playlists into genre folders; some URLs repeat across files."""
+    random.seed(42)
+    for f in range(files):
+        folder = root / GENRES[f % len(GENRES)]
+        folder.mkdir(exist_ok=True)
+        urls = []
+        for e in range(entries):
+            i = random.randrange(f * entries + 1) if random.random() < duplicate_ratio else f * entries + e
+            urls.append((f"Station {i}", f"http://stream{i % 97}.example.org:8000/s{i}"))
+        if f % 2:
+            lines = ["[playlist]"]
+            for n, (name, url) in enumerate(urls, 1):
+                lines += [f"File{n}={url}", f"Title{n}={name}"]
+            lines.append(f"NumberOfEntries={len(urls)}")
+            (folder / f"list{f}.pls").write_text("\n".join(lines) + "\n", encoding="utf-8")
+        else:
+            lines = ["#EXTM3U"]
+            for name, url in urls:
+                lines += [f"#EXTINF:-1,{name}", url]
+            (folder / f"list{f}.m3u").write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+
+def sequential(paths, root):
+    seen = set()
+    stations = entries = 0
+    for path in paths:
+        result = playlist_import.import_playlist(path, genre=playlist_import.genre_from_path(path, root), seen=seen)
+        stations += len(result.stations)
+        entries += len(result.stations) + result.duplicates
+    return stations, entries
+
+
+def run(files=200, entries=2000, workers=None):
+    """Returns a flat dict of results (seconds and stations per second)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        make_tree(root, files, entries)
+        paths = playlist_import.find_playlists(root)
+
+        start = time.perf_counter()
+        seq_stations, seq_entries = sequential(paths, root)
+        seq_elapsed = time.perf_counter() - start
+
+        result = playlist_import.import_playlists(paths, root=root, max_workers=workers)
+        assert len(result.stations) == seq_stations, "parallel and sequential imports disagree"
+
+    return {
+        "files": files,
+        "entries": seq_entries,
+        "stations_unique": seq_stations,
+        "sequential_s": seq_elapsed,
+        "parallel_s": result.elapsed,
+        "sequential_per_s": seq_entries / seq_elapsed,
+        "parallel_per_s": result.stations_per_second,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    results = run(args.files, args.entries, args.workers)
+    for key, value in results.items():
+        if key.endswith("_per_s"):
+            print(f"{key:28} {value:12.0f} stations/s")
+        elif key.endswith("_s"):
+            print(f"{key:28} {value:12.3f} s")
+        else:
+            print(f"{key:28} {value:12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""On-demand profiling: overhead while active and after it ends, and profiles taken from the real daemon.
+
+In-process, a CPU-bound workload (``--days`` of schedule simulation, see
+bench_simulation) is timed in four ways. It runs without a profiler, under
+the sampling profiler, under cProfile and with tracemalloc. It is timed
+once more after all of them ended, to show that nothing is left running.
+
+The daemon then runs in a subprocess against the fake MPD, as in
+bench_daemon_loop. The run asks it for a sampling profile and a memory
+capture on the control socket, and for a CPU profile by SIGUSR1 (a second
+SIGUSR1 ends it). It checks that the files appear under ``profiles/``.
+
+Usage: python benchmarks/bench_profiling.py [--days 60]
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+import daemon_loop  # noqa: E402
+import profiling  # noqa: E402
+import schedule_simulator  # noqa: E402
+from bench_daemon_loop import _playing, _wait_for, _write_config  # noqa: E402
+from bench_simulation import CONFIG  # noqa: E402
+from fake_mpd import FakeMPD  # noqa: E402
+from fake_stream_server import start_servers, stop_servers  # noqa: E402
+
+
+def _workload(days: int) -> float:
+    start = datetime(2026, 1, 5)
+    t = time.perf_counter()
+    schedule_simulator.simulate(CONFIG, start, start + timedelta(days=days))
+    return time.perf_counter() - t
+
+
+def overhead(days: int) -> dict:
+    results = {}
+    _workload(days) # Rozgrzewka (importy, pamięci podręczne)
+    base = min(_workload(days) for _ in range(5))
+    results["workload_s"] = base
+    with tempfile.TemporaryDirectory() as tmp:
+        profiler = profiling.Profiler("bench", Path(tmp))
+        for mode in profiling.MODES:
+            profiler.start_cpu(3600, mode)
+            active = _workload(days)
+            t = time.perf_counter()
+            profiler.stop_cpu()
+            results[f"{mode}_write_s"] = time.perf_counter() - t
+            results[f"{mode}_overhead"] = f"{active / base:.2f}x"
+        profiler.start_memory(3600)
+        active = _workload(days)
+        t = time.perf_counter()
+        profiler.finish_memory()
+        results["memory_write_s"] = time.perf_counter() - t
+        results["memory_overhead"] = f"{active / base:.2f}x"
+        results["after_stop_overhead"] = f"{min(_workload(days) for _ in range(5)) / base:.2f}x"
+        results["files_written"] = len(list(Path(tmp).iterdir()))
+    return results
+
+
+def daemon(profile_seconds: float = 1.0) -> dict:
+    streams = start_servers(1, stream_seconds=3600)
+    server = FakeMPD().start()
+    player = server.player
+    base_url = streams[0][0].base_url
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        config_dir = _write_config(Path(tmp), base_url, server.port)
+        profiles = config_dir / "profiles"
+        control = config_dir / "daemon.sock"
+        proc = subprocess.Popen([sys.executable, str(ROOT / "radio-scheduler.py")],
+                                env=dict(os.environ, HOME=tmp, PATH=f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}"))
+
+        def written(pattern):
+            return lambda: profiles.is_dir() and any(profiles.glob(pattern))
+        try:
+            results["starts_scheduled"] = _wait_for(lambda: _playing(player, f"{base_url}/ok/1"), 30)
+            _wait_for(lambda: daemon_loop.request("ping", control) is not None, 10)
+            reply = daemon_loop.request("profile", control, seconds=profile_seconds)
+            results["profile_started"] = bool(reply and reply.get("ok") and reply["result"]["cpu"])
+            results["sample_written"] = _wait_for(written("daemon-*-sample.txt"), profile_seconds + 5)
+            folded = next(profiles.glob("daemon-*-sample.folded"), None)
+            results["sampled_stacks"] = len(folded.read_text().splitlines()) if folded else 0
+
+            daemon_loop.request("memory", control, seconds=profile_seconds, top=10)
+            results["memory_written"] = _wait_for(written("daemon-*-memory.txt"), profile_seconds + 5)
+
+            daemon_loop.request("profile", control, seconds=60, mode="cprofile")
+            reply = daemon_loop.request("profile", control, stop=True)
+            results["cprofile_stopped_early"] = bool(reply and reply.get("ok") and reply["result"]["written"])
+            results["cprofile_written"] = written("daemon-*-cprofile.prof")()
+
+            time.sleep(1.1) # Nowa sekunda w nazwie pliku
+            before = len(list(profiles.iterdir()))
+            proc.send_signal(signal.SIGUSR1)
+            time.sleep(0.5)
+            proc.send_signal(signal.SIGUSR1)
+            results["signal_written"] = _wait_for(lambda: len(list(profiles.iterdir())) > before, 5)
+            results["daemon_alive"] = proc.poll() is None
+        finally:
+            proc.terminate()
+            proc.wait()
+            server.close()
+            stop_servers(streams)
+    return results
+
+
+def run(days=60):
+    """Returns a flat dict of results (seconds, counts, sizes, flags)."""
+    results = overhead(days)
+    results.update(daemon())
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=60)
+    args = parser.parse_args()
+    for key, value in run(args.days).items():
+        if key.endswith("_s") and value is not None:
+            print(f"{key:24} {value * 1e3:12.3f} ms")
+        else:
+            print(f"{key:24} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Prometheus endpoint: cost of counting and rendering, and a local scrape of the real daemon.
+
+In-process, ``--increments`` counter increments are timed from one thread
+and from four at once, and the total is checked (no increment lost). A
+render with the histograms of a few zones is timed.
+
+The daemon then runs in a subprocess against the fake MPD, as in
+bench_daemon_loop, with the endpoint enabled on a free port. The run
+scrapes it over HTTP ``--scrapes`` times and reports the latency. It
+checks the samples: a scheduled switch, the current station, MPD command
+latencies, the config reload, and a stream failure counted after the fake
+MPD drops the stream.
+
+Usage: python benchmarks/bench_prometheus.py [--increments 200000] [--scrapes 50]
+"""
+import argparse
+import os
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import yaml
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+import daemon_loop  # noqa: E402
+import mpc_metrics  # noqa: E402
+import prometheus_metrics  # noqa: E402
+from bench_daemon_loop import _playing, _wait_for, _write_config  # noqa: E402
+from fake_mpd import FakeMPD  # noqa: E402
+from fake_stream_server import start_servers, stop_servers  # noqa: E402
+
+COMMANDS = ("status", "current", "volume", "clear", "add", "play")
+
+
+def counting(increments: int) -> dict:
+    results = {}
+    counter = prometheus_metrics.Counter("bench_total", "Benchmark counter", ("zone", "reason"))
+    t = time.perf_counter()
+    for _ in range(increments):
+        counter.inc("main", "schedule")
+    results["inc_s"] = (time.perf_counter() - t) / increments
+
+    per_thread = increments // 4
+    threads = [threading.Thread(target=lambda: [counter.inc("main", "failover") for _ in range(per_thread)])
+               for _ in range(4)]
+    t = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    results["inc_4_threads_s"] = (time.perf_counter() - t) / (per_thread * 4)
+    results["no_lost_increments"] = counter.value("main", "failover") == per_thread * 4
+
+    rng = random.Random(1)
+    zones = []
+    for zone in ("main", "kitchen", "office"):
+        metrics = mpc_metrics.CommandMetrics()
+        for _ in range(5000):
+            metrics.record(rng.choice(COMMANDS), rng.expovariate(500), ok=rng.random() > 0.01)
+        zones.append(((zone,), metrics.snapshot()))
+    t = time.perf_counter()
+    for _ in range(100):
+        text = prometheus_metrics.render([
+            prometheus_metrics.command_histograms("bench_mpd_command", "MPD commands", ("zone",), zones),
+            counter.collect()])
+    results["render_s"] = (time.perf_counter() - t) / 100
+    results["render_bytes"] = len(text)
+    return results
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def scraping(scrapes: int) -> dict:
+    streams = start_servers(1, stream_seconds=3600)
+    server = FakeMPD().start()
+    player = server.player
+    base_url = streams[0][0].base_url
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        config_dir = _write_config(Path(tmp), base_url, server.port)
+        port = _free_port()
+        config = yaml.safe_load((config_dir / "config.yaml").read_text(encoding="utf-8"))
+        config["prometheus"] = {"port": port}
+        (config_dir / "config.yaml").write_text(yaml.safe_dump(config), encoding="utf-8")
+        url = f"http://127.0.0.1:{port}/metrics"
+        control = config_dir / "daemon.sock"
+        daemon = subprocess.Popen([sys.executable, str(ROOT / "radio-scheduler.py")],
+                                  env=dict(os.environ, HOME=tmp, PATH=f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}"))
+        try:
+            results["starts_scheduled"] = _wait_for(lambda: _playing(player, f"{base_url}/ok/1"), 30)
+            _wait_for(lambda: daemon_loop.request("ping", control) is not None, 10)
+            times = []
+            for _ in range(scrapes):
+                t = time.perf_counter()
+                text = prometheus_metrics.scrape(url)
+                times.append(time.perf_counter() - t)
+            results["scrape_p50_s"] = statistics.median(times)
+            results["scrape_max_s"] = max(times)
+            results["scrape_bytes"] = len(text)
+            samples = prometheus_metrics.parse(text)
+            results["switch_counted"] = samples.get(
+                'radio_scheduler_station_switches_total{zone="main",reason="schedule"}', 0) >= 1
+            results["current_station"] = samples.get(
+                'radio_scheduler_current_station{zone="main",station="Scheduled"}') == 1
+            results["mpd_status_calls"] = samples.get(
+                'radio_scheduler_mpd_command_seconds_count{zone="main",command="status"}')
+            results["schedule_passes"] = samples.get(
+                'radio_scheduler_task_seconds_count{task="schedule_pass"}')
+            results["config_reloads"] = samples.get("radio_scheduler_config_reloads_total")
+
+            player.fail()
+            failures = 'radio_scheduler_stream_failures_total{zone="main",kind="failure"}'
+            since = time.perf_counter()
+            results["failure_counted"] = _wait_for(
+                lambda: prometheus_metrics.parse(prometheus_metrics.scrape(url)).get(failures, 0) >= 1, 20)
+            results["failure_visible_s"] = time.perf_counter() - since
+            reply = daemon_loop.request("prometheus", control)
+            results["control_socket_matches"] = bool(reply and reply.get("ok")) and (
+                prometheus_metrics.parse(reply["result"]).keys() >= {failures})
+            try:
+                prometheus_metrics.scrape(url.replace("/metrics", "/nothing"))
+                results["unknown_path_404"] = False
+            except OSError as e:
+                results["unknown_path_404"] = getattr(e, "code", None) == 404
+        finally:
+            daemon.terminate()
+            daemon.wait()
+            server.close()
+            stop_servers(streams)
+    return results
+
+
+def run(increments=200000, scrapes=50):
+    """Returns a flat dict of results (seconds, counts, sizes, flags)."""
+    results = counting(increments)
+    results.update(scraping(scrapes))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--increments", type=int, default=200000)
+    parser.add_argument("--scrapes", type=int, default=50)
+    args = parser.parse_args()
+    for key, value in run(args.increments, args.scrapes).items():
+        if key.endswith("_s") and value is not None:
+            print(f"{key:24} {value * 1e3:12.3f} ms")
+        else:
+            print(f"{key:24} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
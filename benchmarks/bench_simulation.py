@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Speed of the schedule simulator against evaluating the rules minute by minute.
+
+The schedule has hourly news, weekday morning and evening shows and a
+weekend block, plus a daily manual override ended by auto-resume. The
+simulator jumps from change to change over compiled timelines. The
+reference evaluates ``target_station`` at every minute, which is what
+waiting for the wall clock amounts to, and must give the same changes.
+
+Usage: python benchmarks/bench_simulation.py [--days 365]
+"""
+import argparse
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+sys.path.insert(0, str(BENCH_DIR.parent))
+import schedule_engine  # noqa: E402
+import schedule_simulator  # noqa: E402
+
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri"]
+CONFIG = {
+    "stations": [{"name": name, "url": f"http://radio.example/{name}"} for name in ("A", "B", "C", "D", "News")],
+    "schedule": {
+        "default": "A",
+        "weekly": [
+            {"days": WEEKDAYS, "from": "06:00", "to": "09:00", "station": "B"},
+            {"days": WEEKDAYS, "from": "17:00", "to": "19:30", "station": "C"},
+            {"days": ["sat", "sun"], "from": "10:00", "to": "14:00", "station": "D"},
+        ],
+        "news_breaks": {"enabled": True, "simple": {"station": "News", "from": "06:00", "to": "22:00",
+                                                    "interval_minutes": 60, "duration_minutes": 5}},
+    },
+    "auto_resume_minutes": 45,
+}
+
+
+def _minute_scan(start: datetime, end: datetime):
+    sched = CONFIG["schedule"]
+    changes, current, was_news = [], None, False
+    moment = start
+    while moment < end:
+        station, is_news = schedule_engine.target_station(sched, lambda day: sched["weekly"], moment)
+        if station and ((was_news and not is_news) or station != current):
+            changes.append((moment, station))
+            current = station
+        was_news = is_news
+        moment += timedelta(minutes=1)
+    return changes
+
+
+def run(days=365):
+    """Returns a flat dict of results (seconds, counts)."""
+    start = datetime(2026, 1, 5)
+    end = start + timedelta(days=days)
+    results = {"days": days}
+
+    timelines = schedule_engine.TimelineCache()
+    t = time.perf_counter()
+    changes = schedule_simulator.simulate(CONFIG, start, end, timelines=timelines)
+    results["simulate_s"] = time.perf_counter() - t
+    results["changes"] = len(changes)
+    results["timelines_compiled"] = timelines.compiled
+
+    # Ponowny przebieg z gotowymi przebiegami dni - sam koszt decyzji
+    t = time.perf_counter()
+    schedule_simulator.simulate(CONFIG, start, end, timelines=timelines)
+    results["simulate_warm_s"] = time.perf_counter() - t
+
+    overrides = [(start + timedelta(days=d, hours=10, minutes=20), "D") for d in range(days)]
+    t = time.perf_counter()
+    with_manual = schedule_simulator.simulate(CONFIG, start, end, manual=overrides, timelines=timelines)
+    results["simulate_manual_s"] = time.perf_counter() - t
+    results["auto_resumes"] = sum(c.reason == schedule_simulator.REASON_AUTO_RESUME for c in with_manual)
+
+    week = min(days, 7)
+    t = time.perf_counter()
+    reference = _minute_scan(start, start + timedelta(days=week))
+    results["minute_scan_week_s"] = time.perf_counter() - t
+    results["minute_scan_extrapolated_s"] = results["minute_scan_week_s"] * days / week
+    results["matches_minute_scan"] = reference == [(c.at, c.station) for c in changes
+                                                   if c.at < start + timedelta(days=week)]
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--days", type=int, default=365)
+    args = parser.parse_args()
+    for key, value in run(args.days).items():
+        if key.endswith("_s"):
+            print(f"{key:28} {value * 1e3:12.2f} ms")
+        else:
+            print(f"{key:28} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Ingest rate and query latency of the offline FTS5 station catalog.
+
+Usage: python benchmarks/bench_station_catalog.py [--stations 200000] [--queries 200]
+"""
+import argparse
+import json
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from station_catalog import StationCatalog  # noqa: E402
+
+WORDS = ["radio", "fm", "jazz", "rock", "classic", "news", "polskie", "nowy", "świat", "music", "hits",
+         "chill", "lounge", "metal", "talk", "sport", "city", "love", "dance", "country", "blues", "soul"]
+TAGS = ["pop", "rock", "news", "classical", "jazz", "chillout", "talk", "dance", "folk", "80s", "oldies"]
+COUNTRIES = ["Poland", "Germany", "The United States Of America", "France", "Japan", "Brazil"]
+
+
+def write_dump(path: Path, n: int):
+    """Writes a radio-browser style JSON array with ``n`` synthetic stations."""
+    random.seed(42)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("[")
+        for i in range(n):
+            name = " ".join(random.sample(WORDS, random.randint(1, 3))).title() + f" {i}"
+            record = {"stationuuid": f"uuid-{i}", "name": name, "url": f"http://s{i % 997}.example.org/{i}",
+                      "url_resolved": f"http://s{i % 997}.example.org/{i}.mp3",
+                      "tags": ",".join(random.sample(TAGS, random.randint(0, 3))),
+                      "country": random.choice(COUNTRIES), "language": "polish", "codec": "MP3",
+                      "bitrate": random.choice([64, 128, 192, 320]), "votes": random.randint(0, 5000)}
+            f.write(("," if i else "") + json.dumps(record, ensure_ascii=False))
+        f.write("]")
+
+
+def _latency(catalog, queries, **kwargs):
+    samples = []
+    for q in queries:
+        start = time.perf_counter()
+        catalog.search(q, **kwargs)
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return statistics.median(samples), samples[int(len(samples) * 0.95) - 1]
+
+
+def run(n=200_000, queries=200):
+    """Returns a flat dict of results (records per second and seconds per query)."""
+    with tempfile.TemporaryDirectory() as tmp:
+        dump = Path(tmp) / "stations.json"
+        write_dump(dump, n)
+        with StationCatalog(Path(tmp) / "catalog.db") as catalog:
+            ingest = catalog.ingest(dump)
+            random.seed(7)
+            prefix = [random.choice(WORDS)[:random.randint(2, 4)] for _ in range(queries)]
+            multi = [f"{random.choice(WORDS)} {random.choice(TAGS)[:3]}" for _ in range(queries)]
+
+            def typo(word):
+                i = random.randrange(len(word))
+                return word[:i] + random.choice("aeioxz") + word[i + 1:]
+            fuzzy = [typo(random.choice(WORDS)) + " " + typo(random.choice(WORDS)) for _ in range(queries // 4)]
+            prefix_p50, prefix_p95 = _latency(catalog, prefix, fuzzy=False)
+            multi_p50, multi_p95 = _latency(catalog, multi)
+            fuzzy_p50, fuzzy_p95 = _latency(catalog, fuzzy)
+            db_bytes = catalog.path.stat().st_size
+    return {
+        "stations": n,
+        "ingest_s": ingest.elapsed,
+        "ingest_per_s": ingest.records_per_second,
+        "database_bytes": db_bytes,
+        "query_prefix_p50_s": prefix_p50,
+        "query_prefix_p95_s": prefix_p95,
+        "query_multi_word_p50_s": multi_p50,
+        "query_multi_word_p95_s": multi_p95,
+        "query_fuzzy_p50_s": fuzzy_p50,
+        "query_fuzzy_p95_s": fuzzy_p95,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=200_000)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+    results = run(args.stations, args.queries)
+    for key, value in results.items():
+        if key.endswith("_per_s"):
+            print(f"{key:28} {value:12.0f} records/s")
+        elif key == "ingest_s":
+            print(f"{key:28} {value:12.2f} s")
+        elif key.endswith("_s"):
+            print(f"{key:28} {value * 1e3:12.2f} ms")
+        elif key.endswith("_bytes"):
+            print(f"{key:28} {value / 2**20:12.2f} MiB")
+        else:
+            print(f"{key:28} {value:12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Throughput of the concurrent station prober against local stand-in stream servers.
+
+Usage: python benchmarks/bench_station_health.py [--stations 1000] [--servers 10] [--concurrency 32]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import station_health  # noqa: E402
+from fake_stream_server import start_servers, station_urls, stop_servers  # noqa: E402
+
+
+def run(n=1000, servers=10, concurrency=32, per_host=4, latency=(0.02, 0.2), sequential_sample=30):
+    """Returns a flat dict of results (seconds, probes per second)."""
+    running = start_servers(servers, latency=latency)
+    try:
+        urls = station_urls(running, n)
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = station_health.HealthCache(Path(tmp) / "health.json")
+
+            start = time.perf_counter()
+            for url in urls[:sequential_sample]:
+                station_health.probe(url)
+            sequential = (time.perf_counter() - start) / sequential_sample
+
+            prober = station_health.StationProber(cache, concurrency=concurrency, per_host=per_host)
+            start = time.perf_counter()
+            results = prober.probe_all(urls)
+            elapsed = time.perf_counter() - start
+
+            start = time.perf_counter()
+            prober.probe_all(urls)
+            cached = time.perf_counter() - start
+
+            # Serwery zastępcze odrzucają HEAD (405), jak wiele serwerów Icecast/Shoutcast
+            sample = urls[:sequential_sample]
+            head_only_ok = sum(station_health._request(url, 5.0, "HEAD", 0).ok for url in sample)
+            fallback_ok = sum(station_health.probe(url, head_first=True).ok for url in sample)
+    finally:
+        stop_servers(running)
+
+    ttfbs = sorted(r.ttfb for r in results.values() if r.ttfb is not None)
+    audio = sorted(r.audio_ttfb for r in results.values() if r.audio_ttfb is not None)
+    return {
+        "stations": n,
+        "ok": sum(r.ok for r in results.values()),
+        "failed": sum(not r.ok for r in results.values()),
+        "sequential_estimate_s": sequential * n,
+        "concurrent_s": elapsed,
+        "cached_s": cached,
+        "concurrent_per_s": n / elapsed,
+        "ttfb_p50_s": statistics.median(ttfbs),
+        "ttfb_p95_s": ttfbs[int(len(ttfbs) * 0.95) - 1],
+        "ttfb_audio_p50_s": statistics.median(audio),
+        "received_per_probe_bytes": sum(r.received for r in results.values()) / len(results),
+        "head_only_ok_of_sample": head_only_ok,
+        "head_fallback_ok_of_sample": fallback_ok,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=1000)
+    parser.add_argument("--servers", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--per-host", type=int, default=4)
+    args = parser.parse_args()
+    results = run(args.stations, args.servers, args.concurrency, args.per_host)
+    for key, value in results.items():
+        if key.endswith("_per_s"):
+            print(f"{key:28} {value:12.1f} probes/s")
+        elif key.startswith("ttfb"):
+            print(f"{key:28} {value * 1e3:12.1f} ms")
+        elif key.endswith("_s"):
+            print(f"{key:28} {value:12.2f} s")
+        elif key.endswith("_bytes"):
+            print(f"{key:28} {value / 1024:12.1f} KiB")
+        else:
+            print(f"{key:28} {value:12}")
+
+
+if __name__ == "__main__":
+    main()
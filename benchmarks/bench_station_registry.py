@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Memory and lookup benchmark: plain station dicts vs. StationRegistry.
+
+Usage: python benchmarks/bench_station_registry.py [--stations 100000]
+"""
+import argparse
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from station_registry import Station, StationRegistry  # noqa: E402
+
+GENRES = ["pop", "rock", "news", "classic", "jazz", "chillout", "asian", "talk", "dance", "folk"]
+
+
+def make_dicts(n):
+    return [{"name": f"Station {i}", "url": f"http://stream{i % 97}.example.org:8000/s{i}",
+             "genre": random.choice(GENRES), "favorite": i % 50 == 0} for i in range(n)]
+
+
+def _measure(build):
+    tracemalloc.start()
+    obj = build()
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return obj, size
+
+
+def _timeit(fn, repeat):
+    # Jak timeit: GC wyłączony, żeby pełne przebiegi kolektora nie zaburzały pomiaru
+    gc.disable()
+    try:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            fn()
+        return (time.perf_counter() - start) / repeat
+    finally:
+        gc.enable()
+
+
+def run(n=100_000, lookups=200):
+    """Returns a flat dict of results (bytes and seconds per operation)."""
+    random.seed(42)
+    # Obie struktury budowane od zera pod tracemalloc (łącznie z napisami).
+    # Do pomiarów czasu używamy osobnych kopii - obiekty zaalokowane pod tracemalloc są wolniejsze.
+    _, dict_bytes = _measure(lambda: make_dicts(n))
+    _, records_bytes = _measure(lambda: [Station.from_dict(d) for d in make_dicts(n)])
+    _, registry_bytes = _measure(lambda: StationRegistry.from_dicts(make_dicts(n)))
+    random.seed(42)
+    dicts = make_dicts(n)
+    registry = StationRegistry.from_dicts(dicts)
+
+    names = [f"Station {random.randrange(n)}" for _ in range(lookups)]
+    urls = [dicts[random.randrange(n)]["url"] for _ in range(lookups)]
+
+    linear_name = _timeit(lambda: [next((s for s in dicts if s["name"] == q), None) for q in names[:20]], 1) / 20
+    linear_url = _timeit(lambda: [next((s for s in dicts if s["url"] == q), None) for q in urls[:20]], 1) / 20
+    index_name = _timeit(lambda: [registry.by_name(q) for q in names], 20) / lookups
+    index_url = _timeit(lambda: [registry.by_url(q) for q in urls], 20) / lookups
+
+    def group_dicts():
+        groups = defaultdict(list)
+        for s in dicts:
+            groups[s.get("genre")].append(s)
+        return groups
+
+    group_linear = _timeit(group_dicts, 3)
+    group_index = _timeit(lambda: [registry.by_genre(g) for g in registry.genres()], 3)
+
+    current = registry[n // 2]
+    step = _timeit(lambda: registry.next_of(registry.prev_of(current)), 10_000)
+
+    return {
+        "stations": n,
+        "memory_dicts_bytes": dict_bytes,
+        "memory_records_bytes": records_bytes,
+        "memory_registry_bytes": registry_bytes,
+        "lookup_name_linear_s": linear_name,
+        "lookup_name_index_s": index_name,
+        "lookup_url_linear_s": linear_url,
+        "lookup_url_index_s": index_url,
+        "group_by_genre_linear_s": group_linear,
+        "group_by_genre_index_s": group_index,
+        "prev_next_s": step,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=100_000)
+    args = parser.parse_args()
+    results = run(args.stations)
+    for key, value in results.items():
+        if key.endswith("_s"):
+            print(f"{key:28} {value * 1e6:12.2f} µs")
+        elif key.endswith("_bytes"):
+            print(f"{key:28} {value / 2**20:12.2f} MiB")
+        else:
+            print(f"{key:28} {value:12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Stream telemetry: cost per status sample, bounded memory, and a stall seen by the real daemon.
+
+In-process, ``--hours`` of one-second status samples are fed for more
+stations than the limit, as a long uptime with many schedule changes
+would. The report covers the time per sample, the points and stations
+kept, the file size, and the time to save, load and take a snapshot.
+
+The daemon then runs in a subprocess against the fake MPD, as in
+bench_daemon_loop. The stream plays, stalls for ``--stall`` seconds and
+recovers. The points read through the control socket must show the stall
+event and the slower progress.
+
+Usage: python benchmarks/bench_stream_telemetry.py [--hours 12] [--stall 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+import daemon_loop  # noqa: E402
+import stream_telemetry  # noqa: E402
+from bench_daemon_loop import _playing, _wait_for, _write_config  # noqa: E402
+from fake_mpd import FakeMPD  # noqa: E402
+from fake_stream_server import start_servers, stop_servers  # noqa: E402
+
+
+def bounded(hours: int) -> dict:
+    results = {}
+    now = [1_700_000_000.0]
+    telemetry = stream_telemetry.StreamTelemetry(clock=lambda: now[0])
+    stations = telemetry.max_stations + 12
+    samples = hours * 3600
+    per_station = samples // stations
+    t = time.perf_counter()
+    for i in range(samples):
+        # Co godzinę inna stacja, co 7 s chwilowe buforowanie (elapsed stoi)
+        station = f"Station {i // per_station}"
+        elapsed = i - i // 7
+        now[0] += 1
+        telemetry.sample("main", station, {"state": "play", "elapsed": f"{elapsed:.3f}", "bitrate": "128",
+                                           "audio": "44100:24:2"})
+    results["sample_s"] = (time.perf_counter() - t) / samples
+    results["stations_fed"] = stations
+    results["stations_kept"] = len(telemetry.stations())
+    snapshot = telemetry.snapshot(telemetry.stations()[0])
+    results["points_last_station"] = len(snapshot["points"]["times"])
+    results["progress_median"] = sorted(snapshot["points"]["progress"])[len(snapshot["points"]["progress"]) // 2]
+
+    t = time.perf_counter()
+    for station in telemetry.stations():
+        telemetry.snapshot(station, since=now[0] - 3600)
+    results["snapshot_hour_s"] = (time.perf_counter() - t) / len(telemetry.stations())
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "stream_telemetry.bin"
+        t = time.perf_counter()
+        telemetry.save(path)
+        results["save_s"] = time.perf_counter() - t
+        results["file_bytes"] = path.stat().st_size
+        loaded = stream_telemetry.StreamTelemetry()
+        t = time.perf_counter()
+        loaded.load(path)
+        results["load_s"] = time.perf_counter() - t
+        results["reload_matches"] = all(loaded.snapshot(s) == telemetry.snapshot(s) for s in telemetry.stations())
+    return results
+
+
+def stall(seconds: float) -> dict:
+    streams = start_servers(1, stream_seconds=3600)
+    server = FakeMPD().start()
+    player = server.player
+    base_url = streams[0][0].base_url
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        config_dir = _write_config(Path(tmp), base_url, server.port)
+        control = config_dir / "daemon.sock"
+        daemon = subprocess.Popen([sys.executable, str(ROOT / "radio-scheduler.py")],
+                                  env=dict(os.environ, HOME=tmp, PATH=f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}"))
+        try:
+            results["starts_scheduled"] = _wait_for(lambda: _playing(player, f"{base_url}/ok/1"), 30)
+            _wait_for(lambda: daemon_loop.request("ping", control) is not None, 10)
+            time.sleep(stream_telemetry.SAMPLE_INTERVAL * 1.5)
+            player.stall()
+            time.sleep(seconds)
+            player.resume()
+            time.sleep(stream_telemetry.SAMPLE_INTERVAL * 1.5)
+            reply = daemon_loop.request("telemetry", control)
+            snapshot = reply["result"]["snapshot"] if reply and reply.get("ok") else None
+            points = snapshot["points"] if snapshot else {"times": [], "events": [], "progress": []}
+            results["station"] = snapshot and snapshot["station"]
+            results["points"] = len(points["times"])
+            results["stall_points"] = sum(1 for e in points["events"] if e & stream_telemetry.EVENT_STALL)
+            results["degraded_points"] = sum(1 for p, e in zip(points["progress"], points["events"])
+                                             if p < stream_telemetry.DEGRADED_PROGRESS or e)
+            results["progress"] = " ".join(str(p) for p in points["progress"])
+            saved = daemon_loop.request("telemetry", control, save=True)
+            results["saved_on_request"] = bool(saved and saved.get("ok")) and (
+                config_dir / "stream_telemetry.bin").exists()
+        finally:
+            daemon.terminate()
+            daemon.wait()
+            server.close()
+            stop_servers(streams)
+    return results
+
+
+def run(hours=12, stall_seconds=5.0):
+    """Returns a flat dict of results (seconds, counts, sizes, flags)."""
+    results = bounded(hours)
+    results.update(stall(stall_seconds))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=int, default=12)
+    parser.add_argument("--stall", type=float, default=5.0)
+    args = parser.parse_args()
+    for key, value in run(args.hours, args.stall).items():
+        if key.endswith("_s") and value is not None:
+            print(f"{key:24} {value * 1e3:12.3f} ms")
+        else:
+            print(f"{key:24} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Stalls and delivered bitrate on a simulated congested link: fixed best variant vs adaptive choice.
+
+The link capacity changes every minute (with congested periods); a 10 s tick
+stalls when the playing variant needs more than the link delivers. The
+station is restarted every 30 minutes, like around news breaks, which is
+when the adaptive selector may step up again.
+
+Usage: python benchmarks/bench_stream_variants.py [--hours 24] [--seed 1]
+"""
+import argparse
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+import stream_variants  # noqa: E402
+
+STATION = {"name": "Station", "url": "http://example.net/320", "bitrate": 320,
+           "variants": [{"url": "http://example.net/128", "bitrate": 128},
+                        {"url": "http://example.net/64", "bitrate": 64, "codec": "aac"}]}
+TICK = 10
+RESTART_EVERY = 1800
+
+
+def link_capacity(hours, seed):
+    """Capacity in kbps for every minute: mostly fine, with congested hours."""
+    rng = random.Random(seed)
+    capacity = []
+    for minute in range(int(hours * 60)):
+        congested = (minute // 60) % 3 == 1 # co trzecia godzina łącze jest zatkane
+        base = 150 if congested else 700
+        capacity.append(max(20, rng.gauss(base, base * 0.3)))
+    return capacity
+
+
+def simulate(variants, capacity, adaptive, tmp):
+    selector = stream_variants.VariantSelector(Path(tmp) / f"variants-{adaptive}.json",
+                                               probe_fn=lambda url: now_capacity[0])
+    now_capacity = [capacity[0]]
+    playing = variants[0]
+    stalls = 0
+    delivered = 0.0
+    for tick in range(len(capacity) * 60 // TICK):
+        now = float(tick * TICK)
+        now_capacity[0] = capacity[tick * TICK // 60]
+        if adaptive and tick * TICK % RESTART_EVERY == 0:
+            selector.measure(STATION["name"], variants, now=now)
+            playing, _ = selector.choose(STATION["name"], variants, now=now)
+        if playing.bitrate > now_capacity[0]:
+            stalls += 1
+            if adaptive:
+                playing = selector.record_stall(STATION["name"], variants, now=now) or playing
+        else:
+            delivered += playing.bitrate
+    ticks = len(capacity) * 60 // TICK
+    return stalls, delivered / ticks
+
+
+def run(hours=24, seed=1):
+    """Returns a flat dict of results."""
+    variants = stream_variants.variants_of(STATION)
+    capacity = link_capacity(hours, seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        fixed_stalls, fixed_kbps = simulate(variants, capacity, False, tmp)
+        adaptive_stalls, adaptive_kbps = simulate(variants, capacity, True, tmp)
+    return {
+        "hours": hours,
+        "fixed_stall_ticks": fixed_stalls,
+        "adaptive_stall_ticks": adaptive_stalls,
+        "fixed_avg_kbps": fixed_kbps,
+        "adaptive_avg_kbps": adaptive_kbps,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    for key, value in run(args.hours, args.seed).items():
+        if key.endswith("_kbps"):
+            print(f"{key:24} {value:12.1f} kbps")
+        else:
+            print(f"{key:24} {value:12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Track history: bounded size, search speed, and capture of title changes by the real daemon.
+
+In-process, the ring buffer takes ``--titles`` titles, far more than its
+capacity, as a long uptime would. The file size and the number of entries
+in memory must stay fixed. Searches by text and time range are timed on
+the full buffer, and so is loading it.
+
+The daemon then runs in a subprocess against the fake MPD, as in
+bench_daemon_loop, while the stream title changes ``--changes`` times. The
+run reports how many titles reached the history and how long a title took
+to show up through the control socket.
+
+Usage: python benchmarks/bench_track_history.py [--titles 100000] [--changes 20]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+import daemon_loop  # noqa: E402
+import track_history  # noqa: E402
+from bench_daemon_loop import _playing, _wait_for, _write_config  # noqa: E402
+from fake_mpd import FakeMPD  # noqa: E402
+from fake_stream_server import start_servers, stop_servers  # noqa: E402
+
+WORDS = ["love", "night", "city", "blue", "heart", "dance", "rain", "fire", "summer", "road", "dream", "gold"]
+
+
+def _title(i: int) -> str:
+    return f"Artist {i % 997} - {WORDS[i % len(WORDS)].title()} {WORDS[i // len(WORDS) % len(WORDS)]} {i}"
+
+
+def bounded(titles: int) -> dict:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "track_history.bin"
+        history = track_history.TrackHistory(path)
+        start = 1_700_000_000
+        t = time.perf_counter()
+        for i in range(titles):
+            history.observe("main", f"Station {i % 5}", _title(i), at=start + i * 180)
+        results["add_s"] = (time.perf_counter() - t) / titles
+        results["capacity"] = history.capacity
+        results["entries_in_memory"] = len(history._entries)
+        results["file_bytes"] = path.stat().st_size
+
+        end = start + titles * 180
+        for name, kwargs in (("search_text_s", {"text": "summer dream"}),
+                             ("search_missing_s", {"text": "no such title"}),
+                             ("search_20min_s", {"since": end - 1200}),
+                             ("search_day_text_s", {"text": "love", "since": end - 86400})):
+            t = time.perf_counter()
+            for _ in range(20):
+                found = history.search(**kwargs)
+            results[name] = (time.perf_counter() - t) / 20
+            results[name.replace("_s", "_found")] = len(found)
+
+        t = time.perf_counter()
+        loaded = track_history.TrackHistory(path)
+        results["load_s"] = time.perf_counter() - t
+        results["reload_matches"] = ([e.title for e in loaded.search(limit=100)]
+                                     == [e.title for e in history.search(limit=100)])
+    return results
+
+
+def capture(changes: int) -> dict:
+    streams = start_servers(1, stream_seconds=3600)
+    server = FakeMPD().start()
+    player = server.player
+    base_url = streams[0][0].base_url
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        config_dir = _write_config(Path(tmp), base_url, server.port)
+        control = config_dir / "daemon.sock"
+        daemon = subprocess.Popen([sys.executable, str(ROOT / "radio-scheduler.py")],
+                                  env=dict(os.environ, HOME=tmp, PATH=f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}"))
+        try:
+            results["starts_scheduled"] = _wait_for(lambda: _playing(player, f"{base_url}/ok/1"), 30)
+            _wait_for(lambda: daemon_loop.request("ping", control) is not None, 10)
+            delays = []
+            for i in range(changes):
+                title = f"Benchmark artist - Song {i}"
+                since = time.perf_counter()
+                player.set_title(title)
+
+                def found():
+                    reply = daemon_loop.request("history", control, text=f"song {i}", limit=1)
+                    return bool(reply and reply.get("ok") and reply["result"]
+                                and reply["result"][0]["title"] == title)
+                if _wait_for(found, 5):
+                    delays.append(time.perf_counter() - since)
+                time.sleep(0.1)
+            results["titles_changed"] = changes
+            results["titles_captured"] = len(delays)
+            results["capture_p50_s"] = statistics.median(delays) if delays else None
+            results["capture_max_s"] = max(delays) if delays else None
+            reply = daemon_loop.request("history", control, limit=1000)
+            results["history_entries"] = len(reply["result"]) if reply and reply.get("ok") else None
+            results["station_named"] = bool(reply and reply.get("ok") and reply["result"]
+                                            and reply["result"][0]["station"] == "Scheduled")
+        finally:
+            daemon.terminate()
+            daemon.wait()
+            server.close()
+            stop_servers(streams)
+    return results
+
+
+def run(titles=100000, changes=20):
+    """Returns a flat dict of results (seconds, counts, sizes, flags)."""
+    results = bounded(titles)
+    results.update(capture(changes))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--titles", type=int, default=100000)
+    parser.add_argument("--changes", type=int, default=20)
+    args = parser.parse_args()
+    for key, value in run(args.titles, args.changes).items():
+        if key.endswith("_s") and value is not None:
+            print(f"{key:24} {value * 1e3:12.3f} ms")
+        else:
+            print(f"{key:24} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
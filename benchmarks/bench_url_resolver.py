@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Station switch latency with and without the URL resolution cache.
+
+Each stand-in station is a PLS playlist that points at a redirect to the
+stream, so reaching audio from the station URL takes several round trips.
+With the cache only the final stream URL is requested on a switch.
+
+Usage: python benchmarks/bench_url_resolver.py [--stations 50] [--latency 0.05]
+"""
+import argparse
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import station_health  # noqa: E402
+import url_resolver  # noqa: E402
+from fake_stream_server import start_servers, station_urls, stop_servers  # noqa: E402
+
+
+def _first_audio(url: str) -> float:
+    """Seconds until the first audio bytes of ``url`` arrive (what MPD waits for on a switch)."""
+    start = time.perf_counter()
+    station_health.fetch(url, read_bytes=1)
+    return time.perf_counter() - start
+
+
+def run(n=50, servers=4, latency=0.05):
+    """Returns a flat dict of results (seconds)."""
+    running = start_servers(servers, latency=(latency, latency), stream_seconds=1.0)
+    try:
+        urls = station_urls(running, n, mix=(("playlist", 1.0),))
+        with tempfile.TemporaryDirectory() as tmp:
+            resolver = url_resolver.URLResolver(Path(tmp) / "resolved.json")
+
+            # Bez pamięci podręcznej: playlista, przekierowanie i strumień przy każdej zmianie
+            uncached = []
+            for url in urls:
+                start = time.perf_counter()
+                _first_audio(url_resolver.resolve_remote(url))
+                uncached.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            resolver.prefetch(urls)
+            prefetch = time.perf_counter() - start
+
+            cached = []
+            for url in urls:
+                start = time.perf_counter()
+                _first_audio(resolver.resolve(url))
+                cached.append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            for url in urls:
+                resolver.matches(url, resolver.cached(url))
+            lookup = (time.perf_counter() - start) / n
+    finally:
+        stop_servers(running)
+
+    return {
+        "stations": n,
+        "switch_uncached_p50_s": statistics.median(uncached),
+        "switch_cached_p50_s": statistics.median(cached),
+        "prefetch_all_s": prefetch,
+        "lookup_s": lookup,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stations", type=int, default=50)
+    parser.add_argument("--servers", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="Per-request server latency in seconds")
+    args = parser.parse_args()
+    results = run(args.stations, args.servers, args.latency)
+    for key, value in results.items():
+        if key.endswith("_s"):
+            print(f"{key:28} {value * 1e3:12.3f} ms")
+        else:
+            print(f"{key:28} {value:12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Pure-Python stand-in for MPD, for benchmarks, soak runs and fault injection.
+
+Speaks the subset of the MPD protocol used by radio-scheduler and ``mpc``:
+status, currentsong, clear, add, play, pause, stop, setvol, ping, close,
+idle/noidle and command lists (command_list_begin / command_list_ok_begin /
+command_list_end). ``elapsed`` advances with wall time while playing.
+
+The server listens on TCP or, given a path instead of an address, on a
+Unix socket; with ``password`` set every command except ``password``
+needs authentication first.
+
+Faults can be injected per server (``latency``, ``error_rate``,
+``drop_rate``, ``fail_next``) and per stream (``FakePlayer.stall`` and
+``FakePlayer.fail``); ``FakePlayer.set_title`` changes the stream title.
+Together with the ``benchmarks/bin/mpc`` shim the daemon and the GUI run
+against it unchanged::
+
+    python benchmarks/fake_mpd.py --port 6601 --latency 0.005 --error-rate 0.01
+    PATH=benchmarks/bin:$PATH MPD_PORT=6601 python radio-scheduler.py
+
+Usage: python benchmarks/fake_mpd.py [--port 6601 | --socket PATH] [--password PW] [--latency 0] [--error-rate 0] [--drop-rate 0]
+"""
+import argparse
+import os
+import random
+import select
+import socket
+import socketserver
+import threading
+import time
+from collections import Counter
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+SUBSYSTEMS = ("player", "mixer", "playlist", "options", "output")
+
+# Kody błędów protokołu MPD (ACK [kod@indeks] {polecenie} opis)
+ACK_ERROR_ARG = 2
+ACK_ERROR_PASSWORD = 3
+ACK_ERROR_PERMISSION = 4
+ACK_ERROR_UNKNOWN = 5
+ACK_ERROR_SYSTEM = 52
+
+
+class CommandError(Exception):
+    def __init__(self, code: int, message: str):
+        super().__init__(message)
+        self.code = code
+
+
+class _Drop(Exception):
+    """Raised to close the connection without answering (injected fault)."""
+
+
+def parse_args(line: str) -> List[str]:
+    """Splits an MPD command line into words; double quotes and backslash escapes as in the protocol."""
+    words, current, quoted, escaped, in_word = [], [], False, False, False
+    for ch in line:
+        if escaped:
+            current.append(ch)
+            escaped = False
+        elif ch == "\\" and quoted:
+            escaped = True
+        elif ch == '"':
+            quoted = not quoted
+            in_word = True
+        elif ch.isspace() and not quoted:
+            if in_word:
+                words.append("".join(current))
+                current, in_word = [], False
+        else:
+            current.append(ch)
+            in_word = True
+    if quoted:
+        raise CommandError(ACK_ERROR_ARG, "Missing closing '\"'")
+    if in_word:
+        words.append("".join(current))
+    return words
+
+
+class FakePlayer:
+    """Playback state shared by all client connections."""
+
+    def __init__(self, on_change: Optional[Callable[[str], None]] = None):
+        self.lock = threading.Lock()
+        self.on_change = on_change or (lambda subsystem: None)
+        self.playlist: List[str] = []
+        self.state = "stop"
+        self.error: Optional[str] = None
+        self.volume = 50
+        self.songid = 0
+        self.played_at: Optional[float] = None # time.time() ostatniego "play" (pomiar rozrzutu przełączeń)
+        self.title = "Fake artist - Fake title"
+        self._elapsed = 0.0
+        self._since: Optional[float] = None # None = elapsed stoi w miejscu
+
+    @property
+    def elapsed(self) -> float:
+        if self._since is None:
+            return self._elapsed
+        return self._elapsed + time.monotonic() - self._since
+
+    def _freeze(self):
+        self._elapsed = self.elapsed
+        self._since = None
+
+    # --- Polecenia MPD ---
+    def clear(self):
+        with self.lock:
+            self.playlist.clear()
+            self.state = "stop"
+            self._freeze()
+        self.on_change("playlist")
+        self.on_change("player")
+
+    def add(self, url: str):
+        with self.lock:
+            self.playlist.append(url)
+        self.on_change("playlist")
+
+    def play(self, position: int = 0):
+        with self.lock:
+            if not 0 <= position < max(len(self.playlist), 1):
+                raise CommandError(ACK_ERROR_ARG, "Bad song index")
+            if not self.playlist:
+                return
+            self.songid += 1
+            self.state = "play"
+            self.error = None
+            self._elapsed = 0.0
+            self._since = time.monotonic()
+            self.played_at = time.time()
+        self.on_change("player")
+
+    def pause(self, on: Optional[bool] = None):
+        with self.lock:
+            if self.state == "stop":
+                return
+            on = self.state == "play" if on is None else on
+            if on and self.state == "play":
+                self._freeze()
+                self.state = "pause"
+            elif not on and self.state == "pause":
+                self._since = time.monotonic()
+                self.state = "play"
+        self.on_change("player")
+
+    def stop(self):
+        with self.lock:
+            self.state = "stop"
+            self._freeze()
+            self._elapsed = 0.0
+        self.on_change("player")
+
+    def setvol(self, volume: int):
+        if not 0 <= volume <= 100:
+            raise CommandError(ACK_ERROR_ARG, "Invalid volume value")
+        with self.lock:
+            self.volume = volume
+        self.on_change("mixer")
+
+    # --- Sterowanie z benchmarku ---
+    def stall(self):
+        """Stream keeps "playing" but no audio arrives."""
+        with self.lock:
+            self._freeze()
+
+    def resume(self):
+        with self.lock:
+            if self.state == "play" and self._since is None:
+                self._since = time.monotonic()
+
+    def set_title(self, title: str):
+        """New title in the stream metadata; MPD reports it as a player change."""
+        with self.lock:
+            self.title = title
+        self.on_change("player")
+
+    def fail(self, error: Optional[str] = "Failed to decode stream"):
+        """Stream dies: MPD stops, optionally with an error message."""
+        with self.lock:
+            self.state = "stop"
+            self.error = error
+            self._freeze()
+        self.on_change("player")
+
+    # --- Odpowiedzi ---
+    def status_lines(self) -> List[str]:
+        with self.lock:
+            lines = [f"volume: {self.volume}", "repeat: 0", "random: 0", "single: 0", "consume: 0",
+                     f"playlistlength: {len(self.playlist)}", f"state: {self.state}"]
+            if self.state != "stop" and self.playlist:
+                lines += ["song: 0", f"songid: {self.songid}", f"elapsed: {self.elapsed:.3f}",
+                          "bitrate: 128", "audio: 44100:24:2"]
+            if self.error:
+                lines.append(f"error: {self.error}")
+            return lines
+
+    def currentsong_lines(self) -> List[str]:
+        with self.lock:
+            if not self.playlist:
+                return []
+            return [f"file: {self.playlist[0]}", "Name: Fake station", f"Title: {self.title}",
+                    "Pos: 0", f"Id: {self.songid}"]
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    # Bez bufora odczytu: w trakcie idle select() musi widzieć każde "noidle", którego nikt jeszcze nie przeczytał
+    rbufsize = 0
+
+    def setup(self):
+        super().setup()
+        self.pending: Set[str] = set()
+        self.authorized = self.server.password is None
+        self.server.register(self)
+
+    def finish(self):
+        self.server.unregister(self)
+        try:
+            super().finish()
+        except OSError:
+            pass # Połączenie zerwane (np. wstrzyknięty drop)
+
+    def _send(self, text: str):
+        self.wfile.write(text.encode("utf-8"))
+
+    def handle(self):
+        self._send("OK MPD 0.23.5\n")
+        command_list: Optional[List[List[str]]] = None
+        list_ok = False
+        try:
+            while True:
+                raw = self.rfile.readline()
+                if not raw:
+                    return
+                line = raw.decode("utf-8", errors="replace").rstrip("\n")
+                try:
+                    words = parse_args(line)
+                except CommandError as e:
+                    self._send(f"ACK [{e.code}@0] {{}} {e}\n")
+                    continue
+                if not words:
+                    continue
+                name = words[0]
+                if command_list is not None:
+                    if name == "command_list_end":
+                        self._run_list(command_list, list_ok)
+                        command_list = None
+                    else:
+                        command_list.append(words)
+                    continue
+                if name in ("command_list_begin", "command_list_ok_begin"):
+                    command_list, list_ok = [], name == "command_list_ok_begin"
+                    continue
+                if name == "close":
+                    return
+                if name == "idle":
+                    self._idle(words[1:])
+                    continue
+                if name == "noidle":
+                    continue # Spóźnione noidle (idle już się zakończyło) MPD po cichu ignoruje
+                try:
+                    body = self._execute(words)
+                except CommandError as e:
+                    self._send(f"ACK [{e.code}@0] {{{name}}} {e}\n")
+                    continue
+                self._send("".join(f"{l}\n" for l in body) + "OK\n")
+        except (_Drop, OSError):
+            return
+
+    def _run_list(self, commands: List[List[str]], list_ok: bool):
+        out = []
+        for index, words in enumerate(commands):
+            try:
+                out.extend(self._execute(words))
+            except CommandError as e:
+                self._send("".join(f"{l}\n" for l in out) + f"ACK [{e.code}@{index}] {{{words[0]}}} {e}\n")
+                return
+            if list_ok:
+                out.append("list_OK")
+        self._send("".join(f"{l}\n" for l in out) + "OK\n")
+
+    def _execute(self, words: List[str]) -> List[str]:
+        server, player = self.server, self.server.player
+        name, args = words[0], words[1:]
+        server.count(name)
+        server.inject_faults(name)
+        if name == "password":
+            if args != [server.password]:
+                raise CommandError(ACK_ERROR_PASSWORD, "incorrect password")
+            self.authorized = True
+            return []
+        if not self.authorized:
+            raise CommandError(ACK_ERROR_PERMISSION, f"you don't have permission for \"{name}\"")
+        if name == "status":
+            return player.status_lines()
+        if name == "currentsong":
+            return player.currentsong_lines()
+        if name in ("clear", "stop"):
+            getattr(player, name)()
+            return []
+        if name == "add":
+            if len(args) != 1:
+                raise CommandError(ACK_ERROR_ARG, "wrong number of arguments for \"add\"")
+            player.add(args[0])
+            return []
+        if name in ("play", "setvol", "pause"):
+            try:
+                values = [int(a) for a in args]
+            except ValueError:
+                raise CommandError(ACK_ERROR_ARG, f"Integer expected: {args[0]}")
+            if name == "setvol":
+                if len(values) != 1:
+                    raise CommandError(ACK_ERROR_ARG, "wrong number of arguments for \"setvol\"")
+                player.setvol(values[0])
+            elif name == "pause":
+                player.pause(bool(values[0]) if values else None)
+            else:
+                player.play(values[0] if values else 0)
+            return []
+        if name == "ping":
+            return []
+        raise CommandError(ACK_ERROR_UNKNOWN, f"unknown command \"{name}\"")
+
+    def _idle(self, subsystems: List[str]):
+        """Blocks until a watched subsystem changes or the client sends "noidle"."""
+        self.server.count("idle")
+        watched = set(subsystems) or set(SUBSYSTEMS)
+        server = self.server
+        while True:
+            with server.changed:
+                ready = self.pending & watched
+                if ready:
+                    self.pending -= ready
+                    break
+                server.changed.wait(0.05)
+            # W trakcie idle klient może wysłać tylko "noidle"
+            readable, _, _ = select.select([self.connection], [], [], 0)
+            if readable:
+                raw = self.rfile.readline()
+                if not raw:
+                    raise _Drop()
+                with server.changed:
+                    ready = self.pending & watched
+                    self.pending -= ready
+                break
+        self._send("".join(f"changed: {s}\n" for s in sorted(ready)) + "OK\n")
+
+
+class FakeMPD(socketserver.ThreadingTCPServer):
+    """MPD protocol server on 127.0.0.1 with configurable faults.
+
+    ``latency`` is a (min, max) delay in seconds before every command,
+    ``error_rate`` the probability that a command fails with an ACK and
+    ``drop_rate`` the probability that the connection is closed instead of
+    answering. ``fail_next(command, message)`` fails the next call of one
+    command deterministically.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, address=("127.0.0.1", 0), latency: Tuple[float, float] = (0.0, 0.0),
+                 error_rate: float = 0.0, drop_rate: float = 0.0, seed: Optional[int] = None,
+                 password: Optional[str] = None):
+        if isinstance(address, str):
+            self.address_family = socket.AF_UNIX
+            if os.path.exists(address):
+                os.unlink(address)
+        super().__init__(address, _Handler)
+        self.password = password
+        self.latency = latency
+        self.error_rate = error_rate
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.changed = threading.Condition()
+        self.clients: List[_Handler] = []
+        self.player = FakePlayer(self.notify)
+        self.command_counts: Counter = Counter()
+        self.injected: Counter = Counter()
+        self._fail_next: Dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    # --- Klienci i idle ---
+    def register(self, client: _Handler):
+        with self.changed:
+            self.clients.append(client)
+
+    def unregister(self, client: _Handler):
+        with self.changed:
+            if client in self.clients:
+                self.clients.remove(client)
+
+    def notify(self, subsystem: str):
+        with self.changed:
+            for client in self.clients:
+                client.pending.add(subsystem)
+            self.changed.notify_all()
+
+    # --- Statystyki i usterki ---
+    @property
+    def commands(self) -> int:
+        return sum(self.command_counts.values())
+
+    def count(self, name: str):
+        self.command_counts[name] += 1
+
+    def fail_next(self, command: str, message: str = "injected failure"):
+        self._fail_next[command] = message
+
+    def inject_faults(self, name: str):
+        low, high = self.latency
+        if high > 0:
+            time.sleep(self.random.uniform(low, high))
+        if name in self._fail_next:
+            self.injected["error"] += 1
+            raise CommandError(ACK_ERROR_SYSTEM, self._fail_next.pop(name))
+        if self.drop_rate and self.random.random() < self.drop_rate:
+            self.injected["drop"] += 1
+            raise _Drop()
+        if self.error_rate and self.random.random() < self.error_rate:
+            self.injected["error"] += 1
+            raise CommandError(ACK_ERROR_SYSTEM, "injected failure")
+
+    # --- Cykl życia ---
+    @property
+    def port(self) -> Optional[int]:
+        return None if self.address_family == socket.AF_UNIX else self.server_address[1]
+
+    def start(self) -> "FakeMPD":
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def close(self):
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+        if self.address_family == socket.AF_UNIX and os.path.exists(self.server_address):
+            os.unlink(self.server_address)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=6601)
+    parser.add_argument("--socket", help="Listen on this Unix socket instead of TCP")
+    parser.add_argument("--password")
+    parser.add_argument("--latency", type=float, default=0.0, help="Maximum random delay per command in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--drop-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    server = FakeMPD(args.socket or ("127.0.0.1", args.port), latency=(0.0, args.latency),
+                     error_rate=args.error_rate, drop_rate=args.drop_rate, password=args.password)
+    print(f"Fake MPD on {args.socket or f'127.0.0.1:{server.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+        if args.socket:
+            os.unlink(args.socket)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Local stand-in for Icecast/Shoutcast servers, used by the network benchmarks.
+
+Paths select the behaviour of a "station":
+  /ok/<n>        200 with ICY headers, then an endless MP3-like stream
+  /icy/<n>       Shoutcast v1 style "ICY 200 OK" status line
+  /missing/<n>   404
+  /redirect/<n>  302 to /ok/<n>
+  /slow/<n>      headers only after ``slow_delay`` seconds
+  /playlist/<n>  PLS playlist (audio/x-scpls) pointing at /redirect/<n>
+
+Usage: python benchmarks/fake_stream_server.py [--servers 4] [--port 8700]
+"""
+import argparse
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Tuple
+
+# Ramka MP3 (MPEG-1 Layer III, 128 kbps, 44.1 kHz) - nagłówek synchronizacji + wypełnienie
+MP3_FRAME = b"\xff\xfb\x90\x64" + b"\x00" * 413
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.0"
+
+    def log_message(self, format, *args):
+        pass
+
+    def _latency(self):
+        low, high = self.server.latency
+        if high > 0:
+            time.sleep(random.uniform(low, high))
+
+    def _stream(self):
+        deadline = time.monotonic() + self.server.stream_seconds
+        try:
+            while time.monotonic() < deadline:
+                self.wfile.write(MP3_FRAME * 8)
+                time.sleep(0.01)
+        except OSError:
+            pass # Klient zamknął połączenie - dokładnie tego oczekujemy
+
+    def do_HEAD(self):
+        self.server.requests += 1
+        if self.server.reject_head:
+            self.send_error(405)
+            return
+        self._latency()
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/mpeg")
+        self.end_headers()
+
+    def do_GET(self):
+        self.server.requests += 1
+        kind = self.path.strip("/").split("/", 1)[0]
+        self._latency()
+        if kind == "missing":
+            self.send_error(404)
+        elif kind == "redirect":
+            self.send_response(302)
+            self.send_header("Location", self.path.replace("/redirect/", "/ok/", 1))
+            self.end_headers()
+        elif kind == "playlist":
+            body = f"[playlist]\nNumberOfEntries=1\nFile1={self.server.base_url}{self.path.replace('/playlist/', '/redirect/', 1)}\nTitle1=Fake\nVersion=2\n".encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/x-scpls")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        elif kind == "icy":
+            self.wfile.write(b"ICY 200 OK\r\ncontent-type: audio/mpeg\r\nicy-br: 128\r\nicy-name: Fake\r\n\r\n")
+            self._stream()
+        else:
+            if kind == "slow":
+                time.sleep(self.server.slow_delay)
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/mpeg")
+            self.send_header("icy-br", "128")
+            self.send_header("icy-name", "Fake station")
+            self.end_headers()
+            self._stream()
+
+
+class FakeStreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address, latency=(0.0, 0.0), slow_delay=2.0, stream_seconds=5.0, reject_head=True):
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.slow_delay = slow_delay
+        self.stream_seconds = stream_seconds
+        self.reject_head = reject_head
+        self.requests = 0
+
+    def handle_error(self, request, client_address):
+        pass # Sondy celowo zrywają połączenia (RST) - to nie jest błąd serwera
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+
+def start_servers(count: int = 4, port: int = 0, **kwargs) -> List[Tuple[FakeStreamServer, threading.Thread]]:
+    """Starts ``count`` servers on 127.0.0.1 (consecutive ports, or random ones for ``port=0``)."""
+    servers = []
+    for i in range(count):
+        server = FakeStreamServer(("127.0.0.1", port + i if port else 0), **kwargs)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        servers.append((server, thread))
+    return servers
+
+
+def stop_servers(servers):
+    for server, thread in servers:
+        server.shutdown()
+        server.server_close()
+        thread.join()
+
+
+def station_urls(servers, n: int, mix=(("ok", 0.85), ("icy", 0.05), ("redirect", 0.05), ("missing", 0.05))) -> List[str]:
+    """Returns ``n`` station URLs spread over the servers with the given mix of behaviours."""
+    random.seed(42)
+    kinds, weights = zip(*mix)
+    return [f"{servers[i % len(servers)][0].base_url}/{random.choices(kinds, weights)[0]}/{i}" for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--servers", type=int, default=4)
+    parser.add_argument("--port", type=int, default=8700)
+    args = parser.parse_args()
+    servers = start_servers(args.servers, args.port)
+    for server, _ in servers:
+        print(server.base_url)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        stop_servers(servers)
+
+
+if __name__ == "__main__":
+    main()
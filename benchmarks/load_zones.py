@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Load test of the multi-zone daemon: many fake MPD zones switching at the same minute.
+
+Starts ``--zones`` fake MPD servers and runs the real daemon with one zone
+per server, all following the main schedule: station A, then B for one
+minute, then A again. For each of the two switches it reports how many
+zones switched, how late the first and the last zone were after the
+minute boundary, and the skew between them. ``--slow`` zones answer every
+command with a delay, to show they do not hold the others back.
+
+The zones send commands over the MPD protocol (``commands: socket``).
+With ``--commands mpc`` every command starts an ``mpc`` process (the shim
+from ``benchmarks/bin``), which a single CPU cannot do for 100 zones at the
+same second.
+
+Usage: python benchmarks/load_zones.py [--zones 100] [--slow 5] [--slow-latency 0.08] [--commands socket]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import yaml
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+from fake_mpd import FakeMPD  # noqa: E402
+from fake_stream_server import start_servers, stop_servers  # noqa: E402
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+
+def _write_config(home: Path, base_url: str, servers, switch_at: datetime, commands: str = "socket"):
+    config_dir = home / ".config/radio-scheduler"
+    config_dir.mkdir(parents=True)
+    day = WEEKDAYS[switch_at.weekday()]
+    config = {
+        "stations": [
+            {"name": "A", "url": f"{base_url}/ok/1", "genre": "test"},
+            {"name": "B", "url": f"{base_url}/ok/2", "genre": "test"},
+        ],
+        "schedule": {
+            "default": "A",
+            "weekly": [{"days": [day], "from": f"{switch_at:%H:%M}",
+                        "to": f"{switch_at + timedelta(minutes=1):%H:%M}", "station": "B"}],
+            "news_breaks": {"enabled": False},
+        },
+        "mpd": {"host": "127.0.0.1", "port": servers[0].port, "commands": commands},
+        "zones": [{"name": f"zone{i:03d}", "mpd": {"host": "127.0.0.1", "port": s.port, "commands": commands}}
+                  for i, s in enumerate(servers[1:], 1)],
+    }
+    (config_dir / "config.yaml").write_text(yaml.safe_dump(config), encoding="utf-8")
+    return config_dir
+
+
+def _switch_times(servers, boundary: float):
+    return [s.player.played_at - boundary for s in servers
+            if s.player.played_at is not None and s.player.played_at >= boundary]
+
+
+def _summary(prefix: str, lateness, results):
+    results[f"{prefix}_zones_switched"] = len(lateness)
+    if lateness:
+        results[f"{prefix}_first_s"] = min(lateness)
+        results[f"{prefix}_median_s"] = statistics.median(lateness)
+        results[f"{prefix}_last_s"] = max(lateness)
+        results[f"{prefix}_skew_s"] = max(lateness) - min(lateness)
+
+
+def run(zones=100, slow=5, slow_latency=0.08, commands="socket"):
+    """Returns a flat dict of results (seconds, counts)."""
+    streams = start_servers(1, stream_seconds=3600)
+    servers = [FakeMPD(latency=(slow_latency, slow_latency) if i >= zones - slow else (0.0, 0.0)).start()
+               for i in range(zones)]
+    fast = servers[:zones - slow]
+    # Pierwsza zmiana na granicy minuty odległej o co najmniej 30 s - demon musi zdążyć uruchomić strefy
+    switch_at = (datetime.now() + timedelta(seconds=90)).replace(second=0, microsecond=0)
+    back_at = switch_at + timedelta(minutes=1)
+    results = {"zones": zones, "slow_zones": slow, "commands": commands}
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        config_dir = _write_config(home, streams[0][0].base_url, servers, switch_at, commands)
+        env = dict(os.environ, HOME=str(home), PATH=f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}")
+        daemon = subprocess.Popen([sys.executable, str(ROOT / "radio-scheduler.py")], env=env)
+        try:
+            time.sleep(max(0.0, switch_at.timestamp() - time.time() - 5))
+            results["zones_playing_before"] = sum(s.player.state == "play" for s in servers)
+            time.sleep(max(0.0, back_at.timestamp() - time.time() - 5))
+            _summary("switch1", _switch_times(fast, switch_at.timestamp()), results)
+            slow_times = _switch_times(servers[zones - slow:], switch_at.timestamp())
+            results["switch1_slow_switched"] = len(slow_times)
+            if slow_times:
+                results["switch1_slow_last_s"] = max(slow_times)
+            time.sleep(max(0.0, back_at.timestamp() + 30 - time.time()))
+            _summary("switch2", _switch_times(fast, back_at.timestamp()), results)
+            results["daemon_alive"] = daemon.poll() is None
+        finally:
+            daemon.terminate()
+            daemon.wait()
+            for server in servers:
+                server.close()
+            stop_servers(streams)
+        log = (config_dir / "radio-scheduler.log").read_text(encoding="utf-8", errors="replace")
+        results["errors_logged"] = log.count(" - ERROR - ")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--zones", type=int, default=100)
+    parser.add_argument("--slow", type=int, default=5, help="Zones whose MPD answers slowly")
+    parser.add_argument("--slow-latency", type=float, default=0.08,
+                        help="Delay per command of the slow zones (above 0.1 s status queries time out)")
+    parser.add_argument("--commands", choices=("socket", "mpc"), default="socket")
+    args = parser.parse_args()
+    for key, value in run(args.zones, args.slow, args.slow_latency, args.commands).items():
+        if key.endswith("_s"):
+            print(f"{key:24} {value * 1e3:12.1f} ms")
+        else:
+            print(f"{key:24} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
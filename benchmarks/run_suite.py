@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Benchmark suite: runs the benchmarks, keeps their results as JSON history and flags regressions.
+
+``run`` imports the selected benchmark modules and calls their ``run()``
+with the arguments from ``SUITE``. These are smaller than the modules' own
+defaults, so the whole suite takes about a minute. The run appends one
+JSON line to ``--history`` (``benchmarks/history.jsonl`` by default). It
+holds the time, the git commit, the Python version, the host and the flat
+results of every module as ``module.key``. Every module runs ``--repeat``
+times (3 by default) and each timing keeps its fastest run, against noise. A
+module that raises is recorded as ``module.error`` and the others still run.
+
+``compare`` compares the newest entry with a baseline. The baseline is the
+entry before it or, with ``--baseline N``, the median of the N entries
+before it. A regression is a timing (an ``_s`` key) slower by more than
+``--threshold`` (20 % by default) and by at least ``--min-seconds`` (timer
+noise). A check that turned from True to False, or a new module error, is
+one too. ``compare`` exits with 1 if anything regressed. Timings are only
+comparable on the same machine, so a different host gives a warning.
+
+Usage:
+  python benchmarks/run_suite.py run [--only bench_hot_paths,bench_simulation] [--repeat 3] [--compare]
+  python benchmarks/run_suite.py compare [--threshold 0.2] [--baseline 5]
+  python benchmarks/run_suite.py list
+"""
+import argparse
+import importlib
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(BENCH_DIR))
+
+HISTORY_PATH = BENCH_DIR / "history.jsonl"
+THRESHOLD = 0.2
+MIN_SECONDS = 1e-6
+
+# Moduł -> argumenty run(); mniejsze niż domyślne, żeby cały zestaw trwał ok. minuty
+SUITE: Dict[str, Dict[str, Any]] = {
+    "bench_hot_paths": {"calls": 20},
+    "bench_mpd_transport": {"calls": 100},
+    "bench_mpc_controller": {"calls": 20},
+    "bench_mpc_metrics": {"calls": 50_000},
+    "bench_simulation": {"days": 60},
+    "bench_station_registry": {"n": 20_000},
+    "bench_stream_variants": {"hours": 6},
+    "bench_play_journal": {"days": 60},
+}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10, check=True).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _merge(best: Dict[str, Any], results: Dict[str, Any]):
+    """Keeps the faster value of every timing, the latest value of everything else."""
+    for key, value in results.items():
+        if key.endswith("_s") and isinstance(best.get(key), (int, float)) and isinstance(value, (int, float)):
+            best[key] = min(best[key], value)
+        else:
+            best[key] = value
+
+
+def run_suite(modules: List[str], repeat: int = 3) -> Dict[str, Any]:
+    """Runs ``modules`` and returns one history entry."""
+    results: Dict[str, Any] = {}
+    durations: Dict[str, float] = {}
+    for name in modules:
+        print(f"{name} ...", file=sys.stderr, flush=True)
+        t = time.perf_counter()
+        try:
+            module = importlib.import_module(name)
+            best: Dict[str, Any] = {}
+            for _ in range(repeat):
+                _merge(best, module.run(**SUITE.get(name, {})))
+        except Exception as e:
+            results[f"{name}.error"] = f"{type(e).__name__}: {e}"
+            continue
+        finally:
+            durations[name] = round(time.perf_counter() - t, 1)
+        results.update((f"{name}.{key}", value) for key, value in best.items())
+    return {"at": datetime.now().isoformat(timespec="seconds"), "commit": _git_commit(),
+            "python": platform.python_version(), "host": platform.node(), "repeat": repeat,
+            "durations": durations, "results": results}
+
+
+def load_history(path: Path = HISTORY_PATH) -> List[Dict[str, Any]]:
+    if not path.exists():
+        return []
+    entries = []
+    for line in path.read_text(encoding="utf-8").splitlines():
+        try:
+            entries.append(json.loads(line))
+        except ValueError:
+            continue # Urwany wpis (przerwany zapis) nie psuje reszty historii
+    return entries
+
+
+def append_history(entry: Dict[str, Any], path: Path = HISTORY_PATH):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(entry, default=str) + "\n")
+
+
+def baseline(entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Median of every timing over ``entries``; checks and errors from the newest entry having them."""
+    result: Dict[str, Any] = {}
+    for key in {key for entry in entries for key in entry["results"]}:
+        values = [entry["results"][key] for entry in entries if key in entry["results"]]
+        if key.endswith("_s") and all(isinstance(v, (int, float)) and not isinstance(v, bool) for v in values):
+            result[key] = statistics.median(values)
+        else:
+            result[key] = values[-1]
+    return result
+
+
+def compare(base: Dict[str, Any], latest: Dict[str, Any], threshold: float = THRESHOLD,
+            min_seconds: float = MIN_SECONDS) -> List[Dict[str, Any]]:
+    """Regressions of ``latest`` against ``base``, worst first."""
+    regressions = []
+    for key, value in latest.items():
+        old = base.get(key)
+        if key.endswith(".error"):
+            if old is None:
+                regressions.append({"key": key, "old": None, "new": value, "ratio": None})
+        elif isinstance(value, bool):
+            if old is True and value is False:
+                regressions.append({"key": key, "old": old, "new": value, "ratio": None})
+        elif (key.endswith("_s") and isinstance(value, (int, float)) and isinstance(old, (int, float))
+              and old > 0 and value > old * (1 + threshold) and value - old >= min_seconds):
+            regressions.append({"key": key, "old": old, "new": value, "ratio": value / old})
+    return sorted(regressions, key=lambda r: -(r["ratio"] or float("inf")))
+
+
+def _format(value) -> str:
+    if isinstance(value, float) and not isinstance(value, bool):
+        return f"{value * 1e3:.3f} ms"
+    return str(value)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--history", type=Path, default=HISTORY_PATH)
+    sub = parser.add_subparsers(dest="command", required=True)
+    run_parser = sub.add_parser("run", help="Run the suite and append the results to the history")
+    run_parser.add_argument("--only", default="", help="Comma-separated benchmark modules (default: the whole suite)")
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--compare", action="store_true", help="Compare with the previous entry afterwards")
+    compare_parser = sub.add_parser("compare", help="Flag regressions of the newest entry")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD)
+    compare_parser.add_argument("--min-seconds", type=float, default=MIN_SECONDS)
+    compare_parser.add_argument("--baseline", type=int, default=1, help="Median of this many entries before the newest")
+    sub.add_parser("list", help="Show the suite's modules and the history")
+    args = parser.parse_args(argv)
+
+    if args.command == "list":
+        for name, kwargs in SUITE.items():
+            print(f"{name:28} {kwargs}")
+        for entry in load_history(args.history):
+            errors = sum(key.endswith(".error") for key in entry["results"])
+            print(f"{entry['at']}  {entry.get('commit') or '-':>16}  {entry.get('host')}  "
+                  f"{len(entry['results'])} results" + (f", {errors} errors" if errors else ""))
+        return 0
+
+    if args.command == "run":
+        modules = [name.strip() for name in args.only.split(",") if name.strip()] or list(SUITE)
+        entry = run_suite(modules, max(1, args.repeat))
+        append_history(entry, args.history)
+        for key, value in entry["results"].items():
+            print(f"{key:48} {_format(value) if key.endswith('_s') else value!s:>16}")
+        print(f"Saved to {args.history}")
+        if not args.compare:
+            return 0
+        args.threshold, args.min_seconds, args.baseline = THRESHOLD, MIN_SECONDS, 1
+
+    entries = load_history(args.history)
+    if len(entries) < 2:
+        print("Not enough history to compare (need at least two runs).")
+        return 0
+    latest, previous = entries[-1], entries[-1 - max(1, args.baseline):-1]
+    if any(entry.get("host") != latest.get("host") for entry in previous):
+        print(f"Warning: the baseline includes runs from another host than {latest.get('host')}.")
+    base = baseline(previous)
+    regressions = compare(base, latest["results"], args.threshold, args.min_seconds)
+    since = previous[0]["at"] if len(previous) == 1 else f"median of {len(previous)} runs since {previous[0]['at']}"
+    print(f"{latest['at']} ({latest.get('commit')}) against {since}, threshold {args.threshold:.0%}")
+    compared = sum(1 for key in latest["results"] if key.endswith("_s") and key in base)
+    if not regressions:
+        print(f"No regressions in {compared} timings.")
+        return 0
+    for r in regressions:
+        ratio = f"{r['ratio']:.2f}x" if r["ratio"] else ""
+        print(f"REGRESSION {r['key']:48} {_format(r['old']):>14} -> {_format(r['new']):>14} {ratio:>8}")
+    print(f"{len(regressions)} regressions in {compared} timings.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
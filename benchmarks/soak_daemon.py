@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Soak run of the real daemon against the fake MPD, the ``mpc`` shim and local stream servers.
+
+The daemon runs unchanged in a subprocess with a temporary HOME. Every few
+seconds a random fault is injected: the stream dies, freezes, or MPD starts
+failing or dropping commands for a while. The player state is sampled to
+measure how much of the run was spent playing and the longest silence.
+
+Usage: python benchmarks/soak_daemon.py [--minutes 5] [--fault-every 20]
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import yaml
+
+BENCH_DIR = Path(__file__).resolve().parent
+ROOT = BENCH_DIR.parent
+sys.path.insert(0, str(BENCH_DIR))
+from fake_mpd import FakeMPD  # noqa: E402
+from fake_stream_server import start_servers, stop_servers  # noqa: E402
+
+
+def _write_config(home: Path, base_url: str):
+    config_dir = home / ".config/radio-scheduler"
+    config_dir.mkdir(parents=True)
+    config = {
+        "stations": [
+            {"name": "Primary", "url": f"{base_url}/ok/1", "genre": "test", "fallbacks": ["Backup"]},
+            {"name": "Backup", "url": f"{base_url}/ok/2", "genre": "test"},
+        ],
+        "schedule": {"default": "Primary", "weekly": [], "news_breaks": {"enabled": False}},
+    }
+    (config_dir / "config.yaml").write_text(yaml.safe_dump(config), encoding="utf-8")
+    return config_dir
+
+
+def _fault(server, rng):
+    kind = rng.choice(["stream_dies", "stream_freezes", "mpd_errors", "mpd_drops"])
+    if kind == "stream_dies":
+        server.player.fail()
+    elif kind == "stream_freezes":
+        server.player.stall()
+    elif kind == "mpd_errors":
+        server.error_rate = 0.5
+    else:
+        server.drop_rate = 0.3
+    return kind
+
+
+def run(minutes=5.0, fault_every=20.0, seed=1):
+    """Returns a flat dict of results (seconds, counts)."""
+    rng = random.Random(seed)
+    streams = start_servers(1, stream_seconds=3600)
+    server = FakeMPD(seed=seed).start()
+    with tempfile.TemporaryDirectory() as tmp:
+        home = Path(tmp)
+        config_dir = _write_config(home, streams[0][0].base_url)
+        env = dict(os.environ, HOME=str(home), MPD_HOST="127.0.0.1", MPD_PORT=str(server.port),
+                   PATH=f"{BENCH_DIR / 'bin'}{os.pathsep}{os.environ['PATH']}")
+        daemon = subprocess.Popen([sys.executable, str(ROOT / "radio-scheduler.py")], env=env)
+        faults = []
+        playing = samples = 0
+        silence_start = None
+        longest_silence = 0.0
+        start = time.monotonic()
+        next_fault = start + fault_every
+        calm_at = None
+        try:
+            while time.monotonic() - start < minutes * 60:
+                now = time.monotonic()
+                if now >= next_fault:
+                    faults.append(_fault(server, rng))
+                    calm_at = now + 5  # Awarie MPD trwają kilka sekund
+                    next_fault = now + fault_every
+                if calm_at and now >= calm_at:
+                    server.error_rate = server.drop_rate = 0.0
+                    calm_at = None
+                status = dict(line.split(": ", 1) for line in server.player.status_lines())
+                ok = status.get("state") == "play" and server.player._since is not None
+                samples += 1
+                playing += ok
+                if ok and silence_start is not None:
+                    longest_silence = max(longest_silence, now - silence_start)
+                    silence_start = None
+                elif not ok and silence_start is None and now - start > 15:
+                    silence_start = now
+                time.sleep(0.5)
+            alive = daemon.poll() is None
+        finally:
+            daemon.terminate()
+            daemon.wait()
+            server.close()
+            stop_servers(streams)
+        log = (config_dir / "radio-scheduler.log").read_text(encoding="utf-8", errors="replace")
+    return {
+        "minutes": minutes,
+        "faults": len(faults),
+        "daemon_alive": alive,
+        "playing_ratio": playing / max(samples, 1),
+        "longest_silence_s": longest_silence,
+        "failures_logged": log.count("failed:"),
+        "fallbacks_logged": log.count("Failing over"),
+        "critical_logged": log.count("CRITICAL"),
+        "mpd_commands": server.commands,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--minutes", type=float, default=5.0)
+    parser.add_argument("--fault-every", type=float, default=20.0)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+    for key, value in run(args.minutes, args.fault_every, args.seed).items():
+        if key.endswith("_s"):
+            print(f"{key:20} {value:12.1f} s")
+        elif key.endswith("_ratio"):
+            print(f"{key:20} {value:12.1%}")
+        else:
+            print(f"{key:20} {value!s:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -18,6 +18,25 @@ FILES_TO_COPY=(
     "radio-scheduler-gui.py"
     "radio-scheduler.py"
     "mpc_controller.py"
+    "mpc_metrics.py"
+    "play_journal.py"
+    "track_history.py"
+    "stream_telemetry.py"
+    "prometheus_metrics.py"
+    "profiling.py"
+    "log_pipeline.py"
+    "daemon_loop.py"
+    "config_store.py"
+    "station_registry.py"
+    "playlist_import.py"
+    "station_catalog.py"
+    "station_health.py"
+    "url_resolver.py"
+    "schedule_engine.py"
+    "schedule_simulator.py"
+    "dns_cache.py"
+    "stream_variants.py"
+    "playback_monitor.py"
     "translations.py"
     "requirements.txt"
     "install.sh"
@@ -0,0 +1,402 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Shared configuration access for the daemon and the GUI.
+
+By default everything lives in ``config.yaml``. Setting ``storage: sqlite`` in
+that file moves the station library and the weekly schedule into an SQLite
+database with indexed name, URL and genre columns, while all other settings
+stay in YAML. Callers always see the same dictionary shape.
+"""
+import json
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+import yaml
+
+CONFIG_DIR = Path.home() / ".config/radio-scheduler"
+CONFIG_PATH = CONFIG_DIR / "config.yaml"
+DB_PATH = CONFIG_DIR / "library.db"
+
+STORAGE_YAML = "yaml"
+STORAGE_SQLITE = "sqlite"
+
+# Klucze stacji przechowywane w osobnych kolumnach; reszta trafia do kolumny "extra" (JSON)
+_STATION_COLUMNS = ("name", "url", "genre", "favorite")
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stations (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    genre TEXT,
+    favorite INTEGER NOT NULL DEFAULT 0,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_stations_name ON stations(name);
+CREATE INDEX IF NOT EXISTS idx_stations_url ON stations(url);
+CREATE INDEX IF NOT EXISTS idx_stations_genre ON stations(genre);
+CREATE INDEX IF NOT EXISTS idx_stations_position ON stations(position);
+CREATE TABLE IF NOT EXISTS weekly_rules (
+    id INTEGER PRIMARY KEY,
+    position INTEGER NOT NULL,
+    days TEXT NOT NULL,
+    time_from TEXT NOT NULL,
+    time_to TEXT NOT NULL,
+    station TEXT,
+    extra TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_weekly_rules_position ON weekly_rules(position);
+"""
+
+
+def _station_to_row(position: int, station: Dict[str, Any]):
+    extra = {k: v for k, v in station.items() if k not in _STATION_COLUMNS}
+    return (position, station["name"], station["url"], station.get("genre"),
+            int(bool(station.get("favorite", False))), json.dumps(extra) if extra else None)
+
+
+def _row_to_station(row) -> Dict[str, Any]:
+    name, url, genre, favorite, extra = row
+    station = {"name": name, "url": url, "genre": genre, "favorite": bool(favorite)}
+    if extra:
+        station.update(json.loads(extra))
+    return station
+
+
+def _rule_to_row(position: int, rule: Dict[str, Any]):
+    extra = {k: v for k, v in rule.items() if k not in ("days", "from", "to", "station")}
+    return (position, ",".join(rule.get("days", [])), rule["from"], rule["to"], rule.get("station"),
+            json.dumps(extra) if extra else None)
+
+
+def _row_to_rule(row) -> Dict[str, Any]:
+    days, time_from, time_to, station, extra = row
+    rule = {"days": days.split(",") if days else [], "from": time_from, "to": time_to, "station": station}
+    if extra:
+        rule.update(json.loads(extra))
+    return rule
+
+
+class SQLiteStore:
+    """Station library and weekly schedule kept in an SQLite database."""
+
+    def __init__(self, path: Path = DB_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+        self._depth = 0
+
+    @contextmanager
+    def transaction(self):
+        """One transaction; nested uses join the outermost one, which commits or rolls back everything."""
+        self._depth += 1
+        try:
+            if self._depth > 1:
+                yield
+            else:
+                with self.conn:
+                    yield
+        finally:
+            self._depth -= 1
+
+    def close(self):
+        self.conn.close()
+
+    def backup(self, path: Path):
+        """Writes a consistent copy of the database to ``path``, including commits still in the WAL file."""
+        target = sqlite3.connect(str(path))
+        try:
+            self.conn.backup(target)
+        finally:
+            target.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # --- Stations ---
+    def stations(self) -> List[Dict[str, Any]]:
+        """Returns all stations in their list order."""
+        rows = self.conn.execute(
+            "SELECT name, url, genre, favorite, extra FROM stations ORDER BY position")
+        return [_row_to_station(r) for r in rows]
+
+    def station_count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM stations").fetchone()[0]
+
+    def find_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute(
+            "SELECT name, url, genre, favorite, extra FROM stations WHERE name = ? ORDER BY position LIMIT 1",
+            (name,)).fetchone()
+        return _row_to_station(row) if row else None
+
+    def _write_stations(self, stations: Iterable[Dict[str, Any]]):
+        self.conn.execute("DELETE FROM stations")
+        self.conn.executemany(
+            "INSERT INTO stations (position, name, url, genre, favorite, extra) VALUES (?, ?, ?, ?, ?, ?)",
+            (_station_to_row(i, s) for i, s in enumerate(stations)))
+
+    def replace_stations(self, stations: Iterable[Dict[str, Any]]):
+        """Atomically replaces the whole station list."""
+        with self.transaction():
+            self._write_stations(stations)
+
+    def add_stations(self, stations: Iterable[Dict[str, Any]]):
+        """Appends stations at the end of the list in a single transaction."""
+        with self.transaction():
+            start = self.conn.execute("SELECT COALESCE(MAX(position) + 1, 0) FROM stations").fetchone()[0]
+            self.conn.executemany(
+                "INSERT INTO stations (position, name, url, genre, favorite, extra) VALUES (?, ?, ?, ?, ?, ?)",
+                (_station_to_row(start + i, s) for i, s in enumerate(stations)))
+
+    def update_station(self, name: str, station: Dict[str, Any]) -> bool:
+        """Replaces the first station called ``name``. Returns False if it does not exist."""
+        with self.transaction():
+            row = self.conn.execute(
+                "SELECT id, position FROM stations WHERE name = ? ORDER BY position LIMIT 1", (name,)).fetchone()
+            if not row:
+                return False
+            self.conn.execute(
+                "UPDATE stations SET position = ?, name = ?, url = ?, genre = ?, favorite = ?, extra = ? WHERE id = ?",
+                _station_to_row(row[1], station) + (row[0],))
+        return True
+
+    def delete_station(self, name: str) -> bool:
+        with self.transaction():
+            cur = self.conn.execute(
+                "DELETE FROM stations WHERE id = (SELECT id FROM stations WHERE name = ? ORDER BY position LIMIT 1)",
+                (name,))
+        return cur.rowcount > 0
+
+    def sync_stations(self, stations: Iterable[Dict[str, Any]]):
+        """Brings the table to ``stations`` by deleting, updating and appending only what changed.
+
+        Handles what the GUI's edits produce: removed stations, edited or
+        renamed ones and new ones at the end. Anything else (a reordered
+        list, a station inserted in the middle, repeated names) rewrites
+        the whole list.
+        """
+        stations = list(stations)
+        with self.transaction():
+            current = {s["name"]: s for s in self.stations()}
+            old_names = list(current)
+            new_names = [s["name"] for s in stations]
+            if len(old_names) != self.station_count() or len(set(new_names)) != len(new_names):
+                self._write_stations(stations)
+                return
+            removed = [name for name in old_names if name not in set(new_names)]
+            added = [name for name in new_names if name not in current]
+            # Jedna zniknięta i jedna nowa nazwa na tym samym miejscu to zmiana nazwy, nie usunięcie i dodanie
+            renamed = {}
+            if len(removed) == 1 and len(added) == 1 and len(old_names) == len(new_names):
+                renamed = {removed[0]: added[0]}
+                removed = []
+            kept = [renamed.get(name, name) for name in old_names if name not in removed]
+            if new_names[:len(kept)] != kept:
+                self._write_stations(stations)
+                return
+            for name in removed:
+                self.delete_station(name)
+            old_by_new = {renamed.get(name, name): name for name in old_names}
+            for station in stations[:len(kept)]:
+                old = old_by_new[station["name"]]
+                if _station_to_row(0, station) != _station_to_row(0, current[old]):
+                    self.update_station(old, station)
+            self.add_stations(stations[len(kept):])
+
+    # --- Weekly schedule ---
+    def weekly_rules(self, day: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Returns weekly rules in order, optionally only those active on ``day``."""
+        rows = self.conn.execute(
+            "SELECT days, time_from, time_to, station, extra FROM weekly_rules ORDER BY position")
+        rules = [_row_to_rule(r) for r in rows]
+        if day is not None:
+            rules = [r for r in rules if day in r["days"]]
+        return rules
+
+    def _write_weekly_rules(self, rules: Iterable[Dict[str, Any]]):
+        self.conn.execute("DELETE FROM weekly_rules")
+        self.conn.executemany(
+            "INSERT INTO weekly_rules (position, days, time_from, time_to, station, extra) VALUES (?, ?, ?, ?, ?, ?)",
+            (_rule_to_row(i, r) for i, r in enumerate(rules)))
+
+    def replace_weekly_rules(self, rules: Iterable[Dict[str, Any]]):
+        with self.transaction():
+            self._write_weekly_rules(rules)
+
+    def replace_library(self, stations: Iterable[Dict[str, Any]], rules: Iterable[Dict[str, Any]]):
+        """Replaces stations and weekly rules in one transaction."""
+        with self.transaction():
+            self._write_stations(stations)
+            self._write_weekly_rules(rules)
+
+    def sync_library(self, stations: Iterable[Dict[str, Any]], rules: Iterable[Dict[str, Any]]):
+        """Like ``replace_library``, but writes only the stations that changed and the rules only if they did."""
+        rules = list(rules)
+        with self.transaction():
+            self.sync_stations(stations)
+            if [_rule_to_row(i, r) for i, r in enumerate(self.weekly_rules())] != [
+                    _rule_to_row(i, r) for i, r in enumerate(rules)]:
+                self._write_weekly_rules(rules)
+
+    # --- YAML import/export ---
+    def import_yaml(self, path: Path):
+        """Loads stations and weekly rules from a YAML config file, replacing the current contents."""
+        with open(path, "r", encoding="utf-8") as f:
+            data = yaml.safe_load(f) or {}
+        self.replace_library(data.get("stations") or [], (data.get("schedule") or {}).get("weekly") or [])
+
+    def export_yaml(self, path: Path, base: Optional[Dict[str, Any]] = None):
+        """Writes the library merged into ``base`` (or an empty config) as a plain YAML config."""
+        data = dict(base or {})
+        data.pop("storage", None)
+        data["stations"] = self.stations()
+        data["schedule"] = dict(data.get("schedule") or {})
+        data["schedule"]["weekly"] = self.weekly_rules()
+        with open(path, "w", encoding="utf-8") as f:
+            yaml.safe_dump(data, f, allow_unicode=True, sort_keys=False)
+
+
+def write_atomic(path: Path, data: Union[str, bytes]):
+    """Replaces ``path`` with ``data`` through a uniquely named temporary file next to it.
+
+    Readers never see a half-written file, and the daemon and the GUI saving
+    the same file at once do not write into each other's temporary file.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    binary = isinstance(data, bytes)
+    f = tempfile.NamedTemporaryFile("wb" if binary else "w", encoding=None if binary else "utf-8",
+                                    dir=path.parent, prefix=f".{path.name}.", suffix=".tmp", delete=False)
+    try:
+        with f:
+            f.write(data)
+        os.replace(f.name, path)
+    except BaseException:
+        Path(f.name).unlink(missing_ok=True)
+        raise
+
+
+def storage_backend(config: Dict[str, Any]) -> str:
+    return STORAGE_SQLITE if config.get("storage") == STORAGE_SQLITE else STORAGE_YAML
+
+
+def store_path(config: Dict[str, Any]) -> Optional[Path]:
+    """Path of the SQLite library the config selects, or None with YAML storage."""
+    if storage_backend(config) != STORAGE_SQLITE:
+        return None
+    return Path(config.get("storage_path") or DB_PATH).expanduser()
+
+
+def library_files(config: Dict[str, Any]) -> List[Path]:
+    """The SQLite library and its write-ahead log (commits land there until a checkpoint)."""
+    path = store_path(config)
+    return [] if path is None else [path, path.with_name(path.name + "-wal")]
+
+
+def library_stamp(config: Dict[str, Any]) -> Optional[Tuple[Optional[Tuple[int, int]], ...]]:
+    """Modification time and size of the library files; changes with every write to the database.
+
+    None with YAML storage, where the library is part of config.yaml.
+    """
+    files = library_files(config)
+    if not files:
+        return None
+    stamps = []
+    for path in files:
+        try:
+            st = path.stat()
+            stamps.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            stamps.append(None)
+    return tuple(stamps)
+
+
+def open_store(config: Dict[str, Any]) -> Optional[SQLiteStore]:
+    """Opens the SQLite store if the config selects it, otherwise returns None."""
+    path = store_path(config)
+    return None if path is None else SQLiteStore(path)
+
+
+def read_yaml_config(path: Path = CONFIG_PATH) -> Dict[str, Any]:
+    """Reads the raw YAML file without touching the SQLite library."""
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def load_config(path: Path = CONFIG_PATH, with_library: bool = True) -> Dict[str, Any]:
+    """Loads the configuration, filling stations and weekly rules from SQLite when enabled.
+
+    With ``with_library=False`` the SQLite-backed lists are left out, which lets
+    callers that only need indexed lookups skip reading the whole library.
+    """
+    config = read_yaml_config(path)
+    if storage_backend(config) == STORAGE_SQLITE and with_library:
+        with open_store(config) as store:
+            config["stations"] = store.stations()
+            config.setdefault("schedule", {})
+            config["schedule"] = dict(config["schedule"] or {})
+            config["schedule"]["weekly"] = store.weekly_rules()
+    return config
+
+
+def save_config(config: Dict[str, Any], path: Path = CONFIG_PATH, library: bool = True):
+    """Saves the configuration using the backend selected in it.
+
+    With SQLite only the changed stations and rules are written, and
+    ``library=False`` (a settings-only save) leaves the database alone.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = config
+    if storage_backend(config) == STORAGE_SQLITE:
+        if library:
+            with open_store(config) as store:
+                store.sync_library(config.get("stations") or [], (config.get("schedule") or {}).get("weekly") or [])
+        # W YAML zostają tylko ustawienia, biblioteka jest w bazie
+        data = {k: v for k, v in config.items() if k != "stations"}
+        data["schedule"] = {k: v for k, v in (config.get("schedule") or {}).items() if k != "weekly"}
+    # Demon wczytuje plik ponownie zaraz po zmianie - nie może trafić na zapisany do połowy
+    write_atomic(path, yaml.safe_dump(data, allow_unicode=True, sort_keys=False))
+
+
+def main(argv=None):
+    """Command-line import/export between config.yaml and the SQLite library."""
+    import argparse
+    parser = argparse.ArgumentParser(description="RadioScheduler library storage")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="Import stations and schedule from a YAML file into SQLite")
+    p_import.add_argument("yaml_file", type=Path)
+    p_export = sub.add_parser("export", help="Export the SQLite library to a plain YAML config")
+    p_export.add_argument("yaml_file", type=Path)
+    parser.add_argument("--db", type=Path, default=DB_PATH, help="Path to the SQLite database")
+    args = parser.parse_args(argv)
+
+    base = read_yaml_config() if CONFIG_PATH.exists() else {}
+    with SQLiteStore(args.db) as store:
+        if args.command == "import":
+            store.import_yaml(args.yaml_file)
+            print(f"Imported {store.station_count()} stations into {args.db}")
+        else:
+            store.export_yaml(args.yaml_file, base)
+            print(f"Exported {store.station_count()} stations to {args.yaml_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
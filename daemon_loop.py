@@ -0,0 +1,354 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Building blocks of the daemon's asyncio event loop.
+
+The daemon runs a single event loop. A schedule pass is triggered by
+timers, file changes, MPD ``idle`` notifications and the control socket.
+Everything that blocks, such as YAML and SQLite or MPD calls through
+``MPCController``, runs in executors. ``TaskRunner`` times every task run
+with the same histograms as the MPD calls, and records how late the loop
+wakes up as ``loop_lag``.
+"""
+import asyncio
+import inspect
+import json
+import logging
+import os
+import socket
+import time
+from concurrent.futures import Executor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Coroutine, Dict, Iterable, List, Optional, Tuple
+
+from config_store import CONFIG_DIR # type: ignore
+from mpc_controller import COMMAND_TIMEOUT, MPCController, quote_arg # type: ignore
+from mpc_metrics import CommandMetrics # type: ignore
+
+TASK_METRICS_PATH = CONFIG_DIR / "daemon_tasks.json"
+CONTROL_SOCKET = CONFIG_DIR / "daemon.sock"
+
+WATCH_INTERVAL = 0.5    # co ile sekund sprawdzać obserwowane pliki
+LAG_INTERVAL = 1.0      # co ile sekund mierzyć opóźnienie pętli
+CONTROL_TIMEOUT = 1.0   # limit czasu odpowiedzi demona na polecenie z gniazda sterującego
+IDLE_RETRY = 1.0        # pierwsza przerwa przed ponownym połączeniem idle; każda kolejna jest dwa razy dłuższa
+MAX_IDLE_RETRY = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+class SystemClock:
+    """The wall clock; a simulation puts ``schedule_simulator.VirtualClock`` in its place."""
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+
+class Waker:
+    """Wakes the main loop; ``set`` may be called from any thread (playback monitors, executors).
+
+    Setting it before the loop runs is remembered until ``bind``.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._event: Optional[asyncio.Event] = None
+        self._pending = False
+
+    def bind(self, loop: asyncio.AbstractEventLoop):
+        self._loop = loop
+        self._event = asyncio.Event()
+        if self._pending:
+            self._event.set()
+
+    def set(self):
+        if self._loop is None or self._event is None:
+            self._pending = True
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._event.set)
+        except RuntimeError:
+            pass # Pętla już zamknięta (koniec pracy demona)
+
+    async def wait(self, timeout: float) -> bool:
+        """Sleeps up to ``timeout`` seconds; returns True when woken early."""
+        assert self._event is not None, "Waker.bind() not called"
+        try:
+            await asyncio.wait_for(self._event.wait(), max(0.0, timeout))
+            woken = True
+        except asyncio.TimeoutError:
+            woken = False
+        self._event.clear()
+        return woken
+
+
+class TaskRunner:
+    """Starts and times the daemon's tasks; blocking calls go to executors."""
+
+    def __init__(self, metrics: Optional[CommandMetrics] = None):
+        self.metrics = metrics or CommandMetrics()
+        self._tasks: set = set()
+
+    async def timed(self, name: str, awaitable: Awaitable) -> Any:
+        start = time.perf_counter()
+        ok = False
+        try:
+            result = await awaitable
+            ok = True
+            return result
+        finally:
+            self.metrics.record(name, time.perf_counter() - start, ok)
+
+    async def blocking(self, name: str, fn: Callable, *args, executor: Optional[Executor] = None) -> Any:
+        """Runs ``fn(*args)`` in ``executor`` (the loop's default one if None); the time includes the queue wait."""
+        loop = asyncio.get_running_loop()
+        return await self.timed(name, loop.run_in_executor(executor, fn, *args))
+
+    def spawn(self, name: str, coro: Coroutine) -> "asyncio.Task":
+        """Starts a background task; an exception it ends with is logged instead of lost."""
+        task = asyncio.create_task(coro, name=name)
+        self._tasks.add(task)
+        task.add_done_callback(self._finished)
+        return task
+
+    def _finished(self, task: "asyncio.Task"):
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            error = task.exception()
+            logger.error(f"Task {task.get_name()} failed: {error}", exc_info=error)
+
+    async def cancel_all(self):
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def watch_lag(self, interval: float = LAG_INTERVAL):
+        """Records how late the loop wakes up from a sleep - the time it was blocked by some task."""
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(interval)
+            self.metrics.record("loop_lag", max(0.0, time.perf_counter() - start - interval))
+
+
+class FileWatcher:
+    """Polls the modification stamps of a few files and calls back when one changes.
+
+    A stat of a handful of files every half second costs microseconds and
+    needs no inotify dependency. Creating and deleting a file count as
+    changes too (lock files work that way).
+    """
+
+    def __init__(self, paths: Iterable[Path], callback: Callable[[Path], None], interval: float = WATCH_INTERVAL):
+        self.paths = list(paths)
+        self.callback = callback
+        self.interval = interval
+        self._stamps = {path: self._stamp(path) for path in self.paths}
+
+    @staticmethod
+    def _stamp(path: Path) -> Optional[Tuple[int, int]]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def poll(self) -> List[Path]:
+        """Paths changed since the previous poll."""
+        changed = []
+        for path in self.paths:
+            stamp = self._stamp(path)
+            if stamp != self._stamps[path]:
+                self._stamps[path] = stamp
+                changed.append(path)
+        return changed
+
+    async def run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            for path in self.poll():
+                self.callback(path)
+
+
+class ControlServer:
+    """Control socket speaking JSON lines: a request {"command": name, ...} gets one JSON reply line.
+
+    Replies are {"ok": true, "result": ...} or {"ok": false, "error": ...}.
+    Handlers run on the event loop, so they must be quick; a handler may
+    also be a coroutine function.
+    """
+
+    def __init__(self, handlers: Dict[str, Callable[[Dict[str, Any]], Any]], path: Path = CONTROL_SOCKET):
+        self.handlers = handlers
+        self.path = path
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if request("ping", self.path, timeout=0.2) is not None:
+            raise OSError(f"another daemon is listening on {self.path}")
+        self.path.unlink(missing_ok=True) # Gniazdo po poprzednim procesie, który nie posprzątał
+        self._server = await asyncio.start_unix_server(self._serve, path=str(self.path))
+        os.chmod(self.path, 0o600)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+            self.path.unlink(missing_ok=True)
+
+    async def dispatch(self, line: bytes) -> Dict[str, Any]:
+        try:
+            message = json.loads(line)
+            handler = self.handlers[message["command"]]
+        except (ValueError, KeyError, TypeError):
+            return {"ok": False, "error": f"unknown request: {line[:80]!r}"}
+        try:
+            result = handler(message)
+            if inspect.isawaitable(result):
+                result = await result
+            return {"ok": True, "result": result}
+        except Exception as e:
+            logger.error(f"Control command {message['command']} failed: {e}", exc_info=True)
+            return {"ok": False, "error": str(e)}
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                reply = await self.dispatch(line)
+                writer.write(json.dumps(reply).encode("utf-8") + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def request(command: str, path: Path = CONTROL_SOCKET, timeout: float = CONTROL_TIMEOUT,
+            **args) -> Optional[Dict[str, Any]]:
+    """Sends one command to the running daemon; returns its reply, or None when no daemon answers."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+            s.settimeout(timeout)
+            s.connect(str(path))
+            s.sendall(json.dumps(dict(args, command=command)).encode("utf-8") + b"\n")
+            reply = b""
+            while not reply.endswith(b"\n"):
+                chunk = s.recv(65536)
+                if not chunk:
+                    return None
+                reply += chunk
+        return json.loads(reply)
+    except (OSError, ValueError):
+        return None
+
+
+class MPDError(Exception):
+    """MPD answered with ACK."""
+
+
+class AsyncMPDClient:
+    """Minimal asyncio MPD client: one connection for commands and ``idle``."""
+
+    def __init__(self, host: str = "localhost", port: int = 6600, socket_path: Optional[str] = None,
+                 password: Optional[str] = None, timeout: float = COMMAND_TIMEOUT):
+        self.host = host
+        self.port = port
+        self.socket_path = socket_path
+        self.password = password
+        self.timeout = timeout
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+
+    @classmethod
+    def for_controller(cls, mpc: MPCController) -> "AsyncMPDClient":
+        """Client for the same MPD (and transport) as ``mpc``."""
+        return cls(mpc.host, mpc.port, mpc.unix_socket, mpc.password)
+
+    async def connect(self):
+        if self.socket_path:
+            path = "\0" + self.socket_path[1:] if self.socket_path.startswith("@") else self.socket_path
+            connecting = asyncio.open_unix_connection(path)
+        else:
+            connecting = asyncio.open_connection(self.host, self.port)
+        self._reader, self._writer = await asyncio.wait_for(connecting, self.timeout)
+        greeting = await asyncio.wait_for(self._reader.readline(), self.timeout)
+        if not greeting.startswith(b"OK MPD"):
+            raise ConnectionError("not an MPD server")
+        if self.password:
+            await self.command(f"password {quote_arg(self.password)}")
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            try:
+                await self._writer.wait_closed()
+            except (OSError, ConnectionError):
+                pass
+            self._reader = self._writer = None
+
+    async def _response(self, timeout: Optional[float]) -> List[Tuple[str, str]]:
+        assert self._reader is not None
+        pairs = []
+        while True:
+            raw = await asyncio.wait_for(self._reader.readline(), timeout)
+            if not raw:
+                raise ConnectionError("connection closed by MPD")
+            line = raw.decode("utf-8", errors="replace").rstrip("\n")
+            if line == "OK":
+                return pairs
+            if line.startswith("ACK "):
+                raise MPDError(line.split("} ", 1)[-1])
+            key, _, value = line.partition(": ")
+            pairs.append((key, value))
+
+    async def command(self, line: str) -> Dict[str, str]:
+        """Sends one command line; returns the response fields (the last value of a repeated key wins)."""
+        assert self._writer is not None, "not connected"
+        self._writer.write(line.encode("utf-8") + b"\n")
+        await self._writer.drain()
+        return dict(await self._response(self.timeout))
+
+    async def idle(self, *subsystems: str) -> List[str]:
+        """Waits (without a time limit) until one of ``subsystems`` changes; returns the changed ones."""
+        assert self._writer is not None, "not connected"
+        self._writer.write(" ".join(("idle",) + subsystems).encode("utf-8") + b"\n")
+        await self._writer.drain()
+        return [value for key, value in await self._response(None) if key == "changed"]
+
+
+async def watch_idle(client_factory: Callable[[], AsyncMPDClient],
+                     on_change: Callable[[List[str], AsyncMPDClient], Awaitable[None]],
+                     subsystems: Tuple[str, ...] = ("player",),
+                     retry: float = IDLE_RETRY, max_retry: float = MAX_IDLE_RETRY, name: str = "MPD"):
+    """Keeps an ``idle`` connection open and awaits ``on_change`` with the changed subsystems.
+
+    ``on_change`` also gets the client, so it can send commands (e.g.
+    ``currentsong``) before the next ``idle``. It is awaited with an empty
+    list after every (re)connection, to catch up on changes missed while
+    disconnected. A lost connection is re-established with exponential
+    backoff; the factory is called for every attempt, so it may pick up
+    new settings.
+    """
+    delay = retry
+    while True:
+        client = client_factory()
+        try:
+            await client.connect()
+            delay = retry
+            await on_change([], client)
+            while True:
+                await on_change(await client.idle(*subsystems), client)
+        except (OSError, ConnectionError, asyncio.TimeoutError, MPDError) as e:
+            logger.debug(f"Idle connection to {name} lost: {e}; reconnecting in {delay:.0f} s")
+        finally:
+            await client.close()
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, max_retry)
@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Small TTL-respecting DNS cache used to pre-resolve upcoming stations.
+
+Addresses come from ``getaddrinfo`` (so /etc/hosts and nsswitch apply, and a
+local caching resolver such as systemd-resolved is warmed up for MPD). Since
+``getaddrinfo`` does not report record TTLs, the TTL is read with one extra
+A query to the first nameserver in /etc/resolv.conf; if that fails the
+default TTL is used. Failed lookups are cached for a short negative TTL.
+"""
+import ipaddress
+import logging
+import random
+import socket
+import struct
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+
+DEFAULT_TTL = 300
+MIN_TTL = 30
+MAX_TTL = 3600
+NEGATIVE_TTL = 30
+DEFAULT_TIMEOUT = 3.0
+MAX_ENTRIES = 256
+RESOLV_CONF = "/etc/resolv.conf"
+
+logger = logging.getLogger(__name__)
+
+
+class DNSResult:
+    """Outcome of resolving one host name."""
+    __slots__ = ("host", "addresses", "error", "elapsed", "resolved_at", "ttl")
+
+    def __init__(self, host: str, addresses: Optional[List[str]] = None, error: Optional[str] = None,
+                 elapsed: float = 0.0, resolved_at: Optional[float] = None, ttl: float = DEFAULT_TTL):
+        self.host = host
+        self.addresses = addresses or []
+        self.error = error
+        self.elapsed = elapsed
+        self.resolved_at = time.time() if resolved_at is None else resolved_at
+        self.ttl = ttl
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and bool(self.addresses)
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        return (now if now is not None else time.time()) - self.resolved_at >= self.ttl
+
+    def __repr__(self):
+        state = ",".join(self.addresses) if self.ok else self.error
+        return f"DNSResult({self.host}, {state}, {self.elapsed * 1000:.1f} ms, ttl={self.ttl:.0f})"
+
+
+def _nameserver() -> Optional[str]:
+    try:
+        with open(RESOLV_CONF, encoding="utf-8") as f:
+            for line in f:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    return parts[1]
+    except OSError:
+        pass
+    return None
+
+
+def _skip_name(data: bytes, pos: int) -> int:
+    while True:
+        length = data[pos]
+        if length & 0xC0 == 0xC0: # Wskaźnik kompresji - nazwa kończy się tutaj
+            return pos + 2
+        pos += 1
+        if length == 0:
+            return pos
+        pos += length
+
+
+def query_ttl(host: str, timeout: float = DEFAULT_TIMEOUT) -> Optional[int]:
+    """Smallest TTL of the A/AAAA/CNAME answers for ``host``, or None if it cannot be determined."""
+    server = _nameserver()
+    if not server:
+        return None
+    query_id = random.getrandbits(16)
+    question = b"".join(bytes([len(label)]) + label for label in host.rstrip(".").encode("idna").split(b"."))
+    packet = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0) + question + b"\x00" + struct.pack("!HH", 1, 1)
+    try:
+        family = socket.AF_INET6 if ":" in server else socket.AF_INET
+        with socket.socket(family, socket.SOCK_DGRAM) as sock:
+            sock.settimeout(timeout)
+            sock.sendto(packet, (server, 53))
+            data = sock.recv(4096)
+        reply_id, flags, qdcount, ancount = struct.unpack("!HHHH", data[:8])
+        if reply_id != query_id or flags & 0x000F:
+            return None
+        pos = 12
+        for _ in range(qdcount):
+            pos = _skip_name(data, pos) + 4
+        ttls = []
+        for _ in range(ancount):
+            pos = _skip_name(data, pos)
+            rtype, _, ttl, rdlength = struct.unpack("!HHIH", data[pos:pos + 10])
+            if rtype in (1, 5, 28):
+                ttls.append(ttl)
+            pos += 10 + rdlength
+        return min(ttls) if ttls else None
+    except (OSError, struct.error, IndexError, UnicodeError):
+        return None
+
+
+def system_resolve(host: str, port: int = 80) -> List[str]:
+    """Addresses of ``host`` via getaddrinfo. Raises OSError (socket.gaierror) on failure."""
+    infos = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    return list(dict.fromkeys(info[4][0] for info in infos))
+
+
+def is_ip_literal(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip("[]"))
+        return True
+    except ValueError:
+        return False
+
+
+class DNSCache:
+    """Thread-safe host name cache; entries expire after their record TTL (clamped to MIN_TTL..MAX_TTL)."""
+
+    def __init__(self, default_ttl: float = DEFAULT_TTL, negative_ttl: float = NEGATIVE_TTL,
+                 max_entries: int = MAX_ENTRIES,
+                 resolve_fn: Callable[[str, int], List[str]] = system_resolve,
+                 ttl_fn: Optional[Callable[[str], Optional[int]]] = query_ttl):
+        self.default_ttl = default_ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+        self.resolve_fn = resolve_fn
+        self.ttl_fn = ttl_fn
+        self._entries: Dict[str, DNSResult] = {}
+        self._lock = threading.Lock()
+
+    def get(self, host: str) -> Optional[DNSResult]:
+        """The cached result for ``host`` if it has not expired yet."""
+        with self._lock:
+            result = self._entries.get(host)
+        return result if result is not None and not result.expired() else None
+
+    def resolve(self, host: str, port: int = 80) -> DNSResult:
+        """Resolves ``host`` now (ignoring the cache) and stores the result."""
+        start = time.perf_counter()
+        try:
+            addresses = self.resolve_fn(host, port)
+        except OSError as e:
+            result = DNSResult(host, error=str(e) or type(e).__name__, elapsed=time.perf_counter() - start,
+                               ttl=self.negative_ttl)
+        else:
+            ttl = self.ttl_fn(host) if self.ttl_fn else None
+            ttl = self.default_ttl if ttl is None else min(max(ttl, MIN_TTL), MAX_TTL)
+            result = DNSResult(host, addresses, elapsed=time.perf_counter() - start, ttl=ttl)
+        with self._lock:
+            self._entries.pop(host, None)
+            self._entries[host] = result
+            # Najstarsze wpisy wypadają pierwsze (słownik zachowuje kolejność wstawiania)
+            while len(self._entries) > self.max_entries:
+                del self._entries[next(iter(self._entries))]
+        return result
+
+    def lookup(self, host: str, port: int = 80) -> DNSResult:
+        """Cached result if fresh, otherwise a new resolution. IP literals are returned as-is."""
+        if is_ip_literal(host):
+            return DNSResult(host, [host.strip("[]")], ttl=float("inf"))
+        return self.get(host) or self.resolve(host, port)
+
+    def prefetch_async(self, hosts: Iterable[str],
+                       callback: Optional[Callable[[DNSResult], None]] = None) -> threading.Thread:
+        """Looks up ``hosts`` in a background thread, calling ``callback`` with each result."""
+        def work(hosts):
+            for host in hosts:
+                result = self.lookup(host)
+                if callback:
+                    callback(result)
+
+        thread = threading.Thread(target=work, args=(list(dict.fromkeys(hosts)),), name="dns-prefetch", daemon=True)
+        thread.start()
+        return thread
+
+    def __len__(self):
+        return len(self._entries)
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""The daemon's logging: off the scheduling path, rotated, compressed, with heartbeats kept apart.
+
+Loggers only put records on a queue (``QueueHandler``); a ``QueueListener``
+thread formats them and writes the file. A slow disk then delays the log,
+not a schedule pass or a zone thread.
+
+The file rotates when it exceeds ``MAX_BYTES`` and at midnight (the first
+record after it), whichever comes first. The rotated files become
+``radio-scheduler.log.1.gz``, ``.2.gz``..., ``BACKUP_COUNT`` of them, and
+are compressed by the listener thread too. A log left from a previous day
+is rotated by the first record of the new day after a restart.
+
+Heartbeats (one per minute) do not go to the file. ``HEARTBEAT_LOGGER``
+keeps its last ``HEARTBEAT_CAPACITY`` lines in memory (``RingBufferHandler``).
+The daemon answers ``heartbeats`` on the control socket and writes them to
+``heartbeat.log`` with its metrics, so the last ones survive a crash.
+
+``stop()`` flushes the queue; the daemon calls it on exit, including on
+SIGTERM.
+"""
+import atexit
+import gzip
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import threading
+import time
+from collections import deque
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+MAX_BYTES = 5 * 1024 * 1024
+BACKUP_COUNT = 14
+HEARTBEAT_LOGGER = "heartbeat"
+HEARTBEAT_CAPACITY = 1440 # Doba uderzeń co minutę, ok. 150 kB w pamięci
+FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+
+def _next_midnight(after: float) -> float:
+    day = datetime.fromtimestamp(after).date() + timedelta(days=1)
+    return datetime.combine(day, datetime.min.time()).timestamp()
+
+
+def _gzip_rotator(source: str, dest: str):
+    with open(source, "rb") as src, gzip.open(dest, "wb", compresslevel=6) as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+class DailyRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """``RotatingFileHandler`` that also rotates at the first record after midnight, compressing backups."""
+
+    def __init__(self, filename: Path, max_bytes: int = MAX_BYTES, backup_count: int = BACKUP_COUNT,
+                 compress: bool = True):
+        super().__init__(filename, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8")
+        if compress:
+            self.namer = lambda name: name + ".gz"
+            self.rotator = _gzip_rotator
+        # Plik z poprzedniego uruchomienia z wczoraj zostanie zrotowany przy pierwszym wpisie dziś
+        try:
+            started = os.stat(self.baseFilename).st_mtime
+        except OSError:
+            started = time.time()
+        self.rollover_at = _next_midnight(started)
+
+    def shouldRollover(self, record: logging.LogRecord) -> bool:
+        if record.created >= self.rollover_at:
+            self.rollover_at = _next_midnight(record.created)
+            if self.stream is None:
+                self.stream = self._open()
+            return self.stream.tell() > 0 # Pusty plik nie daje pustego archiwum
+        return bool(super().shouldRollover(record))
+
+
+class RingBufferHandler(logging.Handler):
+    """Keeps the last ``capacity`` formatted lines in memory."""
+
+    def __init__(self, capacity: int = HEARTBEAT_CAPACITY):
+        super().__init__()
+        self.lines: deque = deque(maxlen=capacity)
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            self.lines.append(self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def tail(self, limit: Optional[int] = None) -> List[str]:
+        """Oldest first; the last ``limit`` lines if given."""
+        lines = list(self.lines)
+        return lines[-limit:] if limit else lines
+
+    def dump(self, path: Path):
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text("".join(line + "\n" for line in list(self.lines)), encoding="utf-8")
+        os.replace(tmp, path)
+
+
+class LogPipeline:
+    """Root logger -> queue -> listener thread -> rotating file; heartbeats -> ring buffer."""
+
+    def __init__(self, path: Path, level: int = logging.INFO, max_bytes: int = MAX_BYTES,
+                 backup_count: int = BACKUP_COUNT, compress: bool = True,
+                 heartbeat_capacity: int = HEARTBEAT_CAPACITY):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        formatter = logging.Formatter(FORMAT)
+        self.file_handler = DailyRotatingFileHandler(path, max_bytes, backup_count, compress)
+        self.file_handler.setFormatter(formatter)
+        self.queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+        self.queue_handler = logging.handlers.QueueHandler(self.queue)
+        self.listener = logging.handlers.QueueListener(self.queue, self.file_handler, respect_handler_level=True)
+        self.heartbeats = RingBufferHandler(heartbeat_capacity)
+        self.heartbeats.setFormatter(formatter)
+        self.level = level
+        self._lock = threading.Lock()
+        self._started = False
+
+    def start(self) -> "LogPipeline":
+        with self._lock:
+            if self._started:
+                return self
+            root = logging.getLogger()
+            root.setLevel(self.level)
+            root.addHandler(self.queue_handler)
+            heartbeat = logging.getLogger(HEARTBEAT_LOGGER)
+            heartbeat.propagate = False # Uderzenia serca nie trafiają do pliku logu
+            heartbeat.addHandler(self.heartbeats)
+            self.listener.start()
+            self._started = True
+        atexit.register(self.stop) # Także polecenia wiersza poleceń, które kończą się bez stop()
+        return self
+
+    def stop(self):
+        """Writes out everything queued and closes the file; later warnings go to standard error."""
+        with self._lock:
+            if not self._started:
+                return
+            self._started = False
+            logging.getLogger().removeHandler(self.queue_handler)
+            self.listener.stop()
+            self.file_handler.close()
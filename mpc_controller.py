@@ -3,10 +3,16 @@
 #
 # This software is released under the MIT License.
 # https://opensource.org/licenses/MIT
+import os
 import subprocess
 import logging
 import socket
+import threading
+import time
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from mpc_metrics import CommandMetrics # type: ignore
 
 LOG_PATH = Path.home() / ".config/radio-scheduler/mpc_controller.log"
 
@@ -21,22 +27,300 @@ if not logger.handlers:
     handler.setFormatter(formatter)
     logger.addHandler(handler)
 
+COMMAND_TIMEOUT = 3.0     # limit czasu jednego wywołania mpc
+STATUS_TIMEOUT = 0.1      # limit pojedynczej operacji na gnieździe
+STATUS_DEADLINE = 0.5     # limit całego zapytania o status
+FAILURE_THRESHOLD = 3     # tyle kolejnych błędów połączenia otwiera bezpiecznik
+COOLDOWN = 2.0            # pierwsza przerwa w wywołaniach; każda kolejna nieudana próba ją podwaja
+MAX_COOLDOWN = 60.0
+
+DEFAULT_PORT = 6600
+COMMANDS_MPC = "mpc"       # polecenie = proces mpc (domyślnie)
+COMMANDS_SOCKET = "socket" # polecenia protokołem MPD przez gniazdo, jak zapytanie o status
+# Typowe położenia gniazda MPD; używane, gdy MPD działa lokalnie, a gniazdo nie zostało podane wprost
+DEFAULT_SOCKET_PATHS = ("/run/mpd/socket", "/var/run/mpd/socket",
+                        os.path.join(os.environ.get("XDG_RUNTIME_DIR", "/run/user/%d" % os.getuid()), "mpd/socket"))
+
+# Fragmenty komunikatów mpc świadczące o braku połączenia z MPD (a nie o błędzie polecenia)
+_UNREACHABLE_MARKERS = ("connection", "timeout", "timed out", "refused", "no route", "resolve")
+
+class CircuitBreaker:
+    """Fast-fails MPD calls for a cool-down after repeated connection failures.
+
+    Closed: calls go through. After ``threshold`` consecutive failures the
+    breaker opens and calls are rejected without touching MPD. Once the
+    cool-down has passed a single call is let through (half-open); success
+    closes the breaker, failure opens it again with the cool-down doubled,
+    up to ``max_cooldown``.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, threshold=FAILURE_THRESHOLD, cooldown=COOLDOWN, max_cooldown=MAX_COOLDOWN, clock=time.monotonic,
+                 name="MPD"):
+        self.name = name
+        self.threshold = threshold
+        self.base_cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        self.clock = clock
+        self.failures = 0
+        self.rejected = 0
+        self.retries = 0
+        self.cooldown = cooldown
+        self._open = False
+        self._retry_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if not self._open:
+            return self.CLOSED
+        return self.HALF_OPEN if self.clock() >= self._retry_at else self.OPEN
+
+    @property
+    def available(self) -> bool:
+        """False while MPD is considered unreachable."""
+        return not self._open
+
+    def seconds_until_retry(self) -> float:
+        return max(0.0, self._retry_at - self.clock()) if self._open else 0.0
+
+    def allow(self) -> bool:
+        """Whether a call may go to MPD now; rejected calls are counted."""
+        with self._lock:
+            if not self._open:
+                return True
+            if self.clock() >= self._retry_at and not self._probing:
+                self._probing = True # Jedna próba naraz, pozostałe wątki dalej dostają odmowę
+                return True
+            self.rejected += 1
+            return False
+
+    def success(self):
+        with self._lock:
+            self.failures = 0
+            self.cooldown = self.base_cooldown
+            self._open = self._probing = False
+
+    def failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._probing or (not self._open and self.failures >= self.threshold):
+                if self._probing:
+                    self.retries += 1
+                else:
+                    self.retries = 0
+                    logger.error(f"{self.name} unreachable after {self.failures} failed calls, pausing calls for {self.cooldown:.0f} s")
+                self._open = True
+                self._probing = False
+                self._retry_at = self.clock() + self.cooldown
+                self.cooldown = min(self.cooldown * 2, self.max_cooldown)
+
+    def release(self):
+        """Ends a call that failed locally (e.g. no ``mpc`` binary) and says nothing about MPD."""
+        with self._lock:
+            self._probing = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"state": self.state, "failures": self.failures, "retries": self.retries,
+                "rejected": self.rejected, "retry_in": self.seconds_until_retry()}
+
+def split_mpd_host(value: str):
+    """Splits an MPD_HOST-style "password@host" value into (host, password)."""
+    if "@" in value and not value.startswith("@"): # "@nazwa" to abstrakcyjne gniazdo Linuksa
+        password, host = value.split("@", 1)
+        return host, password or None
+    return value, None
+
+def quote_arg(value: str) -> str:
+    """Quotes a command argument as the MPD protocol expects."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
 class MPCController:
+    def __init__(self, host=None, port=None, socket_path=None, password=None, commands=None):
+        self.metrics = CommandMetrics()
+        self._settings = None
+        self.configure({"host": host, "port": port, "socket": socket_path, "password": password, "commands": commands})
+
+    def configure(self, settings: Optional[Dict[str, Any]]) -> bool:
+        """Applies the ``mpd`` section of config.yaml (host, port, socket, password, commands).
+
+        Missing values fall back to MPD_HOST/MPD_PORT, like mpc itself. The
+        Unix socket is preferred whenever it exists: given explicitly, or
+        found at a standard location for the default localhost:6600 (an
+        explicit 127.0.0.1 or another port keeps TCP). ``commands`` selects
+        how commands are sent: ``mpc`` (default) starts an mpc process per
+        command, ``socket`` speaks the MPD protocol directly. Returns whether
+        anything changed.
+        """
+        settings = {k: v for k, v in (settings or {}).items() if v not in (None, "")}
+        if settings == self._settings:
+            return False
+        self._settings = settings
+        env_host, env_password = split_mpd_host(os.environ.get("MPD_HOST", "localhost"))
+        self.host = settings.get("host") or env_host
+        self.port = int(settings.get("port") or os.environ.get("MPD_PORT", DEFAULT_PORT))
+        self.password = settings.get("password") or env_password
+        self.socket_path = settings.get("socket")
+        self.commands = settings.get("commands", COMMANDS_MPC)
+        if self.commands not in (COMMANDS_MPC, COMMANDS_SOCKET):
+            logger.error(f"Nieznany sposób wysyłania poleceń MPD: {self.commands!r}, używam mpc")
+            self.commands = COMMANDS_MPC
+        if self.host.startswith(("/", "@")): # MPD_HOST może wskazywać gniazdo
+            self.socket_path, self.host = self.socket_path or self.host, "localhost"
+        self._socket_candidates: List[str] = ([self.socket_path] if self.socket_path else
+                                              list(DEFAULT_SOCKET_PATHS) if (self.host, self.port) == ("localhost", DEFAULT_PORT) else [])
+        self.breaker = CircuitBreaker(name=f"MPD at {self.transport}") # Nowy adres - poprzednie błędy połączenia nie mają znaczenia
+        return True
+
+    @property
+    def unix_socket(self) -> Optional[str]:
+        """Socket path used for the next call, or None for TCP."""
+        for path in self._socket_candidates:
+            if path.startswith("@") or os.path.exists(path):
+                return path
+        return None
+
+    @property
+    def transport(self) -> str:
+        """Human-readable address of MPD: the socket path or host:port."""
+        return self.unix_socket or f"{self.host}:{self.port}"
+
+    def _mpc_env(self):
+        # mpc dostaje adres i hasło przez zmienne środowiskowe - hasło nie pojawia się na liście procesów
+        host = self.unix_socket or self.host
+        env = dict(os.environ, MPD_HOST=f"{self.password}@{host}" if self.password else host)
+        env["MPD_PORT"] = str(self.port)
+        return env
+
+    def _connect(self, timeout=STATUS_TIMEOUT):
+        path = self.unix_socket
+        if path is None:
+            return socket.create_connection((self.host, self.port), timeout=timeout)
+        s = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        s.settimeout(timeout)
+        try:
+            s.connect("\0" + path[1:] if path.startswith("@") else path)
+        except OSError:
+            s.close()
+            raise
+        return s
+
+    @staticmethod
+    def _read_all(s: socket.socket, deadline: float, name: str, op_timeout: Optional[float] = None) -> bytes:
+        """Reads until MPD closes the connection, giving up at ``deadline`` (``time.monotonic()``).
+
+        Every ``recv`` may only wait for the time left (and at most
+        ``op_timeout``), so one slow read cannot overrun the deadline.
+        """
+        response = b""
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise socket.timeout(f"{name} deadline exceeded")
+            s.settimeout(remaining if op_timeout is None else min(remaining, op_timeout))
+            chunk = s.recv(4096)
+            if not chunk:
+                return response
+            response += chunk
+
     def _run_command(self, command, check=False):
+        if not self.breaker.allow():
+            return None # MPD nieosiągalny - nie czekamy na kolejny timeout
+        start = time.perf_counter()
+        ok = reachable = local_error = False
         try:
-            result = subprocess.run(command, check=check, capture_output=True, text=True)
-            if check and result.returncode != 0:
+            result = subprocess.run(command, capture_output=True, text=True, timeout=COMMAND_TIMEOUT,
+                                    env=self._mpc_env())
+            ok = result.returncode == 0
+            reachable = ok or not any(m in result.stderr.lower() for m in _UNREACHABLE_MARKERS)
+            if check and not ok:
                 logger.error(f"Polecenie '{' '.join(command)}' nie powiodło się: {result.stderr.strip()}")
                 return None
             return result
+        except subprocess.TimeoutExpired:
+            logger.error(f"Polecenie '{' '.join(command)}' nie zakończyło się w ciągu {COMMAND_TIMEOUT:.0f} s")
+            return None
         except FileNotFoundError:
+            # Błąd konfiguracji tego komputera, nie awaria MPD - nie liczy się do bezpiecznika
+            local_error = True
             logger.error("Polecenie 'mpc' nie zostało znalezione. Upewnij się, że jest zainstalowane i w ścieżce PATH.")
             return None
         except Exception as e:
             logger.error(f"Niespodziewany błąd podczas uruchamiania polecenia '{' '.join(command)}': {e}")
             return None
+        finally:
+            self.metrics.record(command[1] if len(command) > 1 else command[0], time.perf_counter() - start, ok)
+            if reachable:
+                self.breaker.success()
+            elif local_error:
+                self.breaker.release()
+            else:
+                self.breaker.failure()
+
+    def _request(self, name: str, commands: List[str]) -> Optional[Dict[str, str]]:
+        """Sends protocol commands to MPD over one short-lived connection (``commands: socket``).
+
+        Several commands go as one command list, which MPD applies as a
+        whole. Returns the response fields (the last value of a repeated key
+        wins), or None when MPD refused a command or could not be reached;
+        only the latter counts against the circuit breaker.
+        """
+        if not self.breaker.allow():
+            return None # MPD nieosiągalny - nie czekamy na kolejny timeout
+        start = time.perf_counter()
+        deadline = time.monotonic() + COMMAND_TIMEOUT
+        result = None
+        reachable = False
+        try:
+            with self._connect(COMMAND_TIMEOUT) as s:
+                s.settimeout(max(deadline - time.monotonic(), 0.001))
+                s.recv(1024) # Pomijamy powitanie (OK MPD ...)
+                lines = [f"password {quote_arg(self.password)}"] if self.password else []
+                if len(commands) > 1:
+                    commands = ["command_list_begin", *commands, "command_list_end"]
+                s.sendall("\n".join([*lines, *commands, "close\n"]).encode("utf-8"))
+                response = self._read_all(s, deadline, name)
+            reply = response.decode("utf-8", errors="replace").splitlines()
+            if not reply or not (reply[-1] == "OK" or reply[-1].startswith("ACK ")):
+                raise ConnectionError("connection closed mid-response")
+            reachable = True
+            fields = {}
+            for line in reply:
+                if line.startswith("ACK "):
+                    logger.error(f"Polecenie MPD '{name}' nie powiodło się: {line.split('} ', 1)[-1]}")
+                    return None
+                key, sep, value = line.partition(": ")
+                if sep:
+                    fields[key] = value
+            result = fields
+            return result
+        except OSError as e:
+            logger.error(f"Polecenie MPD '{name}' nie powiodło się ({self.transport}): {e}")
+            return None
+        finally:
+            self.metrics.record(name, time.perf_counter() - start, result is not None)
+            if reachable:
+                self.breaker.success()
+            else:
+                self.breaker.failure()
+
+    @property
+    def available(self):
+        """False while the circuit breaker considers MPD unreachable."""
+        return self.breaker.available
 
     def get_volume(self):
+        if self.commands == COMMANDS_SOCKET:
+            status = self._request("volume", ["status"])
+            try:
+                volume = int(status["volume"]) if status else -1
+            except (KeyError, ValueError):
+                logger.error(f"Nie można przetworzyć głośności ze statusu MPD: {status}")
+                return None
+            return volume if volume >= 0 else None # -1: MPD bez miksera
         result = self._run_command(["mpc", "volume"])
         if result and result.stdout:
             # Check for connection error even if stdout is present
@@ -50,52 +334,86 @@ class MPCController:
 
     def set_volume(self, volume):
         volume = max(0, min(100, volume))
+        if self.commands == COMMANDS_SOCKET:
+            self._request("volume", [f"setvol {volume}"])
+            return
         self._run_command(["mpc", "volume", str(volume)], check=True)
 
     def get_current(self):
+        if self.commands == COMMANDS_SOCKET:
+            # Format jak domyślny w mpc: "Nazwa: Wykonawca - Tytuł", a bez tagów plik
+            song = self._request("current", ["currentsong"])
+            if not song:
+                return "–"
+            title = " - ".join(v for v in (song.get("Artist"), song.get("Title")) if v)
+            if song.get("Name"):
+                return f"{song['Name']}: {title}" if title else song["Name"]
+            return title or song.get("file") or "–"
         result = self._run_command(["mpc", "current"])
         return result.stdout.strip() if result and result.stdout else "–"
 
     def get_current_url(self):
+        if self.commands == COMMANDS_SOCKET:
+            song = self._request("current", ["currentsong"])
+            return song.get("file") if song else None
         result = self._run_command(["mpc", "current", "-f", "%file%"])
         return result.stdout.strip() if result and result.stdout else None
 
     def play_url(self, url):
+        if self.commands == COMMANDS_SOCKET:
+            # Jedna lista poleceń: MPD nie zostaje z pustą kolejką, gdy połączenie zerwie się w połowie
+            return self._request("play_url", ["clear", f"add {quote_arg(url)}", "play"]) is not None
         if self.clear():
             if self.add(url):
                 return self.play()
         return False
 
     def clear(self):
+        if self.commands == COMMANDS_SOCKET:
+            return self._request("clear", ["clear"]) is not None
         return self._run_command(["mpc", "clear"], check=True) is not None
 
     def add(self, url):
+        if self.commands == COMMANDS_SOCKET:
+            return self._request("add", [f"add {quote_arg(url)}"]) is not None
         return self._run_command(["mpc", "add", url], check=True) is not None
 
     def play(self):
+        if self.commands == COMMANDS_SOCKET:
+            return self._request("play", ["play"]) is not None
         return self._run_command(["mpc", "play"], check=True) is not None
 
     def stop(self):
+        if self.commands == COMMANDS_SOCKET:
+            return self._request("stop", ["stop"]) is not None
         return self._run_command(["mpc", "stop"], check=True) is not None
 
     def get_status_dict(self):
         """Connects to MPD via socket to get raw status (bitrate, audio format)."""
+        if not self.breaker.allow():
+            return {}
+        start = time.perf_counter()
+        deadline = time.monotonic() + STATUS_DEADLINE
+        status = {}
+        reachable = False
         try:
-            # Connect to MPD (localhost:6600 is default)
-            with socket.create_connection(("localhost", 6600), timeout=0.1) as s:
+            with self._connect() as s:
+                s.settimeout(max(min(deadline - time.monotonic(), STATUS_TIMEOUT), 0.001))
                 s.recv(1024) # Skip initial greeting (OK MPD ...)
-                s.sendall(b"status\nclose\n")
-                response = b""
-                while True:
-                    chunk = s.recv(4096)
-                    if not chunk: break
-                    response += chunk
+                login = f"password {quote_arg(self.password)}\n" if self.password else ""
+                s.sendall(f"{login}status\nclose\n".encode("utf-8"))
+                response = self._read_all(s, deadline, "status", STATUS_TIMEOUT)
+                reachable = True
                 
-                status = {}
                 for line in response.decode('utf-8', errors='ignore').splitlines():
                     if ':' in line:
                         key, val = line.split(':', 1)
                         status[key.strip()] = val.strip()
-                return status
         except Exception:
-            return {}
\ No newline at end of file
+            status = {}
+        self.metrics.record("status", time.perf_counter() - start, bool(status))
+        if status or reachable:
+            self.breaker.success()
+        else:
+            self.breaker.failure()
+        return status
\ No newline at end of file
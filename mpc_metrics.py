@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Per-command call counters and latency histograms for MPD calls.
+
+Every call made by ``MPCController`` is recorded under its command name
+(``volume``, ``current``, ``status``...): number of calls, number of
+errors, total and maximum time, and a histogram with fixed bucket bounds.
+Recording is a bisect over a short tuple and a few integer increments, so
+it stays cheap enough for every call. Percentiles are estimated from the
+buckets by linear interpolation.
+
+The daemon exports its snapshot to ``mpc_metrics.json`` so the GUI can
+show it next to its own.
+"""
+import json
+import threading
+import time
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from config_store import CONFIG_DIR, write_atomic # type: ignore
+
+METRICS_PATH = CONFIG_DIR / "mpc_metrics.json"
+
+# Górne granice koszyków w sekundach (1-2-5); ostatni koszyk zbiera wszystko powyżej 5 s
+BUCKET_BOUNDS = (0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05,
+                 0.1, 0.2, 0.5, 1.0, 2.0, 5.0)
+PERCENTILES = (50, 95, 99)
+
+
+class CommandStats:
+    """Counters and latency histogram of one command."""
+    __slots__ = ("count", "errors", "total", "max", "buckets")
+
+    def __init__(self, buckets: int):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * buckets
+
+    def percentile(self, q: float, bounds: Sequence[float] = BUCKET_BOUNDS) -> Optional[float]:
+        """Estimated q-th percentile in seconds, or None without calls."""
+        if not self.count:
+            return None
+        rank = self.count * q / 100.0
+        seen = 0
+        for i, n in enumerate(self.buckets):
+            if n and seen + n >= rank:
+                low = bounds[i - 1] if i else 0.0
+                high = bounds[i] if i < len(bounds) else self.max
+                return min(low + (high - low) * (rank - seen) / n, self.max)
+            seen += n
+        return self.max
+
+    def as_dict(self, bounds: Sequence[float] = BUCKET_BOUNDS) -> Dict[str, Any]:
+        result = {"count": self.count, "errors": self.errors, "total": self.total, "max": self.max,
+                  "mean": self.total / self.count if self.count else None, "buckets": list(self.buckets)}
+        for q in PERCENTILES:
+            result[f"p{q}"] = self.percentile(q, bounds)
+        return result
+
+
+class CommandMetrics:
+    """Thread-safe registry of ``CommandStats`` keyed by command name."""
+
+    def __init__(self, bounds: Sequence[float] = BUCKET_BOUNDS):
+        self.bounds = tuple(bounds)
+        self.started_at = time.time()
+        self._commands: Dict[str, CommandStats] = {}
+        self._lock = threading.Lock()
+
+    def record(self, command: str, elapsed: float, ok: bool = True):
+        index = bisect_left(self.bounds, elapsed)
+        with self._lock:
+            stats = self._commands.get(command)
+            if stats is None:
+                stats = self._commands[command] = CommandStats(len(self.bounds) + 1)
+            stats.count += 1
+            stats.total += elapsed
+            stats.buckets[index] += 1
+            if elapsed > stats.max:
+                stats.max = elapsed
+            if not ok:
+                stats.errors += 1
+
+    def stats(self, command: str) -> Optional[CommandStats]:
+        return self._commands.get(command)
+
+    def reset(self):
+        with self._lock:
+            self._commands.clear()
+            self.started_at = time.time()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """JSON-friendly copy of all counters, with percentiles already computed."""
+        with self._lock:
+            commands = {name: stats.as_dict(self.bounds) for name, stats in sorted(self._commands.items())}
+        return {"started_at": self.started_at, "taken_at": time.time(), "bounds": list(self.bounds),
+                "commands": commands}
+
+    def export(self, path: Path = METRICS_PATH) -> Path:
+        write_atomic(path, json.dumps(self.snapshot(), indent=1))
+        return path
+
+
+def load_snapshot(path: Path = METRICS_PATH) -> Optional[Dict[str, Any]]:
+    """Snapshot exported by another process, or None if missing or unreadable."""
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def format_table(snapshot: Dict[str, Any]) -> List[str]:
+    """Plain-text table lines (times in ms) for logs and the About tab."""
+    lines = [f"{'command':<14}{'calls':>8}{'errors':>8}{'p50':>9}{'p95':>9}{'p99':>9}{'max':>9}"]
+    for name, c in snapshot.get("commands", {}).items():
+        times = "".join(f"{c[k] * 1e3:9.2f}" if c.get(k) is not None else f"{'-':>9}"
+                        for k in ("p50", "p95", "p99", "max"))
+        lines.append(f"{name:<14}{c['count']:>8}{c['errors']:>8}{times}")
+    return lines
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Append-only journal of what actually played, with daily rollups for listening statistics.
+
+Every change of what a zone plays is one fixed 16-byte record: time in
+seconds, station id, zone id and reason (schedule, news, manual,
+failover, or stop when nothing plays). The daemon writes the changes it
+makes and the GUI its manual picks. Ids are CRC-32 of the names, so both
+processes agree on them without coordination; ``play_journal.names``
+maps them back to names. A record starts a segment that lasts until the
+zone's next record, so a segment left open by a crash lasts until the
+daemon starts again.
+
+Once a day the daemon rolls the finished days up into
+``play_rollup.bin``: one fixed row per day, zone and station with the
+seconds played in each hour. Rows are only ever appended, so a year of
+statistics is a single read of a few hundred kilobytes. It is aggregated
+with NumPy when installed and in plain Python otherwise. Days not rolled
+up yet (today at least) come from the tail of the journal.
+"""
+import logging
+import os
+import struct
+import threading
+import time
+import zlib
+from bisect import bisect_left
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from config_store import CONFIG_DIR # type: ignore
+
+try:
+    import numpy as np
+except ImportError: # NumPy jest opcjonalny - bez niego sumujemy w czystym Pythonie
+    np = None
+
+JOURNAL_PATH = CONFIG_DIR / "play_journal.bin"
+NAMES_PATH = CONFIG_DIR / "play_journal.names"
+ROLLUP_PATH = CONFIG_DIR / "play_rollup.bin"
+
+REASON_SCHEDULE, REASON_NEWS, REASON_MANUAL, REASON_FAILOVER, REASON_STOP = range(5)
+REASONS = ("schedule", "news", "manual", "failover", "stop")
+
+# Strefa odtwarzacza obsługiwanego przez GUI (jak MAIN_ZONE demona)
+MAIN_ZONE = "main"
+
+# Zapis dziennika: czas (s), id stacji (0 = nic nie gra), id strefy, powód
+RECORD = struct.Struct("<IIIB3x")
+# Wiersz podsumowania: dzień (ordinal, 1 = poniedziałek 1 stycznia roku 1), id strefy, id stacji, sekundy w godzinach
+ROLLUP_ROW = struct.Struct("<iII24f")
+# Ile zapisów sprzed początku okresu przeglądać w poszukiwaniu stacji, która wtedy grała
+LOOKBACK_RECORDS = 1024
+
+Record = Tuple[int, int, int, int]
+# (dzień, id strefy, id stacji) -> sekundy w każdej z 24 godzin
+HourlyTotals = Dict[Tuple[int, int, int], List[float]]
+
+
+def name_id(name: str) -> int:
+    """Stable id of a station or zone name (CRC-32; 0 is reserved for "nothing plays")."""
+    return zlib.crc32(name.encode("utf-8")) or 1
+
+
+def load_names(path: Path = NAMES_PATH) -> Dict[int, str]:
+    """Ids of the journal mapped back to station and zone names."""
+    try:
+        lines = path.read_text(encoding="utf-8").splitlines()
+    except OSError:
+        return {}
+    return {name_id(line): line for line in lines if line}
+
+
+class PlayJournal:
+    """Writer of the journal, shared by the threads of one process.
+
+    Each record is a single ``O_APPEND`` write, so the daemon and the GUI
+    can append to the same file.
+    """
+
+    def __init__(self, path: Path = JOURNAL_PATH, names_path: Path = NAMES_PATH):
+        self.path = Path(path)
+        self.names_path = Path(names_path)
+        self._lock = threading.Lock()
+        self._known: Optional[set] = None
+
+    def append(self, station: Optional[str], reason: int, zone: str = MAIN_ZONE, at: Optional[float] = None):
+        """Records that ``zone`` now plays ``station`` (None: nothing) for ``reason``."""
+        record = RECORD.pack(int(time.time() if at is None else at), name_id(station) if station else 0,
+                             name_id(zone), reason)
+        with self._lock:
+            try:
+                self._remember([station, zone] if station else [zone])
+                fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+                try:
+                    os.write(fd, record)
+                finally:
+                    os.close(fd)
+            except OSError as e:
+                logging.warning(f"Cannot write play journal {self.path}: {e}")
+
+    def _remember(self, names: List[str]):
+        if self._known is None:
+            self._known = set(load_names(self.names_path).values())
+        new = [name for name in names if name not in self._known and "\n" not in name]
+        if new:
+            # Ten sam wpis dopisany przez dwa procesy niczemu nie szkodzi - id wynika z nazwy
+            with open(self.names_path, "a", encoding="utf-8") as f:
+                f.write("".join(f"{name}\n" for name in new))
+            self._known.update(new)
+
+
+def day_start(day: int) -> float:
+    """Timestamp of local midnight starting day ``day`` (a date ordinal)."""
+    return datetime.combine(date.fromordinal(day), datetime.min.time()).timestamp()
+
+
+def _first_at(f, count: int, at: float) -> int:
+    """Index of the first record at or after ``at``; the journal is in time order."""
+    class Times:
+        def __len__(self):
+            return count
+
+        def __getitem__(self, index):
+            f.seek(index * RECORD.size)
+            return RECORD.unpack(f.read(RECORD.size))[0]
+    return bisect_left(Times(), at)
+
+
+def records_between(start: float, end: float, path: Path = JOURNAL_PATH) -> List[Record]:
+    """Records from ``start`` to ``end``, preceded by the record in force at ``start`` in each zone."""
+    try:
+        with open(path, "rb") as f:
+            count = f.seek(0, os.SEEK_END) // RECORD.size
+            first = _first_at(f, count, start)
+            last = _first_at(f, count, end)
+            begin = max(0, first - LOOKBACK_RECORDS)
+            f.seek(begin * RECORD.size)
+            data = f.read((last - begin) * RECORD.size)
+    except FileNotFoundError:
+        return []
+    records = list(RECORD.iter_unpack(data))
+    carried: Dict[int, Record] = {}
+    for record in records[:first - begin]:
+        carried[record[2]] = record
+    return sorted(carried.values()) + records[first - begin:]
+
+
+def first_record_time(path: Path = JOURNAL_PATH) -> Optional[int]:
+    try:
+        with open(path, "rb") as f:
+            data = f.read(RECORD.size)
+    except FileNotFoundError:
+        return None
+    return RECORD.unpack(data)[0] if len(data) == RECORD.size else None
+
+
+def _spread(totals: HourlyTotals, zone: int, station: int, since: float, until: float):
+    """Adds the segment [since, until) to the hours it covers."""
+    while since < until:
+        moment = datetime.fromtimestamp(since)
+        hour_end = (moment.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)).timestamp()
+        if hour_end <= since: # Cofnięcie zegara przy zmianie czasu
+            hour_end = since + 3600
+        step_end = min(hour_end, until)
+        key = (moment.toordinal(), zone, station)
+        row = totals.get(key)
+        if row is None:
+            row = totals[key] = [0.0] * 24
+        row[moment.hour] += step_end - since
+        since = step_end
+
+
+def hourly_totals(records: Iterable[Record], start: float, end: float) -> HourlyTotals:
+    """Seconds played per day, zone, station and hour between ``start`` and ``end``."""
+    totals: HourlyTotals = {}
+    playing: Dict[int, Tuple[int, int]] = {} # strefa -> (od kiedy, stacja)
+    for at, station, zone, _reason in records:
+        since, previous = playing.get(zone, (at, 0))
+        if previous:
+            _spread(totals, zone, previous, max(since, start), min(at, end))
+        playing[zone] = (at, station)
+    for zone, (since, station) in playing.items():
+        if station:
+            _spread(totals, zone, station, max(since, start), end)
+    return totals
+
+
+def _pack_rows(totals: HourlyTotals) -> bytes:
+    return b"".join(ROLLUP_ROW.pack(day, zone, station, *hours)
+                    for (day, zone, station), hours in sorted(totals.items()))
+
+
+def last_rolled_day(path: Path = ROLLUP_PATH) -> Optional[int]:
+    """The last day with rollup rows, as a date ordinal."""
+    try:
+        with open(path, "rb") as f:
+            size = f.seek(0, os.SEEK_END) // ROLLUP_ROW.size * ROLLUP_ROW.size
+            if not size:
+                return None
+            f.seek(size - ROLLUP_ROW.size)
+            return ROLLUP_ROW.unpack(f.read(ROLLUP_ROW.size))[0]
+    except FileNotFoundError:
+        return None
+
+
+def _unrolled_start(journal_path: Path, rollup_path: Path) -> Optional[int]:
+    """First day (ordinal) not covered by the rollups, or None with an empty journal."""
+    last = last_rolled_day(rollup_path)
+    if last is not None:
+        return last + 1
+    first = first_record_time(journal_path)
+    return None if first is None else date.fromtimestamp(first).toordinal()
+
+
+def roll_up(today: date, journal_path: Path = JOURNAL_PATH, rollup_path: Path = ROLLUP_PATH) -> int:
+    """Appends the rows of the finished days (before ``today``) not rolled up yet; returns their number.
+
+    Only the journal written since the last rolled-up day is read.
+    """
+    first_day = _unrolled_start(journal_path, rollup_path)
+    if first_day is None or first_day >= today.toordinal():
+        return 0
+    start, end = day_start(first_day), day_start(today.toordinal())
+    totals = hourly_totals(records_between(start, end, journal_path), start, end)
+    if totals:
+        with open(rollup_path, "ab") as f:
+            f.write(_pack_rows(totals))
+    return len(totals)
+
+
+class ListeningStats:
+    """Seconds played in one zone over a period: per station, and per weekday and hour."""
+    __slots__ = ("per_station", "heatmap", "first_day", "last_day")
+
+    def __init__(self, per_station: Dict[str, float], heatmap: List[List[float]], first_day: date, last_day: date):
+        self.per_station = per_station
+        self.heatmap = heatmap # 7 wierszy (poniedziałek..niedziela) po 24 godziny
+        self.first_day = first_day
+        self.last_day = last_day
+
+    def per_weekday(self) -> List[float]:
+        return [sum(row) for row in self.heatmap]
+
+    def per_hour(self) -> List[float]:
+        return [sum(column) for column in zip(*self.heatmap)]
+
+
+def _aggregate_numpy(raw: bytes, zone: int, since: int, station: Optional[int]):
+    rows = np.frombuffer(raw, dtype=np.dtype([("day", "<i4"), ("zone", "<u4"), ("station", "<u4"),
+                                              ("hours", "<f4", (24,))]))
+    rows = rows[(rows["zone"] == zone) & (rows["day"] >= since)]
+    ids, inverse = np.unique(rows["station"], return_inverse=True)
+    seconds = np.bincount(inverse, weights=rows["hours"].sum(axis=1, dtype=np.float64), minlength=len(ids))
+    if station is not None:
+        rows = rows[rows["station"] == station]
+    heatmap = np.zeros((7, 24))
+    np.add.at(heatmap, (rows["day"] - 1) % 7, rows["hours"])
+    return dict(zip(ids.tolist(), seconds.tolist())), heatmap.tolist()
+
+
+def _aggregate_python(raw: bytes, zone: int, since: int, station: Optional[int]):
+    per_station: Dict[int, float] = {}
+    heatmap = [[0.0] * 24 for _ in range(7)]
+    for row in ROLLUP_ROW.iter_unpack(raw):
+        if row[1] != zone or row[0] < since:
+            continue
+        hours = row[3:]
+        per_station[row[2]] = per_station.get(row[2], 0.0) + sum(hours)
+        if station is None or row[2] == station:
+            cells = heatmap[(row[0] - 1) % 7]
+            for hour, seconds in enumerate(hours):
+                cells[hour] += seconds
+    return per_station, heatmap
+
+
+def load_stats(since: date, zone: str = MAIN_ZONE, station: Optional[str] = None, now: Optional[float] = None,
+               journal_path: Path = JOURNAL_PATH, rollup_path: Path = ROLLUP_PATH,
+               names_path: Path = NAMES_PATH) -> ListeningStats:
+    """Listening statistics of ``zone`` from ``since`` to now; the heatmap only of ``station`` if given."""
+    now = time.time() if now is None else now
+    try:
+        raw = rollup_path.read_bytes()
+    except FileNotFoundError:
+        raw = b""
+    raw = raw[:len(raw) // ROLLUP_ROW.size * ROLLUP_ROW.size]
+    # Dni jeszcze niepodsumowane przez demona (co najmniej dziś) - z końcówki dziennika, w tym samym formacie
+    first_day = _unrolled_start(journal_path, rollup_path)
+    if first_day is not None:
+        start = day_start(max(first_day, since.toordinal()))
+        if start < now:
+            raw += _pack_rows(hourly_totals(records_between(start, now, journal_path), start, now))
+    aggregate = _aggregate_numpy if np is not None else _aggregate_python
+    per_id, heatmap = aggregate(raw, name_id(zone), since.toordinal(), name_id(station) if station else None)
+    names = load_names(names_path)
+    per_station = {names.get(sid, f"#{sid:08x}"): seconds for sid, seconds in per_id.items()}
+    return ListeningStats(per_station, heatmap, since, date.fromtimestamp(now))
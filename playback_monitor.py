@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Detection of dead or stalled streams and the recovery plan after a failure.
+
+``PlaybackMonitor`` polls MPD status every second in a background thread.
+A stream counts as failed when MPD reports an error, falls back to "stop",
+or plays without ``elapsed`` advancing for ``dead_after`` seconds; a shorter
+gap that recovers on its own is reported as an underrun. ``Failover`` decides
+what to play next: retries of the same station with exponential backoff,
+then the station's fallback list in order, then the whole chain again.
+"""
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+POLL_INTERVAL = 1.0
+STALL_AFTER = 3.0       # brak postępu przez tyle sekund = zacięcie
+DEAD_AFTER = 8.0        # ... a przez tyle = strumień uznajemy za martwy
+STARTUP_TIMEOUT = 15.0  # tyle czasu dajemy na połączenie i zbuforowanie nowego strumienia
+RECOVERED_AFTER = 30.0  # tyle stabilnego grania = stacja uznana za naprawioną
+
+RETRIES = 2
+BACKOFF = 2.0
+MAX_BACKOFF = 60.0
+FAILBACK_INTERVAL = 300.0
+
+EVENT_UNDERRUN = "underrun"
+EVENT_FAILED = "failed"
+
+logger = logging.getLogger(__name__)
+
+
+class PlaybackEvent:
+    """A detected problem. ``latency`` is the time from the last healthy sample to the detection."""
+    __slots__ = ("kind", "detail", "at", "latency")
+
+    def __init__(self, kind: str, detail: str, at: float, latency: float):
+        self.kind = kind
+        self.detail = detail
+        self.at = at
+        self.latency = latency
+
+    def __repr__(self):
+        return f"PlaybackEvent({self.kind}, {self.detail!r}, latency={self.latency:.2f}s)"
+
+
+class PlaybackMonitor:
+    """Watches MPD status for the stream the daemon expects to be playing."""
+
+    def __init__(self, status_fn: Callable[[], Dict[str, str]], interval: float = POLL_INTERVAL,
+                 stall_after: float = STALL_AFTER, dead_after: float = DEAD_AFTER,
+                 startup_timeout: float = STARTUP_TIMEOUT, clock: Callable[[], float] = time.monotonic,
+                 wake: Optional[threading.Event] = None, name: str = "playback-monitor"):
+        """``wake`` may be shared by several monitors, so one loop can wait for all of them."""
+        self.status_fn = status_fn
+        self.interval = interval
+        self.stall_after = stall_after
+        self.dead_after = dead_after
+        self.startup_timeout = startup_timeout
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._events: List[PlaybackEvent] = []
+        self._wake = wake or threading.Event()
+        self.name = name
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.expect(None)
+
+    def expect(self, url: Optional[str]):
+        """Starts watching a newly started stream (None stops watching, e.g. during manual override).
+
+        Events not yet drained concern the previous stream and are dropped.
+        """
+        with self._lock:
+            now = self.clock()
+            self._events.clear()
+            self.expected = url
+            self._started = now
+            self._last_healthy = now
+            self._last_progress = None
+            self._stable_since = None
+            self._last_elapsed = None
+            self._songid = None
+            self._stalled = False
+            self._failed = False
+
+    def healthy_for(self) -> float:
+        """Seconds the expected stream has been playing without a stall (0 if it is not healthy)."""
+        with self._lock:
+            if self.expected is None or self._stable_since is None or self._stalled or self._failed:
+                return 0.0
+            return self.clock() - self._stable_since
+
+    def _emit(self, kind: str, detail: str, now: float) -> PlaybackEvent:
+        event = PlaybackEvent(kind, detail, now, now - self._last_healthy)
+        self._events.append(event)
+        self._wake.set()
+        return event
+
+    def check(self, status: Optional[Dict[str, str]] = None) -> Optional[PlaybackEvent]:
+        """Evaluates one status sample (fetched if not given) and returns an event, if any."""
+        if status is None:
+            status = self.status_fn()
+        with self._lock:
+            if self.expected is None or self._failed or not status:
+                # Brak odpowiedzi MPD to nie awaria strumienia - tym zajmuje się kontroler MPD
+                return None
+            now = self.clock()
+            state = status.get("state")
+            if status.get("error"):
+                self._failed = True
+                return self._emit(EVENT_FAILED, f"MPD error: {status['error']}", now)
+            if state == "stop":
+                self._failed = True
+                return self._emit(EVENT_FAILED, "playback stopped", now)
+            if state != "play":
+                # Pauza to decyzja użytkownika
+                self._last_healthy = now
+                self._last_progress = now
+                return None
+            try:
+                elapsed = float(status.get("elapsed", ""))
+            except ValueError:
+                elapsed = None
+            songid = status.get("songid")
+            if songid != self._songid:
+                # Nowy utwór w kolejce - elapsed liczy się od nowa
+                self._songid = songid
+                self._last_elapsed = elapsed
+                self._last_healthy = now
+                return None
+            if elapsed is not None and (self._last_elapsed is None or elapsed > self._last_elapsed):
+                self._last_elapsed = elapsed
+                event = None
+                if self._stalled and self._last_progress is not None:
+                    event = self._emit(EVENT_UNDERRUN, f"stalled for {now - self._last_progress:.1f} s", now)
+                    self._stable_since = now
+                elif self._stable_since is None:
+                    self._stable_since = now
+                self._stalled = False
+                self._last_progress = now
+                self._last_healthy = now
+                return event
+            since = now - (self._last_progress if self._last_progress is not None else self._started)
+            limit = self.dead_after if self._last_progress is not None else self.startup_timeout
+            if since >= limit:
+                self._failed = True
+                return self._emit(EVENT_FAILED, f"no progress for {since:.0f} s", now)
+            if since >= self.stall_after:
+                self._stalled = True
+            return None
+
+    def drain(self) -> List[PlaybackEvent]:
+        with self._lock:
+            events, self._events = self._events, []
+        return events
+
+    def wait(self, timeout: float) -> bool:
+        """Sleeps up to ``timeout`` seconds; returns True early when an event was detected."""
+        woken = self._wake.wait(timeout)
+        self._wake.clear()
+        return woken
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:
+                logger.error(f"Playback monitor check failed: {e}")
+
+
+class Failover:
+    """Recovery plan for one scheduled station: retries with backoff, then fallback stations."""
+
+    def __init__(self, retries: int = RETRIES, backoff: float = BACKOFF, max_backoff: float = MAX_BACKOFF,
+                 failback_interval: float = FAILBACK_INTERVAL, clock: Callable[[], float] = time.monotonic):
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.failback_interval = failback_interval
+        self.clock = clock
+        self.start(None)
+
+    def start(self, primary: Optional[str], fallbacks: Iterable[str] = ()):
+        """Begins a new plan for ``primary`` (None clears it)."""
+        self.chain = list(dict.fromkeys([primary, *fallbacks])) if primary else []
+        self.index = 0
+        self.attempt = 0
+        self.next_at: Optional[float] = None
+        self._last_failback = self.clock()
+
+    @property
+    def primary(self) -> Optional[str]:
+        return self.chain[0] if self.chain else None
+
+    @property
+    def current(self) -> Optional[str]:
+        return self.chain[self.index] if self.chain else None
+
+    @property
+    def on_fallback(self) -> bool:
+        return self.index > 0
+
+    @property
+    def pending(self) -> bool:
+        return self.next_at is not None
+
+    def failed(self) -> Tuple[Optional[str], float]:
+        """Records a failure of the current station and plans the next attempt; returns (station, delay)."""
+        if not self.chain:
+            return None, 0.0
+        if self.attempt < self.retries:
+            self.attempt += 1
+            delay = min(self.backoff * 2 ** (self.attempt - 1), self.max_backoff)
+        elif self.index + 1 < len(self.chain):
+            # Powtórzenia się skończyły - od razu następna stacja z listy, cisza i tak już trwa
+            self.index += 1
+            self.attempt = 0
+            delay = 0.0
+        else:
+            self.index = 0
+            self.attempt = 0
+            delay = self.max_backoff
+        self.next_at = self.clock() + delay
+        return self.current, delay
+
+    def due(self) -> Optional[str]:
+        """The station to (re)start now, if a planned attempt is due."""
+        if self.next_at is not None and self.clock() >= self.next_at:
+            self.next_at = None
+            return self.current
+        return None
+
+    def seconds_until_due(self) -> Optional[float]:
+        return max(0.0, self.next_at - self.clock()) if self.next_at is not None else None
+
+    def recovered(self):
+        """The current station plays again; further failures start with a fresh retry budget."""
+        self.attempt = 0
+
+    def failback_due(self) -> bool:
+        """True every ``failback_interval`` seconds while a fallback station is playing."""
+        now = self.clock()
+        if self.on_fallback and self.next_at is None and now - self._last_failback >= self.failback_interval:
+            self._last_failback = now
+            return True
+        return False
+
+    def fail_back(self):
+        self.index = 0
+        self.attempt = 0
+        self.next_at = None
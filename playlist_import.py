@@ -0,0 +1,265 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Streaming M3U/M3U8/PLS playlist parsing with URL deduplication.
+
+Files are read line by line in binary mode, so memory use does not depend on
+the playlist size and progress can be reported as bytes read. Whole folders
+of playlists can be parsed in parallel with ``import_playlists``.
+"""
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, List, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from station_registry import Station # type: ignore
+
+PLAYLIST_SUFFIXES = (".m3u", ".m3u8", ".pls")
+
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+_PLS_ENTRY = re.compile(r"^(file|title)(\d+)$", re.IGNORECASE)
+
+# (name, url, bytes_read)
+Entry = Tuple[str, str, int]
+
+
+def canonical_url(url: str) -> str:
+    """Normalizes a stream URL for duplicate detection (case, default port, trailing slash, fragment)."""
+    url = url.strip()
+    try:
+        parts = urlsplit(url)
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host
+    if parts.username:
+        netloc = f"{parts.username}{':' + parts.password if parts.password else ''}@{host}"
+    if port and port != _DEFAULT_PORTS.get(scheme):
+        netloc = f"{netloc}:{port}"
+    path = parts.path if parts.path not in ("", "/") else ""
+    return urlunsplit((scheme, netloc, path, parts.query, ""))
+
+
+def _decode_lines(raw_lines: Iterable[bytes]) -> Iterator[Tuple[str, int]]:
+    """Yields stripped text lines together with the number of bytes read so far."""
+    read = 0
+    for raw in raw_lines:
+        read += len(raw)
+        yield raw.decode("utf-8", errors="ignore").strip().lstrip("\ufeff"), read
+
+
+def _lines(path: Path) -> Iterator[Tuple[str, int]]:
+    with open(path, "rb") as f:
+        yield from _decode_lines(f)
+
+
+def _m3u_entries(lines: Iterable[Tuple[str, int]], default_name: str) -> Iterator[Entry]:
+    current_title = None
+    for line, read in lines:
+        if not line:
+            continue
+        if line.startswith("#EXTINF:"):
+            # Format: #EXTINF:-1,Title
+            parts = line.split(",", 1)
+            if len(parts) > 1:
+                current_title = parts[1].strip()
+        elif not line.startswith("#"):
+            yield current_title or default_name, line, read
+            current_title = None
+
+
+def _pls_entries(lines: Iterable[Tuple[str, int]]) -> Iterator[Entry]:
+    # Wpisy FileN/TitleN zwykle idą po kolei, więc trzymamy w pamięci tylko bieżące numery
+    pending = {}
+    last_index = None
+    for line, read in lines:
+        if "=" not in line:
+            continue
+        key, value = line.split("=", 1)
+        match = _PLS_ENTRY.match(key.strip())
+        if not match:
+            continue
+        kind, index = match.group(1).lower(), int(match.group(2))
+        if last_index is not None and index != last_index:
+            for done in sorted(i for i in pending if i < index):
+                entry = pending.pop(done)
+                if entry.get("file"):
+                    yield entry.get("title") or f"Station {done}", entry["file"], read
+        pending.setdefault(index, {})[kind] = value.strip()
+        last_index = index
+    for done in sorted(pending):
+        entry = pending[done]
+        if entry.get("file"):
+            yield entry.get("title") or f"Station {done}", entry["file"], read
+
+
+def iter_m3u(path: Path) -> Iterator[Entry]:
+    return _m3u_entries(_lines(path), path.stem)
+
+
+def iter_pls(path: Path) -> Iterator[Entry]:
+    return _pls_entries(_lines(path))
+
+
+def parse_playlist_data(data: bytes, kind: str, default_name: str = "Station") -> List[Tuple[str, str]]:
+    """Parses playlist content already in memory (e.g. downloaded); ``kind`` is "m3u" or "pls"."""
+    lines = _decode_lines(data.splitlines(keepends=True))
+    entries = _pls_entries(lines) if kind == "pls" else _m3u_entries(lines, default_name)
+    return [(name, url) for name, url, _ in entries]
+
+
+def iter_playlist(path: Path) -> Iterator[Entry]:
+    """Streams (name, url, bytes_read) entries from an M3U/M3U8/PLS file."""
+    path = Path(path)
+    if path.suffix.lower() == ".pls":
+        return iter_pls(path)
+    if path.suffix.lower() in (".m3u", ".m3u8"):
+        return iter_m3u(path)
+    raise ValueError(f"Unsupported playlist type: {path.suffix}")
+
+
+class ImportResult:
+    """Outcome of a playlist import."""
+    __slots__ = ("stations", "duplicates", "cancelled")
+
+    def __init__(self):
+        self.stations: List[Station] = []
+        self.duplicates = 0
+        self.cancelled = False
+
+
+def import_playlist(path: Path, existing_urls: Iterable[str] = (), genre: Optional[str] = None,
+                    progress: Optional[Callable[[int, int], None]] = None,
+                    cancelled: Optional[Callable[[], bool]] = None,
+                    seen: Optional[Set[str]] = None) -> ImportResult:
+    """Parses a playlist into new Station records, skipping URLs that are already known.
+
+    ``progress(bytes_read, total_bytes)`` is called periodically and
+    ``cancelled()`` is polled; when it returns True the import stops and the
+    result is marked as cancelled. ``seen`` may be shared between several
+    calls to deduplicate across files.
+    """
+    path = Path(path)
+    total = path.stat().st_size
+    if seen is None:
+        seen = {canonical_url(u) for u in existing_urls}
+    result = ImportResult()
+    for count, (name, url, read) in enumerate(iter_playlist(path), 1):
+        key = canonical_url(url)
+        if key in seen:
+            result.duplicates += 1
+        else:
+            seen.add(key)
+            result.stations.append(Station(name, url, genre))
+        if count % 500 == 0:
+            if progress:
+                progress(read, total)
+            if cancelled and cancelled():
+                result.cancelled = True
+                return result
+    if progress:
+        progress(total, total)
+    return result
+
+
+def find_playlists(directory: Path) -> List[Path]:
+    """Returns all playlist files below ``directory`` in a stable order."""
+    return sorted(p for p in Path(directory).rglob("*")
+                  if p.is_file() and p.suffix.lower() in PLAYLIST_SUFFIXES)
+
+
+def genre_from_path(path: Path, root: Optional[Path]) -> Optional[str]:
+    """Uses the name of the file's folder as the genre, unless the file sits directly in ``root``."""
+    parent = Path(path).parent
+    if root is not None and parent.resolve() == Path(root).resolve():
+        return None
+    return parent.name or None
+
+
+def _parse_file(path: str) -> Tuple[List[Tuple[str, str, str]], Optional[str]]:
+    """Worker for the process pool: returns (name, url, canonical_url) tuples or an error message."""
+    try:
+        return [(name, url, canonical_url(url)) for name, url, _ in iter_playlist(Path(path))], None
+    except Exception as e:
+        return [], f"{type(e).__name__}: {e}"
+
+
+class BulkImportResult:
+    """Outcome of importing many playlist files at once."""
+    __slots__ = ("stations", "duplicates", "errors", "files", "entries", "elapsed", "cancelled")
+
+    def __init__(self):
+        self.stations: List[Station] = []
+        self.duplicates = 0
+        self.errors: List[Tuple[Path, str]] = []
+        self.files = 0
+        self.entries = 0
+        self.elapsed = 0.0
+        self.cancelled = False
+
+    @property
+    def stations_per_second(self) -> float:
+        """Parsed playlist entries per second of wall time."""
+        return self.entries / self.elapsed if self.elapsed > 0 else 0.0
+
+
+def import_playlists(paths: Iterable[Path], existing_urls: Iterable[str] = (), root: Optional[Path] = None,
+                     max_workers: Optional[int] = None,
+                     progress: Optional[Callable[[int, int], None]] = None,
+                     cancelled: Optional[Callable[[], bool]] = None,
+                     mp_context=None) -> BulkImportResult:
+    """Parses playlist files concurrently in a process pool and merges them.
+
+    URLs are deduplicated globally (against ``existing_urls`` and across files)
+    in the order of ``paths``, so the outcome does not depend on which worker
+    finishes first. A file that fails to parse is recorded in ``errors`` and
+    does not abort the import. ``progress(files_done, files_total)`` is called
+    after each file.
+    """
+    paths = [Path(p) for p in paths]
+    result = BulkImportResult()
+    result.files = len(paths)
+    start = time.perf_counter()
+    parsed = {}
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=mp_context) as pool:
+        futures = {pool.submit(_parse_file, str(p)): i for i, p in enumerate(paths)}
+        for done, future in enumerate(as_completed(futures), 1):
+            parsed[futures[future]] = future.result()
+            if progress:
+                progress(done, len(paths))
+            if cancelled and cancelled():
+                for pending in futures:
+                    pending.cancel()
+                result.cancelled = True
+                break
+    if result.cancelled:
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    seen = {canonical_url(u) for u in existing_urls}
+    for i, path in enumerate(paths):
+        entries, error = parsed[i]
+        if error:
+            result.errors.append((path, error))
+            continue
+        genre = genre_from_path(path, root)
+        for name, url, key in entries:
+            result.entries += 1
+            if key in seen:
+                result.duplicates += 1
+            else:
+                seen.add(key)
+                result.stations.append(Station(name, url, genre))
+    result.elapsed = time.perf_counter() - start
+    return result
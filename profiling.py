@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""On-demand CPU and memory profiling of the daemon and the GUI.
+
+Nothing runs until a profile is asked for: no profiler hook, no sampling
+thread, no allocation tracing. Then, for a given number of seconds:
+
+- ``sample`` (default): a background thread reads the stacks of all
+  threads 200 times a second. It writes them as collapsed stacks (for
+  flamegraph.pl or speedscope) and a summary of the busiest functions.
+  It covers the zone threads and the worker pool as well.
+- ``cprofile``: deterministic profile of the thread that asked for it
+  (the daemon's event loop, the GUI's main thread). It writes a pstats
+  file and the top functions by cumulative time.
+- memory: ``tracemalloc`` traces allocations during the window. The top N
+  source lines still holding memory at the end are written (what grew).
+
+Results go to ``~/.config/radio-scheduler/profiles/`` as
+``<program>-<date>-<time>-<sample|cprofile|memory>.*``; only the newest
+``KEEP_FILES`` are kept. Both programs start a CPU profile on SIGUSR1 (a second SIGUSR1 stops
+it early) and a memory capture on SIGUSR2. The daemon also takes the
+``profile`` and ``memory`` commands on the control socket.
+
+Usage: radio-scheduler.py profile [--memory] [--seconds 30] [--mode sample|cprofile] [--top 30] [--gui] [--stop]
+"""
+import argparse
+import atexit
+import cProfile
+import io
+import logging
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from config_store import CONFIG_DIR # type: ignore
+import daemon_loop # type: ignore
+
+PROFILE_DIR = CONFIG_DIR / "profiles"
+GUI_PID_PATH = CONFIG_DIR / "gui.pid" # Zapisywany przez GUI; tylko ten proces dostaje sygnał "profile --gui"
+DEFAULT_SECONDS = 30.0
+MAX_SECONDS = 600.0
+SAMPLE_INTERVAL = 0.005 # 200 próbek na sekundę
+MODES = ("sample", "cprofile")
+MEMORY_TOP = 30
+MEMORY_FRAMES = 8
+REPORT_LINES = 40
+KEEP_FILES = 60
+
+logger = logging.getLogger(__name__)
+
+
+def _timer(delay: float, fn: Callable[[], Any]):
+    timer = threading.Timer(delay, fn)
+    timer.daemon = True
+    timer.start()
+
+
+class StackSampler:
+    """Counts the stacks of all threads (except its own), read every ``interval`` seconds."""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="profile-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self):
+        own = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if len(names) != len(frames):
+                names = {t.ident: t.name for t in threading.enumerate()}
+            for ident, frame in frames.items():
+                if ident == own:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(ident, str(ident)))
+                self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def report(self, limit: int = REPORT_LINES) -> List[str]:
+        """Functions by share of samples: on the stack (inclusive) and on top of it (self)."""
+        total = sum(self.stacks.values()) or 1
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, n in self.stacks.items():
+            frames = stack.split(";")[1:]
+            if frames:
+                own[frames[-1]] += n
+            for frame in set(frames):
+                inclusive[frame] += n
+        lines = [f"{self.samples} samples of {len(set(s.split(';', 1)[0] for s in self.stacks))} threads, "
+                 f"every {self.interval * 1e3:g} ms", "", "self %  function"]
+        lines += [f"{n * 100 / total:6.1f}  {frame}" for frame, n in own.most_common(limit)]
+        lines += ["", "total %  function"]
+        lines += [f"{n * 100 / total:7.1f}  {frame}" for frame, n in inclusive.most_common(limit)]
+        return lines
+
+
+class Profiler:
+    """Starts and finishes the profiles of one program; ``schedule(delay, fn)`` runs the end of a window.
+
+    The daemon schedules on its event loop and the GUI on a Qt timer, so a
+    cProfile window ends on the thread it started on.
+    """
+
+    def __init__(self, program: str, directory: Path = PROFILE_DIR,
+                 schedule: Callable[[float, Callable[[], Any]], Any] = _timer):
+        self.program = program
+        self.directory = Path(directory)
+        self.schedule = schedule
+        self._lock = threading.Lock()
+        self._cpu: Optional[Dict[str, Any]] = None
+        self._memory: Optional[Dict[str, Any]] = None
+
+    def _path(self, kind: str, suffix: str, started: float) -> Path:
+        stamp = datetime.fromtimestamp(started).strftime("%Y%m%d-%H%M%S")
+        return self.directory / f"{self.program}-{stamp}-{kind}{suffix}"
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            cpu, memory = self._cpu, self._memory
+        return {"cpu": cpu and {"mode": cpu["mode"], "until": cpu["until"]},
+                "memory": memory and {"until": memory["until"], "top": memory["top"]}}
+
+    def start_cpu(self, seconds: float = DEFAULT_SECONDS, mode: str = "sample") -> Dict[str, Any]:
+        """Starts a CPU profile for ``seconds``; does nothing if one is running."""
+        if mode not in MODES:
+            raise ValueError(f"unknown profiling mode {mode!r} (use {', '.join(MODES)})")
+        seconds = min(max(float(seconds), 0.1), MAX_SECONDS)
+        with self._lock:
+            if self._cpu is None:
+                started = time.time()
+                if mode == "cprofile":
+                    profiler = cProfile.Profile()
+                    profiler.enable()
+                else:
+                    profiler = StackSampler()
+                    profiler.start()
+                self._cpu = {"mode": mode, "profiler": profiler, "started": started, "until": started + seconds}
+                self.schedule(seconds, lambda cpu=self._cpu: self.stop_cpu(cpu))
+                logger.info(f"CPU profile ({mode}) started for {seconds:g} s")
+        return self.status()
+
+    def stop_cpu(self, only: Optional[Dict[str, Any]] = None) -> Optional[Path]:
+        """Ends the running CPU profile and writes it; returns the report's path."""
+        with self._lock:
+            cpu = self._cpu
+            if cpu is None or (only is not None and cpu is not only):
+                return None # Już zatrzymany wcześniej (drugi sygnał) - opóźnione zakończenie nie ma nic do roboty
+            self._cpu = None
+        profiler, started = cpu["profiler"], cpu["started"]
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if cpu["mode"] == "cprofile":
+            profiler.disable()
+            profiler.dump_stats(self._path(cpu["mode"], ".prof", started))
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(REPORT_LINES)
+            report = out.getvalue()
+        else:
+            profiler.stop()
+            with open(self._path(cpu["mode"], ".folded", started), "w", encoding="utf-8") as f:
+                f.writelines(f"{stack} {n}\n" for stack, n in profiler.stacks.items())
+            report = "\n".join(profiler.report()) + "\n"
+        path = self._path(cpu["mode"], ".txt", started)
+        path.write_text(report, encoding="utf-8")
+        logger.info(f"CPU profile written to {path}")
+        self.prune()
+        return path
+
+    def toggle_cpu(self):
+        """SIGUSR1: starts a CPU profile, or ends the running one early."""
+        if self._cpu is None:
+            self.start_cpu()
+        else:
+            self.stop_cpu()
+
+    def start_memory(self, seconds: float = DEFAULT_SECONDS, top: int = MEMORY_TOP) -> Dict[str, Any]:
+        """Traces allocations for ``seconds``, then writes the top ``top`` lines; immediate if already tracing."""
+        seconds = min(max(float(seconds), 0.0), MAX_SECONDS)
+        with self._lock:
+            if self._memory is not None:
+                memory = None
+            else:
+                started = time.time()
+                # Śledzenie włączone z zewnątrz (PYTHONTRACEMALLOC) obejmuje cały czas działania - migawka od razu
+                ours = not tracemalloc.is_tracing()
+                if ours:
+                    tracemalloc.start(MEMORY_FRAMES)
+                memory = self._memory = {"started": started, "until": started + (seconds if ours else 0),
+                                         "top": int(top), "ours": ours}
+        if memory is not None and memory["ours"]:
+            logger.info(f"Tracing memory allocations for {seconds:g} s")
+            self.schedule(seconds, self.finish_memory)
+        elif memory is not None:
+            self.finish_memory()
+        return self.status()
+
+    def finish_memory(self) -> Optional[Path]:
+        with self._lock:
+            memory, self._memory = self._memory, None
+        if memory is None:
+            return None
+        snapshot = tracemalloc.take_snapshot()
+        traced, peak = tracemalloc.get_traced_memory()
+        if memory["ours"]:
+            tracemalloc.stop()
+        snapshot = snapshot.filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+        stats = snapshot.statistics("lineno")
+        lines = [f"Traced for {time.time() - memory['started']:.1f} s: {traced / 1024:.1f} KiB held, "
+                 f"peak {peak / 1024:.1f} KiB, in {sum(s.count for s in stats)} blocks", "",
+                 "   KiB   blocks  line"]
+        for stat in stats[:memory["top"]]:
+            frame = stat.traceback[0]
+            lines.append(f"{stat.size / 1024:7.1f} {stat.count:8}  {frame.filename}:{frame.lineno}")
+        lines += ["", "Largest, with their call stacks:"]
+        for stat in snapshot.statistics("traceback")[:min(memory["top"], 10)]:
+            lines += ["", f"{stat.size / 1024:.1f} KiB in {stat.count} blocks"] + stat.traceback.format()
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path("memory", ".txt", memory["started"])
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        logger.info(f"Memory snapshot written to {path}")
+        self.prune()
+        return path
+
+    def prune(self, keep: int = KEEP_FILES):
+        """Removes all but the newest ``keep`` profile files."""
+        try:
+            files = sorted(self.directory.iterdir(), key=lambda p: p.stat().st_mtime, reverse=True)
+            for path in files[keep:]:
+                path.unlink()
+        except OSError as e:
+            logger.warning(f"Cannot prune {self.directory}: {e}")
+
+    def install_signals(self, add_handler: Optional[Callable[[int, Callable[[], Any]], Any]] = None):
+        """SIGUSR1 toggles a CPU profile, SIGUSR2 captures memory; ``add_handler`` e.g. loop.add_signal_handler."""
+        if add_handler is None:
+            add_handler = lambda signum, fn: signal.signal(signum, lambda _signum, _frame: fn())
+        add_handler(signal.SIGUSR1, self.toggle_cpu)
+        add_handler(signal.SIGUSR2, lambda: self.start_memory())
+
+
+def write_pid_file(path: Path = GUI_PID_PATH):
+    """Records this process as the GUI that ``profile --gui`` signals; removed again at exit."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"{os.getpid()}\n", encoding="utf-8")
+    atexit.register(remove_pid_file, path)
+
+
+def remove_pid_file(path: Path = GUI_PID_PATH):
+    """Removes the pid file if it still names this process (a newer GUI may have replaced it)."""
+    if read_pid_file(path) == os.getpid():
+        path.unlink(missing_ok=True)
+
+
+def read_pid_file(path: Path = GUI_PID_PATH) -> Optional[int]:
+    try:
+        return int(path.read_text(encoding="utf-8").split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+
+def gui_pid(path: Path = GUI_PID_PATH) -> Optional[int]:
+    """The GUI process named in the pid file, if it is still running as the GUI."""
+    pid = read_pid_file(path)
+    if pid is None or pid == os.getpid():
+        return None
+    try:
+        os.kill(pid, 0)
+        # Numer procesu mógł zostać użyty ponownie po awarii GUI, które nie usunęło pliku
+        cmdline = Path(f"/proc/{pid}/cmdline")
+        if cmdline.exists() and b"radio-scheduler-gui" not in cmdline.read_bytes():
+            return None
+    except (OSError, ValueError):
+        return None
+    return pid
+
+
+def main(argv=None):
+    """Command-line entry point: asks the daemon (or signals the GUI) to profile itself."""
+    parser = argparse.ArgumentParser(prog="radio-scheduler.py profile",
+                                     description=f"Profile the running daemon or GUI; results go to {PROFILE_DIR}")
+    parser.add_argument("--memory", action="store_true", help="Trace memory allocations instead of CPU time")
+    parser.add_argument("--seconds", type=float, default=DEFAULT_SECONDS)
+    parser.add_argument("--mode", choices=MODES, default="sample",
+                        help="sample: all threads, low overhead; cprofile: exact calls of the event loop")
+    parser.add_argument("--top", type=int, default=MEMORY_TOP, help="Lines in the memory report")
+    parser.add_argument("--stop", action="store_true", help="End the running CPU profile now")
+    parser.add_argument("--gui", action="store_true",
+                        help="Profile the GUI (by signal, with the default duration and mode)")
+    args = parser.parse_args(argv)
+    if args.gui:
+        pid = gui_pid()
+        if pid is None:
+            print(f"The GUI is not running (no live process in {GUI_PID_PATH})", file=sys.stderr)
+            return 1
+        os.kill(pid, signal.SIGUSR2 if args.memory else signal.SIGUSR1)
+        print(f"Signalled GUI process {pid}; results in {PROFILE_DIR}")
+        return 0
+    if args.memory:
+        reply = daemon_loop.request("memory", seconds=args.seconds, top=args.top)
+    else:
+        reply = daemon_loop.request("profile", seconds=args.seconds, mode=args.mode, stop=args.stop)
+    if reply is None:
+        print("The daemon is not running", file=sys.stderr)
+        return 1
+    if not reply.get("ok"):
+        print(reply.get("error"), file=sys.stderr)
+        return 1
+    result = reply["result"]
+    if result.get("written"):
+        print(f"Written {result['written']}")
+    for kind in ("cpu", "memory"):
+        if result.get(kind):
+            until = datetime.fromtimestamp(result[kind]["until"]).strftime("%H:%M:%S")
+            print(f"{kind} profile running until {until}; results in {PROFILE_DIR}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
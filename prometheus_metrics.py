@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Daemon metrics in the Prometheus text exposition format.
+
+Counters for events the daemon counts itself (station switches by reason,
+config reloads, stream stalls and failures) are ``Counter`` objects. An
+increment takes one uncontended lock and one dict update, so it can be done
+on every event from any thread. Latencies are not measured twice: the
+histograms come from the ``CommandMetrics`` the daemon already keeps for MPD
+calls and for its own passes, with the same bucket bounds. Gauges
+(current station, override state) are read when a scrape comes in.
+
+``MetricsServer`` answers ``GET /metrics`` over HTTP on the daemon's event
+loop. It is off by default and listens on localhost when enabled in
+config.yaml::
+
+    prometheus:
+      port: 9817
+      host: 127.0.0.1
+
+The same text is available on the control socket (``prometheus``), which is
+what ``radio-scheduler.py metrics`` prints when no ``--url`` is given.
+
+Usage: radio-scheduler.py metrics [--url http://127.0.0.1:9817/metrics]
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import threading
+import urllib.request
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import daemon_loop # type: ignore
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 9817
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+SCRAPE_TIMEOUT = 5.0
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(names: Sequence[str], values: Sequence[Any]) -> str:
+    """``{a="1",b="2"}`` (empty without labels)."""
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _header(name: str, help: str, kind: str) -> List[str]:
+    return [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+
+
+class Counter:
+    """Monotonic counter with optional labels; safe to increment from any thread."""
+    __slots__ = ("name", "help", "labels", "_values", "_lock")
+
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *values: str, amount: float = 1.0):
+        with self._lock:
+            self._values[values] = self._values.get(values, 0.0) + amount
+
+    def value(self, *values: str) -> float:
+        return self._values.get(values, 0.0)
+
+    def collect(self) -> List[str]:
+        with self._lock:
+            samples = sorted(self._values.items())
+        lines = _header(self.name, self.help, "counter")
+        if not samples and not self.labels:
+            samples = [((), 0.0)] # Licznik bez etykiet widoczny od pierwszego odczytu
+        lines += [f"{self.name}{format_labels(self.labels, values)} {_number(v)}" for values, v in samples]
+        return lines
+
+
+def gauge(name: str, help: str, samples: Dict[Tuple[Any, ...], float], labels: Sequence[str] = ()) -> List[str]:
+    """Lines of a gauge read at scrape time."""
+    lines = _header(name, help, "gauge")
+    lines += [f"{name}{format_labels(labels, values)} {_number(v)}" for values, v in sorted(samples.items())]
+    return lines
+
+
+def command_histograms(name: str, help: str, labels: Sequence[str],
+                       snapshots: Iterable[Tuple[Tuple[str, ...], Dict[str, Any]]],
+                       command_label: str = "command") -> List[str]:
+    """``CommandMetrics`` snapshots as a ``<name>_seconds`` histogram and ``<name>_errors_total`` counter.
+
+    ``labels`` names the label values given with each snapshot; the command
+    name is added as the last label, ``command_label``.
+    """
+    labels = tuple(labels)
+    seconds = _header(f"{name}_seconds", help, "histogram")
+    errors = _header(f"{name}_errors_total", f"{help} (failed calls)", "counter")
+    for values, snapshot in snapshots:
+        bounds = snapshot.get("bounds", ())
+        for command, stats in snapshot.get("commands", {}).items():
+            names, base = labels + (command_label,), tuple(values) + (command,)
+            cumulative = 0
+            for bound, n in zip(list(bounds) + [float("inf")], stats["buckets"]):
+                cumulative += n
+                seconds.append(f"{name}_seconds_bucket{format_labels(names + ('le',), base + (_number(bound),))}"
+                               f" {cumulative}")
+            seconds.append(f"{name}_seconds_sum{format_labels(names, base)} {_number(stats['total'])}")
+            seconds.append(f"{name}_seconds_count{format_labels(names, base)} {stats['count']}")
+            errors.append(f"{name}_errors_total{format_labels(names, base)} {stats['errors']}")
+    return seconds + errors
+
+
+def render(blocks: Iterable[List[str]]) -> str:
+    return "\n".join(line for block in blocks for line in block) + "\n"
+
+
+class MetricsServer:
+    """Minimal HTTP server on the event loop: ``GET /metrics`` returns ``render()``, anything else 404."""
+
+    def __init__(self, render: Callable[[], str], host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.render = render
+        self.host = host
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._serve, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1] # Port 0 = wybrany przez system
+        logger.info(f"Prometheus metrics on http://{self.host}:{self.port}/metrics")
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _serve(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            request = await asyncio.wait_for(reader.readline(), SCRAPE_TIMEOUT)
+            while (await asyncio.wait_for(reader.readline(), SCRAPE_TIMEOUT)).strip():
+                pass # Nagłówki żądania są nam niepotrzebne
+            method, _, rest = request.decode("latin-1").partition(" ")
+            path = rest.split(" ", 1)[0].split("?", 1)[0]
+            if method in ("GET", "HEAD") and path in ("/metrics", "/"):
+                status, body = "200 OK", self.render().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"Not found, try /metrics\n"
+            head = (f"HTTP/1.1 {status}\r\nContent-Type: {CONTENT_TYPE}\r\nContent-Length: {len(body)}\r\n"
+                    f"Connection: close\r\n\r\n")
+            writer.write(head.encode("latin-1") + (body if method != "HEAD" else b""))
+            await writer.drain()
+        except (ConnectionError, asyncio.TimeoutError, UnicodeDecodeError):
+            pass
+        except Exception as e:
+            logger.error(f"Metrics request failed: {e}", exc_info=True)
+        finally:
+            writer.close()
+
+
+def scrape(url: str = f"http://{DEFAULT_HOST}:{DEFAULT_PORT}/metrics", timeout: float = SCRAPE_TIMEOUT) -> str:
+    """Fetches the exposition text as Prometheus would."""
+    with urllib.request.urlopen(url, timeout=timeout) as response:
+        return response.read().decode("utf-8")
+
+
+def parse(text: str) -> Dict[str, float]:
+    """Samples of an exposition text keyed by name and labels, e.g. ``up{job="x"}``; comments skipped."""
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith("#"):
+            key, _, value = line.rpartition(" ")
+            samples[key] = float(value)
+    return samples
+
+
+def main(argv=None):
+    """Command-line entry point: prints the daemon's metrics."""
+    parser = argparse.ArgumentParser(prog="radio-scheduler.py metrics",
+                                     description="Print the daemon's metrics in the Prometheus text format")
+    parser.add_argument("--url", help="Scrape this HTTP endpoint instead of asking on the control socket")
+    args = parser.parse_args(argv)
+    if args.url:
+        try:
+            sys.stdout.write(scrape(args.url))
+        except OSError as e:
+            print(f"Cannot scrape {args.url}: {e}", file=sys.stderr)
+            return 1
+        return 0
+    reply = daemon_loop.request("prometheus")
+    if not reply or not reply.get("ok"):
+        print("The daemon is not running", file=sys.stderr)
+        return 1
+    sys.stdout.write(reply["result"])
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,14 +12,31 @@ from logging.handlers import RotatingFileHandler
 from collections import defaultdict
 from datetime import timedelta
 import logging, os
-import configparser
+import json
 import shutil
+import tempfile
 import zipfile
 import argparse
+import multiprocessing
+import signal
+import socket
 
 from translations import TEXTS # type: ignore
+import config_store # type: ignore
+from station_registry import Station, StationRegistry # type: ignore
+import playlist_import # type: ignore
+import station_catalog # type: ignore
+import station_health # type: ignore
+import url_resolver # type: ignore
+import stream_variants # type: ignore
+import mpc_metrics # type: ignore
+import daemon_loop # type: ignore
+import play_journal # type: ignore
+import track_history # type: ignore
+import stream_telemetry # type: ignore
+import profiling # type: ignore
 import PySide6
-from mpc_controller import MPCController # type: ignore
+from mpc_controller import COMMAND_TIMEOUT, DEFAULT_PORT, MPCController # type: ignore
 from PySide6.QtWidgets import (
     QAbstractItemView,
     QApplication,
@@ -32,6 +49,7 @@ from PySide6.QtWidgets import (
     QFormLayout,
     QGroupBox,
     QHBoxLayout,
+    QHeaderView,
     QLabel,
     QLineEdit,
     QListWidget,
@@ -41,6 +59,7 @@ from PySide6.QtWidgets import (
     QMessageBox,
     QPushButton,
     QProgressBar,
+    QProgressDialog,
     QRadioButton,
     QSlider,
     QSpinBox,
@@ -56,13 +75,11 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
     QTreeWidget,
     QTreeWidgetItem,
-    QTreeWidgetItemIterator,
     QSpacerItem,
     QSizePolicy
 )
-from PySide6.QtCore import QEvent, Qt, QTimer, QUrl, QByteArray, QRectF, QPoint
-from PySide6.QtNetwork import QNetworkAccessManager, QNetworkRequest, QNetworkReply
-from PySide6.QtGui import QAction, QDesktopServices, QIcon, QFont, QKeySequence, QShortcut, QPalette, QPainter, QPixmap, QColor, QBrush, QLinearGradient, QPolygon
+from PySide6.QtCore import QEvent, Qt, QTimer, QUrl, QByteArray, QRectF, QPoint, QPointF, QThread, Signal, QSocketNotifier
+from PySide6.QtGui import QAction, QDesktopServices, QIcon, QFont, QKeySequence, QShortcut, QPalette, QPainter, QPixmap, QColor, QBrush, QLinearGradient, QPolygon, QPolygonF
 from PySide6.QtSvg import QSvgRenderer
 
 # --- Global Paths and Configuration ---
@@ -71,18 +88,19 @@ LOG_PATH = Path.home() / ".config/radio-scheduler/radio-scheduler-gui.log"
 DAEMON_PATH = Path(__file__).parent / "radio-scheduler.py"
 MANUAL_OVERRIDE_LOCK = Path.home() / ".config/radio-scheduler/manual_override.lock"
 NO_NEWS_TODAY_LOCK = Path.home() / ".config/radio-scheduler/no-news-today"
+UPCOMING_PATH = Path.home() / ".config/radio-scheduler/upcoming.json" # Zapisywany przez demona
 ICONS_PATH = Path.home() / ".config/radio-scheduler/icons"
 ICON_PATH = Path(__file__).parent / "app_icon.png"
 
-# Konfiguracja logowania z rotacją plików
-LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
-log_formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
-log_handler = RotatingFileHandler(LOG_PATH, maxBytes=1024*1024, backupCount=5, encoding='utf-8')
-log_handler.setFormatter(log_formatter)
-
 logger = logging.getLogger()
-logger.setLevel(logging.INFO) # Zmieniono poziom logowania na INFO
-logger.addHandler(log_handler)
+
+def setup_logging():
+    """Rotating GUI log; set up in main() so that processes re-importing this file do not share the file."""
+    LOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    log_handler = RotatingFileHandler(LOG_PATH, maxBytes=1024*1024, backupCount=5, encoding='utf-8')
+    log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+    logger.setLevel(logging.INFO) # Zmieniono poziom logowania na INFO
+    logger.addHandler(log_handler)
 
 # Definicje ikon SVG (zintegrowane, aby nie polegać na zewnętrznym skrypcie)
 SVG_ICONS = {
@@ -385,7 +403,18 @@ class ScheduleInfoWidget(QWidget):
             return candidates[0]
         return None
 
-mpc = MPCController()
+# Tworzone w create_services() z main(): procesy importu playlist ("spawn") importują ten plik ponownie
+mpc: MPCController = None # type: ignore
+resolver: url_resolver.URLResolver = None # type: ignore
+variant_selector: stream_variants.VariantSelector = None # type: ignore # Tylko do odczytu - wybiera demon
+journal: play_journal.PlayJournal = None # type: ignore # Ręczne wybory i zatrzymania trafiają do dziennika odtwarzania demona
+
+def create_services():
+    global mpc, resolver, variant_selector, journal
+    mpc = MPCController()
+    resolver = url_resolver.URLResolver()
+    variant_selector = stream_variants.VariantSelector()
+    journal = play_journal.PlayJournal()
 
 def ensure_daemon():
     if subprocess.call(["pgrep", "-f", "radio-scheduler.py"], stdout=subprocess.DEVNULL) != 0:
@@ -394,16 +423,24 @@ def ensure_daemon():
 def clear_and_exit():
     mpc.clear()
     mpc.stop()
+    journal.append(None, play_journal.REASON_STOP)
     subprocess.run(["pkill", "-f", "radio-scheduler.py"], check=False)
     QApplication.quit()
 
 def play_now(station):
     try:
         MANUAL_OVERRIDE_LOCK.touch()
-        if not mpc.play_url(station["url"]):
+        # Wariant jakości ostatnio wybrany przez demona dla tej stacji
+        variant_selector.reload_if_changed()
+        url = variant_selector.preferred(station.name, stream_variants.variants_of(station)).url
+        # Adres z pamięci podręcznej (bez czekania na sieć); brakujący rozwiązujemy w tle na następny raz
+        if not mpc.play_url(resolver.cached(url)):
             raise Exception("MPC command failed, check mpc_controller.log")
+        journal.append(station.name, play_journal.REASON_MANUAL)
+        if not resolver.is_fresh(url):
+            resolver.prefetch_async([url])
     except (subprocess.CalledProcessError, FileNotFoundError) as e:
-        logger.error(f"Błąd podczas ręcznego odtwarzania stacji {station.get('name', '')}: {e}")
+        logger.error(f"Błąd podczas ręcznego odtwarzania stacji {station.name}: {e}")
         # This function is called from outside MainWindow, so we can't use self.translator
         # A simple message box is sufficient.
         QMessageBox.critical(None, "Playback Error", f"Could not play station. Check logs:\n{LOG_PATH}")
@@ -521,6 +558,524 @@ class TimeRangeEditor(QDialog):
             })
         return result
 
+class PlaylistImportWorker(QThread):
+    """Parses a playlist file in the background, reporting progress in percent."""
+    progress = Signal(int)
+
+    def __init__(self, path, existing_urls, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.existing_urls = existing_urls
+        self.result = None
+        self.error = None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            self.result = playlist_import.import_playlist(
+                self.path, self.existing_urls,
+                progress=lambda read, total: self.progress.emit(int(read * 100 / total) if total else 100),
+                cancelled=lambda: self._cancelled)
+        except Exception as e:
+            self.error = e
+
+class BulkImportWorker(QThread):
+    """Parses many playlist files in a process pool, reporting progress as files done."""
+    progress = Signal(int, int)
+
+    def __init__(self, paths, existing_urls, root=None, parent=None):
+        super().__init__(parent)
+        self.paths = paths
+        self.existing_urls = existing_urls
+        self.root = root
+        self.result = None
+        self.error = None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            # "spawn" zamiast fork: proces GUI ma działające wątki Qt
+            self.result = playlist_import.import_playlists(
+                self.paths, self.existing_urls, root=self.root,
+                progress=self.progress.emit, cancelled=lambda: self._cancelled,
+                mp_context=multiprocessing.get_context("spawn"))
+        except Exception as e:
+            self.error = e
+
+class HealthProbeWorker(QThread):
+    """Probes all station URLs concurrently in the background, reporting probes done."""
+    progress = Signal(int, int)
+
+    def __init__(self, urls, cache, force=False, parent=None):
+        super().__init__(parent)
+        self.urls = urls
+        self.cache = cache
+        self.force = force
+        self.result = None
+        self.error = None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            prober = station_health.StationProber(self.cache)
+            self.result = prober.probe_all(self.urls, force=self.force, progress=self.progress.emit,
+                                           cancelled=lambda: self._cancelled)
+        except Exception as e:
+            self.error = e
+
+class CatalogImportWorker(QThread):
+    """Streams a radio-browser dump into the offline catalog, reporting progress in percent."""
+    progress = Signal(int)
+
+    def __init__(self, path, parent=None):
+        super().__init__(parent)
+        self.path = path
+        self.result = None
+        self.error = None
+        self._cancelled = False
+
+    def cancel(self):
+        self._cancelled = True
+
+    def run(self):
+        try:
+            # Osobne połączenie - obiektów sqlite3 nie współdzielimy między wątkami
+            with station_catalog.StationCatalog() as catalog:
+                self.result = catalog.ingest(
+                    self.path,
+                    progress=lambda read, total: self.progress.emit(int(read * 100 / total) if total else 100),
+                    cancelled=lambda: self._cancelled)
+        except Exception as e:
+            self.error = e
+
+class CatalogSearchDialog(QDialog):
+    """Searches the offline station catalog and adds the selected results to the station list."""
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.main_window = parent
+        self.translator = parent.translator
+        self.catalog = station_catalog.StationCatalog()
+        self.results = []
+        self.setWindowTitle(self.translator.tr("catalog_search"))
+        self.resize(760, 480)
+        layout = QVBoxLayout(self)
+
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText(self.translator.tr("catalog_search_placeholder"))
+        layout.addWidget(self.query_input)
+
+        self.table = QTableWidget(0, 4)
+        self.table.setHorizontalHeaderLabels([self.translator.tr("name"), self.translator.tr("genre"),
+                                              self.translator.tr("catalog_country"), self.translator.tr("catalog_format")])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setColumnWidth(0, 300)
+        self.table.doubleClicked.connect(lambda _index: self.add_selected())
+        layout.addWidget(self.table)
+
+        self.status_label = QLabel()
+        layout.addWidget(self.status_label)
+
+        btns = QHBoxLayout()
+        import_btn = QPushButton(self.translator.tr("catalog_import_dump"))
+        import_btn.clicked.connect(self.import_dump)
+        add_btn = QPushButton(self.translator.tr("catalog_add_selected"))
+        add_btn.setStyleSheet("background-color: #4CAF50; color: white;")
+        add_btn.clicked.connect(self.add_selected)
+        close_btn = QPushButton(self.translator.tr("close"))
+        close_btn.clicked.connect(self.accept)
+        btns.addWidget(import_btn); btns.addStretch(); btns.addWidget(add_btn); btns.addWidget(close_btn)
+        layout.addLayout(btns)
+
+        # Wyszukiwanie w trakcie pisania, z krótkim opóźnieniem
+        self.search_timer = QTimer(self, singleShot=True, interval=150)
+        self.search_timer.timeout.connect(self.run_search)
+        self.query_input.textChanged.connect(self.search_timer.start)
+        self.update_status()
+
+    def update_status(self, elapsed_ms=None):
+        if elapsed_ms is not None:
+            self.status_label.setText(self.translator.tr("catalog_results", count=len(self.results), ms=f"{elapsed_ms:.1f}"))
+        else:
+            self.status_label.setText(self.translator.tr("catalog_size", count=self.catalog.count()))
+
+    def run_search(self):
+        query = self.query_input.text().strip()
+        if not query:
+            self.results = []
+            self.table.setRowCount(0)
+            self.update_status()
+            return
+        start = datetime.now()
+        self.results = self.catalog.search(query, limit=200)
+        elapsed_ms = (datetime.now() - start).total_seconds() * 1000
+        self.table.setRowCount(len(self.results))
+        for row, entry in enumerate(self.results):
+            known = self.main_window.stations.by_url(entry.url) is not None
+            name_item = QTableWidgetItem(("✓ " if known else "") + entry.name)
+            name_item.setToolTip(entry.url)
+            self.table.setItem(row, 0, name_item)
+            self.table.setItem(row, 1, QTableWidgetItem(entry.tags or ""))
+            self.table.setItem(row, 2, QTableWidgetItem(entry.country or ""))
+            fmt = " ".join(filter(None, [entry.codec, f"{entry.bitrate} kbps" if entry.bitrate else None]))
+            self.table.setItem(row, 3, QTableWidgetItem(fmt))
+        self.update_status(elapsed_ms)
+
+    def add_selected(self):
+        """Adds the selected results to the station list, skipping URLs that are already there."""
+        rows = sorted({index.row() for index in self.table.selectionModel().selectedRows()})
+        new = []
+        for row in rows:
+            entry = self.results[row]
+            if self.main_window.stations.by_url(entry.url) is None:
+                new.append(entry.to_station())
+        if new:
+            self.main_window.stations.extend(new)
+            self.main_window.refresh_tree(mark_dirty=True)
+        self.main_window.statusBar().showMessage(
+            self.translator.tr("imported_count_duplicates", count=len(new), duplicates=len(rows) - len(new)), 3000)
+        self.run_search()
+
+    def import_dump(self):
+        file_path, _ = QFileDialog.getOpenFileName(self, self.translator.tr("catalog_import_dump"), str(Path.home()),
+                                                   f"{self.translator.tr('catalog_dump_files')} (*.json *.jsonl *.csv)")
+        if not file_path:
+            return
+        worker = CatalogImportWorker(Path(file_path), self)
+        progress = QProgressDialog(self.translator.tr("import_in_progress"), self.translator.tr("cancel"), 0, 100, self)
+        progress.setWindowTitle(self.translator.tr("catalog_import_dump"))
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        worker.progress.connect(progress.setValue)
+        progress.canceled.connect(worker.cancel)
+        worker.finished.connect(lambda: self.on_import_finished(worker, progress))
+        self._import_worker = worker
+        worker.start()
+
+    def on_import_finished(self, worker, progress):
+        progress.reset()
+        self._import_worker = None
+        worker.deleteLater()
+        if worker.error is not None:
+            logger.error(f"Error importing station catalog: {worker.error}")
+            QMessageBox.critical(self, self.translator.tr("error"), f"{self.translator.tr('import_error')}:\n{worker.error}")
+            return
+        result = worker.result
+        if result.cancelled:
+            self.main_window.statusBar().showMessage(self.translator.tr("import_cancelled"), 3000)
+            return
+        QMessageBox.information(self, self.translator.tr("success"),
+                                self.translator.tr("catalog_imported", count=result.records,
+                                                   rate=f"{result.records_per_second:,.0f}", seconds=f"{result.elapsed:.1f}"))
+        self.run_search()
+
+    def done(self, result):
+        self.catalog.close()
+        super().done(result)
+
+class Sparkline(QWidget):
+    """A small line chart of the last values, with marks at the points that had events."""
+    def __init__(self, color, parent=None):
+        super().__init__(parent)
+        self.color = QColor(color)
+        self.values = []
+        self.marks = []
+        self.floor = None
+        self.setFixedHeight(36)
+        self.setMinimumWidth(160)
+
+    def set_values(self, values, marks=(), floor=None):
+        self.values = list(values)
+        self.marks = list(marks)
+        self.floor = floor
+        self.update()
+
+    def paintEvent(self, event):
+        if len(self.values) < 2:
+            return
+        painter = QPainter(self)
+        painter.setRenderHint(QPainter.Antialiasing)
+        w, h = self.width() - 2, self.height() - 4
+        low = min(self.values) if self.floor is None else min(self.floor, min(self.values))
+        span = (max(self.values) - low) or 1
+        step = w / (len(self.values) - 1)
+        points = [QPointF(1 + i * step, 2 + h - (v - low) / span * h) for i, v in enumerate(self.values)]
+        # Zdarzenia (przerwy, awarie) jako czerwone kreski w tle
+        painter.setPen(QColor(244, 67, 54, 140))
+        for i, marked in enumerate(self.marks):
+            if marked:
+                painter.drawLine(QPointF(points[i].x(), 0), QPointF(points[i].x(), self.height()))
+        painter.setPen(self.color)
+        painter.drawPolyline(QPolygonF(points))
+
+class StreamQualityWidget(QWidget):
+    """Bitrate and playback progress of the station playing over the last hour, from the daemon's telemetry."""
+    WINDOW = 3600
+
+    def __init__(self, translator, parent=None):
+        super().__init__(parent)
+        self.translator = translator
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.bitrate_line = Sparkline("#2196F3")
+        self.progress_line = Sparkline("#4CAF50")
+        self.summary_label = QLabel("")
+        self.summary_label.setFont(QFont("Arial", 9))
+        self.summary_label.setStyleSheet("color: #666;")
+        self.export_btn = QPushButton(self.translator.tr("telemetry_export"))
+        self.export_btn.setToolTip(self.translator.tr("telemetry_export_tooltip"))
+        self.export_btn.clicked.connect(self.export_csv)
+        layout.addStretch()
+        layout.addWidget(self.bitrate_line)
+        layout.addWidget(self.progress_line)
+        layout.addWidget(self.summary_label)
+        layout.addWidget(self.export_btn)
+        layout.addStretch()
+        self.setVisible(False)
+
+    def refresh(self, station=None):
+        """Shows ``station`` (default: the one the daemon played last); hidden until it has points."""
+        _stations, snapshot = stream_telemetry.query(station, since=datetime.now().timestamp() - self.WINDOW)
+        points = snapshot["points"] if snapshot else None
+        if not points or len(points["times"]) < 2:
+            self.setVisible(False)
+            return
+        marks = [events != 0 for events in points["events"]]
+        self.bitrate_line.set_values(points["bitrate"], marks)
+        self.progress_line.set_values([p / 1000 for p in points["progress"]], marks, floor=0)
+        self.bitrate_line.setToolTip(self.translator.tr("telemetry_bitrate", station=snapshot["station"],
+                                                        low=min(points["bitrate"]), high=max(points["bitrate"])))
+        self.progress_line.setToolTip(self.translator.tr("telemetry_progress"))
+        # Godziny doby, w których stacja najczęściej się pogarsza (z całej zebranej historii)
+        worst = sorted(((h["degraded"], hour) for hour, h in enumerate(snapshot["hours"])
+                        if h["samples"] and h["degraded"] >= 0.05), reverse=True)[:3]
+        if worst:
+            self.summary_label.setText(self.translator.tr("telemetry_worst_hours", hours=", ".join(
+                f"{hour:02d}:00 ({share:.0%})" for share, hour in worst)))
+        else:
+            self.summary_label.setText(self.translator.tr("telemetry_stable"))
+        self.setVisible(True)
+
+    def export_csv(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, self.translator.tr("telemetry_export"),
+                                                   str(Path.home() / "stream_telemetry.csv"), "CSV (*.csv)")
+        if not file_path:
+            return
+        # Demon zapisuje bufory na prośbę; bez niego eksportujemy ostatnio zapisany plik
+        daemon_loop.request("telemetry", save=True)
+        telemetry = stream_telemetry.StreamTelemetry()
+        telemetry.load()
+        try:
+            with open(file_path, "w", encoding="utf-8", newline="") as f:
+                stream_telemetry.export_csv(telemetry, f)
+        except OSError as e:
+            QMessageBox.critical(self, self.translator.tr("error"), str(e))
+
+class TrackHistoryDialog(QDialog):
+    """Searches the titles played recently (the daemon's track history)."""
+    PERIODS = ((1, "history_last_hour"), (3, "history_last_3h"), (24, "history_last_day"), (None, "history_all"))
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.translator = parent.translator
+        self.entries = []
+        self.setWindowTitle(self.translator.tr("track_history"))
+        self.resize(760, 480)
+        layout = QVBoxLayout(self)
+
+        controls = QHBoxLayout()
+        self.query_input = QLineEdit()
+        self.query_input.setPlaceholderText(self.translator.tr("history_search_placeholder"))
+        self.period_combo = QComboBox()
+        for hours, key in self.PERIODS:
+            self.period_combo.addItem(self.translator.tr(key), hours)
+        controls.addWidget(self.query_input)
+        controls.addWidget(self.period_combo)
+        layout.addLayout(controls)
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels([self.translator.tr("history_time"), self.translator.tr("stats_name"),
+                                              self.translator.tr("history_title")])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        self.table.horizontalHeader().setStretchLastSection(True)
+        self.table.setColumnWidth(0, 140)
+        self.table.setColumnWidth(1, 200)
+        self.table.doubleClicked.connect(lambda _index: self.copy_selected())
+        layout.addWidget(self.table)
+
+        btns = QHBoxLayout()
+        copy_btn = QPushButton(self.translator.tr("history_copy"))
+        copy_btn.clicked.connect(self.copy_selected)
+        refresh_btn = QPushButton(self.translator.tr("stats_refresh"))
+        refresh_btn.clicked.connect(self.run_search)
+        close_btn = QPushButton(self.translator.tr("close"))
+        close_btn.clicked.connect(self.accept)
+        btns.addWidget(copy_btn); btns.addStretch(); btns.addWidget(refresh_btn); btns.addWidget(close_btn)
+        layout.addLayout(btns)
+
+        # Wyszukiwanie w trakcie pisania, z krótkim opóźnieniem
+        self.search_timer = QTimer(self, singleShot=True, interval=150)
+        self.search_timer.timeout.connect(self.run_search)
+        self.query_input.textChanged.connect(self.search_timer.start)
+        self.period_combo.currentIndexChanged.connect(lambda _index: self.run_search())
+        self.run_search()
+
+    def run_search(self):
+        hours = self.period_combo.currentData()
+        since = datetime.now().timestamp() - hours * 3600 if hours else None
+        self.entries = track_history.query(self.query_input.text().strip(), since=since, limit=500)
+        self.table.setRowCount(len(self.entries))
+        for row, entry in enumerate(self.entries):
+            self.table.setItem(row, 0, QTableWidgetItem(f"{datetime.fromtimestamp(entry.at):%d.%m %H:%M:%S}"))
+            self.table.setItem(row, 1, QTableWidgetItem(entry.station))
+            self.table.setItem(row, 2, QTableWidgetItem(entry.title))
+
+    def copy_selected(self):
+        row = self.table.currentRow()
+        if 0 <= row < len(self.entries):
+            QApplication.clipboard().setText(self.entries[row].title)
+
+class StatsTab(QWidget):
+    """Listening statistics from the play journal: hours per station and a weekday x hour heatmap."""
+    PERIODS = (7, 30, 365)
+
+    def __init__(self, parent=None):
+        super().__init__()
+        self.translator = parent.translator if parent else None
+        self.stats = None
+        self.init_ui()
+        self.retranslate_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+        controls = QHBoxLayout()
+        self.period_label = QLabel()
+        self.period_combo = QComboBox()
+        self.station_label = QLabel()
+        self.station_combo = QComboBox()
+        self.refresh_btn = QPushButton()
+        self.refresh_btn.clicked.connect(self.refresh)
+        for widget in (self.period_label, self.period_combo, self.station_label, self.station_combo):
+            controls.addWidget(widget)
+        controls.addStretch()
+        controls.addWidget(self.refresh_btn)
+        layout.addLayout(controls)
+
+        self.stations_table = QTableWidget(0, 3)
+        self.stations_table.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.stations_table.setSelectionBehavior(QAbstractItemView.SelectRows)
+        self.stations_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.stations_table.verticalHeader().setVisible(False)
+        self.stations_table.setMaximumHeight(220)
+        layout.addWidget(self.stations_table)
+
+        self.heatmap_group = QGroupBox()
+        heatmap_layout = QVBoxLayout(self.heatmap_group)
+        self.heatmap = QTableWidget(7, 24)
+        self.heatmap.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.heatmap.setSelectionMode(QAbstractItemView.NoSelection)
+        self.heatmap.horizontalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.heatmap.verticalHeader().setSectionResizeMode(QHeaderView.Stretch)
+        self.heatmap.setHorizontalHeaderLabels([str(hour) for hour in range(24)])
+        heatmap_layout.addWidget(self.heatmap)
+        layout.addWidget(self.heatmap_group)
+        self.summary_label = QLabel()
+        layout.addWidget(self.summary_label)
+
+        self.period_combo.currentIndexChanged.connect(lambda _index: self.refresh())
+        self.station_combo.currentIndexChanged.connect(lambda _index: self.refresh(keep_stations=True))
+
+    def retranslate_ui(self):
+        tr = self.translator.tr
+        self.period_label.setText(tr("stats_period"))
+        self.station_label.setText(tr("stats_station"))
+        self.refresh_btn.setText(tr("stats_refresh"))
+        self.heatmap_group.setTitle(tr("stats_heatmap"))
+        self.stations_table.setHorizontalHeaderLabels([tr("stats_name"), tr("stats_hours"), tr("stats_share")])
+        index = max(self.period_combo.currentIndex(), 0)
+        self.period_combo.blockSignals(True)
+        self.period_combo.clear()
+        self.period_combo.addItems([tr("stats_days", days=days) for days in self.PERIODS])
+        self.period_combo.setCurrentIndex(index)
+        self.period_combo.blockSignals(False)
+
+    def refresh(self, keep_stations=False):
+        """Reloads the statistics; a year of history is one read of the daily rollups."""
+        days = self.PERIODS[max(self.period_combo.currentIndex(), 0)]
+        station = self.station_combo.currentData()
+        since = datetime.now().date() - timedelta(days=days - 1)
+        try:
+            self.stats = play_journal.load_stats(since, station=station)
+        except (OSError, ValueError) as e:
+            logger.error(f"Error loading listening statistics: {e}")
+            self.summary_label.setText(str(e))
+            return
+        if not keep_stations:
+            self.fill_station_combo(station)
+        self.fill_stations_table()
+        self.fill_heatmap()
+
+    def fill_station_combo(self, selected):
+        self.station_combo.blockSignals(True)
+        self.station_combo.clear()
+        self.station_combo.addItem(self.translator.tr("stats_all_stations"), None)
+        for name in sorted(self.stats.per_station, key=self.stats.per_station.get, reverse=True):
+            self.station_combo.addItem(name, name)
+        self.station_combo.setCurrentIndex(max(self.station_combo.findData(selected), 0))
+        self.station_combo.blockSignals(False)
+
+    def fill_stations_table(self):
+        per_station = self.stats.per_station
+        total = sum(per_station.values())
+        self.stations_table.setRowCount(len(per_station))
+        for row, name in enumerate(sorted(per_station, key=per_station.get, reverse=True)):
+            seconds = per_station[name]
+            hours_item = QTableWidgetItem(f"{seconds / 3600:.1f}")
+            share_item = QTableWidgetItem(f"{seconds / total * 100:.1f}%" if total else "-")
+            for item in (hours_item, share_item):
+                item.setTextAlignment(Qt.AlignRight | Qt.AlignVCenter)
+            self.stations_table.setItem(row, 0, QTableWidgetItem(name))
+            self.stations_table.setItem(row, 1, hours_item)
+            self.stations_table.setItem(row, 2, share_item)
+        if total:
+            self.summary_label.setText(self.translator.tr("stats_summary", hours=f"{total / 3600:.1f}",
+                                                          since=self.stats.first_day.isoformat()))
+        else:
+            self.summary_label.setText(self.translator.tr("stats_empty"))
+
+    def fill_heatmap(self):
+        tr = self.translator.tr
+        heatmap = self.stats.heatmap
+        peak = max(max(row) for row in heatmap) or 1.0
+        base, full = self.palette().color(QPalette.ColorRole.Base), QColor("#1e88e5")
+        days = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+        self.heatmap.setVerticalHeaderLabels([f"{tr(f'day_{day}_short')}  {sum(row) / 3600:.1f} h"
+                                              for day, row in zip(days, heatmap)])
+        for hour, seconds in enumerate(self.stats.per_hour()):
+            self.heatmap.horizontalHeaderItem(hour).setToolTip(f"{hour:02d}:00  {seconds / 3600:.1f} h")
+        for row, day in enumerate(days):
+            for hour, seconds in enumerate(heatmap[row]):
+                share = seconds / peak
+                color = QColor(round(base.red() + (full.red() - base.red()) * share),
+                               round(base.green() + (full.green() - base.green()) * share),
+                               round(base.blue() + (full.blue() - base.blue()) * share))
+                item = QTableWidgetItem()
+                item.setBackground(QBrush(color))
+                item.setToolTip(f"{tr(f'day_{day}')} {hour:02d}:00  {seconds / 3600:.2f} h")
+                self.heatmap.setItem(row, hour, item)
+
 class AboutTab(QWidget):
     """'About' tab showing application info, MPD status, and environment details."""
     def __init__(self, parent=None): # Added parent for consistency
@@ -590,6 +1145,23 @@ class AboutTab(QWidget):
         stats_layout.addRow(self.translator.tr("mpd_uptime"), self.mpd_uptime_label)
         main_layout.addWidget(self.stats_group)
 
+        # --- MPD Call Statistics ---
+        self.metrics_group = QGroupBox(self.translator.tr("mpd_calls_title"))
+        metrics_layout = QVBoxLayout(self.metrics_group)
+        self.metrics_text = QTextEdit()
+        self.metrics_text.setReadOnly(True)
+        self.metrics_text.setFont(QFont("Monospace", 9))
+        self.metrics_text.setLineWrapMode(QTextEdit.NoWrap)
+        self.metrics_text.setFixedHeight(160)
+        metrics_layout.addWidget(self.metrics_text)
+        metrics_buttons = QHBoxLayout()
+        metrics_buttons.addStretch()
+        self.metrics_export_btn = QPushButton(self.translator.tr("mpd_calls_export"))
+        self.metrics_export_btn.clicked.connect(self.export_metrics)
+        metrics_buttons.addWidget(self.metrics_export_btn)
+        metrics_layout.addLayout(metrics_buttons)
+        main_layout.addWidget(self.metrics_group)
+
         # --- Application Paths ---
         paths_group = QGroupBox(self.translator.tr("app_paths_title"))
         paths_layout = QFormLayout(paths_group)
@@ -684,6 +1256,35 @@ class AboutTab(QWidget):
         except Exception as e:
             QMessageBox.critical(self, self.translator.tr("error"), str(e))
 
+    def metrics_snapshots(self):
+        """MPD call statistics of this window and of the daemon, and the daemon's task timings (exported every minute)."""
+        return {"gui": mpc.metrics.snapshot(), "daemon": mpc_metrics.load_snapshot(),
+                "daemon_tasks": mpc_metrics.load_snapshot(daemon_loop.TASK_METRICS_PATH)}
+
+    def update_metrics(self):
+        snapshots = self.metrics_snapshots()
+        lines = [self.translator.tr("mpd_calls_gui")] + mpc_metrics.format_table(snapshots["gui"])
+        daemon = snapshots["daemon"]
+        if daemon:
+            taken_at = datetime.fromtimestamp(daemon["taken_at"]).strftime("%H:%M:%S")
+            lines += ["", self.translator.tr("mpd_calls_daemon", time=taken_at)] + mpc_metrics.format_table(daemon)
+        daemon_tasks = snapshots["daemon_tasks"]
+        if daemon_tasks:
+            taken_at = datetime.fromtimestamp(daemon_tasks["taken_at"]).strftime("%H:%M:%S")
+            lines += ["", self.translator.tr("daemon_tasks", time=taken_at)] + mpc_metrics.format_table(daemon_tasks)
+        self.metrics_text.setPlainText("\n".join(lines))
+
+    def export_metrics(self):
+        file_path, _ = QFileDialog.getSaveFileName(self, self.translator.tr("mpd_calls_export"),
+                                                   str(Path.home() / "mpd_metrics.json"), "JSON (*.json)")
+        if not file_path:
+            return
+        try:
+            with open(file_path, "w", encoding="utf-8") as f:
+                json.dump(self.metrics_snapshots(), f, indent=1)
+        except OSError as e:
+            QMessageBox.critical(self, self.translator.tr("error"), str(e))
+
     def open_directory(self, path):
         """Opens the specified directory in the default file manager."""
         QDesktopServices.openUrl(f"file:///{path}")
@@ -692,6 +1293,8 @@ class AboutTab(QWidget):
         # This method is now only for text translation, not logic
         self.scheduler_group.setTitle(self.translator.tr("scheduler_status_title"))
         self.stats_group.setTitle(self.translator.tr("mpd_stats_title"))
+        self.metrics_group.setTitle(self.translator.tr("mpd_calls_title"))
+        self.metrics_export_btn.setText(self.translator.tr("mpd_calls_export"))
         self.instr_group.setTitle(self.translator.tr("mpd_install_title"))
         # The content of the labels is set in update_content
 
@@ -707,7 +1310,13 @@ class AboutTab(QWidget):
             self.scheduler_status_icon.setPixmap(get_icon("error", QStyle.StandardPixmap.SP_DialogCancelButton).pixmap(16, 16))
 
         is_mpd_running = subprocess.call(["pgrep", "-f", "mpd"], stdout=subprocess.DEVNULL) == 0
-        if is_mpd_running:
+        if is_mpd_running and not mpc.available:
+            # Proces działa, ale nie odpowiada - nie odpytujemy go, dopóki bezpiecznik jest otwarty
+            self.mpd_status_label.setText(self.translator.tr(
+                "mpd_unreachable", seconds=f"{mpc.breaker.seconds_until_retry():.0f}"))
+            self.mpd_status_icon.setPixmap(get_icon("error", QStyle.StandardPixmap.SP_DialogCancelButton).pixmap(16, 16))
+            self.stats_group.setVisible(False)
+        elif is_mpd_running:
             self.mpd_status_label.setText(self.translator.tr("mpd_status_active"))
             self.mpd_status_icon.setPixmap(get_icon("check", QStyle.StandardPixmap.SP_DialogApplyButton).pixmap(16, 16))
             self.stats_group.setVisible(True)
@@ -716,8 +1325,10 @@ class AboutTab(QWidget):
 
             try:
                 # Use 'mpc version' as it's the most reliable way to get the version of a running daemon.
-                mpc_version_res = subprocess.run(["mpc", "version"], capture_output=True, text=True, check=False)
-                stats_res = subprocess.run(["mpc", "stats"], capture_output=True, text=True, check=False)
+                mpc_version_res = subprocess.run(["mpc", "version"], capture_output=True, text=True, check=False,
+                                                 timeout=COMMAND_TIMEOUT)
+                stats_res = subprocess.run(["mpc", "stats"], capture_output=True, text=True, check=False,
+                                           timeout=COMMAND_TIMEOUT)
 
                 self.mpd_version_label.setText(mpc_version_res.stdout.strip() if mpc_version_res.returncode == 0 else "N/A")
 
@@ -736,6 +1347,7 @@ class AboutTab(QWidget):
             self.stats_group.setVisible(False)
             self.instr_group.setChecked(True)
             self.instr_group.setVisible(True) # Show instructions if MPD is not running
+        self.update_metrics()
 
 class MainWindow(QMainWindow):
     """The main application window."""
@@ -744,9 +1356,11 @@ class MainWindow(QMainWindow):
         self.last_known_song = None # Bufor dla aktualnie granego utworu
         self.is_restarting = False # Flaga do obsługi restartu
         self.manual_override_status = MANUAL_OVERRIDE_LOCK.exists() # Śledzenie stanu blokady dla powiadomień
+        self.upcoming_mtime = None # Ostatnio odczytany stan najbliższej zmiany stacji
+        self.dns_alerted = set() # (czas, host) - ostrzeżenia DNS już pokazane
+        self.mpd_unreachable_shown = False # Komunikat o niedostępnym MPD na pasku stanu
         self.previous_volume = 50 # Zapamiętana głośność przed wyciszeniem
         
-        self.nam = QNetworkAccessManager(self) # Menedżer sieci do testowania URL
         self.sleep_timer = QTimer(self) # Timer dla wyłącznika czasowego
         self.sleep_timer.timeout.connect(self.on_sleep_timer_triggered)
         self.sleep_timer_end_time = None
@@ -755,9 +1369,14 @@ class MainWindow(QMainWindow):
         ensure_daemon()
 
         self.config = self.load_config()
+        mpc.configure(self.config.get("mpd"))
         self.translator = Translator(self.config.get("language", "pl"))
 
-        self.stations = self.config.get("stations", [])
+        self.stations = StationRegistry.from_dicts(self.config.get("stations", []))
+        self.station_items = {} # Station -> QTreeWidgetItem, wypełniane w refresh_tree
+        self.health_cache = station_health.HealthCache() # Wyniki testów stacji (plakietki w drzewie)
+        self.prune_health_cache()
+        self.playing_item = None
         self.schedule = self.config.get("schedule", {})
 
         self.create_actions()
@@ -774,6 +1393,7 @@ class MainWindow(QMainWindow):
         self.tab_schedule_widget = self.tab_schedule()
         self.tab_news_widget = self.tab_news()
         self.about_tab = AboutTab(self)
+        self.stats_tab = StatsTab(self)
         self.tab_settings_widget = self.tab_settings()
         self.tab_mpd_config_widget = self.tab_mpd_config()
 
@@ -783,7 +1403,9 @@ class MainWindow(QMainWindow):
         self.tabs.addTab(self.tab_news_widget, "")
         self.tabs.addTab(self.tab_settings_widget, "")
         self.tabs.addTab(self.tab_mpd_config_widget, "")
+        self.tabs.addTab(self.stats_tab, "")
         self.tabs.addTab(self.about_tab, "")
+        self.tabs.currentChanged.connect(lambda _index: self.tabs.currentWidget() is self.stats_tab and self.stats_tab.refresh())
 
         self.setCentralWidget(self.tabs)
 
@@ -869,6 +1491,10 @@ class MainWindow(QMainWindow):
         self.set_as_default_action.triggered.connect(self.set_as_default_station)
         self.addAction(self.set_as_default_action)
 
+        self.test_all_stations_action = QAction(self)
+        self.test_all_stations_action.triggered.connect(self.test_all_stations)
+        self.addAction(self.test_all_stations_action)
+
         self.no_news_today_action = QAction(self)
         self.no_news_today_action.setCheckable(True)
         self.no_news_today_action.triggered.connect(self.toggle_no_news_today)
@@ -927,7 +1553,7 @@ class MainWindow(QMainWindow):
         menu = QMenu()
         style = QApplication.style() # Use app style, it's safer
         current_url = self.last_known_song # Use buffered value
-        favorites = [s for s in self.config.get("stations", []) if s.get("favorite")]
+        favorites = self.stations.favorites()
 
         self.tray_now_playing_action = menu.addAction(self.translator.tr("now_playing", current="..."))
         self.tray_now_playing_action.setIcon(style.standardIcon(QStyle.StandardPixmap.SP_MediaPlay))
@@ -936,10 +1562,10 @@ class MainWindow(QMainWindow):
 
         if favorites:
             for s in favorites:
-                a = menu.addAction(s['name'])
+                a = menu.addAction(s.name)
                 a.setIcon(style.standardIcon(QStyle.StandardPixmap.SP_MediaPlay)) # Użyj istniejącej ikony
-                a.triggered.connect(lambda _, x=s: (play_now(x), self.now_playing_label.setText(self.translator.tr("now_playing", current=x["name"])), self.update_return_to_schedule_button()))
-                if s['url'] == current_url:
+                a.triggered.connect(lambda _, x=s: (play_now(x), self.now_playing_label.setText(self.translator.tr("now_playing", current=x.name)), self.update_return_to_schedule_button()))
+                if s.url == current_url:
                     font = a.font()
                     font.setBold(True)
                     a.setFont(font)
@@ -1003,6 +1629,9 @@ class MainWindow(QMainWindow):
 
     def update_tray_tooltip(self):
         """Updates the tooltip for the tray icon with current status."""
+        if not mpc.available:
+            self.tray.setToolTip(f"RadioScheduler\n{self.translator.tr('mpd_unreachable_short')}")
+            return
         current = mpc.get_current()
         vol = mpc.get_volume()
         self.tray.setToolTip(f"RadioScheduler\n{self.translator.tr('now_playing', current=current)}\n{self.translator.tr('volume_menu', volume=vol)}")
@@ -1043,6 +1672,7 @@ class MainWindow(QMainWindow):
         """Stops playback when the sleep timer expires."""
         mpc.stop()
         mpc.clear()
+        journal.append(None, play_journal.REASON_STOP)
         # Ustaw blokadę ręczną, aby demon nie wznowił odtwarzania z harmonogramu
         MANUAL_OVERRIDE_LOCK.touch()
         self.manual_override_status = True
@@ -1055,6 +1685,41 @@ class MainWindow(QMainWindow):
         self.update_tray_icon()
         self.build_tray_menu()
 
+    def check_upcoming_dns(self):
+        """Warns in the tray when the daemon could not pre-resolve the host of the next scheduled station."""
+        try:
+            mtime = UPCOMING_PATH.stat().st_mtime_ns
+            if mtime == self.upcoming_mtime:
+                return
+            self.upcoming_mtime = mtime
+            upcoming = json.loads(UPCOMING_PATH.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        for state in upcoming if isinstance(upcoming, list) else []:
+            key = (state.get("at"), state.get("host"))
+            if state.get("ok", True) or key in self.dns_alerted:
+                continue
+            self.dns_alerted.add(key)
+            at = state.get("at", "")
+            self.tray.showMessage(
+                self.translator.tr("dns_alert_title"),
+                self.translator.tr("dns_alert_text", host=state.get("host"), station=state.get("station"),
+                                   time=at[11:16] if len(at) >= 16 else at, error=state.get("error")),
+                QSystemTrayIcon.MessageIcon.Warning,
+                10000
+            )
+
+    def update_mpd_reachability(self):
+        """Keeps an "MPD unreachable" message in the status bar while the circuit breaker is open."""
+        if mpc.available:
+            if self.mpd_unreachable_shown:
+                self.statusBar().clearMessage()
+                self.mpd_unreachable_shown = False
+            return
+        self.statusBar().showMessage(self.translator.tr(
+            "mpd_unreachable", seconds=f"{mpc.breaker.seconds_until_retry():.0f}"))
+        self.mpd_unreachable_shown = True
+
     def on_timer_tick(self):
         """Periodic timer handler to refresh dynamic UI elements."""
         # Sprawdź czy nastąpił auto-resume (zewnętrzne usunięcie pliku blokady)
@@ -1073,12 +1738,15 @@ class MainWindow(QMainWindow):
             self.build_tray_menu()
         
         self.manual_override_status = current_override_status
+        self.check_upcoming_dns()
+        self.update_mpd_reachability()
 
         # Jeśli sleep timer jest aktywny, odśwież menu tray, aby zaktualizować licznik minut
         if self.sleep_timer_end_time:
             self.build_tray_menu()
 
-        current_song_url = mpc.get_current_url() # type: ignore
+        resolver.reload_if_changed()
+        current_song_url = resolver.canonical(mpc.get_current_url()) # MPD zna adres rozwiązany, stacja - kanoniczny
         # Odświeżaj tylko, jeśli coś się zmieniło
         if current_song_url != self.last_known_song:
             self.last_known_song = current_song_url
@@ -1099,15 +1767,15 @@ class MainWindow(QMainWindow):
         self.update_volume_slider_status()
         
         current_display = mpc.get_current()
-        current_url = mpc.get_current_url()
+        current_url = resolver.canonical(mpc.get_current_url())
 
         # Jeśli MPD zwraca URL jako tytuł (brak metadanych) lub nic nie zwraca, spróbuj wyświetlić nazwę stacji
         if current_display == "–" or (current_url and current_display == current_url) or (current_display and "://" in current_display):
              if current_url:
                  # Znajdź stację po URL
-                 station = next((s for s in self.stations if s["url"] == current_url), None)
+                 station = self.stations.by_url(current_url)
                  if station:
-                     current_display = station["name"]
+                     current_display = station.name
 
         self.now_playing_label.setText(self.translator.tr("now_playing", current=current_display))
         self.update_player_metadata()
@@ -1116,37 +1784,19 @@ class MainWindow(QMainWindow):
 
     def play_next_station(self):
         """Plays the next station in the list."""
-        if not self.stations: return
-        current_url = self.last_known_song
-        idx = -1
-        for i, s in enumerate(self.stations):
-            if s["url"] == current_url:
-                idx = i
-                break
-        
-        next_idx = (idx + 1) % len(self.stations)
-        play_now(self.stations[next_idx])
-        self.now_playing_label.setText(self.translator.tr("now_playing", current=self.stations[next_idx]["name"]))
-        self.last_known_song = self.stations[next_idx]["url"]
-        self.update_playing_station_in_tree()
-        self.update_return_to_schedule_button()
-        self.update_tray_icon()
-        self.initial_ui_refresh()
+        self.play_station_step(self.stations.next_of)
 
     def play_prev_station(self):
         """Plays the previous station in the list."""
-        if not self.stations: return
-        current_url = self.last_known_song
-        idx = -1
-        for i, s in enumerate(self.stations):
-            if s["url"] == current_url:
-                idx = i
-                break
-        
-        prev_idx = (idx - 1 + len(self.stations)) % len(self.stations)
-        play_now(self.stations[prev_idx])
-        self.now_playing_label.setText(self.translator.tr("now_playing", current=self.stations[prev_idx]["name"]))
-        self.last_known_song = self.stations[prev_idx]["url"]
+        self.play_station_step(self.stations.prev_of)
+
+    def play_station_step(self, step):
+        """Plays the station returned by ``step`` for the currently playing one."""
+        station = step(self.stations.by_url(self.last_known_song))
+        if station is None: return
+        play_now(station)
+        self.now_playing_label.setText(self.translator.tr("now_playing", current=station.name))
+        self.last_known_song = station.url
         self.update_playing_station_in_tree()
         self.update_return_to_schedule_button()
         self.update_tray_icon()
@@ -1220,9 +1870,8 @@ class MainWindow(QMainWindow):
         if not CONFIG_PATH.exists():
             return default
         try:
-            # Load existing config
-            with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-                user_config = yaml.safe_load(f) or {}
+            # Load existing config (stations/schedule come from SQLite when that backend is enabled)
+            user_config = config_store.load_config(CONFIG_PATH)
 
             # Validate loaded config
             is_valid, error_msg = self.validate_config(user_config)
@@ -1262,6 +1911,7 @@ class MainWindow(QMainWindow):
         self.add_to_favorites_action.setText(self.translator.tr("add_to_favorites"))
         self.remove_from_favorites_action.setText(self.translator.tr("remove_from_favorites"))
         self.set_as_default_action.setText(self.translator.tr("set_as_default"))
+        self.test_all_stations_action.setText(self.translator.tr("test_all_stations"))
         self.restart_daemon_action.setText(self.translator.tr("restart_daemon"))
         self.no_news_today_action.setText(self.translator.tr("disable_news_today"))
 
@@ -1271,8 +1921,10 @@ class MainWindow(QMainWindow):
         self.tabs.setTabText(3, self.translator.tr("news_tab_title"))
         self.tabs.setTabText(4, self.translator.tr("settings_tab_title"))
         self.tabs.setTabText(5, self.translator.tr("mpd_config_tab_title"))
-        self.tabs.setTabText(6, self.translator.tr("about_tab_title"))
+        self.tabs.setTabText(6, self.translator.tr("stats_tab_title"))
+        self.tabs.setTabText(7, self.translator.tr("about_tab_title"))
         # Explicitly call retranslate on the child widget
+        self.stats_tab.retranslate_ui()
         self.about_tab.update_content()
 
     def restart_scheduler_daemon(self):
@@ -1287,10 +1939,18 @@ class MainWindow(QMainWindow):
         
         # Bitrate
         bitrate = status.get('bitrate', '0')
-        if bitrate and bitrate != '0':
-            self.bitrate_label.setText(f"{bitrate} {self.translator.tr('kbps')}")
-        else:
-            self.bitrate_label.setText("")
+        bitrate_text = f"{bitrate} {self.translator.tr('kbps')}" if bitrate and bitrate != '0' else ""
+
+        # Wariant jakości wybrany przez demona (jeśli stacja ma ich kilka i właśnie gra)
+        variant_selector.reload_if_changed()
+        variant = variant_selector.current
+        variant_reason = ""
+        if variant and variant.get("count", 1) > 1 and variant.get("url") == self.last_known_song:
+            position = self.translator.tr("variant_position", index=variant["index"] + 1, count=variant["count"])
+            bitrate_text = " · ".join(filter(None, [bitrate_text, position]))
+            variant_reason = self.translator.tr(f"variant_reason_{variant.get('reason', 'default')}")
+        self.bitrate_label.setText(bitrate_text)
+        self.bitrate_label.setToolTip(variant_reason)
 
         # Audio Format (rate:bits:channels) e.g., 44100:24:2
         audio = status.get('audio')
@@ -1300,11 +1960,15 @@ class MainWindow(QMainWindow):
                 rate_khz = float(rate) / 1000
                 ch_str = self.translator.tr("stereo") if chans == '2' else (self.translator.tr("mono") if chans == '1' else f"{chans} ch")
                 bits_str = f"{bits} {self.translator.tr('bits')}" if bits != 'f' else "float"
-                self.format_label.setText(f"{rate_khz:g} {self.translator.tr('khz')} | {bits_str} | {ch_str}")
+                self.format_label.setText(" | ".join(filter(None, [f"{rate_khz:g} {self.translator.tr('khz')}", bits_str, ch_str, variant_reason])))
             except ValueError:
                 self.format_label.setText(audio)
         else:
-            self.format_label.setText("")
+            self.format_label.setText(variant_reason)
+
+        # Jakość strumienia: telemetria zbierana przez demona, nie przez GUI
+        station = self.stations.by_url(self.last_known_song)
+        self.stream_quality.refresh(station.name if station else None)
 
     # === ODTWARZACZ ===
     def tab_player(self):
@@ -1365,6 +2029,10 @@ class MainWindow(QMainWindow):
         player_controls_layout.addWidget(play_btn)
         player_controls_layout.addWidget(stop_btn)
         player_controls_layout.addWidget(next_btn)
+        history_btn = QPushButton(self.translator.tr("track_history"))
+        history_btn.setToolTip(self.translator.tr("track_history_tooltip"))
+        history_btn.clicked.connect(lambda: TrackHistoryDialog(self).exec())
+        player_controls_layout.addWidget(history_btn)
         player_controls_layout.addStretch()
         main_layout.addLayout(player_controls_layout)
 
@@ -1424,6 +2092,8 @@ class MainWindow(QMainWindow):
         
         main_layout.addSpacing(10)
         main_layout.addLayout(meta_layout)
+        self.stream_quality = StreamQualityWidget(self.translator)
+        main_layout.addWidget(self.stream_quality)
 
         return w
 
@@ -1444,6 +2114,11 @@ class MainWindow(QMainWindow):
         self.tree = QTreeWidget()
         self.tree.setHeaderLabels([self.translator.tr("stations_tab_title")])
         self.tree.header().setVisible(False)
+        # Druga kolumna: plakietka stanu stacji z ostatniego testu
+        self.tree.setColumnCount(2)
+        self.tree.header().setStretchLastSection(False)
+        self.tree.header().setSectionResizeMode(0, QHeaderView.Stretch)
+        self.tree.header().setSectionResizeMode(1, QHeaderView.ResizeToContents)
         self.tree.itemDoubleClicked.connect(self.play_from_tree)
         # Ustawienie polityki menu kontekstowego
         self.tree.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -1481,6 +2156,18 @@ class MainWindow(QMainWindow):
         import_btn.clicked.connect(self.import_stations_from_playlist)
         btns.addWidget(import_btn)
 
+        import_dir_btn = QPushButton(self.translator.tr("import_playlist_folder"))
+        import_dir_btn.clicked.connect(self.import_stations_from_folder)
+        btns.addWidget(import_dir_btn)
+
+        catalog_btn = QPushButton(self.translator.tr("catalog_search"))
+        catalog_btn.clicked.connect(self.open_station_catalog)
+        btns.addWidget(catalog_btn)
+
+        test_all_btn = QPushButton(self.translator.tr("test_all_stations"))
+        test_all_btn.clicked.connect(self.test_all_stations_action.trigger)
+        btns.addWidget(test_all_btn)
+
         btns.addSpacing(20)
         btns.addLayout(reorder_layout)
         btns.addStretch()
@@ -1542,44 +2229,40 @@ class MainWindow(QMainWindow):
 
     def update_playing_station_in_tree(self):
         """Efficiently updates the currently playing station in the tree without a full rebuild."""
-        current_url = self.last_known_song # Użyj zbuforowanej wartości
-        iterator = QTreeWidgetItemIterator(self.tree)
-        while iterator.value():
-            item = iterator.value()
-            # Działaj tylko na elementach-dzieciach (stacjach)
-            if item.parent():
-                station_data = item.data(0, Qt.UserRole)
-                is_playing = station_data and station_data.get('url') == current_url
-
-                font = item.font(0)
-                font.setBold(is_playing)
-                item.setFont(0, font)
-
-                icon = get_icon("play", QStyle.StandardPixmap.SP_MediaPlay) if is_playing else QIcon()
-                item.setIcon(0, icon)
-
-            iterator += 1
+        station = self.stations.by_url(self.last_known_song) # Użyj zbuforowanej wartości
+        new_item = self.station_items.get(station)
+        if new_item is self.playing_item:
+            return
+        # Zmieniamy tylko dwa elementy: poprzednio i obecnie grany
+        for item, is_playing in ((self.playing_item, False), (new_item, True)):
+            if item is None:
+                continue
+            font = item.font(0)
+            font.setBold(is_playing)
+            item.setFont(0, font)
+            item.setIcon(0, get_icon("play", QStyle.StandardPixmap.SP_MediaPlay) if is_playing else QIcon())
+        self.playing_item = new_item
 
     def refresh_tree(self, mark_dirty=False):
         """Refreshes the station tree view, optionally marking the state as dirty (needs saving)."""
         self.tree.clear()
-        current_url = self.last_known_song
+        self.station_items = {}
+        self.playing_item = None
+        playing_station = self.stations.by_url(self.last_known_song)
         default_station_name = self.schedule.get("default")
 
-        groups = defaultdict(list)
-        for s in self.stations: # Use self.stations directly
-            g = s.get("genre") or self.translator.tr("genre_none")
-            groups[g].append(s)
+        # Grupy pochodzą wprost z indeksu gatunków rejestru
+        groups = sorted((genre or self.translator.tr("genre_none"), genre or "") for genre in self.stations.genres())
 
-        for genre, stations in sorted(groups.items()):
-            parent = QTreeWidgetItem(self.tree, [genre])
+        for label, genre in groups:
+            parent = QTreeWidgetItem(self.tree, [label])
             parent.setFlags(parent.flags() & ~Qt.ItemIsSelectable)
-            for s in stations:
-                is_playing = s['url'] == current_url
-                is_favorite = s.get("favorite", False)
-                is_default = s['name'] == default_station_name
+            for s in self.stations.by_genre(genre or None):
+                is_playing = s is playing_station
+                is_favorite = s.favorite
+                is_default = s.name == default_station_name
 
-                display_name = s['name']
+                display_name = s.name
                 if is_favorite:
                     display_name = f"★ {display_name}"
                 if is_default:
@@ -1587,12 +2270,15 @@ class MainWindow(QMainWindow):
 
                 item = QTreeWidgetItem(parent, [display_name])
                 item.setData(0, Qt.UserRole, s)
+                self.station_items[s] = item
                 font = item.font(0)
                 font.setBold(is_playing)
                 font.setItalic(is_default)
                 item.setFont(0, font)
                 if is_playing:
                     item.setIcon(0, get_icon("play", QStyle.StandardPixmap.SP_MediaPlay))
+                    self.playing_item = item
+                self.apply_health_badge(item, s)
         self.tree.expandAll()
         if mark_dirty:
             self.apply_stations_btn.setEnabled(True)
@@ -1615,13 +2301,14 @@ class MainWindow(QMainWindow):
         station_data = item.data(0, Qt.UserRole)
         if station_data:
             menu.addSeparator()
-            if station_data.get("favorite"):
+            if station_data.favorite:
                 menu.addAction(self.remove_from_favorites_action) # Use the action
             else:
                 menu.addAction(self.add_to_favorites_action) # Use the action
 
         menu.addSeparator()
         menu.addAction(self.set_as_default_action) # Use the action
+        menu.addAction(self.test_all_stations_action)
 
         menu.exec(self.tree.viewport().mapToGlobal(position))
 
@@ -1632,12 +2319,8 @@ class MainWindow(QMainWindow):
         station = item.data(0, Qt.UserRole)
         if not station: return
 
-        # Znajdź stację na głównej liście i zaktualizuj ją
-        for i, s in enumerate(self.stations):
-            if s["url"] == station["url"]:
-                self.stations[i]["favorite"] = is_favorite
-                self.refresh_tree(mark_dirty=True) # Oznacz zmiany jako brudne
-                return
+        self.stations.update(station, favorite=is_favorite)
+        self.refresh_tree(mark_dirty=True) # Oznacz zmiany jako brudne
 
     def set_as_default_station(self):
         """Sets the currently selected station as the default fallback station."""
@@ -1646,8 +2329,7 @@ class MainWindow(QMainWindow):
         station = item.data(0, Qt.UserRole)
         if not station: return
 
-        station_name = station.get("name")
-        self.schedule["default"] = station_name
+        self.schedule["default"] = station.name
         self.refresh_tree(mark_dirty=True)
         self.refresh_default_station_combo()
 
@@ -1658,9 +2340,9 @@ class MainWindow(QMainWindow):
         station = item.data(0, Qt.UserRole)
         if station:
             play_now(station)
-            self.now_playing_label.setText(self.translator.tr("now_playing", current=station["name"]))
+            self.now_playing_label.setText(self.translator.tr("now_playing", current=station.name))
             # Natychmiast zaktualizuj bufor, aby interfejs odświeżył się od razu
-            self.last_known_song = station.get("url")
+            self.last_known_song = station.url
             self.update_return_to_schedule_button()
             self.update_playing_station_in_tree() # Użyj wydajnej metody
             self.update_tray_icon()
@@ -1700,24 +2382,20 @@ class MainWindow(QMainWindow):
         station = item.data(0, Qt.UserRole)
         if not station: return
 
-        idx = self.stations.index(station)
-        new_idx = idx + direction
-        if 0 <= new_idx < len(self.stations):
-            self.stations.pop(idx)
-            self.stations.insert(new_idx, station)
+        if self.stations.move(station, self.stations.index(station) + direction):
             self.refresh_tree(mark_dirty=True)
 
     def edit_station(self):
         """Opens a dialog to add a new station or edit the currently selected one."""
         item = self.tree.currentItem()
-        station = item.data(0, Qt.UserRole) if item and item.parent() else {}
+        station = item.data(0, Qt.UserRole) if item and item.parent() else None
         dlg = QDialog(self) # Create a dialog
         dlg.setWindowTitle(self.translator.tr("add_station") if not station else self.translator.tr("edit_station"))
         l = QFormLayout(dlg)
-        name = QLineEdit(station.get("name", ""))
-        url = QLineEdit(station.get("url", ""))
-        genre = QLineEdit(station.get("genre", ""))
-        fav = QCheckBox(self.translator.tr("favorite")); fav.setChecked(station.get("favorite", False))
+        name = QLineEdit(station.name if station else "")
+        url = QLineEdit(station.url if station else "")
+        genre = QLineEdit((station.genre or "") if station else "")
+        fav = QCheckBox(self.translator.tr("favorite")); fav.setChecked(station.favorite if station else False)
         
         l.addRow(self.translator.tr("name"), name)
         l.addRow(self.translator.tr("url"), url)
@@ -1735,22 +2413,20 @@ class MainWindow(QMainWindow):
         btns.accepted.connect(dlg.accept); btns.rejected.connect(dlg.reject)
         l.addRow(btns)
         if dlg.exec() == QDialog.Accepted:
-            new = {"name": name.text().strip(), "url": url.text().strip(),
-                   "genre": genre.text().strip() or None, "favorite": fav.isChecked()}
-            if not new["name"] or not new["url"]: # Check for empty name/url
+            new = Station(name.text().strip(), url.text().strip(), genre.text().strip() or None, fav.isChecked(),
+                          extra=dict(station.extra) if station and station.extra else None)
+            if not new.name or not new.url: # Check for empty name/url
                 QMessageBox.warning(self, self.translator.tr("error"), self.translator.tr("name_and_url_required"))
                 return
             if station:
-                idx = self.stations.index(station)
-                self.stations[idx] = new
+                self.stations.replace(station, new)
             else:
                 self.stations.append(new)
-            self.config["stations"] = self.stations # Update config
             self.refresh_tree(mark_dirty=True)
             # Nie zapisujemy od razu, użytkownik kliknie "Zastosuj"
 
     def test_station_connection(self, url_str, btn, label):
-        """Tests the connectivity of the given URL using a HEAD request."""
+        """Probes the given URL with a short streaming GET (many stream servers reject HEAD)."""
         url_str = url_str.strip()
         if not url_str: return
         
@@ -1758,100 +2434,211 @@ class MainWindow(QMainWindow):
         label.setText(self.translator.tr("testing"))
         label.setStyleSheet("color: black;")
         
-        req = QNetworkRequest(QUrl(url_str))
-        req.setRawHeader(b"User-Agent", b"RadioScheduler/1.0")
-        
-        # Store reply to prevent garbage collection
-        self._current_test_reply = self.nam.head(req)
-        self._current_test_reply.finished.connect(lambda: self.on_test_finished(self._current_test_reply, btn, label))
+        # Sonda czyta tylko nagłówki i kilka KB strumienia, a wynik trafia też do plakietek w drzewie
+        worker = HealthProbeWorker([url_str], self.health_cache, force=True, parent=self)
+        worker.finished.connect(lambda: self.on_test_finished(worker, url_str, btn, label))
+        self._current_test_worker = worker # Referencja, aby wątek nie został usunięty przez GC
+        worker.start()
 
-    def on_test_finished(self, reply, btn, label):
+    def on_test_finished(self, worker, url_str, btn, label):
         """Callback for the connection test."""
         btn.setEnabled(True)
-        err = reply.error()
-        code = reply.attribute(QNetworkRequest.Attribute.HttpStatusCodeAttribute)
-        
-        if err == QNetworkReply.NetworkError.NoError and 200 <= code < 400:
-            label.setText(self.translator.tr("connection_ok", code=code))
+        self._current_test_worker = None
+        worker.deleteLater()
+        result = worker.result.get(url_str) if worker.result else None
+        
+        if result is not None and result.ok:
+            details = [result.codec.upper() if result.codec else None,
+                       f"{result.bitrate} kbps" if result.bitrate else None]
+            label.setText(self.translator.tr("probe_ok", code=result.status,
+                                             format=" ".join(filter(None, details)) or "?",
+                                             connect=f"{(result.connect_time or 0) * 1000:.0f}",
+                                             audio=f"{result.audio_ttfb * 1000:.0f}" if result.audio_ttfb is not None else "–"))
             label.setStyleSheet("color: green;")
         else:
-            error_msg = f"HTTP {code}" if code else reply.errorString()
+            error_msg = result.error if result is not None else worker.error
             label.setText(self.translator.tr("connection_failed", error=error_msg))
             label.setStyleSheet("color: red;")
-        
-        reply.deleteLater()
-        self._current_test_reply = None
+        station = self.stations.by_url(url_str)
+        if station in self.station_items:
+            self.apply_health_badge(self.station_items[station], station)
+
+    def apply_health_badge(self, item, station):
+        """Shows the last probe result of a station in the second tree column."""
+        result = self.health_cache.latest(station.url)
+        if result is None:
+            item.setIcon(1, QIcon())
+            item.setText(1, "")
+            item.setToolTip(1, self.translator.tr("health_unknown"))
+            return
+        checked = datetime.fromtimestamp(result.checked_at).strftime("%Y-%m-%d %H:%M")
+        if result.ok:
+            item.setIcon(1, get_icon("check", QStyle.StandardPixmap.SP_DialogApplyButton))
+            badge = [result.codec.upper() if result.codec else None, f"{result.bitrate} kbps" if result.bitrate else None]
+            item.setText(1, " ".join(filter(None, badge)))
+            item.setToolTip(1, self.translator.tr("health_ok_details", status=result.status,
+                                                  ttfb=f"{result.ttfb * 1000:.0f}", content_type=result.content_type or "?",
+                                                  bitrate=result.bitrate or "?", checked=checked,
+                                                  codec=result.codec or "?",
+                                                  connect=f"{(result.connect_time or 0) * 1000:.0f}",
+                                                  audio=f"{result.audio_ttfb * 1000:.0f}" if result.audio_ttfb is not None else "–"))
+        else:
+            item.setIcon(1, get_icon("error", QStyle.StandardPixmap.SP_DialogCancelButton))
+            item.setText(1, "")
+            item.setToolTip(1, self.translator.tr("health_failed_details", error=result.error, checked=checked))
+        # Nieaktualny wynik (starszy niż TTL) pokazujemy wyszarzony
+        stale = result.age() >= self.health_cache.ttl
+        item.setForeground(1, QBrush(QColor("gray")) if stale else QBrush())
+
+    def test_all_stations(self):
+        """Checks all stations concurrently in the background and updates the badges in the tree."""
+        if getattr(self, "_health_worker", None) is not None:
+            return
+        urls = [s.url for s in self.stations]
+        if not urls:
+            return
+        # Z wciśniętym Shiftem ignorujemy wyniki z pamięci podręcznej
+        force = bool(QApplication.keyboardModifiers() & Qt.ShiftModifier)
+        worker = HealthProbeWorker(urls, self.health_cache, force, self)
+        progress = QProgressDialog(self.translator.tr("testing"), self.translator.tr("cancel"), 0, len(urls), self)
+        progress.setWindowTitle(self.translator.tr("test_all_stations"))
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(500)
+        worker.progress.connect(lambda done, total: progress.setValue(done))
+        progress.canceled.connect(worker.cancel)
+        worker.finished.connect(lambda: self.on_health_probe_finished(worker, progress))
+        self._health_worker = worker
+        worker.start()
+
+    def on_health_probe_finished(self, worker, progress):
+        progress.reset()
+        self._health_worker = None
+        worker.deleteLater()
+        if worker.error is not None:
+            logger.error(f"Error testing stations: {worker.error}")
+            QMessageBox.critical(self, self.translator.tr("error"), str(worker.error))
+            return
+        for station, item in self.station_items.items():
+            self.apply_health_badge(item, station)
+        results = worker.result.values()
+        ok = sum(1 for r in results if r.ok)
+        self.statusBar().showMessage(self.translator.tr("health_summary", count=len(results), ok=ok,
+                                                        failed=len(results) - ok), 5000)
 
     def delete_station(self): # Delete station
         """Deletes the currently selected station after confirmation."""
         item = self.tree.currentItem()
         if not item or item.parent() is None: return
         s = item.data(0, Qt.UserRole)
-        if QMessageBox.question(self, self.translator.tr("delete_prompt"), self.translator.tr("delete_station_prompt", name=s['name'])) == QMessageBox.Yes:
+        if QMessageBox.question(self, self.translator.tr("delete_prompt"), self.translator.tr("delete_station_prompt", name=s.name)) == QMessageBox.Yes:
             self.stations.remove(s)
-            self.config["stations"] = self.stations
             self.refresh_tree(mark_dirty=True)
             # Nie zapisujemy od razu, użytkownik kliknie "Zastosuj"
 
     def import_stations_from_playlist(self):
         """Imports radio stations from M3U or PLS playlist files."""
-        file_path, _ = QFileDialog.getOpenFileName(self, self.translator.tr("import_playlist_dialog_title"),
-                                                   str(Path.home()),
-                                                   f"{self.translator.tr('playlist_files')} (*.m3u *.m3u8 *.pls)")
-        if not file_path:
+        file_paths, _ = QFileDialog.getOpenFileNames(self, self.translator.tr("import_playlist_dialog_title"),
+                                                     str(Path.home()),
+                                                     f"{self.translator.tr('playlist_files')} (*.m3u *.m3u8 *.pls)")
+        if not file_paths:
             return
+        if len(file_paths) > 1:
+            self.start_bulk_import([Path(p) for p in file_paths])
+            return
+        file_path = file_paths[0]
+
+        # Parsowanie w osobnym wątku - duże playlisty nie blokują interfejsu
+        worker = PlaylistImportWorker(Path(file_path), list(self.stations.urls()), self)
+        progress = QProgressDialog(self.translator.tr("import_in_progress"), self.translator.tr("cancel"), 0, 100, self)
+        progress.setWindowTitle(self.translator.tr("import_playlist"))
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        worker.progress.connect(progress.setValue)
+        progress.canceled.connect(worker.cancel)
+        worker.finished.connect(lambda: self.on_playlist_import_finished(worker, progress))
+        self._import_worker = worker # Referencja, aby wątek nie został usunięty przez GC
+        worker.start()
+
+    def open_station_catalog(self):
+        """Opens the offline catalog search (radio-browser dump)."""
+        CatalogSearchDialog(self).exec()
+
+    def import_stations_from_folder(self):
+        """Imports all playlists found in a folder (recursively); subfolder names become genres."""
+        directory = QFileDialog.getExistingDirectory(self, self.translator.tr("import_playlist_folder"), str(Path.home()))
+        if not directory:
+            return
+        paths = playlist_import.find_playlists(Path(directory))
+        if not paths:
+            QMessageBox.warning(self, self.translator.tr("error"), self.translator.tr("no_playlists_found"))
+            return
+        self.start_bulk_import(paths, root=Path(directory))
+
+    def start_bulk_import(self, paths, root=None):
+        """Parses several playlist files in parallel in the background."""
+        worker = BulkImportWorker(paths, list(self.stations.urls()), root, self)
+        progress = QProgressDialog(self.translator.tr("import_in_progress"), self.translator.tr("cancel"), 0, len(paths), self)
+        progress.setWindowTitle(self.translator.tr("import_playlist_folder"))
+        progress.setWindowModality(Qt.WindowModal)
+        progress.setMinimumDuration(300)
+        worker.progress.connect(lambda done, total: progress.setValue(done))
+        progress.canceled.connect(worker.cancel)
+        worker.finished.connect(lambda: self.on_bulk_import_finished(worker, progress))
+        self._import_worker = worker
+        worker.start()
+
+    def on_bulk_import_finished(self, worker, progress):
+        """Adds stations from a bulk import in one batch and shows a summary with per-file errors."""
+        progress.reset()
+        self._import_worker = None
+        worker.deleteLater()
+        if worker.error is not None:
+            logger.error(f"Error importing playlists: {worker.error}")
+            QMessageBox.critical(self, self.translator.tr("error"), f"{self.translator.tr('import_error')}:\n{worker.error}")
+            return
+        result = worker.result
+        if result.cancelled:
+            self.statusBar().showMessage(self.translator.tr("import_cancelled"), 3000)
+            return
+        for path, error in result.errors:
+            logger.warning(f"Playlist import failed for {path}: {error}")
+        if result.stations:
+            self.stations.extend(result.stations)
+            self.refresh_tree(mark_dirty=True)
 
-        try:
-            path = Path(file_path)
-            content = path.read_text(encoding='utf-8', errors='ignore')
-            new_stations = []
-
-            if path.suffix.lower() in ['.m3u', '.m3u8']:
-                lines = content.splitlines()
-                current_title = None
-                for line in lines:
-                    line = line.strip()
-                    if not line: continue
-                    if line.startswith("#EXTINF:"):
-                        # Format: #EXTINF:-1,Title
-                        parts = line.split(',', 1)
-                        if len(parts) > 1:
-                            current_title = parts[1].strip()
-                    elif not line.startswith("#"):
-                        url = line
-                        name = current_title if current_title else path.stem
-                        new_stations.append({"name": name, "url": url, "genre": None, "favorite": False})
-                        current_title = None
-            
-            elif path.suffix.lower() == '.pls':
-                parser = configparser.ConfigParser()
-                try:
-                    parser.read_string(content)
-                except configparser.MissingSectionHeaderError:
-                    parser.read_string(f"[playlist]\n{content}")
-                
-                # Szukaj sekcji playlist (case-insensitive)
-                section = next((parser[sec] for sec in parser.sections() if sec.lower() == 'playlist'), None)
-                if section:
-                    count = int(section.get('numberofentries', 0))
-                    for i in range(1, count + 1):
-                        url = section.get(f"file{i}")
-                        title = section.get(f"title{i}", f"Station {i}")
-                        if url:
-                            new_stations.append({"name": title, "url": url, "genre": None, "favorite": False})
-
-            if new_stations:
-                self.stations.extend(new_stations)
-                self.config["stations"] = self.stations
-                self.refresh_tree(mark_dirty=True)
-                QMessageBox.information(self, self.translator.tr("success"), 
-                                        self.translator.tr("imported_count", count=len(new_stations)))
-            else:
-                QMessageBox.warning(self, self.translator.tr("error"), self.translator.tr("import_error"))
-
-        except Exception as e:
-            logger.error(f"Error importing playlist: {e}")
-            QMessageBox.critical(self, self.translator.tr("error"), f"{self.translator.tr('import_error')}:\n{e}")
+        summary = self.translator.tr("bulk_import_summary", files=result.files, count=len(result.stations),
+                                     duplicates=result.duplicates, errors=len(result.errors),
+                                     rate=f"{result.stations_per_second:,.0f}", seconds=f"{result.elapsed:.2f}")
+        msg = QMessageBox(QMessageBox.Warning if result.errors else QMessageBox.Information,
+                          self.translator.tr("import_playlist_folder"), summary, QMessageBox.Ok, self)
+        if result.errors:
+            msg.setDetailedText("\n".join(f"{path}: {error}" for path, error in result.errors))
+        msg.exec()
+
+    def on_playlist_import_finished(self, worker, progress):
+        """Adds the stations parsed by the worker to the list in a single batch."""
+        progress.reset()
+        self._import_worker = None
+        worker.deleteLater()
+        if worker.error is not None:
+            logger.error(f"Error importing playlist: {worker.error}")
+            QMessageBox.critical(self, self.translator.tr("error"), f"{self.translator.tr('import_error')}:\n{worker.error}")
+            return
+        result = worker.result
+        if result.cancelled:
+            self.statusBar().showMessage(self.translator.tr("import_cancelled"), 3000)
+            return
+        if result.stations:
+            self.stations.extend(result.stations)
+            self.refresh_tree(mark_dirty=True)
+            QMessageBox.information(self, self.translator.tr("success"),
+                                    self.translator.tr("imported_count_duplicates", count=len(result.stations),
+                                                       duplicates=result.duplicates))
+        elif result.duplicates:
+            QMessageBox.information(self, self.translator.tr("success"),
+                                    self.translator.tr("imported_count_duplicates", count=0, duplicates=result.duplicates))
+        else:
+            QMessageBox.warning(self, self.translator.tr("error"), self.translator.tr("import_error"))
 
     # === HARMONOGRAM + NEWS + ABOUT ===
     def tab_schedule(self):
@@ -1905,7 +2692,7 @@ class MainWindow(QMainWindow):
         self.default_station_combo.clear()
         self.default_station_combo.addItem(self.translator.tr("no_station"), None)
         for s in self.stations:
-            self.default_station_combo.addItem(s["name"], s["name"])
+            self.default_station_combo.addItem(s.name, s.name)
         idx = self.default_station_combo.findData(self.schedule.get("default"))
         if idx > -1: self.default_station_combo.setCurrentIndex(idx)
 
@@ -1965,11 +2752,8 @@ class MainWindow(QMainWindow):
 
     def save_stations_only(self):
         """Saves only the station list to the config file without restarting the daemon."""
-        self.config["stations"] = self.stations
         try:
-            CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                yaml.safe_dump(self.config, f, allow_unicode=True, sort_keys=False)
+            self.write_config()
             self.apply_stations_btn.setEnabled(False) # Disable button after saving
             # Optionally, show a temporary status message
             self.statusBar().showMessage(self.translator.tr("stations_saved_success"), 3000)
@@ -1983,11 +2767,8 @@ class MainWindow(QMainWindow):
         self.schedule["default"] = self.default_station_combo.currentData()
         self.save_news_config()
         self.config["schedule"] = self.schedule
-        # self.config["stations"] jest już aktualne
         try:
-            CONFIG_PATH.parent.mkdir(parents=True, exist_ok=True)
-            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                yaml.safe_dump(self.config, f, allow_unicode=True, sort_keys=False)
+            self.write_config()
             QMessageBox.information(self, self.translator.tr("ok"), self.translator.tr("saved_daemon_restarted"))
             subprocess.run(["pkill", "-f", "radio-scheduler.py"], check=False) # Kill existing daemon
             subprocess.Popen([sys.executable, str(DAEMON_PATH)], start_new_session=True)
@@ -1998,6 +2779,26 @@ class MainWindow(QMainWindow):
     def save_schedule(self):
         self.save_config_and_restart_daemon()
 
+    def write_config(self, library=True):
+        """Writes self.config (with the current station list) using the configured storage backend.
+
+        ``library=False`` is for settings-only saves: with SQLite the station library is not touched.
+        """
+        self.config["stations"] = self.stations.to_dicts()
+        config_store.save_config(self.config, CONFIG_PATH, library=library)
+        if library:
+            self.prune_health_cache()
+
+    def prune_health_cache(self):
+        """Forgets probe results of URLs no longer in the library, e.g. ones only tried in the edit dialog."""
+        before = len(self.health_cache)
+        self.health_cache.prune(url for station in self.stations for url in station.all_urls())
+        if len(self.health_cache) != before:
+            try:
+                self.health_cache.save()
+            except OSError as e:
+                logger.error(f"Błąd zapisu pamięci podręcznej testów stacji: {e}")
+
     def tab_news(self):
         """Creates the 'News Service' tab widget."""
         self.news_tab_widget = QWidget()
@@ -2037,7 +2838,7 @@ class MainWindow(QMainWindow):
         simple_layout = QFormLayout(self.simple_box)
         simple_cfg = self.news_config.get("simple", {})
         self.news_station = QComboBox()
-        self.news_station.addItems([s['name'] for s in self.stations if "News" in s['name'] or "Wiadomości" in s['name']] + [s['name'] for s in self.stations])
+        self.news_station.addItems([s.name for s in self.stations if "News" in s.name or "Wiadomości" in s.name] + [s.name for s in self.stations])
         idx = self.news_station.findText(simple_cfg.get("station", ""))
         if idx > -1: self.news_station.setCurrentIndex(idx)
         self.news_from = QTimeEdit(time.fromisoformat(simple_cfg.get("from", "06:00")))
@@ -2312,6 +3113,34 @@ class MainWindow(QMainWindow):
         
         layout.addWidget(autostart_group)
         
+        # --- MPD connection ---
+        mpd_cfg = self.config.get("mpd", {})
+        mpd_group = QGroupBox(self.translator.tr("mpd_connection_title"))
+        mpd_layout = QFormLayout(mpd_group)
+        self.mpd_host_edit = QLineEdit(mpd_cfg.get("host", ""))
+        self.mpd_host_edit.setPlaceholderText("localhost")
+        self.mpd_port_spin = QSpinBox()
+        self.mpd_port_spin.setRange(1, 65535)
+        self.mpd_port_spin.setValue(int(mpd_cfg.get("port", DEFAULT_PORT)))
+        self.mpd_socket_edit = QLineEdit(mpd_cfg.get("socket", ""))
+        self.mpd_socket_edit.setPlaceholderText("/run/mpd/socket")
+        self.mpd_password_edit = QLineEdit(mpd_cfg.get("password", ""))
+        self.mpd_password_edit.setEchoMode(QLineEdit.Password)
+        mpd_layout.addRow(self.translator.tr("mpd_host"), self.mpd_host_edit)
+        mpd_layout.addRow(self.translator.tr("mpd_port"), self.mpd_port_spin)
+        mpd_layout.addRow(self.translator.tr("mpd_socket"), self.mpd_socket_edit)
+        mpd_layout.addRow(self.translator.tr("mpd_password"), self.mpd_password_edit)
+        mpd_layout.addRow(QLabel(self.translator.tr("mpd_connection_hint")))
+        mpd_buttons = QHBoxLayout()
+        test_mpd_btn = QPushButton(self.translator.tr("mpd_test_connection"))
+        test_mpd_btn.clicked.connect(self.test_mpd_connection)
+        save_mpd_btn = QPushButton(self.translator.tr("save_mpd_settings"))
+        save_mpd_btn.clicked.connect(self.save_mpd_settings)
+        mpd_buttons.addWidget(test_mpd_btn)
+        mpd_buttons.addWidget(save_mpd_btn)
+        mpd_layout.addRow(mpd_buttons)
+        layout.addWidget(mpd_group)
+
         # --- Other settings ---
         other_group = QGroupBox(self.translator.tr("other_settings_title"))
         other_layout = QVBoxLayout(other_group)
@@ -2342,6 +3171,17 @@ class MainWindow(QMainWindow):
         clock_type_layout.addWidget(self.clock_type_combo)
         other_layout.addLayout(clock_type_layout)
 
+        # Storage backend for the station library
+        storage_layout = QHBoxLayout()
+        storage_layout.addWidget(QLabel(self.translator.tr("storage_backend")))
+        self.storage_combo = QComboBox()
+        self.storage_combo.addItem(self.translator.tr("storage_yaml"), config_store.STORAGE_YAML)
+        self.storage_combo.addItem(self.translator.tr("storage_sqlite"), config_store.STORAGE_SQLITE)
+        idx = self.storage_combo.findData(config_store.storage_backend(self.config))
+        if idx != -1: self.storage_combo.setCurrentIndex(idx)
+        storage_layout.addWidget(self.storage_combo)
+        other_layout.addLayout(storage_layout)
+
         save_other_btn = QPushButton(self.translator.tr("save_other_settings"))
         save_other_btn.clicked.connect(self.save_simple_settings)
         other_layout.addWidget(save_other_btn)
@@ -2369,8 +3209,7 @@ class MainWindow(QMainWindow):
         selected_lang = self.language_combo.currentData()
         self.config["language"] = selected_lang
         try:
-            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                yaml.safe_dump(self.config, f, allow_unicode=True, sort_keys=False) # Save the new language setting
+            self.write_config(library=False) # Save the new language setting
 
             reply = QMessageBox.question(self, self.translator.tr("app_restart_prompt"),
                                          self.translator.tr("language_change_prompt"),
@@ -2431,8 +3270,7 @@ Categories=AudioVideo;Audio;Player;
         self.config["shortcuts"] = new_shortcuts
         
         try:
-            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                yaml.safe_dump(self.config, f, allow_unicode=True, sort_keys=False)
+            self.write_config(library=False)
             
             self.apply_language_settings() # Reuse the restart logic
         except Exception as e:
@@ -2445,8 +3283,11 @@ Categories=AudioVideo;Audio;Player;
                                                    "YAML Files (*.yaml *.yml)")
         if file_path:
             try:
+                # Eksport zawsze jako samodzielny YAML, niezależnie od backendu biblioteki
+                exported = {k: v for k, v in self.config.items() if k != "storage"}
+                exported["stations"] = self.stations.to_dicts()
                 with open(file_path, 'w', encoding='utf-8') as f:
-                    yaml.safe_dump(self.config, f, allow_unicode=True, sort_keys=False)
+                    yaml.safe_dump(exported, f, allow_unicode=True, sort_keys=False)
                 QMessageBox.information(self, self.translator.tr("export_success_title"),
                                         self.translator.tr("export_success_text", path=file_path))
             except Exception as e:
@@ -2463,11 +3304,21 @@ Categories=AudioVideo;Audio;Player;
                 with zipfile.ZipFile(file_path, 'w', zipfile.ZIP_DEFLATED) as zipf:
                     if CONFIG_PATH.exists():
                         zipf.write(CONFIG_PATH, arcname="config.yaml")
+                    db_path = config_store.store_path(self.config) # Ta sama baza, której używa open_store
+                    if db_path is not None and db_path.exists():
+                        # Kopia przez API kopii zapasowych SQLite - sam plik bazy nie zawiera zmian z pliku WAL
+                        with tempfile.TemporaryDirectory() as tmp, config_store.SQLiteStore(db_path) as store:
+                            copy = Path(tmp) / "library.db"
+                            store.backup(copy)
+                            zipf.write(copy, arcname="library.db")
                     if LOG_PATH.exists():
                         zipf.write(LOG_PATH, arcname="radio-scheduler-gui.log")
                     daemon_log = Path.home() / ".config/radio-scheduler/radio-scheduler.log"
                     if daemon_log.exists():
                         zipf.write(daemon_log, arcname="radio-scheduler.log")
+                    heartbeat_log = daemon_log.with_name("heartbeat.log") # Uderzenia serca demona są poza logiem
+                    if heartbeat_log.exists():
+                        zipf.write(heartbeat_log, arcname="heartbeat.log")
                 QMessageBox.information(self, self.translator.tr("success"),
                                         self.translator.tr("backup_success", path=file_path))
             except Exception as e:
@@ -2508,15 +3359,60 @@ Categories=AudioVideo;Audio;Player;
         self.config["hide_on_startup"] = self.hide_on_startup_checkbox.isChecked()
         self.config["auto_resume_minutes"] = self.auto_resume_spin.value()
         self.config["player_clock_type"] = self.clock_type_combo.currentData()
+        # Zmiana backendu migruje bibliotekę przy zapisie (save_config zapisuje stacje tam, gdzie trzeba)
+        previous_backend = config_store.storage_backend(self.config)
+        if self.storage_combo.currentData() == config_store.STORAGE_SQLITE:
+            self.config["storage"] = config_store.STORAGE_SQLITE
+        else:
+            self.config.pop("storage", None)
         try:
-            with open(CONFIG_PATH, "w", encoding="utf-8") as f:
-                yaml.safe_dump(self.config, f, allow_unicode=True, sort_keys=False)
+            self.write_config(library=config_store.storage_backend(self.config) != previous_backend)
             self.statusBar().showMessage(self.translator.tr("settings_saved"), 2000)
             self.update_player_clock_view() # Update view after saving
         except Exception as e:
             logger.error(f"Błąd zapisu prostych ustawień: {e}")
             QMessageBox.critical(self, self.translator.tr("save_error"), self.translator.tr("config_save_error", e=e))
 
+    def mpd_settings_from_form(self):
+        """The ``mpd`` config section as entered in the Settings tab (empty fields omitted)."""
+        settings = {"host": self.mpd_host_edit.text().strip(), "socket": self.mpd_socket_edit.text().strip(),
+                    "password": self.mpd_password_edit.text()}
+        if self.mpd_port_spin.value() != DEFAULT_PORT:
+            settings["port"] = self.mpd_port_spin.value()
+        # Sposób wysyłania poleceń ustawia się tylko w config.yaml - formularz go nie nadpisuje
+        settings["commands"] = (self.config.get("mpd") or {}).get("commands")
+        return {k: v for k, v in settings.items() if v}
+
+    def test_mpd_connection(self):
+        """Queries MPD status with the entered settings and reports the transport and latency."""
+        probe = MPCController()
+        probe.configure(self.mpd_settings_from_form())
+        start = datetime.now()
+        status = probe.get_status_dict()
+        elapsed_ms = (datetime.now() - start).total_seconds() * 1000
+        if status:
+            QMessageBox.information(self, self.translator.tr("mpd_test_connection"), self.translator.tr(
+                "mpd_test_ok", transport=probe.transport, ms=f"{elapsed_ms:.1f}"))
+        else:
+            QMessageBox.warning(self, self.translator.tr("mpd_test_connection"),
+                                self.translator.tr("mpd_test_failed", transport=probe.transport))
+
+    def save_mpd_settings(self):
+        settings = self.mpd_settings_from_form()
+        if settings:
+            self.config["mpd"] = settings
+        else:
+            self.config.pop("mpd", None)
+        try:
+            self.write_config(library=False)
+        except Exception as e:
+            logger.error(f"Błąd zapisu ustawień MPD: {e}")
+            QMessageBox.critical(self, self.translator.tr("save_error"), self.translator.tr("config_save_error", e=e))
+            return
+        # Demon wczyta nową konfigurację przy kolejnym obiegu pętli
+        mpc.configure(settings)
+        self.statusBar().showMessage(self.translator.tr("settings_saved"), 2000)
+
     def update_player_clock_view(self):
         """Switches between digital and analog clock in the player tab."""
         clock_type = self.config.get("player_clock_type", "digital")
@@ -2525,12 +3421,37 @@ Categories=AudioVideo;Audio;Player;
         else:
             self.player_dashboard_stack.setCurrentWidget(self.digital_clock)
 
-app = QApplication(sys.argv)
-app.setQuitOnLastWindowClosed(False)
-if ICON_PATH.exists():
-    app.setWindowIcon(QIcon(str(ICON_PATH)))
+_profiling_wakeup = None # Gniazda i obserwator budzące pętlę Qt po sygnale - muszą żyć razem z aplikacją
+
+def install_profiling_signals(app: QApplication) -> profiling.Profiler:
+    """SIGUSR1 profiles the GUI's CPU time, SIGUSR2 its memory (see profiling.py).
+
+    Python runs signal handlers between bytecodes, while Qt may wait in C++
+    for a long time. The signal writes a byte to a socket pair that Qt
+    watches, which wakes it with no polling timer.
+    """
+    global _profiling_wakeup
+    profiler = profiling.Profiler("gui", schedule=lambda delay, fn: QTimer.singleShot(int(delay * 1000), fn))
+    receiver, sender = socket.socketpair()
+    sender.setblocking(False)
+    signal.set_wakeup_fd(sender.fileno())
+    notifier = QSocketNotifier(receiver.fileno(), QSocketNotifier.Type.Read, app)
+    notifier.activated.connect(lambda: receiver.recv(64))
+    _profiling_wakeup = (receiver, sender, notifier)
+    profiler.install_signals()
+    profiling.write_pid_file()
+    return profiler
 
 def main():
+    # Tworzone w main(), a nie przy imporcie modułu - procesy potomne importu ("spawn") importują ten plik
+    setup_logging()
+    create_services()
+    app = QApplication(sys.argv)
+    app.setQuitOnLastWindowClosed(False)
+    if ICON_PATH.exists():
+        app.setWindowIcon(QIcon(str(ICON_PATH)))
+    install_profiling_signals(app)
+
     parser = argparse.ArgumentParser(description="RadioScheduler GUI")
     parser.add_argument("--hidden", action="store_true", help="Start minimized to tray")
     parser.add_argument("--play", type=str, help="Name of the station to play on startup")
@@ -2543,12 +3464,12 @@ def main():
 
     # Obsługa argumentu --play
     if args.play:
-        station = next((s for s in win.stations if s["name"] == args.play), None)
+        station = win.stations.by_name(args.play)
         if station:
             logger.info(f"Auto-playing station from CLI: {args.play}")
             play_now(station)
-            win.now_playing_label.setText(win.translator.tr("now_playing", current=station["name"]))
-            win.last_known_song = station["url"]
+            win.now_playing_label.setText(win.translator.tr("now_playing", current=station.name))
+            win.last_known_song = station.url
             win.update_playing_station_in_tree()
             win.update_return_to_schedule_button()
             win.update_tray_icon()
@@ -4,156 +4,820 @@
 #
 # This software is released under the MIT License.
 # https://opensource.org/licenses/MIT
+import asyncio
+import json
+import os
+import signal
+import sys
+import threading
 import time
-import yaml
+from concurrent.futures import ThreadPoolExecutor
 import subprocess
 from datetime import datetime, timedelta
 from pathlib import Path
 import logging
+from urllib.parse import urlsplit
 from mpc_controller import MPCController # type: ignore
-from typing import Dict, Any, List, Optional
+import config_store # type: ignore
+from station_registry import Station, StationRegistry, find_station # type: ignore
+import url_resolver # type: ignore
+import dns_cache # type: ignore
+import schedule_engine # type: ignore
+import stream_variants # type: ignore
+import playback_monitor # type: ignore
+import station_health # type: ignore
+import mpc_metrics # type: ignore
+import daemon_loop # type: ignore
+import play_journal # type: ignore
+import track_history # type: ignore
+import stream_telemetry # type: ignore
+import prometheus_metrics # type: ignore
+import profiling # type: ignore
+import log_pipeline # type: ignore
+import schedule_simulator # type: ignore
+from typing import Dict, Any, List, Optional, Tuple
 
 CONFIG_PATH = Path.home() / ".config/radio-scheduler/config.yaml"
 LOG_PATH = Path.home() / ".config/radio-scheduler/radio-scheduler.log"
+HEARTBEAT_PATH = Path.home() / ".config/radio-scheduler/heartbeat.log" # Ostatnie uderzenia serca, poza logiem
 MANUAL_OVERRIDE_LOCK = Path.home() / ".config/radio-scheduler/manual_override.lock"
 NO_NEWS_TODAY_LOCK = Path.home() / ".config/radio-scheduler/no-news-today"
+# Stan najbliższej zmiany stacji (z wynikiem wstępnego rozwiązania DNS) - czytany przez GUI
+UPCOMING_PATH = Path.home() / ".config/radio-scheduler/upcoming.json"
 
-# Konfiguracja logowania
-logging.basicConfig(
-    filename=LOG_PATH,
-    level=logging.INFO, # Log INFO level messages as well for better diagnostics
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+# Z jakim wyprzedzeniem rozwiązywać DNS dla następnej stacji
+DNS_PREFETCH_LEAD = timedelta(seconds=90)
 
-mpc = MPCController()
+# Co ile sekund odświeżać w tle rozwiązane adresy stacji z harmonogramu (krócej niż url_resolver.REFRESH_AHEAD)
+RESOLVE_REFRESH_INTERVAL = 3600
+
+# Co ile sekund zapisywać statystyki wywołań MPD dla GUI
+METRICS_EXPORT_INTERVAL = 60
+
+# Strefa z ustawień głównych (mpd, schedule); tylko ją obsługuje GUI i tryb ręczny
+MAIN_ZONE = "main"
+# Najdłuższe czekanie pętli głównej między obiegami
+TICK_INTERVAL = 10.0
+
+# Konfiguracja logowania: zapis w osobnym wątku, rotacja po 5 MB i o północy, uderzenia serca tylko w pamięci
+logs = log_pipeline.LogPipeline(LOG_PATH, level=logging.INFO).start()
+heartbeat_log = logging.getLogger(log_pipeline.HEARTBEAT_LOGGER)
+
+resolver = url_resolver.URLResolver()
+dns = dns_cache.DNSCache()
+selector = stream_variants.VariantSelector()
+timelines = schedule_engine.TimelineCache() # Wspólne dla wszystkich stref o tym samym harmonogramie
+_wake = daemon_loop.Waker() # Budzi pętlę główną, np. gdy monitor którejkolwiek strefy wykryje zdarzenie
+tasks = daemon_loop.TaskRunner() # Czasy obiegów, zadań w tle i opóźnienie pętli
+clock = daemon_loop.SystemClock() # Symulacja i testy mogą podstawić zegar wirtualny
+journal = play_journal.PlayJournal() # Co faktycznie grało - do statystyk słuchania w GUI
+history = track_history.TrackHistory() # Ostatnie tytuły - wyszukiwane przez GUI i "history"
+telemetry = stream_telemetry.StreamTelemetry() # Jakość strumieni w czasie - wykresy w GUI
+telemetry.load()
+# Liczniki dla Prometheusa; czasy obiegów i wywołań MPD już mierzą tasks.metrics i metryki stref
+station_switches = prometheus_metrics.Counter("radio_scheduler_station_switches_total",
+                                              "Station changes journaled, by reason", ("zone", "reason"))
+stream_failures = prometheus_metrics.Counter("radio_scheduler_stream_failures_total",
+                                             "Stalls and failures found by the playback monitors", ("zone", "kind"))
+config_reloads = prometheus_metrics.Counter("radio_scheduler_config_reloads_total",
+                                            "Reads of the configuration after it changed")
+STARTED_AT = time.time()
+profiler = profiling.Profiler("daemon") # Profil na żądanie (SIGUSR1/SIGUSR2, "profile"/"memory")
+# (czas zmiany, host) -> (zmiana, wynik wstępnego rozwiązania lub None, gdy w toku)
+_dns_prefetched: Dict[Tuple[datetime, str], Tuple[schedule_engine.Transition, Optional[dns_cache.DNSResult]]] = {}
+_dns_alerted = set()
+_dns_lock = threading.Lock() # Obie struktury wyżej: wyniki przychodzą z wątków "dns-prefetch", obieg je przycina
+_upcoming_lock = threading.Lock() # Zapis pliku dla GUI z kilku wątków naraz
+_metrics_exported_at = 0.0
+
+def export_metrics(force: bool = False):
+    """Writes the MPD call and task statistics, stream telemetry and heartbeats, at most once per METRICS_EXPORT_INTERVAL."""
+    global _metrics_exported_at
+    if not force and time.monotonic() - _metrics_exported_at < METRICS_EXPORT_INTERVAL:
+        return
+    _metrics_exported_at = time.monotonic()
+    try:
+        zones[MAIN_ZONE].mpc.metrics.export(mpc_metrics.METRICS_PATH)
+        tasks.metrics.export(daemon_loop.TASK_METRICS_PATH)
+        telemetry.save()
+        logs.heartbeats.dump(HEARTBEAT_PATH)
+    except OSError as e:
+        logging.warning(f"Could not export MPD call metrics: {e}")
 
 def load_config() -> Dict[str, Any]:
-    """Loads the YAML configuration file."""
+    """Loads the configuration (YAML settings, library from SQLite when enabled)."""
     try:
         if not CONFIG_PATH.exists():
             return {"stations": [], "schedule": {"default": "", "weekly": [], "news_breaks": {"enabled": True}}}
-        with open(CONFIG_PATH, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f) or {}
+        # Z backendem SQLite nie wczytujemy całej biblioteki co 10 s - wyszukiwanie idzie przez indeksy
+        return config_store.load_config(CONFIG_PATH, with_library=False)
     except Exception as e:
         logging.error(f"Error loading configuration: {e}")
         return {"stations": [], "schedule": {}}
 
-def find_station_url(name: str, stations: List[Dict[str, Any]]) -> Optional[str]:
-    """Finds the URL for a station by its name."""
-    for s in stations:
-        if s["name"] == name:
-            return s["url"]
-    if name:
-        logging.error(f"Station not found: {name}")
-    return None
+_config_cache: Dict[str, Any] = {"key": None, "config": None, "registry": None}
 
-def main():
-    was_news_playing = False
-    last_logged_minute = -1
-    while True:
+def load_config_cached() -> Tuple[Dict[str, Any], StationRegistry]:
+    """Returns the config and its station registry, re-reading the file only when it changed."""
+    try:
+        st = CONFIG_PATH.stat()
+        key = (st.st_mtime_ns, st.st_size)
+    except FileNotFoundError:
+        key = None
+    if key is None or key != _config_cache["key"]:
         config = load_config()
-        stations = config.get("stations", [])
-        sched = config.get("schedule", {})
-        now = datetime.now()
-        # Fix: Use locale-independent weekday mapping (0=Monday)
-        weekday_map = {0: "mon", 1: "tue", 2: "wed", 3: "thu", 4: "fri", 5: "sat", 6: "sun"}
-        weekday = weekday_map[now.weekday()]
-        current_time_str = now.strftime("%H:%M")        
-
-        # Logowanie statusu co minutę dla celów debugowania
-        if now.minute != last_logged_minute:
-            logging.info(f"Heartbeat: Day={weekday}, Time={current_time_str}, Manual={MANUAL_OVERRIDE_LOCK.exists()}, NoNews={NO_NEWS_TODAY_LOCK.exists()}")
-            last_logged_minute = now.minute
-
-        target_station_name = None
-        
-        # Sprawdź flagę "bez newsów na dziś"
-        no_news_today = NO_NEWS_TODAY_LOCK.exists() and NO_NEWS_TODAY_LOCK.read_text().strip() == str(now.date())
-        manual_override = MANUAL_OVERRIDE_LOCK.exists()
-
-        # Auto-resume logic
-        if manual_override:
-            auto_resume_minutes = config.get("auto_resume_minutes", 0)
-            if auto_resume_minutes > 0:
-                try:
-                    # Sprawdź wiek pliku blokady
-                    mtime = datetime.fromtimestamp(MANUAL_OVERRIDE_LOCK.stat().st_mtime)
-                    if (now - mtime).total_seconds() / 60 > auto_resume_minutes:
-                        logging.info(f"Auto-resume: Manual override expired after {auto_resume_minutes} minutes.")
-                        MANUAL_OVERRIDE_LOCK.unlink(missing_ok=True)
-                        manual_override = False
-                except FileNotFoundError:
-                    pass # Plik mógł zostać usunięty w międzyczasie
-
-        # News breaks (advanced first)
-        news_cfg = sched.get("news_breaks", {})
-        news_played_this_cycle = False
-        
-        # Sprawdź czy newsy są włączone I (nie ma trybu ręcznego LUB tryb ręczny nie blokuje newsów)
-        should_play_news = news_cfg.get("enabled", True) and (not manual_override or not news_cfg.get("block_manual", True))
-
-        if not no_news_today and should_play_news:
-            offset = news_cfg.get("start_minute_offset", 0)
-            if news_cfg.get("use_advanced", False):
-                for rule in news_cfg.get("advanced", []):
-                    if weekday in rule["days"]:
-                        start = datetime.strptime(rule["from"], "%H:%M").time()
-                        end = datetime.strptime(rule["to"], "%H:%M").time()
-                        if start <= now.time() <= end:
-                            # Poprawiona logika: Sprawdź, czy bieżąca godzina jest w interwale i czy minuta pasuje do offsetu
-                            if now.hour % (rule["interval_minutes"] / 60) == 0 if rule["interval_minutes"] >= 60 else now.minute % rule["interval_minutes"] == 0:
-                                if offset <= now.minute < offset + rule.get("duration_minutes", 8):
-                                    target_station_name = rule["station"]
-                                    news_played_this_cycle = True
-                                    break
-            else: # Tryb prosty
-                simple = news_cfg.get("simple", {})
-                days = simple.get("days", ["mon","tue","wed","thu","fri","sat","sun"])
-                if weekday in days and simple.get("station"):
-                    start = datetime.strptime(simple.get("from", "00:00"), "%H:%M").time()
-                    end = datetime.strptime(simple.get("to", "22:00"), "%H:%M").time()
-                    if start <= now.time() <= end:
-                        interval = simple.get("interval_minutes", 60)
-                        duration = simple.get("duration_minutes", 8)
-                        # Poprawiona logika dla trybu prostego
-                        # Sprawdź, czy godzina jest wielokrotnością interwału (dla pełnych godzin)
-                        # lub czy minuta jest wielokrotnością interwału (dla < 60 min)
-                        is_on_interval = (now.minute == 0 and now.hour % (interval / 60) == 0) if interval >= 60 else (now.minute % interval == 0)
-                        if is_on_interval and offset <= now.minute < offset + duration:
-                                target_station_name = simple["station"]
-                                news_played_this_cycle = True
-            
-            if news_played_this_cycle:
-                pass # Mamy już stację z newsów
-
-        # Weekly schedule
-        if not target_station_name and not manual_override:
-            rule_found = False
-            for rule in sched.get("weekly", []):
-                if weekday in rule["days"] and rule["from"] <= current_time_str < rule["to"]:
-                    target_station_name = rule["station"]
-                    rule_found = True
-                    break
-            if not rule_found:
-                target_station_name = sched.get("default")
+        config_reloads.inc()
+        _config_cache.update(key=key, config=config,
+                             registry=StationRegistry.from_dicts(config.get("stations") or []))
+    return _config_cache["config"], _config_cache["registry"]
+
+def find_station_url(name: str, stations: StationRegistry, store: Optional[config_store.SQLiteStore] = None) -> Optional[str]:
+    """Finds the URL for a station by its name using the registry or SQLite index."""
+    station = find_station(name, stations, store)
+    return station.url if station else None
+
+def schedule_station_names(sched: Dict[str, Any], weekly: List[Dict[str, Any]]) -> List[Optional[str]]:
+    """Names of the stations a schedule refers to (default, weekly rules, news breaks)."""
+    news_cfg = sched.get("news_breaks", {})
+    names = [sched.get("default"), news_cfg.get("simple", {}).get("station")]
+    names += [rule.get("station") for rule in weekly]
+    names += [rule.get("station") for rule in news_cfg.get("advanced", [])]
+    return names
+
+def scheduled_urls(config: Dict[str, Any], stations: StationRegistry, store: Optional[config_store.SQLiteStore] = None) -> List[str]:
+    """URLs (with variants) of all stations referenced by the main schedule and the zones' own schedules."""
+    sched = config.get("schedule", {})
+    weekly = store.weekly_rules() if store is not None else sched.get("weekly", [])
+    names = schedule_station_names(sched, weekly)
+    for entry in config.get("zones") or []:
+        if isinstance(entry, dict) and isinstance(entry.get("schedule"), dict):
+            names += schedule_station_names(entry["schedule"], entry["schedule"].get("weekly", []))
+    found = (find_station(name, stations, store) for name in dict.fromkeys(filter(None, names)))
+    return [url for station in found if station for url in station.all_urls()]
+
+def url_host(url: Optional[str]) -> Optional[str]:
+    try:
+        return urlsplit(url).hostname if url else None
+    except ValueError:
+        return None
+
+def write_upcoming():
+    """Saves the DNS status of all upcoming switches for the GUI."""
+    with _dns_lock:
+        prefetched = list(_dns_prefetched.items())
+    state = [{
+        "station": transition.station, "at": transition.at.isoformat(timespec="minutes"),
+        "is_news": transition.is_news, "host": host, "ok": result.ok, "error": result.error,
+        "addresses": result.addresses, "elapsed_ms": round(result.elapsed * 1000, 1), "checked_at": result.resolved_at,
+    } for (_, host), (transition, result) in prefetched if result is not None]
+    try:
+        with _upcoming_lock:
+            config_store.write_atomic(UPCOMING_PATH, json.dumps(state))
+    except OSError as e:
+        logging.error(f"Could not write {UPCOMING_PATH}: {e}")
+
+def _on_prefetched(transition: schedule_engine.Transition, host: str, result: dns_cache.DNSResult):
+    key = (transition.at, host)
+    with _dns_lock:
+        if key not in _dns_prefetched:
+            return # Zmiana już minęła i obieg ją usunął - spóźniony wynik nie może jej przywrócić
+        _dns_prefetched[key] = (transition, result)
+        alert = not result.ok and key not in _dns_alerted
+        if alert:
+            _dns_alerted.add(key)
+    lead = (transition.at - clock.now()).total_seconds()
+    if result.ok:
+        logging.info(f"Pre-resolved {host} for {transition.station} at {transition.at:%H:%M} "
+                     f"({lead:.0f} s ahead): {', '.join(result.addresses)} in {result.elapsed * 1000:.1f} ms, TTL {result.ttl:.0f} s")
+    elif alert:
+        # Ostrzegamy przed zmianą stacji, a nie dopiero gdy MPD nie zdoła się połączyć
+        logging.warning(f"DNS pre-resolution failed for {transition.station} ({host}) scheduled at "
+                        f"{transition.at:%H:%M}, {lead:.0f} s ahead: {result.error}")
+    write_upcoming()
+
+def prefetch_upcoming(transitions: List[schedule_engine.Transition], stations: StationRegistry,
+                      store: Optional[config_store.SQLiteStore] = None):
+    """Warms DNS for the hosts of upcoming stations; failed lookups are retried after the negative TTL."""
+    now = clock.now()
+    with _dns_lock:
+        for key in [k for k in _dns_prefetched if k[0] < now]:
+            del _dns_prefetched[key]
+            _dns_alerted.discard(key)
+    for transition in transitions:
+        station = find_station(transition.station, stations, store)
+        if station is None:
+            continue
+        variants = stream_variants.variants_of(station)
+        url = selector.preferred(station.name, variants).url
+        host = url_host(resolver.cached(url))
+        if not host or dns_cache.is_ip_literal(host):
+            continue
+        key = (transition.at, host)
+        with _dns_lock:
+            entry = _dns_prefetched.get(key)
+            if entry is not None and (entry[1] is None or entry[1].ok or not entry[1].expired()):
+                continue
+            _dns_prefetched[key] = (transition, None)
+        if entry is None:
+            # Zmiana stacji to bezpieczny moment na zmianę jakości - zmierz przepustowość wariantów przed nią
+            selector.measure_async(station.name, variants)
+        dns.prefetch_async([host], callback=lambda result, t=transition, h=host: _on_prefetched(t, h, result))
+
+def is_playing(station: Station, played_url: Optional[str]) -> bool:
+    """True if MPD plays any variant of ``station``."""
+    return any(resolver.matches(url, played_url) for url in station.all_urls())
+
+def station_fallbacks(station: Station) -> List[str]:
+    """Names of the stations to fail over to, from the station's "fallbacks" list."""
+    fallbacks = station.extra.get("fallbacks") if station.extra else None
+    return [fallbacks] if isinstance(fallbacks, str) else list(fallbacks or [])
+
+class _ZoneLog(logging.LoggerAdapter):
+    """Prefixes log messages with the zone name; the main zone logs exactly as before zones existed."""
+
+    def process(self, msg, kwargs):
+        zone = self.extra["zone"]
+        return (msg if zone == MAIN_ZONE else f"[{zone}] {msg}"), kwargs
+
+class Zone:
+    """One MPD endpoint with its own playback supervision, failover plan and (optionally) schedule."""
+
+    def __init__(self, name: str, mpc: Optional[MPCController] = None):
+        self.name = name
+        self.mpc = mpc or MPCController()
+        self.monitor = playback_monitor.PlaybackMonitor(self.sample_status, wake=_wake, name=f"monitor-{name}")
+        self.failover = playback_monitor.Failover()
+        self.schedule: Optional[Dict[str, Any]] = None # None = harmonogram główny
+        self.was_news_playing = False
+        self.mpd_available = True
+        self.busy: Optional[asyncio.Task] = None # Obieg w toku (wykonywany w puli wątków)
+        self.journaled: Optional[str] = None # Stacja z ostatniego zapisu w dzienniku odtwarzania
+        self.log = _ZoneLog(logging.getLogger(), {"zone": name})
+
+    def check_mpd_available(self) -> bool:
+        """Whether MPD is reachable according to the controller's circuit breaker; logs changes."""
+        available = self.mpc.available
+        if available != self.mpd_available:
+            if available:
+                self.log.info("MPD is reachable again, resuming playback supervision")
+            else:
+                self.log.warning(f"MPD unreachable, pausing playback supervision "
+                                 f"(next attempt in {self.mpc.breaker.seconds_until_retry():.0f} s)")
+            # Stan odtwarzacza sprzed przerwy (np. "stop" po restarcie MPD) nie świadczy o awarii stacji
+            self.monitor.expect(None)
+            self.mpd_available = available
+            if not available:
+                self.note_playing(None, play_journal.REASON_STOP)
+        return available
+
+    def sample_status(self) -> Dict[str, str]:
+        """MPD status for the playback monitor; also a telemetry sample of the station playing."""
+        status = self.mpc.get_status_dict()
+        if status and self.journaled:
+            telemetry.sample(self.name, self.journaled, status)
+        return status
+
+    def note_playing(self, station: Optional[str], reason: int):
+        """Journals what the zone plays now (None: nothing) if it differs from the last record."""
+        if station == self.journaled:
+            return
+        self.journaled = station
+        reason = reason if station else play_journal.REASON_STOP
+        journal.append(station, reason, self.name)
+        station_switches.inc(self.name, play_journal.REASONS[reason])
+
+    def play_station_url(self, url: str) -> bool:
+        """Hands MPD the cached stream URL; if that fails, resolves again once and retries.
+
+        The switch never waits for the network: a missing or stale
+        resolution is refreshed in the background for the next time.
+        """
+        play_url = resolver.cached(url)
+        if not resolver.is_fresh(url):
+            resolver.prefetch_async([url])
+        host = url_host(play_url)
+        if host and not dns_cache.is_ip_literal(host):
+            # Tylko odczyt pamięci podręcznej - rozwiązywanie nazw zostaje w tle, przełączenie nie czeka
+            result = dns.get(host)
+            if result is None:
+                self.log.info(f"DNS for {host}: cold, MPD resolves it itself")
+                dns.prefetch_async([host])
+            elif result.ok:
+                self.log.info(f"DNS for {host}: pre-resolved ({result.elapsed * 1000:.1f} ms in the background)")
+            else:
+                self.log.warning(f"DNS lookup for {host} failed before switching: {result.error}")
+        if self.mpc.play_url(play_url):
+            return True
+        if play_url != url and self.mpc.available:
+            self.log.warning(f"Playback of resolved URL {play_url} failed, revalidating {url}")
+            resolver.invalidate(url)
+            return self.mpc.play_url(resolver.resolve(url, refresh=True))
+        return False
+
+    def play_station(self, station: Station) -> bool:
+        """Starts ``station`` with the quality variant chosen for the current link conditions."""
+        variants = stream_variants.variants_of(station)
+        variant, reason = selector.choose(station.name, variants)
+        if len(variants) > 1:
+            self.log.info(f"Variant for {station.name}: {variant.label()} ({reason})")
+        return self.start_stream(variant.url)
+
+    def start_stream(self, url: str) -> bool:
+        """Plays ``url`` and hands it to the playback monitor once MPD has been told to play it."""
+        # Podczas "clear" + "add" MPD chwilowo stoi - monitor nie może wziąć tego za awarię
+        self.monitor.expect(None)
+        ok = self.play_station_url(url)
+        self.monitor.expect(url)
+        return ok
+
+    def on_underrun(self, station: Station, event: playback_monitor.PlaybackEvent):
+        """Notes a stall that recovered by itself; steps down to a lower variant when stalls repeat."""
+        variants = stream_variants.variants_of(station)
+        playing = selector.preferred(station.name, variants)
+        self.log.warning(f"Stall on {station.name} ({playing.label()}): {event.detail}")
+        telemetry.event(self.name, station.name, stream_telemetry.EVENT_STALL)
+        stream_failures.inc(self.name, "stall")
+        lower = selector.record_stall(station.name, variants)
+        if lower is not None:
+            self.log.warning(f"Repeated stalls on {station.name}, switching down to {lower.label()}")
+            self.start_stream(lower.url)
+
+    def on_failure(self, station: Station, event: playback_monitor.PlaybackEvent):
+        """Plans recovery after the playing stream died: retry with backoff, then the fallback chain."""
+        self.log.warning(f"Playback of {station.name} failed: {event.detail} (detected after {event.latency:.1f} s)")
+        telemetry.event(self.name, station.name, stream_telemetry.EVENT_FAILED)
+        stream_failures.inc(self.name, "failure")
+        self.monitor.expect(None)
+        self.note_playing(None, play_journal.REASON_STOP)
+        failover = self.failover
+        next_station, delay = failover.failed()
+        if next_station == station.name:
+            self.log.info(f"Retrying {station.name} in {delay:.1f} s (attempt {failover.attempt} of {failover.retries})")
+        elif next_station == failover.primary:
+            self.log.warning(f"All fallbacks of {failover.primary} failed, starting over in {delay:.0f} s")
+        else:
+            self.log.warning(f"Failing over from {station.name} to {next_station}")
+
+    def supervise(self, target: Station, force_play: bool, lookup: Dict[str, Station], is_news: bool = False):
+        """Keeps the scheduled station (or its current fallback) playing.
+
+        ``lookup`` maps the names of the target and its fallbacks to stations;
+        it is prepared by the main loop, as the SQLite library may only be
+        used from that thread. ``is_news`` only labels the play journal record.
+        """
+        failover, monitor = self.failover, self.monitor
+        if not self.check_mpd_available():
+            # Niedostępny MPD to nie awaria stacji - nie ruszamy planu failover,
+            # a ponowne połączenie sprawdza monitor przy kolejnym odczycie statusu
+            return
+        if failover.primary != target.name:
+            failover.start(target.name, station_fallbacks(target))
+        current = target
+        if failover.on_fallback:
+            current = lookup.get(failover.current) or target
+
+        for event in monitor.drain():
+            if event.kind == playback_monitor.EVENT_FAILED:
+                self.on_failure(current, event)
+            else:
+                self.on_underrun(current, event)
+
+        retry = failover.due()
+        if retry is not None:
+            station = lookup.get(retry)
+            if station is None:
+                # Nieznana stacja na liście zapasowych - traktujemy jak kolejną awarię
+                self.log.error(f"Station not found: {retry}")
+                failover.failed()
+                return
+            # Przy ponownej próbie zapominamy rozwiązany adres - poprzedni mógł wygasnąć; nowy rozwiąże się w tle
+            for url in station.all_urls():
+                resolver.invalidate(url)
+            self.log.info(f"Starting {station.name} (recovery of {target.name})")
+            self.play_station(station)
+            self.note_playing(station.name, play_journal.REASON_FAILOVER)
+            return
+        if failover.pending:
+            return # Czekamy na kolejną próbę (backoff)
 
+        if failover.on_fallback:
+            reason = play_journal.REASON_FAILOVER
+        else:
+            reason = play_journal.REASON_NEWS if is_news else play_journal.REASON_SCHEDULE
+        played_url = self.mpc.get_current_url()
+        if force_play or not is_playing(current, played_url):
+            self.log.info(f"Changing station to: {current.name} (URL: {current.url})")
+            self.play_station(current)
+            self.note_playing(current.name, reason)
+            return
+        self.note_playing(current.name, reason) # Stacja już grała, np. po restarcie demona lub po trybie ręcznym
+        if monitor.expected is None:
+            monitor.expect(played_url) # Np. po restarcie demona stacja już gra - zaczynamy ją pilnować
+        if monitor.healthy_for() >= playback_monitor.RECOVERED_AFTER:
+            failover.recovered()
+        if failover.failback_due():
+            # Stacja podstawowa może już działać - sprawdzamy ją krótkim zapytaniem, bez przerywania odtwarzania
+            result = station_health.probe(target.url)
+            if result.ok:
+                self.log.info(f"{target.name} is reachable again, switching back from {current.name}")
+                failover.fail_back()
+                self.play_station(target)
+                self.note_playing(target.name, play_journal.REASON_FAILOVER)
+
+    def tick(self, target: Optional[Station], is_news: bool, lookup: Dict[str, Station]):
+        """One pass of the zone, run in the worker pool so a slow MPD only delays its own zone."""
+        planned = self.failover.next_at
+        try:
+            if target is not None:
+                # Wymuś powrót do stacji po zakończeniu newsów
+                force_play = self.was_news_playing and not is_news
+                self.supervise(target, force_play, lookup, is_news)
+            else:
+                # Tryb ręczny lub brak stacji - nie pilnujemy odtwarzania; ręczne wybory zapisuje GUI
+                self.monitor.expect(None)
+                self.failover.start(None)
+                self.journaled = None
+            self.was_news_playing = is_news
+        except Exception as e:
+            self.log.error(f"Zone pass failed: {e}", exc_info=True)
+        if self.failover.next_at is not None and self.failover.next_at != planned:
+            _wake.set() # Nowa próba zaplanowana po wyliczeniu czasu uśpienia pętli - niech go przeliczy
+
+    def describe(self) -> Dict[str, Any]:
+        """State of the zone for the control socket."""
+        return {"name": self.name, "mpd": self.mpc.transport, "available": self.mpc.available,
+                "expected_url": self.monitor.expected, "station": self.failover.current,
+                "scheduled": self.failover.primary, "own_schedule": self.schedule is not None}
+
+    def stop(self):
+        self.monitor.stop()
+
+zones: Dict[str, Zone] = {MAIN_ZONE: Zone(MAIN_ZONE)}
+
+def configure_zones(config: Dict[str, Any]):
+    """Adds, updates and removes zones to match the config; the main zone always exists.
+
+    Each entry of ``zones`` has a ``name``, its own ``mpd`` settings and
+    optionally its own ``schedule``; without one it follows the main
+    schedule (and shares its compiled timeline).
+    """
+    wanted: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = {MAIN_ZONE: (config.get("mpd"), None)}
+    for entry in config.get("zones") or []:
+        name = entry.get("name") if isinstance(entry, dict) else None
+        if not name or name in wanted:
+            logging.error(f"Ignoring zone without a unique name: {entry}")
+            continue
+        schedule = entry.get("schedule")
+        wanted[name] = (entry.get("mpd"), schedule if isinstance(schedule, dict) else None)
+    for name in [n for n in zones if n not in wanted]:
+        logging.info(f"Zone {name} removed")
+        zones.pop(name).stop()
+    for name, (mpd, schedule) in wanted.items():
+        zone = zones.get(name)
+        if zone is None:
+            zone = zones[name] = Zone(name)
+            zone.mpc.configure(mpd)
+            zone.monitor.start()
+            logging.info(f"Zone {name} added: MPD at {zone.mpc.transport}")
+        elif zone.mpc.configure(mpd):
+            zone.log.info(f"MPD connection: {zone.mpc.transport}")
+        zone.schedule = schedule
+
+def zone_lookup(target: Station, stations: StationRegistry,
+                store: Optional[config_store.SQLiteStore] = None) -> Dict[str, Station]:
+    """The target and its fallback stations by name, for a zone's pass in a worker thread."""
+    lookup = {target.name: target}
+    for name in station_fallbacks(target):
+        station = find_station(name, stations, store, quiet=True)
+        if station is not None:
+            lookup[name] = station
+    return lookup
+
+# Stan między kolejnymi obiegami harmonogramu
+_pass_state: Dict[str, Any] = {"last_logged_minute": -1, "prefetched_config_key": object(), "prefetch_due": 0.0,
+                               "zones_config_key": object(), "rolled_up": None,
+                               "fingerprints_key": object(), "fingerprints": {},
+                               "manual_override": False, "no_news_today": False}
+
+def schedule_pass() -> Tuple[List[Tuple["Zone", Optional[Station], bool, Dict[str, Station]]],
+                             Dict[Tuple[int, bool], schedule_engine.Timeline], Optional[datetime]]:
+    """One pass of the scheduler: re-reads the config and works out the target station of every zone.
+
+    Runs in the scheduler thread, as it reads files and the SQLite library.
+    Returns the plan (zone, target, news flag, station lookup) for the zone
+    passes, plus the compiled timelines and the auto-resume moment, which
+    tell when to wake up next.
+    """
+    state = _pass_state
+    config, stations = load_config_cached()
+    if _config_cache["key"] != state["zones_config_key"]:
+        state["zones_config_key"] = _config_cache["key"]
+        configure_zones(config)
+    sched = config.get("schedule", {})
+    try:
+        store = config_store.open_store(config)
+    except Exception as e:
+        logging.error(f"Error opening station library: {e}")
+        store = None
+    # Po każdej zmianie konfiguracji i co godzinę rozwiązujemy adresy stacji z harmonogramu w tle,
+    # zanim wpisy wygasną - przełączenie bierze adres tylko z pamięci podręcznej
+    resolver.reload_if_changed()
+    if _config_cache["key"] != state["prefetched_config_key"] or time.monotonic() >= state["prefetch_due"]:
+        state["prefetched_config_key"] = _config_cache["key"]
+        state["prefetch_due"] = time.monotonic() + RESOLVE_REFRESH_INTERVAL
+        resolver.prefetch_async(scheduled_urls(config, stations, store))
+    now = clock.now()
+    weekday = schedule_engine.weekday_key(now)
+    current_time_str = now.strftime("%H:%M")
+
+    # Logowanie statusu co minutę dla celów debugowania
+    if now.minute != state["last_logged_minute"]:
+        heartbeat_log.info(f"Heartbeat: Day={weekday}, Time={current_time_str}, Manual={MANUAL_OVERRIDE_LOCK.exists()}, NoNews={NO_NEWS_TODAY_LOCK.exists()}")
+        state["last_logged_minute"] = now.minute
+
+    # Raz na dobę (i po starcie) podsumowujemy zakończone dni dziennika odtwarzania
+    if state["rolled_up"] != now.date():
+        state["rolled_up"] = now.date()
+        try:
+            rows = play_journal.roll_up(now.date())
+            if rows:
+                logging.info(f"Play journal: rolled up {rows} station-days")
+        except (OSError, ValueError) as e:
+            logging.warning(f"Play journal rollup failed: {e}")
+
+    # Sprawdź flagę "bez newsów na dziś"
+    no_news_today = NO_NEWS_TODAY_LOCK.exists() and NO_NEWS_TODAY_LOCK.read_text().strip() == str(now.date())
+    manual_override = MANUAL_OVERRIDE_LOCK.exists()
+    state["no_news_today"] = no_news_today
+
+    # Auto-resume logic
+    resume_at = None
+    if manual_override:
+        auto_resume_minutes = config.get("auto_resume_minutes", 0)
+        try:
+            # Blokada wygasa po auto_resume_minutes od jej założenia (czas modyfikacji pliku)
+            mtime = datetime.fromtimestamp(MANUAL_OVERRIDE_LOCK.stat().st_mtime)
+            resume_at = schedule_engine.auto_resume_at(mtime, auto_resume_minutes)
+            if resume_at is not None and now >= resume_at:
+                logging.info(f"Auto-resume: Manual override expired after {auto_resume_minutes} minutes.")
+                MANUAL_OVERRIDE_LOCK.unlink(missing_ok=True)
+                manual_override = False
+                resume_at = None
+        except FileNotFoundError:
+            pass # Plik mógł zostać usunięty w międzyczasie
+
+    state["manual_override"] = manual_override
+
+    # Newsy mają pierwszeństwo, potem tygodniowy harmonogram i stacja domyślna.
+    # Harmonogram dnia jest skompilowany raz i wspólny dla stref o tym samym harmonogramie.
+    if store is not None:
+        main_weekly_for = store.weekly_rules
+    else:
+        main_weekly_for = lambda day: sched.get("weekly", [])
+    # Odcisk harmonogramu strefy liczymy raz na wczytanie konfiguracji, nie przy każdym przebiegu.
+    # Z SQLite reguły tygodniowe są w bazie - jej zmiana (import, zapis z GUI) też unieważnia odciski.
+    fingerprints_key = (_config_cache["key"], config_store.library_stamp(config))
+    if fingerprints_key != state["fingerprints_key"]:
+        state["fingerprints_key"] = fingerprints_key
+        state["fingerprints"] = {}
+    fingerprints: Dict[str, str] = state["fingerprints"]
+    compiled: Dict[Tuple[int, bool], schedule_engine.Timeline] = {}
+    upcoming: List[schedule_engine.Transition] = []
+    plan = []
+    for zone in list(zones.values()):
+        if zone.schedule is None:
+            zone_sched, weekly_for = sched, main_weekly_for
+        else:
+            zone_sched, weekly_for = zone.schedule, lambda day, s=zone.schedule: s.get("weekly", [])
+        manual = manual_override and zone.name == MAIN_ZONE # Tryb ręczny dotyczy odtwarzacza z GUI
+        key = (id(zone_sched), manual)
+        if key not in compiled:
+            if zone.name not in fingerprints:
+                fingerprints[zone.name] = schedule_engine.schedule_fingerprint(zone_sched, weekly_for)
+            fingerprint = fingerprints[zone.name]
+            compiled[key] = timelines.get(zone_sched, weekly_for, now.date(), manual, no_news_today, fingerprint)
+            upcoming += timelines.upcoming(zone_sched, weekly_for, now, DNS_PREFETCH_LEAD, manual, no_news_today,
+                                           fingerprint)
+        target_station_name, is_news = compiled[key].at(now)
         # Odtwarzaj tylko jeśli jest co i jeśli to inna stacja niż aktualna
-        if target_station_name:
-            target_url = find_station_url(target_station_name, stations)
-            currently_playing_url = mpc.get_current_url()
-            
-            # Wymuś powrót do stacji po zakończeniu newsów
-            force_play = was_news_playing and not news_played_this_cycle
-
-            if target_url and (force_play or target_url != currently_playing_url):
-                logging.info(f"Changing station to: {target_station_name} (URL: {target_url})")
-                mpc.play_url(target_url)
-        
-        was_news_playing = news_played_this_cycle
-        time.sleep(10)
+        target = find_station(target_station_name, stations, store) if target_station_name else None
+        plan.append((zone, target, is_news, zone_lookup(target, stations, store) if target else {}))
+
+    # Rozwiąż z wyprzedzeniem nazwy hostów stacji, które zaczną grać w najbliższych minutach
+    prefetch_upcoming(upcoming, stations, store)
+    if store is not None:
+        store.close()
+    export_metrics()
+    return plan, compiled, resume_at
+
+def next_wake(compiled: Dict[Tuple[int, bool], schedule_engine.Timeline], resume_at: Optional[datetime] = None) -> float:
+    """Seconds until the next pass: the nearest station change, auto-resume, failover retry or TICK_INTERVAL."""
+    now = clock.now()
+    timeout = TICK_INTERVAL
+    if resume_at is not None:
+        timeout = min(timeout, (resume_at - now).total_seconds())
+    for timeline in compiled.values():
+        change = timeline.next_change(now)
+        if change is not None:
+            timeout = min(timeout, (change - now).total_seconds())
+    for zone in list(zones.values()):
+        until_retry = zone.failover.seconds_until_due()
+        if until_retry is not None:
+            timeout = min(timeout, until_retry)
+    return max(0.0, timeout)
+
+def on_file_changed(path: Path):
+    """Config, library or lock file changed (e.g. "return to schedule" in the GUI) - run a pass now, not up to 10 s later."""
+    logging.debug(f"{path.name} changed")
+    _wake.set()
+
+async def on_player_change(zone: "Zone", changed: List[str], client: daemon_loop.AsyncMPDClient):
+    """MPD reported a player change (stop, error, another title): check the stream now, not at the next poll.
+
+    A new title goes to the track history. A failure found by the check
+    wakes the loop through the monitor. Changes made by the zone's own pass
+    (a station switch) are not checked.
+    """
+    song = await client.command("currentsong")
+    # Nazwa z dziennika odtwarzania; w trybie ręcznym demon jej nie zna - wtedy nazwa podana przez strumień
+    station = zone.journaled or song.get("Name") or ""
+    if history.observe(zone.name, station, track_history.song_title(song)):
+        zone.log.debug(f"Now playing on {station}: {track_history.song_title(song)}")
+    if "player" not in changed:
+        return
+    if zone.monitor.expected is None or (zone.busy is not None and not zone.busy.done()):
+        return
+    await tasks.blocking("idle_check", zone.monitor.check)
+
+def sync_idle(idle: Dict[str, Tuple[Tuple[str, Optional[str]], "asyncio.Task"]]):
+    """Keeps one MPD idle connection per zone, reconnecting when the zone's MPD address changed."""
+    for name in list(idle):
+        zone = zones.get(name)
+        if zone is None or idle[name][0] != (zone.mpc.transport, zone.mpc.password):
+            idle.pop(name)[1].cancel()
+    for name, zone in zones.items():
+        if name not in idle:
+            watch = daemon_loop.watch_idle(lambda z=zone: daemon_loop.AsyncMPDClient.for_controller(z.mpc),
+                                           lambda changed, client, z=zone: on_player_change(z, changed, client),
+                                           subsystems=("player", "playlist"), name=f"MPD at {zone.mpc.transport}")
+            idle[name] = ((zone.mpc.transport, zone.mpc.password), tasks.spawn(f"idle-{name}", watch))
+
+def control_handlers() -> Dict[str, Any]:
+    """Commands of the control socket (see daemon_loop.ControlServer)."""
+    return {
+        "ping": lambda request: {"pid": os.getpid()},
+        "status": lambda request: {"pid": os.getpid(), "zones": [zone.describe() for zone in zones.values()]},
+        "metrics": lambda request: {"tasks": tasks.metrics.snapshot(),
+                                    "mpd": {name: zone.mpc.metrics.snapshot() for name, zone in zones.items()}},
+        "wake": lambda request: _wake.set(),
+        "history": lambda request: [entry.as_dict() for entry in history.search(
+            request.get("text") or "", request.get("since"), request.get("until"), request.get("zone"),
+            int(request.get("limit") or 50))],
+        "telemetry": telemetry_request,
+        "prometheus": lambda request: prometheus_text(),
+        "profile": profile_request,
+        "heartbeats": lambda request: logs.heartbeats.tail(int(request.get("limit") or 0) or None),
+        "memory": lambda request: profiler.start_memory(float(request.get("seconds") or profiling.DEFAULT_SECONDS),
+                                                        int(request.get("top") or profiling.MEMORY_TOP)),
+    }
+
+def profile_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Starts a CPU profile of the daemon, or with ``stop`` ends the running one and names the report."""
+    if request.get("stop"):
+        path = profiler.stop_cpu()
+        return dict(profiler.status(), written=str(path) if path else None)
+    return profiler.start_cpu(float(request.get("seconds") or profiling.DEFAULT_SECONDS),
+                              request.get("mode") or "sample")
+
+def telemetry_request(request: Dict[str, Any]) -> Dict[str, Any]:
+    """Stations sampled (last played first) and the points of one (default: the last played); ``save`` writes the file."""
+    if request.get("save"):
+        telemetry.save()
+    stations = telemetry.stations()
+    station = request.get("station") or (stations[0] if stations else None)
+    return {"stations": stations,
+            "snapshot": telemetry.snapshot(station, request.get("since")) if station else None}
+
+def prometheus_text() -> str:
+    """All daemon metrics in the Prometheus text format, for the HTTP endpoint and the control socket."""
+    zone_list = list(zones.values())
+    by_zone = lambda value: {(zone.name,): float(value(zone)) for zone in zone_list}
+    return prometheus_metrics.render([
+        prometheus_metrics.gauge("radio_scheduler_start_time_seconds", "Start of the daemon (Unix time)",
+                                 {(): STARTED_AT}),
+        prometheus_metrics.command_histograms(
+            "radio_scheduler_task", "Duration of schedule passes, zone passes and other daemon tasks",
+            (), [((), tasks.metrics.snapshot())], command_label="task"),
+        prometheus_metrics.command_histograms(
+            "radio_scheduler_mpd_command", "Duration of MPD commands", ("zone",),
+            [((zone.name,), zone.mpc.metrics.snapshot()) for zone in zone_list]),
+        station_switches.collect(),
+        stream_failures.collect(),
+        config_reloads.collect(),
+        prometheus_metrics.gauge("radio_scheduler_current_station", "Station the zone plays (value is always 1)",
+                                 {(zone.name, zone.journaled): 1.0 for zone in zone_list if zone.journaled},
+                                 ("zone", "station")),
+        prometheus_metrics.gauge("radio_scheduler_manual_override", "Manual mode set in the GUI (1 = on)",
+                                 {(): float(_pass_state["manual_override"])}),
+        prometheus_metrics.gauge("radio_scheduler_no_news_today", "News breaks skipped today (1 = yes)",
+                                 {(): float(_pass_state["no_news_today"])}),
+        prometheus_metrics.gauge("radio_scheduler_news_playing", "News break playing (1 = yes)",
+                                 by_zone(lambda zone: zone.was_news_playing), ("zone",)),
+        prometheus_metrics.gauge("radio_scheduler_on_fallback", "Zone plays a fallback station (1 = yes)",
+                                 by_zone(lambda zone: zone.failover.on_fallback), ("zone",)),
+        prometheus_metrics.gauge("radio_scheduler_mpd_available", "MPD reachable (1 = yes)",
+                                 by_zone(lambda zone: zone.mpd_available), ("zone",)),
+    ])
+
+def prometheus_settings() -> Optional[Tuple[str, int]]:
+    """Address of the metrics endpoint from the ``prometheus`` section of the config, or None when disabled."""
+    settings = load_config_cached()[0].get("prometheus")
+    if not isinstance(settings, dict) or not settings.get("port"):
+        return None
+    return str(settings.get("host") or prometheus_metrics.DEFAULT_HOST), int(settings["port"])
+
+async def run_daemon():
+    """The daemon's event loop.
+
+    Schedule passes run one at a time in the scheduler thread; each zone's
+    pass goes to the zone pool, so a slow MPD only delays its own zone. A
+    pass runs on a station change, on a failover retry, when a playback
+    monitor, MPD idle, a watched file or the control socket wakes the loop,
+    and at least every TICK_INTERVAL.
+    """
+    loop = asyncio.get_running_loop()
+    _wake.bind(loop)
+    # Koniec okna profilu na pętli - cProfile musi zostać wyłączony w wątku, w którym go włączono
+    profiler.schedule = loop.call_later
+    profiler.install_signals(loop.add_signal_handler)
+    # SIGTERM (np. systemctl stop) kończy pętlę zwyczajnie, by zapisać metryki i dokończyć zapis logu
+    loop.add_signal_handler(signal.SIGTERM, asyncio.current_task().cancel)
+    scheduler = ThreadPoolExecutor(max_workers=1, thread_name_prefix="schedule")
+    pool: Optional[ThreadPoolExecutor] = None
+    pool_size = 0
+    idle: Dict[str, Tuple[Tuple[str, Optional[str]], asyncio.Task]] = {}
+    control: Optional[daemon_loop.ControlServer] = daemon_loop.ControlServer(control_handlers())
+    try:
+        await control.start()
+    except OSError as e:
+        logging.warning(f"Control socket unavailable: {e}")
+        control = None
+    metrics_server: Optional[prometheus_metrics.MetricsServer] = None
+    address = prometheus_settings()
+    if address is not None:
+        metrics_server = prometheus_metrics.MetricsServer(prometheus_text, *address)
+        try:
+            await metrics_server.start()
+        except OSError as e:
+            logging.warning(f"Prometheus endpoint unavailable on {address[0]}:{address[1]}: {e}")
+            metrics_server = None
+    watched = [CONFIG_PATH, MANUAL_OVERRIDE_LOCK, NO_NEWS_TODAY_LOCK] + config_store.library_files(load_config_cached()[0])
+    watcher = daemon_loop.FileWatcher(watched, on_file_changed)
+    tasks.spawn("file_watch", watcher.run())
+    tasks.spawn("loop_lag", tasks.watch_lag())
+    try:
+        while True:
+            plan, compiled, resume_at = await tasks.blocking("schedule_pass", schedule_pass, executor=scheduler)
+            if pool is None or pool_size != len(zones):
+                # Każda strefa ma własny wątek - wolny MPD jednej strefy nie opóźnia pozostałych
+                if pool is not None:
+                    pool.shutdown(wait=False)
+                pool_size = len(zones)
+                pool = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="zone")
+            sync_idle(idle)
+            for zone, target, is_news, lookup in plan:
+                if zone.busy is not None and not zone.busy.done():
+                    continue # Poprzedni obieg strefy jeszcze trwa (np. MPD odpowiada z limitem czasu)
+                zone.busy = tasks.spawn(f"zone-{zone.name}", tasks.blocking(
+                    "zone_pass", zone.tick, target, is_news, lookup, executor=pool))
+            await _wake.wait(next_wake(compiled, resume_at))
+    except asyncio.CancelledError:
+        logging.info("Daemon stopping (SIGTERM)")
+    finally:
+        await tasks.cancel_all()
+        if control is not None:
+            await control.close()
+        if metrics_server is not None:
+            await metrics_server.close()
+        scheduler.shutdown(wait=False)
+        if pool is not None:
+            pool.shutdown(wait=False)
+
+def main():
+    asyncio.run(run_daemon())
 
 if __name__ == "__main__":
+    # Polecenia wiersza poleceń; bez nich uruchamiamy demona
+    commands = {"simulate": schedule_simulator.main, "history": track_history.main,
+                "telemetry": stream_telemetry.main, "metrics": prometheus_metrics.main,
+                "profile": profiling.main}
+    if sys.argv[1:2] and sys.argv[1] in commands:
+        sys.exit(commands[sys.argv[1]](sys.argv[2:]))
     try:
+        zones[MAIN_ZONE].monitor.start()
         main()
     except Exception as e:
         logging.critical(f"Daemon terminated due to a critical error: {e}", exc_info=True)
+    finally:
+        export_metrics(force=True)
+        logs.stop()
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Pure schedule evaluation: which station should play at a given moment.
+
+``target_station`` evaluates the rules for one moment; ``upcoming_transitions``
+runs them for the next minutes, so work for an upcoming switch (DNS, URL
+resolution) can be done before the boundary. ``Timeline`` compiles a whole
+day into station runs once, and ``TimelineCache`` shares those between all
+zones with the same schedule, so the daemon's tick is a bisect per zone.
+``auto_resume_at`` is the rule that ends the manual mode by itself.
+Nothing here touches MPD, the filesystem or the clock.
+"""
+import json
+from bisect import bisect_right
+from functools import lru_cache
+from datetime import date, datetime, time, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Mapowanie niezależne od locale (0 = poniedziałek)
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+
+Rules = List[Dict[str, Any]]
+
+
+def weekday_key(moment: datetime) -> str:
+    return WEEKDAYS[moment.weekday()]
+
+
+@lru_cache(maxsize=256)
+def _clock_time(text: str) -> time:
+    """"HH:MM" as a time; the same few strings are parsed for every minute of a compiled day."""
+    return datetime.strptime(text, "%H:%M").time()
+
+
+def news_station(news_cfg: Dict[str, Any], now: datetime) -> Optional[str]:
+    """Station of the news break active at ``now`` (advanced rules or simple mode), if any.
+
+    Like the weekly rules, a window covers ``from`` up to but excluding
+    ``to``, so the result is the same for every second of a minute.
+    """
+    weekday = weekday_key(now)
+    offset = news_cfg.get("start_minute_offset", 0)
+    if news_cfg.get("use_advanced", False):
+        for rule in news_cfg.get("advanced", []):
+            if weekday in rule["days"]:
+                start = _clock_time(rule["from"])
+                end = _clock_time(rule["to"])
+                if start <= now.time() < end:
+                    # Sprawdź, czy bieżąca godzina jest w interwale i czy minuta pasuje do offsetu
+                    if now.hour % (rule["interval_minutes"] / 60) == 0 if rule["interval_minutes"] >= 60 else now.minute % rule["interval_minutes"] == 0:
+                        if offset <= now.minute < offset + rule.get("duration_minutes", 8):
+                            return rule["station"]
+        return None
+    simple = news_cfg.get("simple", {})
+    days = simple.get("days", list(WEEKDAYS))
+    if weekday in days and simple.get("station"):
+        start = _clock_time(simple.get("from", "00:00"))
+        end = _clock_time(simple.get("to", "22:00"))
+        if start <= now.time() < end:
+            interval = simple.get("interval_minutes", 60)
+            duration = simple.get("duration_minutes", 8)
+            # Godzina jest wielokrotnością interwału (dla pełnych godzin) lub minuta jest wielokrotnością interwału (< 60 min)
+            is_on_interval = (now.minute == 0 and now.hour % (interval / 60) == 0) if interval >= 60 else (now.minute % interval == 0)
+            if is_on_interval and offset <= now.minute < offset + duration:
+                return simple["station"]
+    return None
+
+
+def weekly_station(sched: Dict[str, Any], weekly: Rules, now: datetime) -> Optional[str]:
+    """Station of the first weekly rule covering ``now``, or the default station."""
+    weekday = weekday_key(now)
+    current_time_str = now.strftime("%H:%M")
+    for rule in weekly:
+        if weekday in rule["days"] and rule["from"] <= current_time_str < rule["to"]:
+            return rule["station"]
+    return sched.get("default")
+
+
+def target_station(sched: Dict[str, Any], weekly_for: Callable[[str], Rules], now: datetime,
+                   manual_override: bool = False, no_news_today: bool = False) -> Tuple[Optional[str], bool]:
+    """Returns (station name, is_news) for ``now``; the name is None when nothing should be switched.
+
+    ``weekly_for(day)`` returns the weekly rules to consider for that day.
+    """
+    news_cfg = sched.get("news_breaks", {})
+    # Newsy są włączone I (nie ma trybu ręcznego LUB tryb ręczny nie blokuje newsów)
+    should_play_news = news_cfg.get("enabled", True) and (not manual_override or not news_cfg.get("block_manual", True))
+    if not no_news_today and should_play_news:
+        name = news_station(news_cfg, now)
+        if name:
+            return name, True
+    if manual_override:
+        return None, False
+    return weekly_station(sched, weekly_for(weekday_key(now)), now), False
+
+
+def auto_resume_at(manual_since: datetime, minutes: float) -> Optional[datetime]:
+    """Moment a manual override started at ``manual_since`` expires, or None when auto-resume is off."""
+    return manual_since + timedelta(minutes=minutes) if minutes and minutes > 0 else None
+
+
+class Transition:
+    """A future moment at which the scheduled station changes."""
+    __slots__ = ("at", "station", "is_news")
+
+    def __init__(self, at: datetime, station: str, is_news: bool):
+        self.at = at
+        self.station = station
+        self.is_news = is_news
+
+    def __repr__(self):
+        return f"Transition({self.at:%a %H:%M}, {self.station!r}, news={self.is_news})"
+
+
+def upcoming_transitions(sched: Dict[str, Any], weekly_for: Callable[[str], Rules], now: datetime,
+                         horizon: timedelta, manual_override: bool = False,
+                         no_news_today: bool = False) -> List[Transition]:
+    """Station changes between ``now`` and ``now + horizon``, evaluated at each minute boundary.
+
+    Rules have minute resolution, so checking the start of every minute is
+    enough to see every switch.
+    """
+    rules_by_day: Dict[str, Rules] = {}
+
+    def cached_weekly(day: str) -> Rules:
+        if day not in rules_by_day:
+            rules_by_day[day] = weekly_for(day)
+        return rules_by_day[day]
+
+    current = target_station(sched, cached_weekly, now, manual_override, no_news_today)
+    transitions = []
+    at = now.replace(second=0, microsecond=0) + timedelta(minutes=1)
+    while at <= now + horizon:
+        state = target_station(sched, cached_weekly, at, manual_override, no_news_today)
+        if state != current:
+            if state[0]:
+                transitions.append(Transition(at, state[0], state[1]))
+            current = state
+        at += timedelta(minutes=1)
+    return transitions
+
+
+class Timeline:
+    """The schedule of one day compiled into runs: the state starting at each minute where it changes."""
+    __slots__ = ("day", "starts", "states")
+
+    def __init__(self, day: date, starts: List[int], states: List[Tuple[Optional[str], bool]]):
+        self.day = day
+        self.starts = starts # minuty od północy, rosnąco, zaczynając od 0
+        self.states = states
+
+    def at(self, moment: datetime) -> Tuple[Optional[str], bool]:
+        """(station name, is_news) at ``moment``, which must fall on ``day``."""
+        return self.states[bisect_right(self.starts, moment.hour * 60 + moment.minute) - 1]
+
+    def transitions(self, after: datetime, until: datetime) -> List[Transition]:
+        """Changes to a station within this day, in (after, until]."""
+        midnight = datetime.combine(self.day, time())
+        result = []
+        for minute, (name, is_news) in zip(self.starts[1:], self.states[1:]):
+            at = midnight + timedelta(minutes=minute)
+            if at > until:
+                break
+            if at > after and name:
+                result.append(Transition(at, name, is_news))
+        return result
+
+    def next_change(self, after: datetime) -> Optional[datetime]:
+        """Moment of the first state change after ``after`` within this day, if any."""
+        index = bisect_right(self.starts, after.hour * 60 + after.minute)
+        if index < len(self.starts):
+            return datetime.combine(self.day, time()) + timedelta(minutes=self.starts[index])
+        return None
+
+
+def compile_timeline(sched: Dict[str, Any], weekly: Rules, day: date, manual_override: bool = False,
+                     no_news_today: bool = False) -> Timeline:
+    """Evaluates the rules at every minute of ``day`` and keeps only the changes.
+
+    The rules have minute resolution, so the state at the start of a minute
+    holds until its end.
+    """
+    midnight = datetime.combine(day, time())
+    starts: List[int] = []
+    states: List[Tuple[Optional[str], bool]] = []
+    for minute in range(24 * 60):
+        state = target_station(sched, lambda _: weekly, midnight + timedelta(minutes=minute),
+                               manual_override, no_news_today)
+        if not states or state != states[-1]:
+            starts.append(minute)
+            states.append(state)
+    return Timeline(day, starts, states)
+
+
+def schedule_fingerprint(sched: Dict[str, Any], weekly_for: Callable[[str], Rules]) -> str:
+    """Content key of a schedule for the whole week; identical schedules give the same key."""
+    return json.dumps([sched.get("default"), sched.get("news_breaks"), [weekly_for(day) for day in WEEKDAYS]],
+                      sort_keys=True, default=str)
+
+
+class TimelineCache:
+    """Compiled timelines keyed by schedule content, weekday and flags - identical schedules share one.
+
+    The rules depend only on the weekday and the time of day, so a day is
+    compiled once per weekday and reused for every later week. Without a
+    ``fingerprint`` every call serializes the day's rules to find its
+    timeline; a caller that knows when the schedule changes passes
+    ``schedule_fingerprint`` computed once, and the rules are then read only
+    to compile a day.
+    """
+
+    def __init__(self, max_entries: int = 64):
+        self.max_entries = max_entries
+        self.compiled = 0
+        self._timelines: Dict[Tuple[str, int, bool, bool], Timeline] = {}
+
+    def get(self, sched: Dict[str, Any], weekly_for: Callable[[str], Rules], day: date,
+            manual_override: bool = False, no_news_today: bool = False,
+            fingerprint: Optional[str] = None) -> Timeline:
+        weekly = None
+        if fingerprint is None:
+            weekly = weekly_for(WEEKDAYS[day.weekday()])
+            fingerprint = json.dumps([sched.get("default"), sched.get("news_breaks"), weekly], sort_keys=True, default=str)
+        key = (fingerprint, day.weekday(), manual_override, no_news_today)
+        timeline = self._timelines.get(key)
+        if timeline is None:
+            if len(self._timelines) >= self.max_entries:
+                self._timelines.clear()
+            if weekly is None:
+                weekly = weekly_for(WEEKDAYS[day.weekday()])
+            timeline = self._timelines[key] = compile_timeline(sched, weekly, day, manual_override, no_news_today)
+            self.compiled += 1
+        elif timeline.day != day:
+            # Ten sam dzień tygodnia w innym tygodniu - te same przebiegi, tylko inna data
+            timeline = self._timelines[key] = Timeline(day, timeline.starts, timeline.states)
+        return timeline
+
+    def upcoming(self, sched: Dict[str, Any], weekly_for: Callable[[str], Rules], now: datetime,
+                 horizon: timedelta, manual_override: bool = False, no_news_today: bool = False,
+                 fingerprint: Optional[str] = None) -> List[Transition]:
+        """Same result as ``upcoming_transitions``, read from the compiled timelines (also across midnight)."""
+        until = now + horizon
+        current = self.get(sched, weekly_for, now.date(), manual_override, no_news_today, fingerprint)
+        result = current.transitions(now, until)
+        day = now.date() + timedelta(days=1)
+        previous = current.states[-1]
+        while datetime.combine(day, time()) <= until:
+            timeline = self.get(sched, weekly_for, day, manual_override, # "bez newsów" dotyczy tylko dzisiaj
+                                fingerprint=fingerprint)
+            if timeline.states[0] != previous and timeline.states[0][0]:
+                result.append(Transition(datetime.combine(day, time()), *timeline.states[0]))
+            result += timeline.transitions(datetime.combine(day, time()), until)
+            previous = timeline.states[-1]
+            day += timedelta(days=1)
+        return result
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Deterministic fast-forward replay of the scheduler's decisions.
+
+``simulate`` moves a virtual clock from one possible change to the next
+instead of waiting for the wall clock. Those moments are schedule
+boundaries from the compiled timelines (news breaks included), manual
+overrides, returns to the schedule and auto-resume. At each one it makes
+the daemon's decisions: news first, a forced return after the news, no
+supervision in manual mode, and a switch only when another station is
+due. Names are looked up with the daemon's ``find_station``, and a name
+missing from the library is skipped, as the daemon skips it. Every switch
+goes to an MPD backend, ``RecordingMPD`` by default, and the resulting
+timeline can be diffed between two versions of a schedule before
+deploying it.
+
+Usage: radio-scheduler.py simulate --from 2026-01-05 --to 2026-01-12 [--config PATH] [--zone NAME]
+       [--manual "2026-01-05 08:00=Station"] [--resume "2026-01-05 09:00"] [--no-news 2026-01-06] [--json]
+"""
+import argparse
+import json
+import sys
+import time
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import config_store # type: ignore
+import schedule_engine # type: ignore
+from station_registry import Station, StationRegistry, find_station # type: ignore
+
+REASON_START = "start"
+REASON_SCHEDULE = "schedule"
+REASON_NEWS = "news"
+REASON_AFTER_NEWS = "after news"
+REASON_MANUAL = "manual"
+REASON_RETURN = "return"
+REASON_AUTO_RESUME = "auto-resume"
+
+
+class VirtualClock:
+    """Clock of a simulation: time moves only when ``advance_to`` is called."""
+    __slots__ = ("current",)
+
+    def __init__(self, start: datetime):
+        self.current = start
+
+    def now(self) -> datetime:
+        return self.current
+
+    def advance_to(self, moment: datetime):
+        if moment < self.current:
+            raise ValueError(f"cannot go back from {self.current} to {moment}")
+        self.current = moment
+
+
+class RecordingMPD:
+    """MPD backend that only notes what it was told to play (an ``MPCController`` works too)."""
+
+    def __init__(self):
+        self.played: List[str] = []
+
+    def play_url(self, url: str) -> bool:
+        self.played.append(url)
+        return True
+
+    def get_current_url(self) -> Optional[str]:
+        return self.played[-1] if self.played else None
+
+
+class Change:
+    """A station switch of the simulated timeline."""
+    __slots__ = ("at", "station", "is_news", "reason")
+
+    def __init__(self, at: datetime, station: str, is_news: bool, reason: str):
+        self.at = at
+        self.station = station
+        self.is_news = is_news
+        self.reason = reason
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"at": self.at.isoformat(timespec="seconds"), "station": self.station,
+                "is_news": self.is_news, "reason": self.reason}
+
+    def format(self) -> str:
+        return f"{self.at:%Y-%m-%d %a %H:%M:%S}  {self.station:<30} {self.reason}"
+
+    def __repr__(self):
+        return f"Change({self.at:%Y-%m-%d %H:%M}, {self.station!r}, {self.reason})"
+
+
+def simulate(config: Dict[str, Any], start: datetime, end: datetime,
+             manual: Iterable[Tuple[datetime, str]] = (), resumes: Iterable[datetime] = (),
+             no_news_days: Iterable[date] = (), zone: Optional[str] = None,
+             clock: Optional[VirtualClock] = None, mpd: Any = None,
+             timelines: Optional[schedule_engine.TimelineCache] = None,
+             missing: Optional[Set[str]] = None) -> List[Change]:
+    """Station changes between ``start`` and ``end`` (exclusive) as the daemon would make them.
+
+    ``manual`` lists (moment, station) picked in the GUI and ``resumes``
+    the moments of "return to schedule"; both concern the main zone only,
+    as in the daemon. ``zone`` selects an extra zone with its own
+    schedule. Scheduled names that are not in the library are added to
+    ``missing``.
+    """
+    sched = config.get("schedule") or {}
+    if zone is not None:
+        entry = next((z for z in config.get("zones") or [] if isinstance(z, dict) and z.get("name") == zone), None)
+        if entry is None:
+            raise ValueError(f"no zone named {zone!r}")
+        if isinstance(entry.get("schedule"), dict):
+            sched = entry["schedule"]
+        manual, resumes = (), ()
+    weekly = sched.get("weekly") or []
+    stations = StationRegistry.from_dicts(config.get("stations") or [])
+    missing = missing if missing is not None else set()
+    for _, name in manual:
+        if find_station(name, stations, quiet=True) is None:
+            raise ValueError(f"no station named {name!r} for a manual override")
+    auto_resume_minutes = config.get("auto_resume_minutes", 0)
+    no_news: Set[date] = set(no_news_days)
+    clock = clock or VirtualClock(start)
+    mpd = mpd or RecordingMPD()
+    timelines = timelines or schedule_engine.TimelineCache()
+
+    events = sorted([(at, 0, station) for at, station in manual] + [(at, 1, None) for at in resumes],
+                    key=lambda e: (e[0], e[1]))
+    changes: List[Change] = []
+    current: Optional[str] = None
+    was_news = False
+    manual_since: Optional[datetime] = None
+    pending_reason: Optional[str] = REASON_START
+    index = 0
+    timeline_key = None
+
+    def play(now: datetime, station: Station, is_news: bool, reason: str):
+        nonlocal current
+        mpd.play_url(station.url)
+        current = station.name
+        changes.append(Change(now, station.name, is_news, reason))
+
+    clock.advance_to(start)
+    now = start
+    while now < end:
+        while index < len(events) and events[index][0] <= now:
+            _, kind, station = events[index]
+            index += 1
+            if kind == 0:
+                # GUI zakłada blokadę i sam włącza wybraną stację
+                manual_since = now
+                play(now, find_station(station, stations, quiet=True), False, REASON_MANUAL)
+            elif manual_since is not None:
+                manual_since = None
+                pending_reason = REASON_RETURN
+        resume_at = schedule_engine.auto_resume_at(manual_since, auto_resume_minutes) if manual_since else None
+        if resume_at is not None and now >= resume_at:
+            manual_since = resume_at = None
+            pending_reason = REASON_AUTO_RESUME
+
+        key = (now.date(), manual_since is not None, now.date() in no_news)
+        if key != timeline_key:
+            timeline_key = key
+            timeline = timelines.get(sched, lambda day: weekly, *key)
+        name, is_news = timeline.at(now)
+        # Jak demon: stacji spoza biblioteki nie włączamy, MPD gra dalej to, co grał
+        station = find_station(name, stations, quiet=True) if name else None
+        if station is None and name:
+            missing.add(name)
+        if station is not None:
+            force_play = was_news and not is_news # Jak demon: po newsach zawsze włączamy stację od nowa
+            if force_play or station.name != current:
+                reason = pending_reason or (REASON_NEWS if is_news else REASON_AFTER_NEWS if force_play else REASON_SCHEDULE)
+                play(now, station, is_news, reason)
+        pending_reason = None
+        was_news = is_news
+
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        candidates = [end, timeline.next_change(now) or midnight, midnight]
+        if index < len(events):
+            candidates.append(events[index][0])
+        if resume_at is not None:
+            candidates.append(resume_at)
+        now = min(c for c in candidates if c > now)
+        clock.advance_to(now)
+    return changes
+
+
+def _moment(text: str) -> datetime:
+    try:
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a date or date and time: {text!r}")
+
+
+def _manual(text: str) -> Tuple[datetime, str]:
+    moment, sep, station = text.partition("=")
+    if not sep or not station:
+        raise argparse.ArgumentTypeError(f"expected MOMENT=STATION, got {text!r}")
+    return _moment(moment.strip()), station.strip()
+
+
+def main(argv=None):
+    """Command-line entry point: prints the simulated timeline, one change per line."""
+    parser = argparse.ArgumentParser(prog="radio-scheduler.py simulate",
+                                     description="Replay the scheduler's decisions for a period without waiting for the clock")
+    parser.add_argument("--from", dest="start", type=_moment, required=True, help="Start, e.g. 2026-01-05 or 2026-01-05T06:00")
+    parser.add_argument("--to", dest="end", type=_moment, required=True, help="End (exclusive)")
+    parser.add_argument("--config", type=Path, default=config_store.CONFIG_PATH)
+    parser.add_argument("--zone", help="Simulate an extra zone instead of the main one")
+    parser.add_argument("--manual", type=_manual, action="append", default=[], metavar="MOMENT=STATION",
+                        help="Manual override: station picked in the GUI at MOMENT (repeatable)")
+    parser.add_argument("--resume", type=_moment, action="append", default=[], metavar="MOMENT",
+                        help="Return to the schedule at MOMENT (repeatable)")
+    parser.add_argument("--no-news", type=lambda s: _moment(s).date(), action="append", default=[], metavar="DATE",
+                        help="Day with news breaks switched off (repeatable)")
+    parser.add_argument("--json", action="store_true", help="One JSON object per change")
+    args = parser.parse_args(argv)
+    if args.end <= args.start:
+        parser.error("--to must be after --from")
+
+    config = config_store.load_config(args.config)
+    started = time.perf_counter()
+    timelines = schedule_engine.TimelineCache()
+    missing: Set[str] = set()
+    try:
+        changes = simulate(config, args.start, args.end, args.manual, args.resume, args.no_news,
+                           zone=args.zone, timelines=timelines, missing=missing)
+    except ValueError as e:
+        parser.error(str(e))
+    elapsed = time.perf_counter() - started
+    for change in changes:
+        print(json.dumps(change.as_dict()) if args.json else change.format())
+    for name in sorted(missing):
+        print(f"Station not found: {name} (the daemon does not switch to it)", file=sys.stderr)
+    days = (args.end - args.start).total_seconds() / 86400
+    print(f"{len(changes)} changes in {days:g} days, simulated in {elapsed * 1000:.1f} ms "
+          f"({timelines.compiled} timelines compiled)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
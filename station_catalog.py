@@ -0,0 +1,344 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Offline station catalog with full-text search (SQLite FTS5).
+
+A radio-browser dump (JSON array, JSON lines or CSV) is streamed into
+``catalog.db`` in batches, so hundreds of thousands of entries can be
+imported without loading the file into memory. Searches use an FTS5 index
+with prefix matching on name, tags, country and language, and fall back to a
+trigram index on names for misspelled queries.
+"""
+import codecs
+import csv
+import io
+import json
+import logging
+import re
+import sqlite3
+import sys
+import time
+from difflib import SequenceMatcher
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from config_store import CONFIG_DIR # type: ignore
+from station_registry import Station # type: ignore
+
+CATALOG_PATH = CONFIG_DIR / "catalog.db"
+
+BATCH_SIZE = 5000
+_CHUNK_SIZE = 1 << 20
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS catalog (
+    id INTEGER PRIMARY KEY,
+    uuid TEXT UNIQUE,
+    name TEXT NOT NULL,
+    url TEXT NOT NULL,
+    tags TEXT,
+    country TEXT,
+    language TEXT,
+    codec TEXT,
+    bitrate INTEGER,
+    votes INTEGER
+);
+CREATE TABLE IF NOT EXISTS catalog_meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE VIRTUAL TABLE IF NOT EXISTS catalog_fts USING fts5(
+    name, tags, country, language,
+    content='catalog', content_rowid='id',
+    tokenize='unicode61 remove_diacritics 2', prefix='1 2 3'
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS catalog_trigram USING fts5(
+    name, content='catalog', content_rowid='id', tokenize='trigram'
+);
+"""
+
+_COLUMNS = ("id", "name", "url", "tags", "country", "language", "codec", "bitrate", "votes")
+_ROW_COLUMNS = ("uuid",) + _COLUMNS[1:]
+_SELECT = "SELECT c.id, c.name, c.url, c.tags, c.country, c.language, c.codec, c.bitrate, c.votes FROM catalog c"
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+# (record, bytes_read)
+Record = Tuple[Dict[str, Any], int]
+
+
+class CatalogEntry:
+    """A single search result from the catalog."""
+    __slots__ = _COLUMNS
+
+    def __init__(self, row):
+        for key, value in zip(_COLUMNS, row):
+            setattr(self, key, value)
+
+    @property
+    def genre(self) -> Optional[str]:
+        """The first radio-browser tag, used as the genre when adding the station."""
+        first = (self.tags or "").split(",", 1)[0].strip()
+        return first or None
+
+    def to_station(self) -> Station:
+        return Station(self.name, self.url, self.genre)
+
+    def __repr__(self):
+        return f"CatalogEntry({self.name!r}, {self.url!r})"
+
+
+def iter_json(path: Path) -> Iterator[Record]:
+    """Streams objects from a JSON array or a JSON-lines file without reading it whole."""
+    decoder = json.JSONDecoder()
+    utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    buf, pos, read, eof = "", 0, 0, False
+    with open(path, "rb") as f:
+        while True:
+            # Pomijamy separatory między obiektami: "[", ",", "]" i białe znaki
+            while pos < len(buf) and buf[pos] in " \t\r\n,[]\ufeff":
+                pos += 1
+            if pos < len(buf):
+                try:
+                    obj, end = decoder.raw_decode(buf, pos)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    pos = end
+                    if isinstance(obj, dict):
+                        yield obj, read
+                    continue
+            elif eof:
+                return
+            chunk = f.read(_CHUNK_SIZE)
+            read += len(chunk)
+            eof = not chunk
+            buf = buf[pos:] + utf8.decode(chunk, final=eof)
+            pos = 0
+
+
+def iter_csv(path: Path) -> Iterator[Record]:
+    """Streams rows of a CSV dump as dicts keyed by the header line."""
+    with open(path, "rb") as raw:
+        text = io.TextIOWrapper(raw, encoding="utf-8", errors="replace", newline="")
+        for row in csv.DictReader(text):
+            yield row, raw.tell()
+
+
+def iter_dump(path: Path) -> Iterator[Record]:
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        return iter_csv(path)
+    return iter_json(path)
+
+
+def _to_int(value) -> Optional[int]:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _record_to_row(record: Dict[str, Any]):
+    url = (record.get("url_resolved") or record.get("url") or "").strip()
+    name = (record.get("name") or "").strip()
+    if not url or not name:
+        return None
+    tags = record.get("tags")
+    if isinstance(tags, list):
+        tags = ",".join(tags)
+    return (record.get("stationuuid") or record.get("uuid") or None, name, url, tags or None,
+            record.get("country") or None, record.get("language") or None, record.get("codec") or None,
+            _to_int(record.get("bitrate")), _to_int(record.get("votes")))
+
+
+class IngestResult:
+    """Outcome of a catalog import."""
+    __slots__ = ("records", "skipped", "elapsed", "cancelled")
+
+    def __init__(self):
+        self.records = 0
+        self.skipped = 0
+        self.elapsed = 0.0
+        self.cancelled = False
+
+    @property
+    def records_per_second(self) -> float:
+        return self.records / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class _Cancelled(Exception):
+    """Aborts the import transaction."""
+
+
+class StationCatalog:
+    """Searchable catalog of radio-browser stations kept in its own SQLite database."""
+
+    def __init__(self, path: Path = CATALOG_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(_SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def count(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM catalog").fetchone()[0]
+
+    def meta(self, key: str) -> Optional[str]:
+        row = self.conn.execute("SELECT value FROM catalog_meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    # --- Import ---
+    def ingest(self, path: Path,
+               progress: Optional[Callable[[int, int], None]] = None,
+               cancelled: Optional[Callable[[], bool]] = None) -> IngestResult:
+        """Replaces the catalog with the contents of a dump, streamed in batches.
+
+        Rows go to a temporary table first and are then copied sorted by
+        votes, so row ids follow popularity and searches can return the most
+        popular matches without ranking every hit. The search indexes are
+        rebuilt once at the end. ``progress(bytes_read, total_bytes)`` is
+        called after every batch and ``cancelled()`` is polled; a cancelled
+        import is rolled back.
+        """
+        path = Path(path)
+        total = path.stat().st_size
+        result = IngestResult()
+        start = time.perf_counter()
+        batch = []
+        self.conn.execute("PRAGMA synchronous=OFF")
+        try:
+            with self.conn:
+                self.conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS staging ({', '.join(_ROW_COLUMNS)})")
+                self.conn.execute("DELETE FROM staging")
+                insert = f"INSERT INTO staging VALUES ({', '.join('?' * len(_ROW_COLUMNS))})"
+                for record, read in iter_dump(path):
+                    row = _record_to_row(record)
+                    if row is None:
+                        result.skipped += 1
+                        continue
+                    batch.append(row)
+                    if len(batch) >= BATCH_SIZE:
+                        self.conn.executemany(insert, batch)
+                        result.records += len(batch)
+                        batch.clear()
+                        if progress:
+                            progress(read, total)
+                        if cancelled and cancelled():
+                            result.cancelled = True
+                            raise _Cancelled()
+                self.conn.executemany(insert, batch)
+                result.records += len(batch)
+                columns = ", ".join(_ROW_COLUMNS)
+                self.conn.execute("DELETE FROM catalog")
+                # Przy powtórzonym uuid zostaje wpis z największą liczbą głosów
+                self.conn.execute(f"INSERT OR IGNORE INTO catalog ({columns}) "
+                                  f"SELECT {columns} FROM staging ORDER BY votes DESC")
+                self.conn.execute("DROP TABLE staging")
+                result.records = self.count()
+                self.conn.execute("INSERT INTO catalog_fts(catalog_fts) VALUES('rebuild')")
+                self.conn.execute("INSERT INTO catalog_trigram(catalog_trigram) VALUES('rebuild')")
+                self.conn.executemany("INSERT OR REPLACE INTO catalog_meta (key, value) VALUES (?, ?)",
+                                      [("source", str(path)), ("imported_at", time.strftime("%Y-%m-%d %H:%M:%S"))])
+        except _Cancelled:
+            pass
+        finally:
+            self.conn.execute("PRAGMA synchronous=FULL")
+        if progress and not result.cancelled:
+            progress(total, total)
+        result.elapsed = time.perf_counter() - start
+        logger.info(f"Catalog import from {path}: {result.records} records in {result.elapsed:.1f}s")
+        return result
+
+    # --- Search ---
+    def _match(self, table: str, match: str, limit: int, exclude=()) -> List[CatalogEntry]:
+        # Kolejność rowid = popularność, więc LIMIT bez sortowania po rank zwraca najpopularniejsze trafienia
+        rows = self.conn.execute(
+            f"{_SELECT} WHERE c.id IN (SELECT rowid FROM {table} WHERE {table} MATCH ? ORDER BY rowid LIMIT ?) "
+            "ORDER BY c.id", (match, limit + len(exclude))).fetchall()
+        return [CatalogEntry(r) for r in rows if r[0] not in exclude][:limit]
+
+    def search(self, query: str, limit: int = 50, fuzzy: bool = True) -> List[CatalogEntry]:
+        """Prefix search on all words of ``query``, most popular stations first.
+
+        Name matches come before matches in tags, country or language; if
+        there are still fewer than ``limit`` hits, fuzzy name matches are added.
+        """
+        words = _WORD.findall(query.lower())
+        if not words:
+            return []
+        terms = " ".join(f'"{w}"*' for w in words)
+        results = self._match("catalog_fts", f"name : ({terms})", limit)
+        if len(results) < limit:
+            results += self._match("catalog_fts", terms, limit - len(results), {e.id for e in results})
+        if fuzzy and len(results) < limit:
+            found = {e.id for e in results}
+            results += [e for e in self.fuzzy_search(query, limit) if e.id not in found][:limit - len(results)]
+        return results
+
+    def fuzzy_search(self, query: str, limit: int = 50, min_ratio: float = 0.5) -> List[CatalogEntry]:
+        """Typo-tolerant name search: candidates sharing trigrams with the query, ranked by similarity."""
+        words = _WORD.findall(query.lower())
+        text = " ".join(words)
+        # Każde słowo musi mieć przynajmniej jeden wspólny trigram - zawęża kandydatów przed rankingiem
+        groups = []
+        for word in words:
+            grams = sorted({word[i:i + 3] for i in range(len(word) - 2)})
+            if grams:
+                groups.append("(" + " OR ".join(f'"{g}"' for g in grams) + ")")
+        if not groups:
+            return []
+        match = " AND ".join(groups)
+        rows = self.conn.execute(
+            f"{_SELECT} JOIN catalog_trigram t ON t.rowid = c.id WHERE catalog_trigram MATCH ? "
+            "ORDER BY rank LIMIT ?", (match, limit * 4)).fetchall()
+        scored = []
+        for row in rows:
+            entry = CatalogEntry(row)
+            ratio = SequenceMatcher(None, text, entry.name.lower()).ratio()
+            if ratio >= min_ratio:
+                scored.append((ratio, entry.votes or 0, entry))
+        scored.sort(key=lambda s: (s[0], s[1]), reverse=True)
+        return [entry for _, _, entry in scored[:limit]]
+
+
+def main(argv=None):
+    """Command-line import and search for the offline catalog."""
+    import argparse
+    parser = argparse.ArgumentParser(description="RadioScheduler offline station catalog")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_import = sub.add_parser("import", help="Import a radio-browser JSON/CSV dump")
+    p_import.add_argument("dump", type=Path)
+    p_search = sub.add_parser("search", help="Search the catalog")
+    p_search.add_argument("query")
+    p_search.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--db", type=Path, default=CATALOG_PATH, help="Path to the catalog database")
+    args = parser.parse_args(argv)
+
+    with StationCatalog(args.db) as catalog:
+        if args.command == "import":
+            result = catalog.ingest(args.dump)
+            print(f"Imported {result.records} stations ({result.skipped} skipped) "
+                  f"in {result.elapsed:.1f}s, {result.records_per_second:,.0f} records/s")
+        else:
+            start = time.perf_counter()
+            results = catalog.search(args.query, args.limit)
+            elapsed = (time.perf_counter() - start) * 1000
+            for entry in results:
+                print(f"{entry.name}\t{entry.url}\t{entry.tags or ''}\t{entry.country or ''}")
+            print(f"{len(results)} results in {elapsed:.1f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,457 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Concurrent station health probing with a persistent result cache.
+
+Many Icecast/Shoutcast servers reject or mishandle HEAD, so each probe opens
+the stream with a ranged/streaming GET instead, reads the headers and the
+first few KB of audio (enough to detect the codec) and resets the connection.
+Probes run in a bounded thread pool with a limit of simultaneous connections
+per host; results (reachability, HTTP status, connect time, time to first
+byte and first audio byte, content type, codec, ICY bitrate) are kept in a
+JSON cache with a TTL, shared by the GUI and the command line.
+"""
+import json
+import logging
+import re
+import socket
+import ssl
+import struct
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from config_store import CONFIG_DIR, write_atomic # type: ignore
+
+HEALTH_CACHE_PATH = CONFIG_DIR / "health_cache.json"
+
+DEFAULT_TTL = 6 * 3600
+DEFAULT_TIMEOUT = 5.0
+DEFAULT_CONCURRENCY = 32
+DEFAULT_PER_HOST = 4
+MAX_REDIRECTS = 5
+SNIFF_BYTES = 4096
+USER_AGENT = "RadioScheduler/1.0"
+
+_MAX_HEADER_BYTES = 16 * 1024
+_REDIRECTS = (301, 302, 303, 307, 308)
+_FIRST_INT = re.compile(r"\d+")
+_CODEC_BY_TYPE = {
+    "audio/mpeg": "mp3", "audio/mp3": "mp3", "audio/aac": "aac", "audio/aacp": "aac", "audio/x-aac": "aac",
+    "audio/ogg": "ogg", "application/ogg": "ogg", "audio/opus": "opus", "audio/flac": "flac",
+}
+
+logger = logging.getLogger(__name__)
+
+
+class ProbeResult:
+    """Outcome of a single station probe."""
+    __slots__ = ("url", "ok", "status", "ttfb", "content_type", "bitrate", "final_url", "error", "checked_at",
+                 "connect_time", "audio_ttfb", "codec", "received")
+
+    def __init__(self, url: str, ok: bool = False, status: Optional[int] = None, ttfb: Optional[float] = None,
+                 content_type: Optional[str] = None, bitrate: Optional[int] = None,
+                 final_url: Optional[str] = None, error: Optional[str] = None,
+                 checked_at: Optional[float] = None, connect_time: Optional[float] = None,
+                 audio_ttfb: Optional[float] = None, codec: Optional[str] = None, received: int = 0):
+        self.url = url
+        self.ok = ok
+        self.status = status
+        self.ttfb = ttfb
+        self.content_type = content_type
+        self.bitrate = bitrate
+        self.final_url = final_url
+        self.error = error
+        self.checked_at = checked_at if checked_at is not None else time.time()
+        self.connect_time = connect_time
+        self.audio_ttfb = audio_ttfb
+        self.codec = codec
+        self.received = received
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "ProbeResult":
+        return cls(**{k: data.get(k) for k in cls.__slots__ if k in data})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {k: getattr(self, k) for k in self.__slots__}
+
+    def age(self, now: Optional[float] = None) -> float:
+        return (now if now is not None else time.time()) - self.checked_at
+
+    def __repr__(self):
+        return f"ProbeResult({self.url!r}, ok={self.ok}, status={self.status}, error={self.error!r})"
+
+
+# --- Probing ---
+def _parse_bitrate(headers: Dict[str, str]) -> Optional[int]:
+    value = headers.get("icy-br")
+    if not value:
+        # Icecast: "ice-audio-info: ice-samplerate=44100;ice-bitrate=128;ice-channels=2"
+        info = headers.get("ice-audio-info", "")
+        value = next((part.split("=", 1)[1] for part in info.split(";")
+                      if part.strip().lower().startswith(("ice-bitrate=", "bitrate="))), None)
+    match = _FIRST_INT.search(value or "")
+    return int(match.group()) if match else None
+
+
+def _read_head(sock: socket.socket) -> Tuple[bytes, bytes]:
+    """Reads until the end of the response headers; returns (head, start of the body)."""
+    data = b""
+    while True:
+        chunk = sock.recv(4096)
+        if not chunk:
+            return data, b""
+        data += chunk
+        for sep in (b"\r\n\r\n", b"\n\n"):
+            end = data.find(sep)
+            if end >= 0:
+                return data[:end], data[end + len(sep):]
+        if len(data) > _MAX_HEADER_BYTES:
+            raise ValueError("Response headers too long")
+
+
+def _parse_head(head: bytes) -> Tuple[int, Dict[str, str]]:
+    lines = head.decode("latin-1").splitlines()
+    # "HTTP/1.1 200 OK" albo "ICY 200 OK" (Shoutcast v1)
+    parts = lines[0].split(None, 2) if lines else []
+    if len(parts) < 2 or not parts[1].isdigit():
+        raise ValueError(f"Invalid status line: {lines[0] if lines else ''!r}")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            key, value = line.split(":", 1)
+            headers[key.strip().lower()] = value.strip()
+    return int(parts[1]), headers
+
+
+def detect_codec(data: bytes, content_type: Optional[str] = None) -> Optional[str]:
+    """Guesses the audio codec from the first bytes of a stream, falling back to the content type."""
+    if data.startswith(b"OggS"):
+        head = data[:512]
+        for marker, codec in ((b"OpusHead", "opus"), (b"\x01vorbis", "vorbis"), (b"\x7fFLAC", "flac")):
+            if marker in head:
+                return codec
+        return "ogg"
+    if data.startswith(b"fLaC"):
+        return "flac"
+    if data.startswith(b"ID3"):
+        return "mp3"
+    # Synchronizacja ramki MPEG/ADTS: 11 (MPEG) lub 12 (ADTS) jedynek na początku nagłówka
+    sync = data.find(b"\xff")
+    while 0 <= sync < min(len(data) - 1, 2048):
+        second = data[sync + 1]
+        if second & 0xF6 == 0xF0:
+            return "aac"
+        if second & 0xE0 == 0xE0 and (second >> 1) & 3:
+            return "mp3" if (second >> 1) & 3 == 1 else "mp2"
+        sync = data.find(b"\xff", sync + 1)
+    if content_type:
+        return _CODEC_BY_TYPE.get(content_type.split(";", 1)[0].strip().lower())
+    return None
+
+
+def _open(url: str, timeout: float, method: str = "GET", sniff_bytes: int = 0) -> Tuple[socket.socket, float]:
+    """Connects and sends the request; returns the socket and the connect (plus TLS) time."""
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise ValueError(f"Unsupported URL: {url}")
+    port = parts.port or (443 if parts.scheme == "https" else 80)
+    start = time.perf_counter()
+    sock = socket.create_connection((parts.hostname, port), timeout=timeout)
+    try:
+        if parts.scheme == "https":
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=parts.hostname)
+        connect_time = time.perf_counter() - start
+        path = parts.path or "/"
+        if parts.query:
+            path = f"{path}?{parts.query}"
+        # HTTP/1.0 - serwer nie użyje kodowania chunked i zamknie połączenie po naszej stronie
+        request = (f"{method} {path} HTTP/1.0\r\nHost: {parts.netloc}\r\nUser-Agent: {USER_AGENT}\r\n"
+                   "Accept: */*\r\nIcy-MetaData: 1\r\nConnection: close\r\n")
+        if sniff_bytes:
+            # Serwery plików zwrócą tylko początek; Icecast/Shoutcast zignorują nagłówek i będą nadawać dalej
+            request += f"Range: bytes=0-{sniff_bytes - 1}\r\n"
+        sock.sendall((request + "\r\n").encode("latin-1"))
+    except BaseException:
+        sock.close()
+        raise
+    return sock, connect_time
+
+
+def _abort(sock: socket.socket):
+    """Closes the connection with a reset, so the server stops sending the stream immediately."""
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))
+    except OSError:
+        pass
+    sock.close()
+
+
+class Response:
+    """Headers and the first bytes of the body of an HTTP/ICY response."""
+    __slots__ = ("url", "status", "headers", "body", "connect_time", "ttfb", "body_ttfb", "received")
+
+    def __init__(self, url, status, headers, body, connect_time, ttfb, body_ttfb, received):
+        self.url = url
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.connect_time = connect_time
+        self.ttfb = ttfb
+        self.body_ttfb = body_ttfb
+        self.received = received
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status < 300
+
+
+def fetch(url: str, timeout: float = DEFAULT_TIMEOUT, method: str = "GET", read_bytes: int = 0,
+          read_if: Optional[Callable[[str, Dict[str, str]], bool]] = None) -> Response:
+    """Requests ``url`` following redirects, reads the headers and at most ``read_bytes`` of a 2xx body.
+
+    With ``read_if`` the body is read only when ``read_if(final_url, headers)``
+    is true, so one request serves callers that decide from the headers. The
+    connection is reset afterwards, so live streams are never downloaded.
+    ``Response.url`` is the URL after redirects. Raises OSError or ValueError.
+    """
+    start = time.perf_counter()
+    current = url
+    connect_time = 0.0
+    for _ in range(MAX_REDIRECTS + 1):
+        sock, connect = _open(current, timeout, method, read_bytes)
+        connect_time += connect
+        try:
+            head, body = _read_head(sock)
+            ttfb = time.perf_counter() - start
+            if not head:
+                raise ValueError("Empty response")
+            status, headers = _parse_head(head)
+            if status in _REDIRECTS and headers.get("location"):
+                current = urljoin(current, headers["location"])
+                continue
+            body_ttfb = ttfb if body else None
+            if read_if is not None and not read_if(current, headers):
+                body = b""
+            elif 200 <= status < 300 and method == "GET" and read_bytes:
+                # Czytamy tylko kilka KB strumienia - wystarczy do rozpoznania kodeka
+                while len(body) < read_bytes:
+                    try:
+                        chunk = sock.recv(read_bytes - len(body))
+                    except socket.timeout:
+                        break
+                    if not chunk:
+                        break
+                    if body_ttfb is None:
+                        body_ttfb = time.perf_counter() - start
+                    body += chunk
+            return Response(current, status, headers, body[:read_bytes], connect_time, ttfb, body_ttfb,
+                            len(head) + len(body))
+        finally:
+            _abort(sock)
+    raise ValueError("Too many redirects")
+
+
+def _request(url: str, timeout: float, method: str, sniff_bytes: int) -> ProbeResult:
+    response = fetch(url, timeout, method, sniff_bytes)
+    content_type = response.headers.get("content-type")
+    return ProbeResult(url, ok=response.ok, status=response.status, ttfb=response.ttfb, content_type=content_type,
+                       bitrate=_parse_bitrate(response.headers), final_url=response.url,
+                       error=None if response.ok else f"HTTP {response.status}", connect_time=response.connect_time,
+                       audio_ttfb=response.body_ttfb if response.body else None,
+                       codec=detect_codec(response.body, content_type) if response.ok else None,
+                       received=response.received)
+
+
+def probe(url: str, timeout: float = DEFAULT_TIMEOUT, sniff_bytes: int = SNIFF_BYTES,
+          head_first: bool = False) -> ProbeResult:
+    """Probes a stream without downloading it.
+
+    Sends a ranged/streaming GET (following redirects), reads the headers and
+    the first ``sniff_bytes`` of audio, then resets the connection. With
+    ``head_first`` a HEAD request is tried first and the GET is only used when
+    the server rejects or mishandles HEAD, as many Icecast/Shoutcast servers do.
+    """
+    try:
+        if head_first:
+            result = _request(url, timeout, "HEAD", 0)
+            if result.ok:
+                return result
+            logger.debug(f"HEAD failed for {url} ({result.error}), falling back to GET")
+        return _request(url, timeout, "GET", sniff_bytes)
+    except (OSError, ValueError) as e:
+        return ProbeResult(url, error=str(e) or type(e).__name__)
+
+
+# --- Cache ---
+class HealthCache:
+    """Probe results per URL, persisted as JSON. Entries older than ``ttl`` seconds count as stale."""
+
+    def __init__(self, path: Path = HEALTH_CACHE_PATH, ttl: float = DEFAULT_TTL):
+        self.path = Path(path)
+        self.ttl = ttl
+        self._results: Dict[str, ProbeResult] = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+            self._results = {url: ProbeResult.from_dict(entry) for url, entry in data.items()}
+        except FileNotFoundError:
+            self._results = {}
+        except (ValueError, TypeError, AttributeError) as e:
+            logger.warning(f"Ignoring unreadable health cache {self.path}: {e}")
+            self._results = {}
+
+    def save(self):
+        with self._lock:
+            data = {url: result.to_dict() for url, result in self._results.items()}
+        write_atomic(self.path, json.dumps(data))
+
+    def get(self, url: str) -> Optional[ProbeResult]:
+        """Returns the result for ``url`` if it is still fresh."""
+        result = self._results.get(url)
+        return result if result is not None and result.age() < self.ttl else None
+
+    def latest(self, url: str) -> Optional[ProbeResult]:
+        """Returns the last known result for ``url``, however old."""
+        return self._results.get(url)
+
+    def put(self, result: ProbeResult):
+        with self._lock:
+            self._results[result.url] = result
+
+    def prune(self, keep_urls: Iterable[str]):
+        """Drops results of URLs that are no longer on the station list."""
+        keep = set(keep_urls)
+        with self._lock:
+            self._results = {url: r for url, r in self._results.items() if url in keep}
+
+    def __len__(self):
+        return len(self._results)
+
+
+# --- Prober ---
+def _interleave_by_host(urls: List[str]) -> List[str]:
+    """Orders URLs round-robin over hosts, so pool threads are not all stuck behind one host's limit."""
+    groups: Dict[str, List[str]] = OrderedDict()
+    for url in urls:
+        groups.setdefault(urlsplit(url).netloc.lower(), []).append(url)
+    ordered = []
+    queues = [iter(g) for g in groups.values()]
+    while queues:
+        alive = []
+        for q in queues:
+            url = next(q, None)
+            if url is not None:
+                ordered.append(url)
+                alive.append(q)
+        queues = alive
+    return ordered
+
+
+class StationProber:
+    """Probes many stations concurrently with a bounded pool and a per-host connection limit."""
+
+    def __init__(self, cache: Optional[HealthCache] = None, concurrency: int = DEFAULT_CONCURRENCY,
+                 per_host: int = DEFAULT_PER_HOST, timeout: float = DEFAULT_TIMEOUT,
+                 probe_fn: Callable[[str, float], ProbeResult] = probe):
+        self.cache = cache
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.probe_fn = probe_fn
+        self._host_limits: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_lock = threading.Lock()
+
+    def _host_limit(self, url: str) -> threading.BoundedSemaphore:
+        host = urlsplit(url).netloc.lower()
+        with self._host_lock:
+            sem = self._host_limits.get(host)
+            if sem is None:
+                sem = self._host_limits[host] = threading.BoundedSemaphore(self.per_host)
+            return sem
+
+    def _probe_limited(self, url: str) -> ProbeResult:
+        with self._host_limit(url):
+            return self.probe_fn(url, self.timeout)
+
+    def probe_all(self, urls: Iterable[str], force: bool = False,
+                  progress: Optional[Callable[[int, int], None]] = None,
+                  cancelled: Optional[Callable[[], bool]] = None) -> Dict[str, ProbeResult]:
+        """Probes ``urls`` and returns results by URL.
+
+        Fresh cached results are reused unless ``force`` is set. New results
+        are stored in the cache, which is saved at the end (also after a
+        cancellation, keeping what was probed so far).
+        ``progress(done, total)`` is called after every probe.
+        """
+        results: Dict[str, ProbeResult] = {}
+        pending = []
+        for url in dict.fromkeys(urls):
+            cached = None if force or self.cache is None else self.cache.get(url)
+            if cached is not None:
+                results[url] = cached
+            else:
+                pending.append(url)
+        total = len(results) + len(pending)
+        done = len(results)
+        if progress:
+            progress(done, total)
+        with ThreadPoolExecutor(max_workers=max(1, min(self.concurrency, len(pending) or 1))) as pool:
+            futures = {pool.submit(self._probe_limited, url): url for url in _interleave_by_host(pending)}
+            for future in as_completed(futures):
+                result = future.result()
+                results[result.url] = result
+                if self.cache is not None:
+                    self.cache.put(result)
+                done += 1
+                if progress:
+                    progress(done, total)
+                if cancelled and cancelled():
+                    for f in futures:
+                        f.cancel()
+                    break
+        if self.cache is not None:
+            self.cache.save()
+        return results
+
+
+def main(argv=None):
+    """Command-line health check of all configured stations."""
+    import argparse
+    import config_store # type: ignore
+    parser = argparse.ArgumentParser(description="RadioScheduler station health check")
+    parser.add_argument("--force", action="store_true", help="Ignore cached results")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST)
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    args = parser.parse_args(argv)
+
+    config = config_store.load_config()
+    stations = config.get("stations") or []
+    prober = StationProber(HealthCache(), args.concurrency, args.per_host, args.timeout)
+    start = time.perf_counter()
+    results = prober.probe_all((s["url"] for s in stations), force=args.force)
+    for s in stations:
+        r = results.get(s["url"])
+        if r is None:
+            continue
+        details = (f"HTTP {r.status}, connect {(r.connect_time or 0) * 1000:.0f} ms, first byte {r.ttfb * 1000:.0f} ms, "
+                   f"{r.codec or r.content_type or '?'} {r.bitrate or '?'} kbps") if r.ok else r.error
+        print(f"{'OK ' if r.ok else 'ERR'}  {s['name']}: {details}")
+    print(f"{len(results)} stations in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
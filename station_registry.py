@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Typed station records and an indexed, ordered station registry.
+
+Shared by the daemon, the simulator and the GUI. Lookups by name, URL, genre and list
+position are O(1); the indexes are kept up to date on every mutation.
+"""
+import logging
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Klucze zapisywane wprost w rekordzie; pozostałe trafiają do "extra"
+_KNOWN_KEYS = ("name", "url", "genre", "favorite")
+
+
+class Station:
+    """A single radio station. Compared by identity, like the dicts it replaces."""
+    __slots__ = ("name", "url", "genre", "favorite", "extra")
+
+    def __init__(self, name: str, url: str, genre: Optional[str] = None, favorite: bool = False,
+                 extra: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.url = url
+        # Gatunków jest niewiele, a stacji mogą być setki tysięcy - internujemy napisy
+        self.genre = sys.intern(genre) if genre else None
+        self.favorite = bool(favorite)
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Station":
+        extra = {k: v for k, v in data.items() if k not in _KNOWN_KEYS}
+        return cls(data["name"], data["url"], data.get("genre"), data.get("favorite", False), extra)
+
+    def all_urls(self) -> Tuple[str, ...]:
+        """The main URL followed by the URLs of the station's quality variants (see stream_variants)."""
+        if not self.extra or not self.extra.get("variants"):
+            return (self.url,)
+        extra_urls = (v if isinstance(v, str) else v.get("url") for v in self.extra["variants"])
+        return tuple(dict.fromkeys([self.url, *filter(None, extra_urls)]))
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Returns the config.yaml representation of the station."""
+        data = {"name": self.name, "url": self.url, "genre": self.genre, "favorite": self.favorite}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def __repr__(self):
+        return f"Station({self.name!r}, {self.url!r}, genre={self.genre!r})"
+
+
+class StationRegistry:
+    """Ordered collection of stations with name, URL, genre and position indexes."""
+
+    def __init__(self, stations: Iterable[Station] = ()):
+        self._items: List[Station] = []
+        self._pos: Dict[Station, int] = {}
+        # Wartością jest pojedyncza stacja, a lista tylko przy duplikatach - oszczędza pamięć
+        self._by_name: Dict[str, Any] = {}
+        self._by_url: Dict[str, Any] = {}
+        self._by_genre: Dict[Optional[str], Dict[Station, None]] = {}
+        # Kubełki gatunków są w kolejności listy, dopóki tylko dopisujemy na końcu
+        self._genre_order_valid = True
+        self.extend(stations)
+
+    @classmethod
+    def from_dicts(cls, stations: Iterable[Dict[str, Any]]) -> "StationRegistry":
+        return cls(Station.from_dict(s) for s in stations)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        return [s.to_dict() for s in self._items]
+
+    # --- Sequence protocol ---
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self) -> Iterator[Station]:
+        return iter(self._items)
+
+    def __getitem__(self, index: int) -> Station:
+        return self._items[index]
+
+    def __contains__(self, station) -> bool:
+        return station in self._pos
+
+    # --- Index maintenance ---
+    @staticmethod
+    def _add_to(index: Dict[str, Any], key: str, station: Station):
+        current = index.get(key)
+        if current is None:
+            index[key] = station
+        elif isinstance(current, list):
+            current.append(station)
+        else:
+            index[key] = [current, station]
+
+    @staticmethod
+    def _remove_from(index: Dict[str, Any], key: str, station: Station):
+        current = index.get(key)
+        if current is station:
+            del index[key]
+        elif isinstance(current, list):
+            current.remove(station)
+            if len(current) == 1:
+                index[key] = current[0]
+
+    def _index(self, station: Station):
+        self._add_to(self._by_name, station.name, station)
+        for url in station.all_urls():
+            self._add_to(self._by_url, url, station)
+        self._by_genre.setdefault(station.genre, {})[station] = None
+
+    def _unindex(self, station: Station):
+        self._remove_from(self._by_name, station.name, station)
+        for url in station.all_urls():
+            self._remove_from(self._by_url, url, station)
+        genre_bucket = self._by_genre.get(station.genre)
+        if genre_bucket is not None:
+            genre_bucket.pop(station, None)
+            if not genre_bucket:
+                del self._by_genre[station.genre]
+
+    def _rebuild_genre_order(self):
+        buckets: Dict[Optional[str], Dict[Station, None]] = {}
+        for station in self._items:
+            buckets.setdefault(station.genre, {})[station] = None
+        self._by_genre = buckets
+        self._genre_order_valid = True
+
+    def _renumber(self, start: int = 0):
+        for i in range(start, len(self._items)):
+            self._pos[self._items[i]] = i
+
+    # --- Mutations ---
+    def append(self, station: Station):
+        self._pos[station] = len(self._items)
+        self._items.append(station)
+        self._index(station)
+
+    def extend(self, stations: Iterable[Station]):
+        for station in stations:
+            self.append(station)
+
+    def insert(self, index: int, station: Station):
+        index = max(0, min(index, len(self._items)))
+        self._items.insert(index, station)
+        self._index(station)
+        self._renumber(index)
+        self._genre_order_valid = False
+
+    def remove(self, station: Station):
+        index = self._pos.pop(station)
+        del self._items[index]
+        self._unindex(station)
+        self._renumber(index)
+
+    def replace(self, old: Station, new: Station):
+        """Puts ``new`` in the place of ``old``, keeping its position."""
+        index = self._pos.pop(old)
+        self._unindex(old)
+        self._items[index] = new
+        self._pos[new] = index
+        self._index(new)
+        self._genre_order_valid = False
+
+    def update(self, station: Station, **fields):
+        """Changes fields of a station in place and refreshes the affected indexes."""
+        self._unindex(station)
+        for key, value in fields.items():
+            if key == "genre":
+                value = sys.intern(value) if value else None
+            setattr(station, key, value)
+        self._index(station)
+        self._genre_order_valid = False
+
+    def move(self, station: Station, new_index: int) -> bool:
+        """Moves a station to ``new_index``. Returns False if the index is out of range."""
+        if not 0 <= new_index < len(self._items):
+            return False
+        index = self._pos[station]
+        self._items.pop(index)
+        self._items.insert(new_index, station)
+        self._renumber(min(index, new_index))
+        self._genre_order_valid = False
+        return True
+
+    def clear(self):
+        self._items.clear()
+        self._pos.clear()
+        self._by_name.clear()
+        self._by_url.clear()
+        self._by_genre.clear()
+        self._genre_order_valid = True
+
+    # --- Lookups ---
+    def index(self, station: Station) -> int:
+        return self._pos[station]
+
+    def _first(self, entry) -> Optional[Station]:
+        # Przy duplikatach zwracamy stację stojącą najwyżej na liście
+        return min(entry, key=self._pos.__getitem__) if isinstance(entry, list) else entry
+
+    def by_name(self, name: str) -> Optional[Station]:
+        return self._first(self._by_name.get(name))
+
+    def by_url(self, url: Optional[str]) -> Optional[Station]:
+        """Station with ``url`` as its main URL or as one of its variants."""
+        return self._first(self._by_url.get(url)) if url else None
+
+    def by_genre(self, genre: Optional[str]) -> List[Station]:
+        """Stations of a genre (None for no genre) in list order."""
+        if not self._genre_order_valid:
+            self._rebuild_genre_order()
+        return list(self._by_genre.get(genre, ()))
+
+    def genres(self) -> List[Optional[str]]:
+        return list(self._by_genre)
+
+    def urls(self):
+        """A live view of all known URLs (including variants), e.g. for deduplication."""
+        return self._by_url.keys()
+
+    def favorites(self) -> List[Station]:
+        return [s for s in self._items if s.favorite]
+
+    def next_of(self, station: Optional[Station]) -> Optional[Station]:
+        """Station after ``station`` (wrapping around); the first one if ``station`` is unknown."""
+        if not self._items:
+            return None
+        index = self._pos.get(station, -1)
+        return self._items[(index + 1) % len(self._items)]
+
+    def prev_of(self, station: Optional[Station]) -> Optional[Station]:
+        """Station before ``station`` (wrapping around); the last one if ``station`` is unknown."""
+        if not self._items:
+            return None
+        index = self._pos.get(station, 0)
+        return self._items[(index - 1) % len(self._items)]
+
+
+def find_station(name: Optional[str], stations: StationRegistry, store: Any = None,
+                 quiet: bool = False) -> Optional[Station]:
+    """Finds a station by its name in the registry, or through the SQLite index when ``store`` is given.
+
+    Used by the daemon and the simulator alike, so both skip a scheduled
+    name that is not in the library. Logs unknown names unless ``quiet``.
+    """
+    if store is not None:
+        data = store.find_by_name(name) if name else None
+        station = Station.from_dict(data) if data else None
+    else:
+        station = stations.by_name(name) if name else None
+    if station is None and name and not quiet:
+        logging.error(f"Station not found: {name}")
+    return station
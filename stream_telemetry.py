@@ -0,0 +1,356 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Stream quality over time, per station, in fixed-size ring buffers.
+
+The daemon's playback monitors read MPD status every second. Each status
+is accumulated into the point of the station playing; one point per
+``SAMPLE_INTERVAL`` goes to the station's ring buffers, kept as
+``array`` columns:
+
+- time;
+- bitrate (kbps);
+- audio format: sample rate, bits (0 = float) and channels;
+- progress: how much ``elapsed`` advanced per second of wall time, in
+  thousandths (1000 = real time, less = buffering);
+- event flags (stall, failure, MPD error).
+
+Every station also has a 24-hour profile of samples, degraded samples and
+errors, so it shows at which hours a station degrades over days, beyond
+what the ring buffers hold. Memory is bounded by ``POINTS`` per station
+and ``MAX_STATIONS`` stations (the least recently played is dropped).
+
+Only stations the daemon starts are sampled, not manual picks. The
+snapshot is saved to ``stream_telemetry.bin`` next to the MPD call
+metrics. The GUI gets the points from the control socket (``telemetry``)
+or from that file, and exports them as CSV; so does the command line.
+
+Usage: radio-scheduler.py telemetry [--station NAME] [--csv FILE|-]
+"""
+import argparse
+import csv
+import logging
+import struct
+import sys
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, IO, List, Optional, Tuple
+
+from config_store import CONFIG_DIR, write_atomic # type: ignore
+import daemon_loop # type: ignore
+
+TELEMETRY_PATH = CONFIG_DIR / "stream_telemetry.bin"
+
+SAMPLE_INTERVAL = 10.0 # Jeden punkt na 10 s odczytów statusu
+POINTS = 2160          # 6 godzin na stację
+MAX_STATIONS = 48
+
+EVENT_STALL = 1
+EVENT_FAILED = 2
+EVENT_ERROR = 4
+# Punkt liczy się jako pogorszony poniżej 95% tempa odtwarzania albo ze zdarzeniem
+DEGRADED_PROGRESS = 950
+
+# Kolumny bufora: nazwa -> typ array
+COLUMNS = (("times", "I"), ("bitrate", "H"), ("rate", "I"), ("bits", "B"), ("channels", "B"),
+           ("progress", "H"), ("events", "B"))
+# Profil doby: dla każdej godziny liczba punktów, pogorszonych, ze zdarzeniem i suma bitrate
+PROFILE_FIELDS = 4
+
+FILE_HEADER = struct.Struct("<4sHHI")
+MAGIC = b"RSTT"
+VERSION = 1
+STATION_HEADER = struct.Struct("<HII")
+
+logger = logging.getLogger(__name__)
+
+
+def parse_audio(audio: Optional[str]) -> Tuple[int, int, int]:
+    """MPD "audio" (rate:bits:channels, e.g. 44100:24:2 or 48000:f:2) as numbers; zeros if unknown."""
+    try:
+        rate, bits, channels = (audio or "").split(":")
+        return int(rate), 0 if bits == "f" else int(bits), int(channels)
+    except ValueError:
+        return 0, 0, 0
+
+
+class Series:
+    """Ring buffers of one station and its 24-hour profile."""
+    __slots__ = ("points", "head", "count", "profile") + tuple(name for name, _ in COLUMNS)
+
+    def __init__(self, points: int = POINTS):
+        self.points = points
+        self.head = 0 # Indeks następnego zapisu
+        self.count = 0
+        for name, code in COLUMNS:
+            setattr(self, name, array(code, bytes(array(code).itemsize * points)))
+        self.profile = array("d", bytes(8 * 24 * PROFILE_FIELDS))
+
+    def add(self, at: int, bitrate: int, rate: int, bits: int, channels: int, progress: int, events: int):
+        i = self.head
+        self.times[i], self.bitrate[i], self.rate[i] = at, min(bitrate, 0xFFFF), rate
+        self.bits[i], self.channels[i] = min(bits, 0xFF), min(channels, 0xFF)
+        self.progress[i], self.events[i] = min(progress, 0xFFFF), events
+        self.head = (i + 1) % self.points
+        self.count = min(self.count + 1, self.points)
+        hour = time.localtime(at).tm_hour * PROFILE_FIELDS
+        self.profile[hour] += 1
+        self.profile[hour + 1] += progress < DEGRADED_PROGRESS or events != 0
+        self.profile[hour + 2] += events != 0
+        self.profile[hour + 3] += bitrate
+
+    def _order(self) -> List[int]:
+        start = (self.head - self.count) % self.points
+        return [(start + k) % self.points for k in range(self.count)]
+
+    def columns(self, since: Optional[float] = None) -> Dict[str, List[int]]:
+        """The points in time order, column by column."""
+        order = self._order()
+        if since is not None:
+            order = [i for i in order if self.times[i] >= since]
+        return {name: [getattr(self, name)[i] for i in order] for name, _ in COLUMNS}
+
+    def hours(self) -> List[Dict[str, float]]:
+        """Per hour of the day: points, share degraded, points with events and mean bitrate."""
+        result = []
+        for hour in range(24):
+            samples, degraded, events, bitrate = self.profile[hour * PROFILE_FIELDS:(hour + 1) * PROFILE_FIELDS]
+            result.append({"samples": samples, "degraded": degraded / samples if samples else 0.0,
+                           "events": events, "bitrate": bitrate / samples if samples else 0.0})
+        return result
+
+    def to_bytes(self) -> bytes:
+        return b"".join(getattr(self, name).tobytes() for name, _ in COLUMNS) + self.profile.tobytes()
+
+    @classmethod
+    def from_bytes(cls, data: bytes, points: int, head: int, count: int) -> "Series":
+        series = cls(points)
+        offset = 0
+        for name, code in COLUMNS:
+            column = array(code)
+            size = column.itemsize * points
+            column.frombytes(data[offset:offset + size])
+            setattr(series, name, column)
+            offset += size
+        series.profile = array("d", data[offset:offset + 8 * 24 * PROFILE_FIELDS])
+        series.head, series.count = head % points, min(count, points)
+        return series
+
+    @classmethod
+    def size(cls, points: int) -> int:
+        return sum(array(code).itemsize for _, code in COLUMNS) * points + 8 * 24 * PROFILE_FIELDS
+
+
+class _Pending:
+    """The point being accumulated for one zone and station."""
+    __slots__ = ("started", "samples", "bitrate", "audio", "last_elapsed", "last_at", "advanced", "waited",
+                 "events")
+
+    def __init__(self, now: float):
+        self.started = now
+        self.samples = 0
+        self.bitrate = 0
+        self.audio = (0, 0, 0)
+        self.last_elapsed: Optional[float] = None
+        self.last_at: Optional[float] = None
+        self.advanced = 0.0 # Przyrost elapsed w tym punkcie
+        self.waited = 0.0   # ... i czas zegarowy, w którym powinien był nastąpić
+        self.events = 0
+
+
+class StreamTelemetry:
+    """Per-station ring buffers fed by status samples; safe to share between threads."""
+
+    def __init__(self, points: int = POINTS, interval: float = SAMPLE_INTERVAL, max_stations: int = MAX_STATIONS,
+                 clock=time.time):
+        self.points = points
+        self.interval = interval
+        self.max_stations = max_stations
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._series: "OrderedDict[str, Series]" = OrderedDict()
+        self._pending: Dict[Tuple[str, str], _Pending] = {}
+
+    def sample(self, zone: str, station: str, status: Dict[str, str]):
+        """Accumulates one MPD status of ``station`` playing in ``zone``."""
+        now = self.clock()
+        with self._lock:
+            key = (zone, station)
+            pending = self._pending.get(key)
+            if pending is None:
+                # Nowa stacja w strefie - niedokończony punkt poprzedniej trafia do jej bufora
+                for other in [k for k in self._pending if k[0] == zone]:
+                    self._flush(other[1], self._pending.pop(other))
+                pending = self._pending[key] = _Pending(now)
+            elif now - pending.started >= self.interval:
+                self._flush(station, pending)
+                last_elapsed, last_at = pending.last_elapsed, pending.last_at
+                pending = self._pending[key] = _Pending(now)
+                pending.last_elapsed, pending.last_at = last_elapsed, last_at
+            pending.samples += 1
+            if status.get("error"):
+                pending.events |= EVENT_ERROR
+            try:
+                pending.bitrate = max(pending.bitrate, int(status.get("bitrate") or 0))
+            except ValueError:
+                pass
+            if status.get("audio"):
+                pending.audio = parse_audio(status["audio"])
+            try:
+                elapsed = float(status["elapsed"]) if status.get("state") == "play" else None
+            except (KeyError, ValueError):
+                elapsed = None
+            if elapsed is not None and pending.last_elapsed is not None and elapsed >= pending.last_elapsed:
+                pending.advanced += elapsed - pending.last_elapsed
+                pending.waited += now - pending.last_at
+            pending.last_elapsed, pending.last_at = elapsed, now
+
+    def event(self, zone: str, station: str, flag: int):
+        """Marks a stall or failure found by the playback monitor in the current point."""
+        with self._lock:
+            pending = self._pending.get((zone, station))
+            if pending is None:
+                pending = self._pending[(zone, station)] = _Pending(self.clock())
+            pending.events |= flag
+
+    def _flush(self, station: str, pending: _Pending):
+        if not pending.samples and not pending.events:
+            return
+        series = self._series.get(station)
+        if series is None:
+            if len(self._series) >= self.max_stations:
+                self._series.popitem(last=False) # Najdawniej grana stacja
+            series = self._series[station] = Series(self.points)
+        else:
+            self._series.move_to_end(station)
+        progress = round(1000 * pending.advanced / pending.waited) if pending.waited > 0 else 0
+        series.add(int(pending.started), pending.bitrate, *pending.audio, progress, pending.events)
+
+    def stations(self) -> List[str]:
+        with self._lock:
+            return list(reversed(self._series)) # Ostatnio grana pierwsza
+
+    def snapshot(self, station: str, since: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Points and hour profile of ``station`` (JSON-friendly), or None if it was never sampled."""
+        with self._lock:
+            series = self._series.get(station)
+            if series is None:
+                return None
+            return {"station": station, "interval": self.interval, "points": series.columns(since),
+                    "hours": series.hours()}
+
+    def save(self, path: Path = TELEMETRY_PATH):
+        """Writes all ring buffers (a few dozen kilobytes per station) atomically."""
+        with self._lock:
+            blocks = [FILE_HEADER.pack(MAGIC, VERSION, len(self._series), self.points)]
+            for station, series in self._series.items():
+                name = station.encode("utf-8")
+                blocks += [STATION_HEADER.pack(len(name), series.head, series.count), name, series.to_bytes()]
+        write_atomic(path, b"".join(blocks))
+
+    def load(self, path: Path = TELEMETRY_PATH) -> bool:
+        """Reads a saved snapshot; returns False (keeping the current buffers) if missing or unusable."""
+        try:
+            data = path.read_bytes()
+            magic, version, stations, points = FILE_HEADER.unpack_from(data)
+            if (magic, version, points) != (MAGIC, VERSION, self.points):
+                return False
+            offset = FILE_HEADER.size
+            loaded: "OrderedDict[str, Series]" = OrderedDict()
+            size = Series.size(points)
+            for _ in range(stations):
+                name_len, head, count = STATION_HEADER.unpack_from(data, offset)
+                offset += STATION_HEADER.size
+                name = data[offset:offset + name_len].decode("utf-8", errors="replace")
+                offset += name_len
+                if len(data) < offset + size:
+                    raise ValueError("truncated")
+                loaded[name] = Series.from_bytes(data[offset:offset + size], points, head, count)
+                offset += size
+        except (OSError, ValueError, struct.error) as e:
+            if not isinstance(e, FileNotFoundError):
+                logger.warning(f"Ignoring stream telemetry {path}: {e}")
+            return False
+        with self._lock:
+            self._series = loaded
+        return True
+
+
+def export_csv(telemetry: StreamTelemetry, out: IO[str]):
+    """All points of all stations as CSV, one row per point, for offline analysis."""
+    writer = csv.writer(out)
+    writer.writerow(["time", "station", "bitrate_kbps", "sample_rate", "bits", "channels", "progress", "events"])
+    for station in telemetry.stations():
+        snapshot = telemetry.snapshot(station)
+        if snapshot is None:
+            continue
+        p = snapshot["points"]
+        for i, at in enumerate(p["times"]):
+            writer.writerow([time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(at)), station, p["bitrate"][i],
+                             p["rate"][i], p["bits"][i] or "f", p["channels"][i], p["progress"][i] / 1000,
+                             p["events"][i]])
+
+
+def query(station: Optional[str] = None, since: Optional[float] = None,
+          path: Path = TELEMETRY_PATH) -> Tuple[List[str], Optional[Dict[str, Any]]]:
+    """Stations sampled (last played first) and the snapshot of ``station`` (default: the last played).
+
+    Asks the running daemon; without one, reads the file it saved last.
+    """
+    reply = daemon_loop.request("telemetry", station=station, since=since)
+    if reply and reply.get("ok"):
+        return reply["result"]["stations"], reply["result"]["snapshot"]
+    telemetry = StreamTelemetry()
+    telemetry.load(path)
+    stations = telemetry.stations()
+    station = station or (stations[0] if stations else None)
+    return stations, telemetry.snapshot(station, since) if station else None
+
+
+def format_hours(snapshot: Dict[str, Any]) -> List[str]:
+    """Plain-text table of the 24-hour profile: points, degraded share, events and mean bitrate."""
+    lines = [f"{'hour':<7}{'points':>8}{'degraded':>10}{'events':>8}{'kbps':>7}"]
+    for hour, h in enumerate(snapshot["hours"]):
+        if h["samples"]:
+            lines.append(f"{hour:02d}:00{h['samples']:>10.0f}{h['degraded'] * 100:>9.1f}%{h['events']:>8.0f}"
+                         f"{h['bitrate']:>7.0f}")
+    return lines
+
+
+def main(argv=None):
+    """Command-line entry point: prints the hour profiles, or exports all points as CSV."""
+    parser = argparse.ArgumentParser(prog="radio-scheduler.py telemetry",
+                                     description="Stream quality per station and hour of the day")
+    parser.add_argument("--station", help="Only this station (default: all)")
+    parser.add_argument("--csv", metavar="FILE", help="Export all points as CSV to FILE (- for standard output)")
+    args = parser.parse_args(argv)
+    telemetry = StreamTelemetry()
+    # Świeży stan z demona: prosi go o zapis, a bez niego czyta ostatnio zapisany plik
+    daemon_loop.request("telemetry", save=True)
+    telemetry.load()
+    if args.csv:
+        if args.csv == "-":
+            export_csv(telemetry, sys.stdout)
+        else:
+            with open(args.csv, "w", encoding="utf-8", newline="") as f:
+                export_csv(telemetry, f)
+        return 0
+    stations = [args.station] if args.station else telemetry.stations()
+    for station in stations:
+        snapshot = telemetry.snapshot(station)
+        if snapshot is None:
+            print(f"No telemetry for {station}", file=sys.stderr)
+            continue
+        print(station)
+        print("\n".join(format_hours(snapshot)))
+        print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Quality variants of a station and adaptive choice between them.
+
+A station may list alternative streams next to its main ``url``::
+
+    - name: RMF FM
+      url: http://example.net/rmf_320
+      bitrate: 320
+      variants:
+        - {url: http://example.net/rmf_128, bitrate: 128, codec: mp3}
+        - {url: http://example.net/rmf_64, bitrate: 64, codec: aac}
+
+``VariantSelector`` keeps the chosen variant per station. It steps down
+right away after repeated stalls (playback is already interrupted, so the
+switch costs nothing), and only steps up at safe points - when the station
+is (re)started anyway - if measured throughput leaves enough headroom and
+playback has been stable for a while. The state is shared with the GUI
+through a JSON file.
+"""
+import json
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import station_health # type: ignore
+from config_store import CONFIG_DIR, write_atomic # type: ignore
+
+VARIANT_STATE_PATH = CONFIG_DIR / "variants.json"
+
+STALL_WINDOW = 120.0       # okno, w którym liczymy zacięcia
+DOWNSHIFT_STALLS = 2       # tyle zacięć w oknie = przejście na niższą jakość
+STABLE_PERIOD = 600.0      # bez zacięć przez tyle sekund = można próbować wyższej jakości
+HEADROOM = 1.5             # wymagany zapas przepustowości względem bitrate wariantu
+THROUGHPUT_MAX_AGE = 900.0
+THROUGHPUT_BYTES = 64 * 1024
+
+# Powody wyboru wariantu (klucze tłumaczeń "variant_reason_<powód>")
+REASON_DEFAULT = "default"
+REASON_STALLS = "stalls"
+REASON_THROUGHPUT = "throughput"
+REASON_UPSHIFT = "upshift"
+
+logger = logging.getLogger(__name__)
+
+
+class Variant:
+    """One stream of a station: URL, bitrate in kbps and codec (both optional)."""
+    __slots__ = ("url", "bitrate", "codec")
+
+    def __init__(self, url: str, bitrate: Optional[int] = None, codec: Optional[str] = None):
+        self.url = url
+        self.bitrate = int(bitrate) if bitrate else None
+        self.codec = codec or None
+
+    def label(self) -> str:
+        return " ".join(filter(None, [self.codec.upper() if self.codec else None,
+                                      f"{self.bitrate} kbps" if self.bitrate else None])) or self.url
+
+    def __repr__(self):
+        return f"Variant({self.url!r}, {self.bitrate}, {self.codec!r})"
+
+
+def variants_of(station: Any) -> List[Variant]:
+    """All variants of a station (Station or config dict), best quality first.
+
+    The main URL comes first among equals; a variant without a known bitrate
+    is treated as the best one, as it usually is the original stream.
+    """
+    data = station.to_dict() if hasattr(station, "to_dict") else station
+    variants = [Variant(data["url"], data.get("bitrate"), data.get("codec"))]
+    for entry in data.get("variants") or []:
+        if isinstance(entry, str):
+            entry = {"url": entry}
+        if entry.get("url") and entry["url"] != data["url"]:
+            variants.append(Variant(entry["url"], entry.get("bitrate"), entry.get("codec")))
+    return sorted(variants, key=lambda v: -(v.bitrate or float("inf")))
+
+
+def measure_throughput(url: str, timeout: float = 5.0, read_bytes: int = THROUGHPUT_BYTES) -> Optional[float]:
+    """Download speed in kbps of the first ``read_bytes`` of a stream, or None if it cannot be measured.
+
+    Icecast sends a burst of buffered audio on connect, so this measures the
+    link rather than the stream's own pace.
+    """
+    start = time.perf_counter()
+    try:
+        response = station_health.fetch(url, timeout, read_bytes=read_bytes)
+    except (OSError, ValueError):
+        return None
+    if not response.ok or not response.body:
+        return None
+    # Liczymy od końca nagłówków, żeby czas połączenia i TTFB nie zaniżały wyniku
+    transfer = max(time.perf_counter() - start - response.ttfb, 1e-3)
+    return len(response.body) * 8 / 1000 / transfer
+
+
+class VariantSelector:
+    """Chosen variant per station, with stall history and throughput measurements."""
+
+    def __init__(self, path: Path = VARIANT_STATE_PATH, stall_window: float = STALL_WINDOW,
+                 downshift_stalls: int = DOWNSHIFT_STALLS, stable_period: float = STABLE_PERIOD,
+                 headroom: float = HEADROOM, probe_fn=measure_throughput):
+        self.path = Path(path)
+        self.stall_window = stall_window
+        self.downshift_stalls = downshift_stalls
+        self.stable_period = stable_period
+        self.headroom = headroom
+        self.probe_fn = probe_fn
+        # nazwa stacji -> {"url", "reason", "changed_at", "stalls": [czas, ...], "throughput": {url: [kbps, czas]}}
+        self._stations: Dict[str, Dict[str, Any]] = {}
+        self.current: Optional[Dict[str, Any]] = None
+        self._mtime = None
+        self._lock = threading.RLock()
+        self.reload_if_changed()
+
+    # --- Persistence ---
+    def reload_if_changed(self):
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable variant state {self.path}: {e}")
+            return
+        with self._lock:
+            self._stations = data.get("stations", {})
+            self.current = data.get("current")
+            self._mtime = mtime
+
+    def save(self):
+        with self._lock:
+            write_atomic(self.path, json.dumps({"current": self.current, "stations": self._stations}))
+            self._mtime = self.path.stat().st_mtime_ns
+
+    def _state(self, name: str) -> Dict[str, Any]:
+        return self._stations.setdefault(name, {"url": None, "reason": REASON_DEFAULT, "changed_at": 0.0,
+                                                "stalls": [], "throughput": {}})
+
+    # --- Measurements ---
+    def throughput(self, name: str, url: str, now: Optional[float] = None) -> Optional[float]:
+        """Last measured throughput (kbps) of a variant, if recent enough."""
+        now = time.time() if now is None else now
+        entry = self._stations.get(name, {}).get("throughput", {}).get(url)
+        return entry[0] if entry and now - entry[1] < THROUGHPUT_MAX_AGE else None
+
+    def measure(self, name: str, variants: Iterable[Variant], now: Optional[float] = None):
+        """Measures the throughput of the variants one step around the current one and saves it."""
+        now = time.time() if now is None else now
+        variants = list(variants)
+        if len(variants) < 2:
+            return
+        index = self._index(name, variants)
+        for variant in variants[max(0, index - 1):index + 1]:
+            kbps = self.probe_fn(variant.url)
+            if kbps is not None:
+                with self._lock:
+                    self._state(name)["throughput"][variant.url] = [round(kbps, 1), now]
+        self.save()
+
+    def measure_async(self, name: str, variants: Iterable[Variant]) -> threading.Thread:
+        thread = threading.Thread(target=self.measure, args=(name, list(variants)), name="variant-probe", daemon=True)
+        thread.start()
+        return thread
+
+    # --- Selection ---
+    def _index(self, name: str, variants: List[Variant]) -> int:
+        url = self._stations.get(name, {}).get("url")
+        for i, variant in enumerate(variants):
+            if variant.url == url:
+                return i
+        return 0
+
+    def _set(self, name: str, variant: Variant, reason: str, now: float, count: int, index: int):
+        state = self._state(name)
+        if state["url"] != variant.url:
+            state["changed_at"] = now
+        state["url"] = variant.url
+        state["reason"] = reason
+        self.current = {"station": name, "url": variant.url, "bitrate": variant.bitrate, "codec": variant.codec,
+                        "reason": reason, "index": index, "count": count}
+
+    def choose(self, name: str, variants: List[Variant], now: Optional[float] = None) -> Tuple[Variant, str]:
+        """Picks the variant to play when ``name`` is (re)started - a safe point for changing quality."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state(name)
+            index = self._index(name, variants)
+            reason = state["reason"] if state["url"] == variants[index].url else REASON_DEFAULT
+            measured = self.throughput(name, variants[index].url, now)
+            recent_stalls = [t for t in state["stalls"] if now - t < self.stable_period]
+            if measured is not None and variants[index].bitrate and measured < variants[index].bitrate:
+                # Łącze nie nadąża nawet za bieżącym wariantem - schodzimy do pierwszego, który się mieści
+                fitting = [i for i in range(index + 1, len(variants))
+                           if variants[i].bitrate and variants[i].bitrate * self.headroom <= measured]
+                index, reason = (fitting[0] if fitting else len(variants) - 1), REASON_THROUGHPUT
+            elif index > 0 and not recent_stalls and now - state["changed_at"] >= self.stable_period:
+                better = variants[index - 1]
+                better_measured = self.throughput(name, better.url, now)
+                if better_measured is not None and better.bitrate and better_measured >= better.bitrate * self.headroom:
+                    index, reason = index - 1, REASON_UPSHIFT
+            self._set(name, variants[index], reason, now, len(variants), index)
+        self.save()
+        return variants[index], reason
+
+    def record_stall(self, name: str, variants: List[Variant], now: Optional[float] = None) -> Optional[Variant]:
+        """Notes a stall; returns the lower variant to switch to if stalls keep repeating."""
+        now = time.time() if now is None else now
+        with self._lock:
+            state = self._state(name)
+            state["stalls"] = [t for t in state["stalls"] if now - t < max(self.stall_window, self.stable_period)]
+            state["stalls"].append(now)
+            index = self._index(name, variants)
+            in_window = sum(1 for t in state["stalls"] if now - t < self.stall_window)
+            downshift = in_window >= self.downshift_stalls and index < len(variants) - 1
+            if downshift:
+                index += 1
+                self._set(name, variants[index], REASON_STALLS, now, len(variants), index)
+        self.save()
+        return variants[index] if downshift else None
+
+    def preferred(self, name: str, variants: List[Variant]) -> Variant:
+        """The variant last chosen for ``name`` (without changing anything), e.g. for manual playback in the GUI."""
+        return variants[self._index(name, variants)]
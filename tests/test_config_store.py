@@ -0,0 +1,47 @@
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Saving the configuration and copying the SQLite library."""
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import config_store  # noqa: E402
+
+STATIONS = [{"name": "Music", "url": "http://radio.example.org/music", "genre": "pop", "favorite": True},
+            {"name": "News", "url": "http://radio.example.org/news", "genre": None, "favorite": False}]
+
+
+def test_save_config_replaces_the_file_atomically(tmp_path):
+    path = tmp_path / "config.yaml"
+    path.write_text("language: pl\n", encoding="utf-8")
+    inode = path.stat().st_ino
+    config_store.save_config({"language": "en", "stations": STATIONS, "schedule": {"default": "Music"}}, path)
+    assert path.stat().st_ino != inode # Nowy plik podmieniony w całości, nie nadpisywany w miejscu
+    assert config_store.load_config(path)["stations"] == STATIONS
+    assert [p.name for p in tmp_path.iterdir()] == ["config.yaml"]
+
+
+def test_sqlite_settings_save_leaves_the_library_out_of_yaml(tmp_path):
+    path = tmp_path / "config.yaml"
+    config = {"storage": "sqlite", "storage_path": str(tmp_path / "library.db"), "stations": STATIONS,
+              "schedule": {"default": "Music", "weekly": [{"days": ["mon"], "from": "09:00", "to": "10:00",
+                                                          "station": "News"}]}}
+    config_store.save_config(config, path)
+    assert "stations" not in config_store.read_yaml_config(path)
+    assert config_store.store_path(config) == tmp_path / "library.db"
+    loaded = config_store.load_config(path)
+    assert loaded["stations"] == STATIONS
+    assert loaded["schedule"]["weekly"][0]["station"] == "News"
+
+
+def test_backup_includes_commits_still_in_the_wal(tmp_path):
+    with config_store.SQLiteStore(tmp_path / "library.db") as writer:
+        writer.replace_library(STATIONS, [])
+        # Połączenie piszące jest otwarte - zmiany są jeszcze w library.db-wal
+        with config_store.SQLiteStore(tmp_path / "library.db") as store:
+            store.backup(tmp_path / "copy.db")
+    with config_store.SQLiteStore(tmp_path / "copy.db") as copy:
+        assert copy.stations() == STATIONS
@@ -0,0 +1,289 @@
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""The daemon's scheduler pass and zone ticks against the fake MPD, on a virtual clock.
+
+Every test imports radio-scheduler.py afresh with HOME in a temporary
+directory, points the main zone at ``benchmarks/fake_mpd.FakeMPD`` and
+the stations at a local stream server, then drives ``schedule_pass()``
+and ``Zone.tick()`` itself instead of starting the main loop.
+"""
+import importlib.util
+import os
+import sys
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+import yaml
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+import schedule_engine  # noqa: E402
+
+MONDAY = datetime(2026, 1, 5)
+NEWS = {"enabled": True, "start_minute_offset": 0, "use_advanced": True,
+        "advanced": [{"days": list(schedule_engine.WEEKDAYS), "from": "06:00", "to": "22:00",
+                      "interval_minutes": 60, "duration_minutes": 5, "station": "News"}]}
+
+
+@pytest.fixture(scope="module")
+def home(tmp_path_factory):
+    # Moduły repozytorium liczą ścieżki z HOME przy imporcie - ustawiamy go przed pierwszym importem
+    path = tmp_path_factory.mktemp("home")
+    old = os.environ.get("HOME")
+    os.environ["HOME"] = str(path)
+    (path / ".config/radio-scheduler").mkdir(parents=True)
+    yield path
+    if old is None:
+        os.environ.pop("HOME", None)
+    else:
+        os.environ["HOME"] = old
+
+
+@pytest.fixture(scope="module")
+def streams(home):
+    from fake_stream_server import start_servers, stop_servers
+    servers = start_servers(1, stream_seconds=3600)
+    yield servers[0][0].base_url
+    stop_servers(servers)
+
+
+@pytest.fixture
+def mpd(home):
+    from fake_mpd import FakeMPD
+    server = FakeMPD().start()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def commands(request, monkeypatch):
+    """How the daemon sends MPD commands: ``socket`` unless a test is parametrized with ``mpc``.
+
+    ``mpc`` is the default of ``main()``: a process per command, here the
+    stand-in from ``benchmarks/bin`` that talks to the fake MPD.
+    """
+    commands = getattr(request, "param", "socket")
+    if commands == "mpc":
+        monkeypatch.setenv("PATH", f"{ROOT / 'benchmarks/bin'}{os.pathsep}{os.environ['PATH']}")
+    return commands
+
+
+@pytest.fixture
+def write_config(home, streams, mpd, commands):
+    def write(**extra):
+        config = {
+            "stations": [
+                {"name": "Music", "url": f"{streams}/ok/1"},
+                {"name": "Morning", "url": f"{streams}/ok/2"},
+                {"name": "News", "url": f"{streams}/ok/3"},
+                {"name": "Manual", "url": f"{streams}/ok/4"},
+            ],
+            "schedule": {"default": "Music", "news_breaks": NEWS,
+                         "weekly": [{"days": ["mon"], "from": "09:00", "to": "10:00", "station": "Morning"}]},
+            "mpd": {"host": "127.0.0.1", "port": mpd.port, "commands": commands},
+        }
+        config.update(extra)
+        path = home / ".config/radio-scheduler/config.yaml"
+        path.write_text(yaml.safe_dump(config), encoding="utf-8")
+        return config
+    return write
+
+
+@pytest.fixture
+def daemon(home, write_config):
+    import schedule_simulator
+    write_config()
+    for name in ("manual_override.lock", "no-news-today"):
+        (home / ".config/radio-scheduler" / name).unlink(missing_ok=True)
+    spec = importlib.util.spec_from_file_location("radio_scheduler", ROOT / "radio-scheduler.py")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    module.clock = schedule_simulator.VirtualClock(MONDAY)
+    yield module
+    for zone in module.zones.values():
+        zone.stop()
+    module.logs.stop()
+
+
+def run_pass(daemon, at: datetime):
+    """Moves the virtual clock to ``at`` and runs one scheduler pass with all zone ticks, like the main loop."""
+    daemon.clock.advance_to(at)
+    plan, _, resume_at = daemon.schedule_pass()
+    for zone, target, is_news, lookup in plan:
+        zone.tick(target, is_news, lookup)
+    return plan, resume_at
+
+
+def station_url(daemon, name: str) -> str:
+    """The resolved stream URL of ``name``, looked up like the daemon does (also in the SQLite library)."""
+    config, stations = daemon.load_config_cached()
+    store = daemon.config_store.open_store(config)
+    try:
+        return daemon.resolver.resolve(daemon.find_station(name, stations, store).url)
+    finally:
+        if store is not None:
+            store.close()
+
+
+def playing(daemon, mpd, name: str) -> bool:
+    return mpd.player.state == "play" and mpd.player.playlist[:1] == [station_url(daemon, name)]
+
+
+def gui_play(daemon, mpd, name: str):
+    """Plays ``name`` over a connection of its own, as the GUI does in manual mode."""
+    from mpc_controller import MPCController
+    MPCController("127.0.0.1", mpd.port, commands="socket").play_url(station_url(daemon, name))
+
+
+BOTH_TRANSPORTS = pytest.mark.parametrize("commands", ["socket", "mpc"], indirect=True)
+
+
+@BOTH_TRANSPORTS
+def test_scheduled_start(daemon, mpd):
+    run_pass(daemon, MONDAY.replace(hour=8, minute=30))
+    assert playing(daemon, mpd, "Music")
+    plan, _ = run_pass(daemon, MONDAY.replace(hour=9, minute=5, second=30))
+    assert [(zone.name, target.name, is_news) for zone, target, is_news, _ in plan] == [("main", "Morning", False)]
+    assert playing(daemon, mpd, "Morning")
+    run_pass(daemon, MONDAY.replace(hour=10, minute=5))
+    assert playing(daemon, mpd, "Music")
+
+
+def test_station_already_playing_is_not_restarted(daemon, mpd):
+    run_pass(daemon, MONDAY.replace(hour=8, minute=30))
+    started = mpd.player.played_at
+    run_pass(daemon, MONDAY.replace(hour=8, minute=30, second=10))
+    assert playing(daemon, mpd, "Music")
+    assert mpd.player.played_at == started
+
+
+@BOTH_TRANSPORTS
+def test_news_takes_priority_and_schedule_returns(daemon, mpd):
+    run_pass(daemon, MONDAY.replace(hour=10, minute=58))
+    assert playing(daemon, mpd, "Music")
+    plan, _ = run_pass(daemon, MONDAY.replace(hour=11, minute=0, second=5))
+    assert plan[0][1].name == "News" and plan[0][2]
+    assert playing(daemon, mpd, "News")
+    run_pass(daemon, MONDAY.replace(hour=11, minute=4, second=59))
+    assert playing(daemon, mpd, "News")
+    run_pass(daemon, MONDAY.replace(hour=11, minute=5))
+    assert playing(daemon, mpd, "Music")
+
+
+@BOTH_TRANSPORTS
+def test_station_is_replayed_after_news_even_if_already_playing(daemon, mpd):
+    run_pass(daemon, MONDAY.replace(hour=11, minute=1))
+    assert playing(daemon, mpd, "News")
+    # Ktoś przełączył MPD z powrotem na stację z harmonogramu jeszcze w trakcie newsów
+    mpd.player.playlist[:] = [station_url(daemon, "Music")]
+    before = mpd.player.played_at
+    run_pass(daemon, MONDAY.replace(hour=11, minute=5))
+    assert playing(daemon, mpd, "Music")
+    assert mpd.player.played_at != before
+    assert not daemon.zones["main"].was_news_playing
+
+
+def test_switch_does_not_resolve_urls_inline(daemon, mpd, monkeypatch):
+    resolving = []
+    resolve_remote = daemon.url_resolver.resolve_remote
+
+    def recording(url, *args, **kwargs):
+        resolving.append(threading.current_thread())
+        return resolve_remote(url, *args, **kwargs)
+
+    monkeypatch.setattr(daemon.url_resolver, "resolve_remote", recording)
+    run_pass(daemon, MONDAY.replace(hour=8, minute=30)) # Pusta pamięć podręczna
+    assert threading.main_thread() not in resolving
+    assert playing(daemon, mpd, "Music")
+    for entry in daemon.resolver._entries.values():
+        entry["resolved_at"] = 0 # Wszystko przeterminowane, jak po dobie pracy demona
+    resolving.clear()
+    run_pass(daemon, MONDAY.replace(hour=9, minute=5))
+    assert resolving and threading.main_thread() not in resolving
+    assert playing(daemon, mpd, "Morning")
+
+
+def test_manual_override_is_respected(daemon, mpd, home):
+    run_pass(daemon, MONDAY.replace(hour=8, minute=30))
+    (home / ".config/radio-scheduler/manual_override.lock").touch()
+    gui_play(daemon, mpd, "Manual")
+    for at in (MONDAY.replace(hour=9, minute=0), MONDAY.replace(hour=10, minute=1)): # Zmiana w harmonogramie, newsy
+        plan, resume_at = run_pass(daemon, at)
+        assert plan[0][1] is None
+        assert resume_at is None # auto_resume_minutes nie ustawione
+        assert playing(daemon, mpd, "Manual")
+
+
+def test_manual_override_resumes_automatically(daemon, mpd, home, write_config):
+    write_config(auto_resume_minutes=30)
+    lock = home / ".config/radio-scheduler/manual_override.lock"
+    lock.touch()
+    locked_at = MONDAY.replace(hour=8, minute=10)
+    os.utime(lock, (locked_at.timestamp(), locked_at.timestamp()))
+    gui_play(daemon, mpd, "Manual")
+
+    _, resume_at = run_pass(daemon, MONDAY.replace(hour=8, minute=39, second=59))
+    assert resume_at == locked_at + timedelta(minutes=30)
+    assert lock.exists()
+    assert playing(daemon, mpd, "Manual")
+    _, resume_at = run_pass(daemon, MONDAY.replace(hour=8, minute=40))
+    assert resume_at is None
+    assert not lock.exists()
+    assert playing(daemon, mpd, "Music")
+
+
+def test_no_news_today(daemon, mpd, home):
+    lock = home / ".config/radio-scheduler/no-news-today"
+    lock.write_text(str(MONDAY.date()))
+    run_pass(daemon, MONDAY.replace(hour=10, minute=58))
+    started = mpd.player.played_at
+    plan, _ = run_pass(daemon, MONDAY.replace(hour=11, minute=1))
+    assert plan[0][1].name == "Music" and not plan[0][2]
+    assert playing(daemon, mpd, "Music")
+    assert mpd.player.played_at == started
+    # Flaga z innego dnia nie wyłącza newsów
+    lock.write_text(str(MONDAY.date() - timedelta(days=1)))
+    run_pass(daemon, MONDAY.replace(hour=12, minute=1))
+    assert playing(daemon, mpd, "News")
+
+
+def test_unknown_station_leaves_mpd_alone(daemon, mpd, write_config):
+    config = write_config()
+    config["schedule"]["default"] = "Ghost"
+    write_config(schedule=config["schedule"])
+    plan, _ = run_pass(daemon, MONDAY.replace(hour=8, minute=30))
+    assert plan[0][1] is None
+    assert mpd.player.playlist == []
+
+
+def test_schedule_follows_library_changes(daemon, mpd, home, write_config):
+    config = write_config(storage="sqlite", storage_path=str(home / "library.db"))
+    config_store = daemon.config_store
+    config_store.save_config(config, home / ".config/radio-scheduler/config.yaml")
+    plan, _ = run_pass(daemon, MONDAY.replace(hour=8, minute=30))
+    assert plan[0][1].name == "Music"
+    # Zmiana tylko w bazie (np. "config_store.py import"), config.yaml bez zmian
+    with config_store.SQLiteStore(home / "library.db") as store:
+        store.replace_weekly_rules([{"days": list(schedule_engine.WEEKDAYS), "from": "00:00", "to": "23:59",
+                                     "station": "Morning"}])
+    plan, _ = run_pass(daemon, MONDAY.replace(hour=8, minute=30, second=10))
+    assert plan[0][1].name == "Morning"
+    assert playing(daemon, mpd, "Morning")
+
+
+def test_late_dns_result_does_not_revive_a_past_switch(daemon):
+    import dns_cache
+    daemon.clock.advance_to(MONDAY.replace(hour=8, minute=58))
+    transition = schedule_engine.Transition(MONDAY.replace(hour=9), "Morning", False)
+    key = (transition.at, "radio.example.org")
+    daemon._dns_prefetched[key] = (transition, None)
+    daemon.clock.advance_to(MONDAY.replace(hour=9, minute=1))
+    daemon.prefetch_upcoming([], daemon.load_config_cached()[1]) # Przycina minione zmiany
+    daemon._on_prefetched(transition, "radio.example.org", dns_cache.DNSResult("radio.example.org", error="timeout"))
+    assert key not in daemon._dns_prefetched
+    assert key not in daemon._dns_alerted
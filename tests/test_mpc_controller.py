@@ -0,0 +1,71 @@
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""The MPD controller's circuit breaker and time limits."""
+import socket
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import mpc_controller  # noqa: E402
+from mpc_controller import CircuitBreaker, MPCController  # noqa: E402
+
+
+def test_missing_mpc_binary_does_not_open_the_breaker(tmp_path, monkeypatch):
+    monkeypatch.setenv("PATH", str(tmp_path)) # Bez mpc
+    mpc = MPCController("127.0.0.1", 1)
+    for _ in range(mpc_controller.FAILURE_THRESHOLD + 2):
+        assert mpc.get_volume() is None
+    assert mpc.available
+    assert mpc.breaker.failures == 0
+
+
+def test_released_probe_lets_the_next_call_through():
+    now = [0.0]
+    breaker = CircuitBreaker(threshold=1, cooldown=5, clock=lambda: now[0])
+    breaker.failure()
+    now[0] = 6.0
+    assert breaker.allow() # Próba w stanie półotwartym
+    breaker.release()
+    assert breaker.allow()
+
+
+def _stalling_mpd(trickle: float, interval: float = 0.05) -> socket.socket:
+    """Greets, sends a few bytes of a response for ``trickle`` seconds, then goes silent."""
+    server = socket.create_server(("127.0.0.1", 0))
+
+    def serve():
+        conn, _ = server.accept()
+        with conn:
+            conn.sendall(b"OK MPD 0.23.5\n")
+            end = time.monotonic() + trickle
+            while time.monotonic() < end:
+                conn.sendall(b"x")
+                time.sleep(interval)
+            time.sleep(trickle * 4)
+
+    threading.Thread(target=serve, daemon=True).start()
+    return server
+
+
+def test_command_deadline_bounds_the_whole_request(monkeypatch):
+    monkeypatch.setattr(mpc_controller, "COMMAND_TIMEOUT", 0.5)
+    server = _stalling_mpd(0.45)
+    with server:
+        mpc = MPCController("127.0.0.1", server.getsockname()[1], commands="socket")
+        start = time.monotonic()
+        assert mpc.get_volume() is None
+        assert time.monotonic() - start < 0.75
+
+
+def test_status_deadline_bounds_the_whole_query():
+    server = _stalling_mpd(mpc_controller.STATUS_DEADLINE - 0.05)
+    with server:
+        mpc = MPCController("127.0.0.1", server.getsockname()[1])
+        start = time.monotonic()
+        assert mpc.get_status_dict() == {}
+        assert time.monotonic() - start < mpc_controller.STATUS_DEADLINE + 0.1
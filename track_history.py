@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Bounded history of the titles played ("what was that song?"), kept in an on-disk ring buffer.
+
+The daemon notes every title change MPD reports (``currentsong`` after an
+idle event) with the time, zone and station. ``track_history.bin`` holds
+a header with the capacity and the number of titles ever written, then
+``capacity`` fixed 256-byte slots that are overwritten oldest first. Disk
+use is fixed by the capacity, and memory holds at most the same number of
+entries, however long the daemon runs.
+
+In memory the entries are kept in time order next to their casefolded
+text, so a search is a bisect on the time range and a substring scan of
+at most ``capacity`` short strings. The daemon answers searches on the
+control socket (``history``); the GUI and ``radio-scheduler.py history``
+ask it and read the file directly when no daemon runs.
+
+Usage: radio-scheduler.py history [TEXT] [--since 20m] [--until 14:30] [--zone NAME] [--limit 50] [--json]
+"""
+import argparse
+import json
+import logging
+import os
+import struct
+import sys
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config_store import CONFIG_DIR # type: ignore
+import daemon_loop # type: ignore
+
+HISTORY_PATH = CONFIG_DIR / "track_history.bin"
+# 8192 tytułów po 256 B = 2 MB na dysku; przy zmianie tytułu co 3 minuty to ok. 2,5 doby słuchania
+CAPACITY = 8192
+
+# Nagłówek: znacznik, wersja, rozmiar slotu, pojemność, liczba tytułów zapisanych od początku
+HEADER = struct.Struct("<4sHHIQ12x")
+MAGIC = b"RSTH"
+VERSION = 1
+# Slot: czas, długości strefy, stacji i tytułu w bajtach, potem same teksty (UTF-8, przycięte)
+TEXT_SIZE = 249
+SLOT = struct.Struct(f"<IBBB{TEXT_SIZE}s")
+
+
+def _clip(text: str, size: int) -> bytes:
+    return text.encode("utf-8")[:size].decode("utf-8", errors="ignore").encode("utf-8")
+
+
+def song_title(song: Dict[str, str]) -> Optional[str]:
+    """Title of a ``currentsong`` reply; streams put "Artist - Title" in the Title tag."""
+    title = song.get("Title")
+    if title and song.get("Artist"):
+        return f"{song['Artist']} - {title}"
+    return title or None
+
+
+class Entry:
+    """One title of the history."""
+    __slots__ = ("at", "zone", "station", "title")
+
+    def __init__(self, at: int, zone: str, station: str, title: str):
+        self.at = at
+        self.zone = zone
+        self.station = station
+        self.title = title
+
+    def pack(self) -> bytes:
+        zone = _clip(self.zone, 32)
+        station = _clip(self.station, 64)
+        title = _clip(self.title, TEXT_SIZE - len(zone) - len(station))
+        return SLOT.pack(self.at, len(zone), len(station), len(title), zone + station + title)
+
+    @classmethod
+    def unpack(cls, data: bytes) -> "Entry":
+        at, zone_len, station_len, title_len, text = SLOT.unpack(data)
+        station_end = zone_len + station_len
+        return cls(at, text[:zone_len].decode("utf-8", errors="replace"),
+                   text[zone_len:station_end].decode("utf-8", errors="replace"),
+                   text[station_end:station_end + title_len].decode("utf-8", errors="replace"))
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {"at": datetime.fromtimestamp(self.at).isoformat(timespec="seconds"), "zone": self.zone,
+                "station": self.station, "title": self.title}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Entry":
+        return cls(int(datetime.fromisoformat(data["at"]).timestamp()), data["zone"], data["station"], data["title"])
+
+    def format(self) -> str:
+        return f"{datetime.fromtimestamp(self.at):%Y-%m-%d %H:%M:%S}  {self.station:<24} {self.title}"
+
+
+class TrackHistory:
+    """The ring buffer on disk and its in-memory index; only the daemon writes to it."""
+
+    def __init__(self, path: Path = HISTORY_PATH, capacity: int = CAPACITY):
+        self.path = Path(path)
+        self.capacity = capacity
+        self.written = 0 # Tytuły zapisane od założenia pliku; następny slot to written % capacity
+        self._lock = threading.Lock()
+        self._entries: List[Entry] = []
+        self._times: List[int] = []
+        self._folded: List[str] = []
+        self._last: Dict[str, str] = {} # strefa -> ostatni tytuł
+        self.load()
+
+    def load(self):
+        """Reads the ring buffer; a missing, damaged or resized file starts an empty history."""
+        try:
+            with open(self.path, "rb") as f:
+                magic, version, slot_size, capacity, written = HEADER.unpack(f.read(HEADER.size))
+                if (magic, version, slot_size, capacity) != (MAGIC, VERSION, SLOT.size, self.capacity):
+                    raise ValueError("different format or capacity")
+                data = f.read(capacity * SLOT.size)
+        except (OSError, ValueError, struct.error):
+            return
+        count = min(written, self.capacity, len(data) // SLOT.size)
+        entries = [Entry.unpack(data[i * SLOT.size:(i + 1) * SLOT.size]) for i in range(count)]
+        entries.sort(key=lambda e: e.at) # Najstarszy slot to ten, który zostanie nadpisany jako następny
+        with self._lock:
+            self.written = written
+            self._entries = entries
+            self._times = [e.at for e in entries]
+            self._folded = [f"{e.station}\n{e.title}".casefold() for e in entries]
+            self._last = {e.zone: e.title for e in entries}
+
+    def observe(self, zone: str, station: str, title: Optional[str], at: Optional[float] = None) -> bool:
+        """Adds ``title`` if it differs from the last title of ``zone``; returns whether it was added."""
+        if not title or self._last.get(zone) == title:
+            return False
+        self.add(Entry(int(time.time() if at is None else at), zone, station, title))
+        return True
+
+    def add(self, entry: Entry):
+        with self._lock:
+            self._last[entry.zone] = entry.title
+            self._entries.append(entry)
+            self._times.append(entry.at)
+            self._folded.append(f"{entry.station}\n{entry.title}".casefold())
+            # Z pamięci usuwamy porcjami, by nie przesuwać list przy każdym tytule
+            excess = len(self._entries) - self.capacity
+            if excess > self.capacity // 8:
+                del self._entries[:excess], self._times[:excess], self._folded[:excess]
+            slot = self.written % self.capacity
+            self.written += 1
+            try:
+                self._write(slot, entry)
+            except OSError as e:
+                logging.warning(f"Cannot write track history {self.path}: {e}")
+
+    def _write(self, slot: int, entry: Entry):
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            os.pwrite(fd, entry.pack(), HEADER.size + slot * SLOT.size)
+            os.pwrite(fd, HEADER.pack(MAGIC, VERSION, SLOT.size, self.capacity, self.written), 0)
+        finally:
+            os.close(fd)
+
+    def __len__(self):
+        return min(len(self._entries), self.capacity)
+
+    def search(self, text: str = "", since: Optional[float] = None, until: Optional[float] = None,
+               zone: Optional[str] = None, limit: int = 50) -> List[Entry]:
+        """Newest first: titles (or stations) containing every word of ``text``, between ``since`` and ``until``."""
+        # Najdłuższe słowo najpierw i osobno: odrzuca większość wpisów bez kosztu all()
+        words = sorted(text.casefold().split(), key=len, reverse=True) or [""]
+        longest, rest = words[0], words[1:]
+        with self._lock:
+            first = max(len(self._entries) - self.capacity, 0)
+            if since is not None:
+                first = max(first, bisect_left(self._times, since))
+            last = len(self._entries) if until is None else bisect_right(self._times, until)
+            found = []
+            for i in range(last - 1, first - 1, -1):
+                folded = self._folded[i]
+                if longest in folded and all(word in folded for word in rest) and (
+                        zone is None or self._entries[i].zone == zone):
+                    found.append(self._entries[i])
+                    if len(found) >= limit:
+                        break
+            return found
+
+
+def query(text: str = "", since: Optional[float] = None, until: Optional[float] = None,
+          zone: Optional[str] = None, limit: int = 50, path: Path = HISTORY_PATH) -> List[Entry]:
+    """Searches the running daemon's history, or the file when no daemon answers."""
+    reply = daemon_loop.request("history", text=text, since=since, until=until, zone=zone, limit=limit)
+    if reply and reply.get("ok"):
+        return [Entry.from_dict(data) for data in reply["result"]]
+    return TrackHistory(path).search(text, since, until, zone, limit)
+
+
+def parse_moment(text: str, now: Optional[datetime] = None) -> datetime:
+    """``20m`` / ``2h`` / ``1d`` ago, ``HH:MM`` today, or an ISO date and time."""
+    now = now or datetime.now()
+    units = {"m": "minutes", "h": "hours", "d": "days"}
+    if text[-1:] in units and text[:-1].isdigit():
+        return now - timedelta(**{units[text[-1]]: int(text[:-1])})
+    try:
+        if len(text) <= 5 and ":" in text:
+            clock = datetime.strptime(text, "%H:%M").time()
+            return datetime.combine(now.date(), clock)
+        return datetime.fromisoformat(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a time: {text!r} (use e.g. 20m, 2h, 14:30 or 2026-01-05T14:30)")
+
+
+def main(argv=None):
+    """Command-line entry point: prints matching titles, newest first."""
+    parser = argparse.ArgumentParser(prog="radio-scheduler.py history",
+                                     description="Search the titles played recently")
+    parser.add_argument("text", nargs="*", help="Words that the title or station must contain")
+    parser.add_argument("--since", type=parse_moment, help="E.g. 20m, 2h, 14:30 or 2026-01-05T14:30")
+    parser.add_argument("--until", type=parse_moment)
+    parser.add_argument("--zone", help="Only this zone (default: all)")
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="One JSON object per title")
+    args = parser.parse_args(argv)
+    entries = query(" ".join(args.text), args.since and args.since.timestamp(), args.until and args.until.timestamp(),
+                    args.zone, args.limit)
+    for entry in entries:
+        print(json.dumps(entry.as_dict()) if args.json else entry.format())
+    if not entries:
+        print("No titles found", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
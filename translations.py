@@ -212,6 +212,84 @@ TEXTS = {
         "player_clock_type": "Typ zegara na karcie odtwarzacza:",
         "clock_digital": "Cyfrowy",
         "clock_analog": "Analogowy",
+        "storage_backend": "Przechowywanie biblioteki stacji:",
+        "storage_yaml": "Plik YAML",
+        "storage_sqlite": "Baza SQLite (duże biblioteki)",
+        "import_in_progress": "Importowanie stacji...",
+        "import_cancelled": "Import anulowany.",
+        "imported_count_duplicates": "Zaimportowano {count} stacji, pominięto {duplicates} duplikatów.",
+        "import_playlist_folder": "Importuj folder playlist...",
+        "no_playlists_found": "W wybranym folderze nie znaleziono plików M3U/PLS.",
+        "bulk_import_summary": "Przetworzono plików: {files}\nZaimportowano stacji: {count}\nPominięte duplikaty: {duplicates}\nBłędne pliki: {errors}\n\nWydajność: {rate} stacji/s ({seconds} s)",
+        "close": "Zamknij",
+        "catalog_search": "Katalog stacji...",
+        "catalog_search_placeholder": "Szukaj po nazwie, gatunku, kraju lub języku...",
+        "catalog_country": "Kraj",
+        "catalog_format": "Format",
+        "catalog_import_dump": "Importuj zrzut radio-browser...",
+        "catalog_add_selected": "Dodaj zaznaczone",
+        "catalog_dump_files": "Zrzuty radio-browser",
+        "catalog_results": "Wyników: {count} ({ms} ms)",
+        "catalog_size": "Stacji w katalogu: {count}",
+        "catalog_imported": "Zaimportowano do katalogu {count} stacji w {seconds} s ({rate} rekordów/s).",
+        "test_all_stations": "Testuj wszystkie stacje",
+        "health_unknown": "Stacja nie była jeszcze testowana",
+        "health_ok_details": "Dostępna (HTTP {status})\nPołączenie: {connect} ms, pierwszy bajt: {ttfb} ms, pierwszy bajt audio: {audio} ms\nTyp: {content_type}, kodek: {codec}\nBitrate: {bitrate} kbps\nSprawdzono: {checked}",
+        "health_failed_details": "Niedostępna: {error}\nSprawdzono: {checked}",
+        "health_summary": "Przetestowano stacji: {count} (dostępne: {ok}, błędy: {failed})",
+        "probe_ok": "Połączenie udane (HTTP {code}) · {format} · połączenie {connect} ms, audio po {audio} ms",
+        "dns_alert_title": "Problem z DNS",
+        "dns_alert_text": "Nie można rozwiązać adresu {host} stacji {station}, która ma zacząć grać o {time}: {error}",
+        "variant_position": "wariant {index}/{count}",
+        "variant_reason_default": "najwyższa jakość",
+        "variant_reason_stalls": "niższa jakość po zacięciach",
+        "variant_reason_throughput": "niższa jakość - za wolne łącze",
+        "variant_reason_upshift": "wyższa jakość - łącze stabilne",
+        "mpd_calls_title": "Wywołania MPD",
+        "mpd_calls_export": "Eksportuj…",
+        "mpd_calls_gui": "Okno (czasy w ms):",
+        "mpd_calls_daemon": "Demon, stan z {time} (czasy w ms):",
+        "mpd_unreachable": "MPD nieosiągalny - kolejna próba za {seconds} s",
+        "mpd_unreachable_short": "MPD nieosiągalny",
+        "mpd_connection_title": "Połączenie z MPD",
+        "mpd_host": "Host:",
+        "mpd_port": "Port:",
+        "mpd_socket": "Gniazdo Unix:",
+        "mpd_password": "Hasło:",
+        "mpd_connection_hint": "Puste pola: wartości z MPD_HOST/MPD_PORT. Gniazdo Unix, jeśli istnieje, ma pierwszeństwo przed TCP.",
+        "mpd_test_connection": "Sprawdź połączenie",
+        "save_mpd_settings": "Zapisz ustawienia MPD",
+        "mpd_test_ok": "Połączono przez {transport} ({ms} ms).",
+        "mpd_test_failed": "Brak odpowiedzi MPD ({transport}).",
+        "daemon_tasks": "Zadania demona, stan z {time} (czasy w ms):",
+        "stats_tab_title": "Statystyki",
+        "stats_period": "Okres:",
+        "stats_days": "ostatnie {days} dni",
+        "stats_station": "Stacja:",
+        "stats_all_stations": "Wszystkie stacje",
+        "stats_refresh": "Odśwież",
+        "stats_heatmap": "Godziny słuchania wg dnia tygodnia i godziny",
+        "stats_hours": "Godziny",
+        "stats_share": "Udział",
+        "stats_summary": "Razem {hours} h od {since}",
+        "stats_empty": "Brak zapisów w dzienniku odtwarzania za ten okres.",
+        "stats_name": "Stacja",
+        "track_history": "Historia utworów",
+        "track_history_tooltip": "Co grało wcześniej - wyszukiwanie w ostatnich tytułach",
+        "history_search_placeholder": "Szukaj wykonawcy, tytułu lub stacji...",
+        "history_last_hour": "ostatnia godzina",
+        "history_last_3h": "ostatnie 3 godziny",
+        "history_last_day": "ostatnia doba",
+        "history_all": "cała historia",
+        "history_time": "Czas",
+        "history_title": "Utwór",
+        "history_copy": "Kopiuj tytuł",
+        "telemetry_export": "Eksport jakości strumieni",
+        "telemetry_export_tooltip": "Zapisuje bitrate, format i tempo odtwarzania wszystkich stacji do pliku CSV",
+        "telemetry_bitrate": "{station}: bitrate w ostatniej godzinie ({low}-{high} kbps)",
+        "telemetry_progress": "Tempo odtwarzania (1 = płynnie, mniej = buforowanie); czerwone kreski to przerwy i awarie",
+        "telemetry_worst_hours": "Najczęstsze problemy: {hours}",
+        "telemetry_stable": "Strumień stabilny",
     },
     "en": {
         "app_title": "RadioScheduler",
@@ -423,5 +501,83 @@ TEXTS = {
         "player_clock_type": "Player tab clock type:",
         "clock_digital": "Digital",
         "clock_analog": "Analog",
+        "storage_backend": "Station library storage:",
+        "storage_yaml": "YAML file",
+        "storage_sqlite": "SQLite database (large libraries)",
+        "import_in_progress": "Importing stations...",
+        "import_cancelled": "Import cancelled.",
+        "imported_count_duplicates": "Imported {count} stations, skipped {duplicates} duplicates.",
+        "import_playlist_folder": "Import Playlist Folder...",
+        "no_playlists_found": "No M3U/PLS files found in the selected folder.",
+        "bulk_import_summary": "Files processed: {files}\nStations imported: {count}\nDuplicates skipped: {duplicates}\nFiles with errors: {errors}\n\nThroughput: {rate} stations/s ({seconds} s)",
+        "close": "Close",
+        "catalog_search": "Station Catalog...",
+        "catalog_search_placeholder": "Search by name, genre, country or language...",
+        "catalog_country": "Country",
+        "catalog_format": "Format",
+        "catalog_import_dump": "Import radio-browser Dump...",
+        "catalog_add_selected": "Add Selected",
+        "catalog_dump_files": "radio-browser dumps",
+        "catalog_results": "{count} results ({ms} ms)",
+        "catalog_size": "Stations in catalog: {count}",
+        "catalog_imported": "Imported {count} stations into the catalog in {seconds} s ({rate} records/s).",
+        "test_all_stations": "Test All Stations",
+        "health_unknown": "Station has not been tested yet",
+        "health_ok_details": "Reachable (HTTP {status})\nConnect: {connect} ms, first byte: {ttfb} ms, first audio byte: {audio} ms\nType: {content_type}, codec: {codec}\nBitrate: {bitrate} kbps\nChecked: {checked}",
+        "health_failed_details": "Unreachable: {error}\nChecked: {checked}",
+        "health_summary": "Tested {count} stations ({ok} reachable, {failed} failed)",
+        "probe_ok": "Connection successful (HTTP {code}) · {format} · connect {connect} ms, audio after {audio} ms",
+        "dns_alert_title": "DNS problem",
+        "dns_alert_text": "Cannot resolve {host} for {station}, scheduled to start at {time}: {error}",
+        "variant_position": "variant {index}/{count}",
+        "variant_reason_default": "best quality",
+        "variant_reason_stalls": "lower quality after stalls",
+        "variant_reason_throughput": "lower quality - link too slow",
+        "variant_reason_upshift": "higher quality - link is stable",
+        "mpd_calls_title": "MPD calls",
+        "mpd_calls_export": "Export…",
+        "mpd_calls_gui": "This window (times in ms):",
+        "mpd_calls_daemon": "Daemon, as of {time} (times in ms):",
+        "mpd_unreachable": "MPD unreachable - next attempt in {seconds} s",
+        "mpd_unreachable_short": "MPD unreachable",
+        "mpd_connection_title": "MPD connection",
+        "mpd_host": "Host:",
+        "mpd_port": "Port:",
+        "mpd_socket": "Unix socket:",
+        "mpd_password": "Password:",
+        "mpd_connection_hint": "Empty fields use MPD_HOST/MPD_PORT. The Unix socket, when it exists, takes precedence over TCP.",
+        "mpd_test_connection": "Test connection",
+        "save_mpd_settings": "Save MPD settings",
+        "mpd_test_ok": "Connected via {transport} ({ms} ms).",
+        "mpd_test_failed": "No answer from MPD ({transport}).",
+        "daemon_tasks": "Daemon tasks, as of {time} (times in ms):",
+        "stats_tab_title": "Statistics",
+        "stats_period": "Period:",
+        "stats_days": "last {days} days",
+        "stats_station": "Station:",
+        "stats_all_stations": "All stations",
+        "stats_refresh": "Refresh",
+        "stats_heatmap": "Listening hours by weekday and hour",
+        "stats_hours": "Hours",
+        "stats_share": "Share",
+        "stats_summary": "{hours} h in total since {since}",
+        "stats_empty": "The play journal has no records for this period.",
+        "stats_name": "Station",
+        "track_history": "Track history",
+        "track_history_tooltip": "What played earlier - search the recent titles",
+        "history_search_placeholder": "Search artist, title or station...",
+        "history_last_hour": "last hour",
+        "history_last_3h": "last 3 hours",
+        "history_last_day": "last 24 hours",
+        "history_all": "whole history",
+        "history_time": "Time",
+        "history_title": "Title",
+        "history_copy": "Copy title",
+        "telemetry_export": "Export stream quality",
+        "telemetry_export_tooltip": "Saves the bitrate, format and playback progress of all stations to a CSV file",
+        "telemetry_bitrate": "{station}: bitrate over the last hour ({low}-{high} kbps)",
+        "telemetry_progress": "Playback progress (1 = smooth, lower = buffering); red marks are stalls and failures",
+        "telemetry_worst_hours": "Most problems at: {hours}",
+        "telemetry_stable": "Stream stable",
     }
 }
\ No newline at end of file
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# Copyright (c) 2025 - 2026 Daszkan (Jacek S.)
+#
+# This software is released under the MIT License.
+# https://opensource.org/licenses/MIT
+"""Resolution of station URLs to the final stream URL, with a persistent cache.
+
+Many station URLs are playlist wrappers (.pls/.m3u served over HTTP) or
+redirect chains, which MPD would otherwise resolve again on every switch.
+The resolver expands them ahead of time and remembers the result for a TTL.
+Stations keep their canonical URL; only MPD is handed the resolved one, and
+``canonical()`` maps what MPD reports back to the station URL. When playback
+of a resolved URL fails, ``invalidate()`` forces a fresh resolution.
+"""
+import json
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import playlist_import # type: ignore
+import station_health # type: ignore
+from config_store import CONFIG_DIR, write_atomic # type: ignore
+
+RESOLVE_CACHE_PATH = CONFIG_DIR / "resolved_urls.json"
+
+DEFAULT_TTL = 24 * 3600
+# Prefetch odświeża wpisy na tyle przed wygaśnięciem, żeby przełączenie nigdy nie trafiło na przeterminowany
+REFRESH_AHEAD = 2 * 3600
+DEFAULT_TIMEOUT = 5.0
+MAX_NESTING = 3
+PLAYLIST_BYTES = 64 * 1024
+
+_PLAYLIST_TYPES = {
+    "audio/x-scpls": "pls", "application/pls+xml": "pls",
+    "audio/x-mpegurl": "m3u", "audio/mpegurl": "m3u", "application/x-mpegurl": "m3u",
+    "application/vnd.apple.mpegurl": "m3u",
+}
+_PLAYLIST_SUFFIXES = {".pls": "pls", ".m3u": "m3u", ".m3u8": "m3u"}
+
+logger = logging.getLogger(__name__)
+
+
+def _playlist_kind(url: str, content_type: Optional[str]) -> Optional[str]:
+    ctype = (content_type or "").split(";", 1)[0].strip().lower()
+    if ctype in _PLAYLIST_TYPES:
+        return _PLAYLIST_TYPES[ctype]
+    # Część serwerów podaje playlisty jako text/plain lub application/octet-stream
+    if not ctype.startswith(("audio/", "video/")):
+        for suffix, kind in _PLAYLIST_SUFFIXES.items():
+            if urlsplit(url).path.lower().endswith(suffix):
+                return kind
+    return None
+
+
+def resolve_remote(url: str, timeout: float = DEFAULT_TIMEOUT, depth: int = 0) -> str:
+    """Follows redirects and playlist wrappers to the final stream URL. Raises OSError or ValueError."""
+    # Treść czytamy w tym samym żądaniu, tylko gdy nagłówki wskazują na playlistę
+    response = station_health.fetch(url, timeout, read_bytes=PLAYLIST_BYTES, read_if=lambda final, headers: (
+        depth < MAX_NESTING and _playlist_kind(final, headers.get("content-type")) is not None))
+    if not response.ok:
+        raise ValueError(f"HTTP {response.status}")
+    kind = _playlist_kind(response.url, response.headers.get("content-type"))
+    if kind is None or depth >= MAX_NESTING:
+        return response.url
+    body = response.body
+    # HLS (#EXT-X-...) to nie opakowanie, tylko właściwy strumień - MPD obsługuje go sam
+    if b"#EXT-X-" in body:
+        return response.url
+    for _, entry in playlist_import.parse_playlist_data(body, kind):
+        if entry.lower().startswith(("http://", "https://")):
+            return resolve_remote(entry, timeout, depth + 1)
+    raise ValueError("Playlist contains no stream URL")
+
+
+class URLResolver:
+    """Cache of station URL -> resolved stream URL, shared by the daemon and the GUI through a JSON file."""
+
+    def __init__(self, path: Path = RESOLVE_CACHE_PATH, ttl: float = DEFAULT_TTL, timeout: float = DEFAULT_TIMEOUT):
+        self.path = Path(path)
+        self.ttl = ttl
+        self.timeout = timeout
+        # url -> {"resolved": str, "resolved_at": float}
+        self._entries: Dict[str, Dict] = {}
+        self._reverse: Dict[str, str] = {}
+        self._mtime = None
+        self._inflight = set() # Adresy rozwiązywane właśnie w tle - kolejny prefetch ich nie powtarza
+        self._lock = threading.RLock()
+        self.reload_if_changed()
+
+    # --- Persistence ---
+    def reload_if_changed(self):
+        """Re-reads the cache file if another process (daemon/GUI) has updated it."""
+        try:
+            mtime = self.path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return
+        if mtime == self._mtime:
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+        except (OSError, ValueError) as e:
+            logger.warning(f"Ignoring unreadable URL resolution cache {self.path}: {e}")
+            return
+        with self._lock:
+            self._entries = entries if isinstance(entries, dict) else {}
+            self._reverse = {e["resolved"]: url for url, e in self._entries.items() if e.get("resolved") != url}
+            self._mtime = mtime
+
+    def save(self):
+        with self._lock:
+            write_atomic(self.path, json.dumps(self._entries))
+            self._mtime = self.path.stat().st_mtime_ns
+
+    def _store(self, url: str, resolved: str):
+        with self._lock:
+            old = self._entries.get(url)
+            if old:
+                self._reverse.pop(old.get("resolved"), None)
+            self._entries[url] = {"resolved": resolved, "resolved_at": time.time()}
+            if resolved != url:
+                self._reverse[resolved] = url
+
+    # --- Lookups ---
+    def cached(self, url: str) -> str:
+        """The cached resolution of ``url`` (even if stale), or ``url`` itself. Never touches the network."""
+        entry = self._entries.get(url)
+        return entry["resolved"] if entry else url
+
+    def is_fresh(self, url: str, ahead: float = 0.0) -> bool:
+        """Whether ``url`` has a cached resolution that stays valid for ``ahead`` more seconds."""
+        entry = self._entries.get(url)
+        return bool(entry) and time.time() - entry.get("resolved_at", 0) < self.ttl - ahead
+
+    def canonical(self, played_url: Optional[str]) -> Optional[str]:
+        """Maps a URL reported by MPD back to the station URL it was resolved from."""
+        return self._reverse.get(played_url, played_url) if played_url else played_url
+
+    def matches(self, url: str, played_url: Optional[str]) -> bool:
+        """True if MPD is playing ``url`` either directly or in its resolved form."""
+        return played_url is not None and (played_url == url or played_url == self.cached(url))
+
+    def resolve(self, url: str, refresh: bool = False) -> str:
+        """Returns the final stream URL for ``url``, resolving it if the cached entry is missing or stale.
+
+        If resolution fails, a stale cached result is still used; without one
+        the original URL is returned and MPD resolves it itself.
+        """
+        if not refresh and self.is_fresh(url):
+            return self.cached(url)
+        start = time.perf_counter()
+        try:
+            resolved = resolve_remote(url, self.timeout)
+        except (OSError, ValueError) as e:
+            fallback = self.cached(url)
+            logger.warning(f"Could not resolve {url}: {e}; using {fallback}")
+            return fallback
+        if resolved != url:
+            logger.info(f"Resolved {url} -> {resolved} in {(time.perf_counter() - start) * 1000:.0f} ms")
+        self._store(url, resolved)
+        self.save()
+        return resolved
+
+    def invalidate(self, url: str):
+        """Forgets the resolution of ``url`` (e.g. after playback of the resolved URL failed)."""
+        with self._lock:
+            entry = self._entries.pop(url, None)
+            if entry:
+                self._reverse.pop(entry.get("resolved"), None)
+        if entry:
+            self.save()
+
+    def prefetch(self, urls: Iterable[str], max_workers: int = 8, ahead: float = REFRESH_AHEAD):
+        """Resolves all missing URLs and those expiring within ``ahead`` seconds concurrently, then saves once.
+
+        URLs that another prefetch is resolving right now are skipped.
+        """
+        with self._lock:
+            pending = [u for u in dict.fromkeys(urls) if u and u not in self._inflight and not self.is_fresh(u, ahead)]
+            self._inflight.update(pending)
+        if not pending:
+            return
+
+        def work(url):
+            try:
+                self._store(url, resolve_remote(url, self.timeout))
+            except (OSError, ValueError) as e:
+                logger.warning(f"Could not resolve {url}: {e}")
+
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                list(pool.map(work, pending))
+            self.save()
+        finally:
+            with self._lock:
+                self._inflight.difference_update(pending)
+
+    def prefetch_async(self, urls: Iterable[str]) -> threading.Thread:
+        """Runs ``prefetch`` in a background thread."""
+        thread = threading.Thread(target=self.prefetch, args=(list(urls),), name="url-prefetch", daemon=True)
+        thread.start()
+        return thread